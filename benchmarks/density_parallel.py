@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# This benchmark times the reduction of orbital products onto a grid
+# (the kernel of DensityMatrix.density) for graphene and bulk Si
+# with an increasing number of threads.
+
+# This benchmark may be called using:
+#
+#  python $0 [N] [max-threads]
+#
+# where N is the number of repetitions of the unit cells.
+#
+
+from __future__ import annotations
+
+import sys
+import time
+
+import numpy as np
+
+import sisl
+from sisl._threads import num_threads
+
+if len(sys.argv) > 1:
+    N = int(sys.argv[1])
+else:
+    N = 4
+if len(sys.argv) > 2:
+    max_threads = int(sys.argv[2])
+else:
+    max_threads = 4
+print(f"N = {N}")
+
+# Always fix the random seed to make each profiling concurrent
+np.random.seed(1234567890)
+
+
+def orbitals(R):
+    r = np.linspace(0, R, 100)
+    f = np.exp(-r)
+    return [
+        o for l in (0, 1) for o in sisl.SphericalOrbital(l, (r, f)).toAtomicOrbital()
+    ]
+
+
+gr = sisl.geom.graphene(atoms=sisl.Atom(6, orbitals(2.0))).tile(N, 0).tile(N, 1)
+si = sisl.geom.diamond(5.43, atoms=sisl.Atom(14, orbitals(2.5))).tile(N // 2 + 1, 0)
+
+for name, geom, shape in (
+    ("graphene", gr, (12 * N, 12 * N, 60)),
+    ("bulk Si", si, (24 * (N // 2 + 1), 24, 24)),
+):
+    psi = sisl.SparseGridOrbitalBZ.from_geometry(geom, shape)
+    # the orbital values may need a larger supercell than the geometry
+    geom = psi.geometry
+    DM = sisl.DensityMatrix(geom)
+    R = geom.maxR() * 2
+    for ia in geom:
+        orbs = geom.a2o(ia, all=True)
+        for ja in geom.close(ia, R=R):
+            DM[orbs, geom.a2o(ja, all=True)] = np.random.rand()
+    csr = DM.tocsr()
+    npoints = np.prod(shape)
+    print(f"{name}: no = {geom.no}, grid = {shape}, nnz(psi) = {psi._csr.nnz}")
+
+    ref = None
+    nthreads = 1
+    while nthreads <= max_threads:
+        with num_threads(nthreads):
+            t0 = time.perf_counter()
+            rho = psi.reduce_orbital_products(csr, DM.lattice).grid
+            t = time.perf_counter() - t0
+        if ref is None:
+            ref = rho
+        assert np.allclose(ref, rho)
+        print(
+            f"  threads = {nthreads:3d}: {t:8.3f} s, {npoints / t / 1e6:8.2f} Mpoints/s"
+        )
+        nthreads *= 2
@@ -112,6 +112,9 @@ from .shape import *
 # Physical quantities and required classes
 from .physics import *
 
+# Orbital values on grids (requires the physics module)
+from ._sparse_grid import *
+
 # The io files requires imports from the above modules
 # Hence, we *must* import it last.
 # This makes one able to get files through:
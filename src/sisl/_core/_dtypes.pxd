@@ -30,8 +30,10 @@ ctypedef fused ints_st:
     long
 
 
+# Sparse matrix indices, int64 is used for very large matrices
 ctypedef fused int_sp_st:
     int
+    int64_t
 
 
 ctypedef fused floats_st:
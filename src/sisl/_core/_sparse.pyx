@@ -9,7 +9,7 @@ cimport numpy as cnp
 from numpy cimport dtype, ndarray
 
 from sisl._core._dtypes cimport inline_sum, int_sp_st, numerics_st, type2dtype
-from sisl._indices cimport in_1d
+from sisl._indices cimport _index_sorted, in_1d
 
 
 @cython.boundscheck(False)
@@ -200,6 +200,100 @@ def fold_csr_matrix_diag(int_sp_st[::1] ptr,
     return FOLD_ptr, FOLD_ncol, FOLD_col[:nz].copy()
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+@cython.cdivision(True)
+def fold_csr_matrix_index(int_sp_st[::1] ptr,
+                          int_sp_st[::1] ncol,
+                          int_sp_st[::1] col,
+                          int_sp_st[::1] fold_ptr,
+                          int_sp_st[::1] fold_ncol,
+                          int_sp_st[::1] fold_col,
+                          ):
+    """ Index of each sparse element in the folded sparse matrix (see `fold_csr_matrix`)
+
+    Elements not in use (holes in the sparse pattern) will have index -1.
+    """
+
+    # Number of rows
+    cdef int_sp_st nr = ncol.shape[0]
+
+    cdef object dtype = type2dtype[int_sp_st](1)
+    cdef ndarray[int_sp_st, mode='c'] FOLD_idx = np.full([col.shape[0]], -1, dtype=dtype)
+    cdef int_sp_st[::1] fold_idx = FOLD_idx
+
+    # local variables
+    cdef int_sp_st r, ind
+    cdef int_sp_st[::1] tmp
+
+    with nogil:
+        for r in range(nr):
+            tmp = fold_col[fold_ptr[r]:fold_ptr[r] + fold_ncol[r]]
+            for ind in range(ptr[r], ptr[r] + ncol[r]):
+                fold_idx[ind] = fold_ptr[r] + _index_sorted(tmp, col[ind] % nr)
+
+    return FOLD_idx
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def coo_merge_sorted(int_sp_st[::1] row,
+                     int_sp_st[::1] col,
+                     numerics_st[:, ::1] data,
+                     const int_sp_st nr,
+                     const bint add):
+    """ Convert COO elements sorted by (row, col) into finalized CSR arrays
+
+    Duplicate (row, col) elements are merged, either by summing them (`add`)
+    or by keeping the last one.
+
+    Returns
+    -------
+    ptr, ncol, col, data
+    """
+    cdef Py_ssize_t n = row.shape[0]
+    cdef Py_ssize_t K = data.shape[1]
+
+    cdef object dtype = type2dtype[int_sp_st](1)
+    cdef ndarray[int_sp_st, mode='c'] PTR = np.zeros([nr + 1], dtype=dtype)
+    cdef ndarray[int_sp_st, mode='c'] NCOL = np.zeros([nr], dtype=dtype)
+    cdef ndarray[int_sp_st, mode='c'] COL = np.empty([n], dtype=dtype)
+    cdef cnp.ndarray D = np.empty([n, K], dtype=np.asarray(data).dtype)
+
+    cdef int_sp_st[::1] ptr = PTR
+    cdef int_sp_st[::1] ncol = NCOL
+    cdef int_sp_st[::1] out_col = COL
+    cdef numerics_st[:, ::1] out_data = D
+
+    cdef Py_ssize_t ind, ix, r
+    cdef Py_ssize_t nz = -1
+
+    with nogil:
+        for ind in range(n):
+            if nz >= 0 and row[ind] == row[ind-1] and col[ind] == out_col[nz]:
+                # duplicate element
+                if add:
+                    for ix in range(K):
+                        out_data[nz, ix] += data[ind, ix]
+                else:
+                    for ix in range(K):
+                        out_data[nz, ix] = data[ind, ix]
+            else:
+                nz += 1
+                ncol[row[ind]] += 1
+                out_col[nz] = col[ind]
+                for ix in range(K):
+                    out_data[nz, ix] = data[ind, ix]
+
+        for r in range(nr):
+            ptr[r+1] = ptr[r] + ncol[r]
+
+    nz += 1
+    return PTR, NCOL, COL[:nz].copy(), D[:nz].copy()
+
+
 def sparse_dense(M):
     cdef cnp.ndarray dense = np.zeros(M.shape, dtype=M.dtype)
     _sparse_dense(M.ptr, M.ncol, M.col, M._D, dense)
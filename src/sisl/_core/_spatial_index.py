@@ -0,0 +1,134 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from math import floor
+
+import numpy as np
+import numpy.typing as npt
+
+import sisl._array as _a
+
+__all__ = ["SpatialIndex"]
+
+
+class SpatialIndex:
+    r"""Cartesian bins of a set of coordinates for fast sphere queries
+
+    The coordinates are distributed in cubic bins spanning the bounding
+    box of the coordinates. A query for all coordinates within a sphere then only
+    needs to check the coordinates in the bins overlapping the sphere, i.e.
+    the query scales with the number of neighbors, rather than the number of
+    coordinates.
+
+    This is used internally by `Geometry` to speed up `Geometry.close` and
+    `Geometry.within` (and their supercell variants). Contrary to the bins
+    of `NeighborFinder` the bins are not related to the lattice,
+    so any coordinates (also outside the unit cell) and any query point are handled.
+
+    Parameters
+    ----------
+    xyz :
+        the coordinates to index, a copy is stored to check whether the
+        index is still valid.
+    bin_size :
+        the (minimum) side length of the bins. The bins are made larger if
+        the number of bins would largely exceed the number of coordinates
+        (e.g. for sparse coordinates).
+    """
+
+    def __init__(self, xyz: npt.ArrayLike, bin_size: float = 1.0):
+        self.xyz = _a.arrayd(xyz).reshape(-1, 3)
+        n = len(self.xyz)
+
+        if n == 0:
+            self.origin = _a.zerosd(3)
+            extent = _a.zerosd(3)
+        else:
+            self.origin = self.xyz.min(0)
+            extent = self.xyz.max(0) - self.origin
+
+        # Limit the number of bins to a few times the number of coordinates
+        bin_size = max(bin_size, 1e-3)
+        nbins = np.floor(extent / bin_size).astype(np.int64) + 1
+        while nbins.prod() > 4 * n + 8:
+            bin_size *= 1.25
+            nbins = np.floor(extent / bin_size).astype(np.int64) + 1
+        self.bin_size = bin_size
+        self.nbins = nbins
+        self._nbins = nbins.tolist()
+
+        bins = self._get_bins(self.xyz)
+        # Sort coordinates by their bins, ptr[i]:ptr[i+1] are the
+        # coordinates in bin i
+        self._index = np.argsort(bins, kind="stable").astype(np.int32)
+        self._ptr = _a.zerosi(nbins.prod() + 1)
+        np.cumsum(np.bincount(bins, minlength=nbins.prod()), out=self._ptr[1:])
+
+    def __len__(self) -> int:
+        return len(self.xyz)
+
+    def _get_bins(self, xyz: np.ndarray) -> np.ndarray:
+        """Scalar bin index for each coordinate"""
+        ibins = np.floor((xyz - self.origin) / self.bin_size).astype(np.int64)
+        ibins = np.clip(ibins, 0, self.nbins - 1)
+        return np.ravel_multi_index(ibins.T, self.nbins)
+
+    def is_valid(self, xyz: np.ndarray) -> bool:
+        """Whether the index is built from the coordinates `xyz`"""
+        return xyz.shape == self.xyz.shape and np.array_equal(xyz, self.xyz)
+
+    def candidates(self, center: npt.ArrayLike, R: float) -> np.ndarray:
+        """Indices of the coordinates that may be within a sphere (sorted)
+
+        All coordinates within the sphere are returned, together with some coordinates
+        in the bins overlapping with the sphere. The distances should be checked by the caller.
+
+        Parameters
+        ----------
+        center :
+            center of the sphere
+        R :
+            radius of the sphere
+        """
+        # a small margin catches coordinates on the sphere surface
+        R = R * (1 + 1e-12) + 1e-8
+        h = self.bin_size
+        lo = []
+        hi = []
+        for c, nbins in zip((_a.asarrayd(center) - self.origin).tolist(), self._nbins):
+            # clip before converting to int (R may be very large)
+            l = max(floor(max((c - R) / h, -1.0)), 0)
+            u = min(floor(min((c + R) / h, nbins)), nbins - 1)
+            if u < l:
+                return _a.emptyi([0])
+            lo.append(l)
+            hi.append(u)
+
+        # the bins along the last direction are consecutive
+        ptr = self._ptr
+        index = self._index
+        _, ny, nz = self._nbins
+        if (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) > 32:
+            # many bins (large spheres), gather them all at once
+            ix = np.arange(lo[0], hi[0] + 1)
+            iy = np.arange(lo[1], hi[1] + 1)
+            first = ((ix[:, None] * ny + iy[None, :]) * nz).ravel()
+            start = ptr[first + lo[2]]
+            count = ptr[first + hi[2] + 1] - start
+            total = count.sum()
+            idx = np.repeat(start - np.cumsum(count) + count, count) + np.arange(total)
+            return np.sort(index[idx])
+
+        parts = []
+        for ix in range(lo[0], hi[0] + 1):
+            for iy in range(lo[1], hi[1] + 1):
+                first = (ix * ny + iy) * nz
+                start = ptr[first + lo[2]]
+                end = ptr[first + hi[2] + 1]
+                if start < end:
+                    parts.append(index[start:end])
+        if len(parts) == 0:
+            return _a.emptyi([0])
+        return np.sort(np.concatenate(parts))
@@ -0,0 +1,113 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+import sisl._array as _a
+
+if TYPE_CHECKING:
+    from .geometry import Geometry
+
+__all__ = ["SupercellCoordinates"]
+
+
+class SupercellCoordinates:
+    r"""Virtual view of the atomic coordinates in all supercell images of a geometry
+
+    The coordinates of the supercell atoms are never stored, they are
+    calculated on demand from the unit-cell coordinates and the supercell offsets
+
+    .. math::
+        \mathbf r^{I + s N} = \mathbf r^I + \mathbf R_s
+
+    Hence, indexing the view only calculates the requested coordinates and
+    `blocks` streams through all coordinates in blocks of supercell images,
+    so the memory stays at the scale of the unit cell.
+
+    The view always reflects the current coordinates and lattice of the geometry.
+
+    Parameters
+    ----------
+    geometry :
+        the geometry with the coordinates and supercell
+
+    Examples
+    --------
+    >>> geom = Geometry([[0, 0, 0], [0.5, 0, 0]], lattice=Lattice(1., nsc=[3, 1, 1]))
+    >>> sc_xyz = geom.sc_xyz
+    >>> sc_xyz.shape
+    (6, 3)
+    >>> np.allclose(sc_xyz[[1, 3]], geom.axyz([1, 3]))
+    True
+    """
+
+    def __init__(self, geometry: Geometry):
+        self.geometry = geometry
+
+    def __repr__(self) -> str:
+        return f"<{self.__module__}.{self.__class__.__name__} shape={self.shape}>"
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the coordinates, ``(na_s, 3)``"""
+        return (self.geometry.na_s, 3)
+
+    def __len__(self) -> int:
+        return self.geometry.na_s
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Cartesian offsets of the supercell images, in the order of the supercell indices"""
+        return self.geometry.lattice.offset(self.geometry.lattice.sc_off)
+
+    def __getitem__(self, atoms) -> np.ndarray:
+        """Coordinates of the supercell atoms `atoms` (anything `Geometry` can sanitize)"""
+        geom = self.geometry
+        if isinstance(atoms, slice):
+            atoms = _a.arangei(*atoms.indices(geom.na_s))
+        else:
+            atoms = geom._sanitize_atoms(atoms)
+        isc, ia = np.divmod(atoms, geom.na)
+        return geom.xyz[ia] + self.offsets[isc]
+
+    def blocks(self, size: Optional[int] = None) -> Iterator[tuple[slice, np.ndarray]]:
+        """Iterate the coordinates of all supercell atoms in blocks of supercell images
+
+        Parameters
+        ----------
+        size :
+            the (approximate) number of coordinates in each block, rounded to
+            a full number of supercell images (at least one).
+            Defaults to the number of atoms in the unit cell.
+
+        Yields
+        ------
+        slice
+            the supercell atomic indices of the block
+        numpy.ndarray
+            the coordinates of the supercell atoms in the block
+        """
+        geom = self.geometry
+        na = geom.na
+        xyz = geom.xyz
+        offsets = self.offsets
+        n_s = len(offsets)
+        if size is None:
+            size = na
+        step = max(1, size // max(1, na))
+        for s in range(0, n_s, step):
+            off = offsets[s : s + step]
+            block = (xyz[None, :, :] + off[:, None, :]).reshape(-1, 3)
+            yield slice(s * na, (s + len(off)) * na), block
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        xyz = self.geometry.xyz
+        xyz = (xyz[None, :, :] + self.offsets[:, None, :]).reshape(-1, 3)
+        if dtype is not None:
+            xyz = xyz.astype(dtype, copy=False)
+        return xyz
@@ -71,6 +71,8 @@ from sisl.utils import (
 )
 from sisl.utils.mathematics import fnorm
 
+from ._spatial_index import SpatialIndex
+from ._supercell_coordinates import SupercellCoordinates
 from .atom import Atom, Atoms
 from .lattice import Lattice, LatticeChild
 from .orbital import Orbital
@@ -333,6 +335,14 @@ class Geometry(
         """Returns geometry coordinates in fractional coordinates"""
         return dot(self.xyz, self.icell.T)
 
+    @property
+    def sc_xyz(self) -> SupercellCoordinates:
+        """Virtual view of the atomic coordinates of all supercell atoms
+
+        The coordinates are calculated on demand, see `SupercellCoordinates`.
+        """
+        return SupercellCoordinates(self)
+
     def __setitem__(self, atoms, value):
         """Specify geometry coordinates"""
         if isinstance(atoms, str):
@@ -635,38 +645,18 @@ class Geometry(
         `Geometry`
             the supercell expanded and reordered Geometry
         """
-        # Get total number of atoms
-        na = len(self)
-        # create the big supercell geometry in the simplest (linear) way
-        sc = self * self.nsc
-
-        # remove nsc, this supercell should hold all information
-        sc.set_nsc([1, 1, 1])
-
-        # get off-set for first atom
-        # this is used to correct the indices created after having shifted
-        # everything
-        f0 = self.fxyz[0]
-
-        # translate the supercell such that the 0, 0, 0 (primary cell)
-        # is located at the origin.
-        sc = sc.translate(-(self.nsc // 2) @ self.cell)
-
-        # Calculate the translation table such that the ordering in `sc` can
-        # be made to look like the `self` supercell indices
-        isc_sc = np.rint(sc.xyz[::na] @ self.icell.T - f0).astype(np.int32)
-        isc_self = self.a2isc(np.arange(self.n_s) * na)
-
-        def new_sub(isc):
-            return (abs(isc_sc - isc).sum(1) == 0).nonzero()[0][0]
-
-        # Create the translation table for the indices
-        translate = np.array([new_sub(isc) for isc in isc_self])
-        # make sure all atoms are present
-        translate = np.repeat(translate * na, na).reshape(-1, na) + np.arange(na)
+        # the lattice of the big supercell, it holds all information
+        lattice = self.lattice.copy()
+        for axis, reps in enumerate(self.nsc):
+            lattice = lattice.tile(reps, axis)
+        lattice.set_nsc([1, 1, 1])
 
-        # re-arrange the atoms and return
-        return sc.sub(translate.ravel())
+        # the coordinates are directly ordered as the supercell indices
+        return self.__class__(
+            np.asarray(self.sc_xyz),
+            atoms=self.atoms.tile(self.n_s),
+            lattice=lattice,
+        )
 
     def reorder(self) -> None:
         """Reorders atoms according to first occurence in the geometry
@@ -2329,6 +2319,27 @@ class Geometry(
         # Neither of atoms, or isc are `None`, we add the offset to all coordinates
         return self.oxyz(orbitals) + self.lattice.offset(isc)
 
+    #: Minimum number of atoms for which `close` and `within` use a spatial index
+    _spatial_index_min_na = 128
+
+    def _get_spatial_index(self) -> Optional[SpatialIndex]:
+        """Spatial index of the atomic coordinates used in the proximity searches
+
+        The index is built lazily and stored on the geometry. It is rebuilt
+        whenever the atomic coordinates are changed (in-place changes included).
+        The index is independent of the lattice, the supercell offsets are added
+        to the query points.
+
+        Returns ``None`` for small geometries, where a direct search is faster.
+        """
+        if self.na < self._spatial_index_min_na:
+            return None
+        index = getattr(self, "_spatial_index", None)
+        if index is None or not index.is_valid(self.xyz):
+            index = SpatialIndex(self.xyz, bin_size=max(self.maxR(), 1.0))
+            self._spatial_index = index
+        return index
+
     def within_sc(
         self,
         shapes,
@@ -2378,7 +2389,24 @@ class Geometry(
         rij
             distance of the indexed atoms to the center of the shape (only for true `ret_rij`)
         """
+        index = None
+        if atoms is None:
+            index = self._get_spatial_index()
+        return self._within_sc(
+            shapes, isc, atoms, atoms_xyz, ret_xyz, ret_rij, index=index
+        )
 
+    def _within_sc(
+        self,
+        shapes,
+        isc,
+        atoms: AtomsIndex,
+        atoms_xyz,
+        ret_xyz: bool,
+        ret_rij: bool,
+        index: Optional[SpatialIndex] = None,
+    ):
+        """Implementation of `within_sc`, `index` is the (validated) spatial index used for ``atoms=None``"""
         # Ensure that `shapes` is a list
         if isinstance(shapes, Shape):
             shapes = [shapes]
@@ -2397,8 +2425,20 @@ class Geometry(
         # Get the supercell offset
         soff = self.lattice.offset(isc)[:]
 
+        if atoms is not None:
+            index = None
+        if index is not None:
+            try:
+                sphere = shapes[-1].to.Sphere()
+            except Exception:
+                index = None
+
         # Get atomic coordinate in principal cell
-        if atoms_xyz is None:
+        if index is not None:
+            # Only check atoms close to the shape
+            atoms = index.candidates(sphere.center - soff, sphere.radius)
+            xa = self.xyz[atoms] + soff[None, :]
+        elif atoms_xyz is None:
             xa = self[atoms, :] + soff[None, :]
         else:
             # For extremely large systems re-using the
@@ -2548,6 +2588,25 @@ class Geometry(
         rij
             distance of the indexed atoms to the center coordinate (only for true `ret_rij`)
         """
+        index = None
+        if atoms is None:
+            index = self._get_spatial_index()
+        return self._close_sc(
+            xyz_ia, isc, R, atoms, atoms_xyz, ret_xyz, ret_rij, index=index
+        )
+
+    def _close_sc(
+        self,
+        xyz_ia,
+        isc,
+        R,
+        atoms: AtomsIndex,
+        atoms_xyz,
+        ret_xyz: bool,
+        ret_rij: bool,
+        index: Optional[SpatialIndex] = None,
+    ):
+        """Implementation of `close_sc`, `index` is the (validated) spatial index used for ``atoms=None``"""
         maxR = self.maxR() + 0.001
         if R is None:
             R = np.array([maxR], np.float64)
@@ -2583,8 +2642,15 @@ class Geometry(
         # Calculate the complete offset
         foff = self.lattice.offset(isc) - off
 
+        if atoms is not None:
+            index = None
+
         # Get distances between `xyz_ia` and `atoms`
-        if atoms_xyz is None:
+        if index is not None:
+            # Only check atoms close to the sphere
+            atoms = index.candidates(-foff, max_R)
+            dxa = self.xyz[atoms] + foff
+        elif atoms_xyz is None:
             dxa = self.axyz(atoms) + foff
         else:
             # For extremely large systems re-using the
@@ -2826,16 +2892,22 @@ class Geometry(
         def isc_tile(isc, n):
             return tile(isc.reshape(1, -1), (n, 1))
 
+        # validate the spatial index once for all supercells
+        index = None
+        if atoms is None:
+            index = self._get_spatial_index()
+
         for s in range(self.n_s):
             na = self.na * s
             isc = self.lattice.sc_off[s, :]
-            sret = self.within_sc(
+            sret = self._within_sc(
                 shapes,
-                self.lattice.sc_off[s, :],
-                atoms=atoms,
-                atoms_xyz=atoms_xyz,
-                ret_xyz=ret_xyz,
-                ret_rij=ret_rij,
+                isc,
+                atoms,
+                atoms_xyz,
+                ret_xyz,
+                ret_rij,
+                index=index,
             )
 
             if listify:
@@ -2975,17 +3047,23 @@ class Geometry(
         def isc_tile(isc, n):
             return tile(isc.reshape(1, -1), (n, 1))
 
+        # validate the spatial index once for all supercells
+        index = None
+        if atoms is None:
+            index = self._get_spatial_index()
+
         for s in range(self.n_s):
             na = self.na * s
             isc = self.lattice.sc_off[s]
-            sret = self.close_sc(
+            sret = self._close_sc(
                 xyz_ia,
                 isc,
-                R=R,
-                atoms=atoms,
-                atoms_xyz=atoms_xyz,
-                ret_xyz=ret_xyz,
-                ret_rij=ret_rij,
+                R,
+                atoms,
+                atoms_xyz,
+                ret_xyz,
+                ret_rij,
+                index=index,
             )
 
             if listify:
@@ -3819,10 +3897,16 @@ class Geometry(
         nsc[non_periodic] = 1
         full_geom.set_nsc(nsc)
 
-        # Now retrieve all atomic coordinates from the full geometry
-        xyz = full_geom.axyz(_a.arangei(full_geom.na_s))
-        idx = cuboid.within_index(xyz)
-        xyz = xyz[idx, :]
+        # Now retrieve all atomic coordinates from the full geometry,
+        # streamed in blocks of supercell images
+        idx = []
+        xyz = []
+        for sl, block in full_geom.sc_xyz.blocks():
+            ix = cuboid.within_index(block)
+            idx.append(ix + sl.start)
+            xyz.append(block[ix])
+        idx = concatenate(idx)
+        xyz = concatenate(xyz)
         del full_geom
 
         # Figure out supercell connections in the smaller indices
@@ -11,21 +11,23 @@ from math import pi
 from math import sqrt as msqrt
 from numbers import Integral, Real
 from typing import Optional, Union
+from weakref import WeakKeyDictionary
 
 import numpy as np
 import numpy.typing as npt
 from numpy import cos, sin, take
-from scipy.special import eval_genlaguerre, factorial, lpmv
+from scipy.special import eval_genlaguerre, factorial
 
 try:
     from scipy.integrate import cumulative_trapezoid
 except ImportError:
     from scipy.integrate import cumtrapz as cumulative_trapezoid
 
-from scipy.interpolate import UnivariateSpline
+from scipy.interpolate import CubicHermiteSpline, UnivariateSpline
 
 import sisl._array as _a
 from sisl._internal import set_module
+from sisl._math_small import uniform_table_eval
 from sisl.constant import a0
 from sisl.messages import warn
 from sisl.shape import Sphere
@@ -61,8 +63,46 @@ def _rfact(l, m):
 # It will never be used, but in case somebody wishes to play with spherical harmonics
 # then why not ;)
 _rspher_harm_fact = tuple({m: _rfact(l, m) for m in range(-l, l + 1)} for l in range(8))
+
+
+# The same factors, but for P^{|m|}_l, i.e. with the relation
+#   P^{-m}_l = (-1)^m (l-m)!/(l+m)! P^m_l
+# folded in.
+def _rfact_abs(l, m):
+    if m < 0:
+        return _rspher_harm_fact[l][m] * (-1) ** m * fact(l + m) / fact(l - m)
+    return _rspher_harm_fact[l][m]
+
+
+_rspher_harm_fact_abs = tuple(
+    {m: _rfact_abs(l, m) for m in range(-l, l + 1)} for l in range(8)
+)
 # Clean-up
-del _rfact
+del _rfact, _rfact_abs
+
+
+def _lpmv_abs(l, m, x):
+    r"""Associated Legendre polynomial :math:`P^m_l(x)` for :math:`0\le m\le l` (with the Condon-Shortley phase)
+
+    Calculated with the upwards recurrence in :math:`l`, which is much faster
+    than `scipy.special.lpmv` for the low :math:`l` of orbitals.
+    """
+    x = np.asarray(x)
+    # P^m_m
+    p = np.ones_like(x, dtype=np.float64)
+    if m > 0:
+        # (2m-1)!!
+        dfact = 1.0
+        for i in range(1, 2 * m, 2):
+            dfact *= i
+        p = (-1) ** m * dfact * np.sqrt(np.maximum(1 - x * x, 0.0)) ** m
+    if l == m:
+        return p
+    # P^m_{m+1}
+    p_prev, p = p, x * (2 * m + 1) * p
+    for ll in range(m + 2, l + 1):
+        p_prev, p = p, ((2 * ll - 1) * x * p - (ll + m - 1) * p_prev) / (ll - m)
+    return p
 
 
 def _rspherical_harm(l, m, theta, cos_phi):
@@ -94,11 +134,12 @@ def _rspherical_harm(l, m, theta, cos_phi):
     # Currently this is a re-write of what Inelastica does and a combination of
     # learned lessons from Denchar.
     # As such the choice of these real spherical harmonics is that of Siesta.
+    P = _lpmv_abs(l, abs(m), cos_phi)
     if m == 0:
-        return _rspher_harm_fact[l][m] * lpmv(m, l, cos_phi)
+        return _rspher_harm_fact_abs[l][m] * P
     elif m < 0:
-        return _rspher_harm_fact[l][m] * (lpmv(m, l, cos_phi) * sin(m * theta))
-    return _rspher_harm_fact[l][m] * (lpmv(m, l, cos_phi) * cos(m * theta))
+        return _rspher_harm_fact_abs[l][m] * (P * sin(m * theta))
+    return _rspher_harm_fact_abs[l][m] * (P * cos(m * theta))
 
 
 @set_module("sisl")
@@ -576,6 +617,11 @@ def _radial(self, r, *args, **kwargs) -> np.ndarray:
     return p
 
 
+# Tabulated radial functions, per radial function (shared by all orbitals
+# using the same radial function) and (R, dr, order).
+_radial_tables = WeakKeyDictionary()
+
+
 RadialFuncType = Union[
     tuple[npt.ArrayLike, npt.ArrayLike], Callable[[npt.ArrayLike], npt.NDArray]
 ]
@@ -636,6 +682,12 @@ class SphericalOrbital(Orbital):
     # Additional slots (inherited classes retain the same slots)
     __slots__ = ("_l", "_radial")
 
+    #: Spacing (in Ang) of the uniform mesh the radial function is tabulated on
+    radial_table_dr: float = 0.001
+    #: Order of the interpolation of the tabulated radial function (1: linear, 3: cubic).
+    #: If 0 the radial function is always evaluated directly.
+    radial_table_order: int = 3
+
     def __init__(
         self,
         l: int,
@@ -674,7 +726,71 @@ class SphericalOrbital(Orbital):
         return hash((super(Orbital, self), self._l, self._radial))
 
     set_radial = _set_radial
-    radial = _radial
+
+    def _radial_table(self):
+        """Tabulated radial function, i.e. the interpolation coefficients and the mesh spacing
+
+        Returns ``None`` if the radial function can't be tabulated.
+        """
+        R = self.R
+        order = self.radial_table_order
+        if R <= 0 or order <= 0:
+            return None
+        key = (R, self.radial_table_dr, order)
+        try:
+            tables = _radial_tables.setdefault(self._radial, {})
+        except TypeError:
+            # the radial function can't be weak-referenced (or hashed)
+            return None
+
+        table = tables.get(key)
+        if table is None:
+            n = max(int(np.ceil(R / self.radial_table_dr)), 4)
+            r = np.linspace(0, R, n + 1)
+            f = _a.asarrayd(self._radial(r))
+            if order == 1:
+                coeff = np.column_stack((np.diff(f) / (r[1] - r[0]), f[:-1]))
+            else:
+                # a local interpolation, so kinks in the radial function only
+                # affect the neighboring intervals
+                coeff = CubicHermiteSpline(r, f, np.gradient(f, r, edge_order=2)).c.T
+            table = (np.ascontiguousarray(coeff), r[1] - r[0])
+            tables[key] = table
+        return table
+
+    def radial(self, r, *args, **kwargs) -> np.ndarray:
+        r"""Calculate the radial part of spherical orbital :math:`R(\mathbf r)`
+
+        The radial function is tabulated on a uniform mesh (see `radial_table_dr`)
+        the first time it is called, and interpolated (see `radial_table_order`).
+        The table is shared by all orbitals with the same radial function.
+
+        Parameters
+        -----------
+        r : array_like
+           radius from the orbital origin
+        *args :
+           arguments passed to the radial function (disables the tabulation)
+        **args :
+           keyword arguments passed to the radial function (disables the tabulation)
+
+        Returns
+        -------
+        numpy.ndarray
+            radial orbital value at point `r`
+        """
+        table = None
+        if len(args) == 0 and len(kwargs) == 0:
+            table = self._radial_table()
+        if table is None:
+            return _radial(self, r, *args, **kwargs)
+
+        r = _a.asarrayd(r)
+        p = _a.zerosd(r.shape)
+        idx = (r <= self.R).nonzero()
+        if len(idx[0]) > 0:
+            p[idx] = uniform_table_eval(np.ascontiguousarray(r[idx]), *table)
+        return p
 
     def spher(self, theta, phi, m: int = 0, cos_phi: bool = False):
         r"""Calculate the spherical harmonics of this orbital at a given point (in spherical coordinates)
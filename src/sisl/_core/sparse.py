@@ -37,6 +37,7 @@ from numpy import (
     lexsort,
     ndarray,
     repeat,
+    searchsorted,
     setdiff1d,
     split,
     take,
@@ -55,7 +56,7 @@ from sisl.messages import SislError, warn
 from sisl.typing import OrSequence, SeqOrScalarFloat, SeqOrScalarInt, SparseMatrix
 from sisl.utils.mathematics import intersect_and_diff_sets
 
-from ._sparse import sparse_dense
+from ._sparse import coo_merge_sorted, sparse_dense
 
 # Although this re-implements the CSR in scipy.sparse.csr_matrix
 # we use it slightly differently and thus require this new sparse pattern.
@@ -94,11 +95,11 @@ def _to_cd(csr, data: bool = True, rows=None):
             D = D.copy()
     else:
         if rows is None:
-            idx = array_arange(ptr[:-1], n=ncol, dtype=int32)
+            idx = array_arange(ptr[:-1], n=ncol, dtype=ptr.dtype)
         else:
             rows = csr._sanitize(rows).ravel()
             ncol = ncol[rows]
-            idx = array_arange(ptr[rows], n=ncol, dtype=int32)
+            idx = array_arange(ptr[rows], n=ncol, dtype=ptr.dtype)
         if data:
             D = D[idx]
         cols = col[idx]
@@ -138,16 +139,16 @@ def _to_coo(csr, data: bool = True, rows=None):
             D = D.copy()
     else:
         if rows is None:
-            idx = array_arange(ptr[:-1], n=ncol, dtype=int32)
+            idx = array_arange(ptr[:-1], n=ncol, dtype=ptr.dtype)
         else:
             rows = csr._sanitize(rows).ravel()
             ncol = ncol[rows]
-            idx = array_arange(ptr[rows], n=ncol, dtype=int32)
+            idx = array_arange(ptr[rows], n=ncol, dtype=ptr.dtype)
         if data:
             D = D[idx]
         cols = col[idx]
     idx = (ncol > 0).nonzero()[0]
-    rows = repeat(idx.astype(int32, copy=False), ncol[idx])
+    rows = repeat(idx.astype(_index_dtype(csr.shape[0]), copy=False), ncol[idx])
 
     if data:
         return rows, cols, D
@@ -155,13 +156,52 @@ def _to_coo(csr, data: bool = True, rows=None):
 
 
 def _ncol_to_indptr(ncol):
-    """Convert the ncol array into a pointer array"""
-    ptr = _a.emptyi(ncol.size + 1)
+    """Convert the ncol array into a pointer array (of the same data type)"""
+    ptr = empty(ncol.size + 1, dtype=ncol.dtype)
     ptr[0] = 0
-    _a.cumsumi(ncol, out=ptr[1:])
+    np.cumsum(ncol, out=ptr[1:])
     return ptr
 
 
+def _index_dtype(n: int):
+    """Data type of the sparse indices (``ptr``, ``ncol`` and ``col``)
+
+    The indices are int32, unless `n` (the number of non-zero elements,
+    or the number of columns) requires int64.
+    """
+    if n > np.iinfo(int32).max:
+        return np.int64
+    return int32
+
+
+def _translate(old, new, values, missing=None):
+    """Translate `values` equal to an element in `old` to the corresponding element in `new`
+
+    This is equivalent to ``pvt[values]`` with ``pvt[old] = new``, without
+    creating a pivot array spanning all values.
+
+    Parameters
+    ----------
+    old, new :
+        the translation table, if `old` has duplicate values the last one is used
+    values :
+        the values to translate
+    missing :
+        the value for `values` not in `old`, if None they are retained
+    """
+    pvt = argsort(old, kind="stable")
+    old = old[pvt]
+    idx = searchsorted(old, values, side="right") - 1
+    found = idx >= 0
+    found[found] = old[idx[found]] == values[found]
+    if missing is None:
+        out = values.copy()
+    else:
+        out = full(values.shape, missing, dtype=values.dtype)
+    out[found] = new[pvt[idx[found]]]
+    return out
+
+
 def valid_index(idx, shape: int):
     """Check that all indices in `idx` is between [0; shape["""
     return np.logical_and(0 <= idx, idx < shape)
@@ -193,6 +233,11 @@ class SparseCSR(NDArrayOperatorsMixin):
 
     `nnz` is only used if ``nnz > nr * nnzpr``.
 
+    The indices (``ptr``, ``ncol`` and ``col``) are stored as int32, unless
+    the number of non-zero elements, or the number of columns, requires
+    int64 indices. The indices are converted to int64 when the matrix grows
+    beyond the int32 limit.
+
     This class may be instantiated by verious means.
 
     - ``SparseCSR(S)``
@@ -231,11 +276,27 @@ class SparseCSR(NDArrayOperatorsMixin):
 
     # We don't really need slots, but it is useful
     # to keep a good overview of which variables are present
-    __slots__ = ("_shape", "_ns", "_finalized", "_nnz", "ptr", "ncol", "col", "_D")
+    __slots__ = (
+        "_shape",
+        "_ns",
+        "_finalized",
+        "_nnz",
+        "ptr",
+        "ncol",
+        "col",
+        "_D",
+        "_revision",
+        "_pattern_revision",
+    )
 
     def __init__(self, arg1, dim=1, dtype=None, nnzpr: int = 20, nnz=None, **kwargs):
         """Initialize a new sparse CSR matrix"""
 
+        # counter of modifications, used for invalidating cached quantities
+        self._revision = 0
+        # counter of modifications of the sparsity pattern
+        self._pattern_revision = 0
+
         # step size in sparse elements
         # If there isn't enough room for adding
         # a non-zero element, the # of elements
@@ -286,7 +347,8 @@ class SparseCSR(NDArrayOperatorsMixin):
                 self.__init_shape(shape, dim=dim, dtype=dtype, nnz=1, **kwargs)
 
                 # Copy data to the arrays
-                self.ptr = arg1[2].astype(int32, copy=False)
+                idtype = _index_dtype(max(len(arg1[1]), shape[1]))
+                self.ptr = arg1[2].astype(idtype, copy=False)
                 """ int-array, ``self.shape[0]+1``
 pointer index in the 1D column indices of the corresponding row
                 """
@@ -294,7 +356,7 @@ pointer index in the 1D column indices of the corresponding row
                 """ int-array, ``self.shape[0]``
 number of entries per row
                 """
-                self.col = arg1[1].astype(int32, copy=False)
+                self.col = arg1[1].astype(idtype, copy=False)
                 """ int-array
 column indices of the sparse elements
                 """
@@ -350,13 +412,15 @@ column indices of the sparse elements
         nnzpr = max(nnzpr, 1)
         nnz = max(nnz, nnzpr * M)
 
+        idtype = _index_dtype(max(nnz, N))
+
         # Store number of columns currently hold
         # in the sparsity pattern
-        self.ncol = _a.zerosi([M])
+        self.ncol = zeros([M], idtype)
         # Create pointer array
-        self.ptr = _a.cumsumi(_a.fulli(M + 1, nnzpr)) - nnzpr
+        self.ptr = np.cumsum(full(M + 1, nnzpr, idtype), dtype=idtype) - nnzpr
         # Create column array
-        self.col = _a.fulli(nnz, -1)
+        self.col = full(nnz, -1, idtype)
         # Store current number of non-zero elements
         self._nnz = 0
 
@@ -430,9 +494,15 @@ column indices of the sparse elements
                     row_cols.append(mat.indices[mat.indptr[row] : mat.indptr[row + 1]])
             out_col.append(np.unique(concatenate(row_cols)))
         # Put into the output
-        out.ncol = _a.arrayi([len(cols) for cols in out_col])
+        ncol = [len(cols) for cols in out_col]
+        out_col = concatenate(out_col)
+        # retain int64 indices if any of the matrices uses it
+        idtype = np.promote_types(
+            _index_dtype(max(len(out_col), shape[1])), out_col.dtype
+        )
+        out.ncol = np.array(ncol, dtype=idtype)
         out.ptr = _ncol_to_indptr(out.ncol)
-        out.col = concatenate(out_col).astype(np.int32, copy=False)
+        out.col = out_col.astype(idtype, copy=False)
         out._nnz = len(out.col)
         out._D = full([out._nnz, out.dim], value, dtype=dtype)
         return out
@@ -445,7 +515,7 @@ column indices of the sparse elements
         rows, cols = _to_coo(self, data=False)
 
         # Now retrieve rows and cols
-        idx = array_arange(self.ptr[:-1], n=self.ncol, dtype=int32)
+        idx = array_arange(self.ptr[:-1], n=self.ncol, dtype=self.ptr.dtype)
         # figure out the indices where we have a diagonal index
         diag_idx = np.equal(rows, cols)
         idx = idx[diag_idx]
@@ -516,9 +586,11 @@ column indices of the sparse elements
            matrix from an old sparse matrix
         """
         self._D[:, :] = 0.0
+        self._revision += 1
 
         if not keep_nnz:
             self._finalized = False
+            self._pattern_revision += 1
             # The user does not wish to retain the
             # sparse pattern
             self.ncol[:] = 0
@@ -580,6 +652,7 @@ column indices of the sparse elements
         """
         if self.finalized:
             return
+        self._pattern_revision += 1
 
         # Create and index array to retain the indices we want
         row, col, D = _to_coo(self)
@@ -630,30 +703,38 @@ column indices of the sparse elements
         # Signal that we indeed have finalized the data
         self._finalized = sort
 
+    def _sanitize_dtype(self, axis: int):
+        """Data type of the sanitized indices, columns follows the index data type"""
+        if axis == 1:
+            return self.col.dtype
+        return int32
+
     @singledispatchmethod
     def _sanitize(self, idx, axis: int = 0) -> ndarray:
         """Sanitize the input indices to a conforming numpy array"""
+        dtype = self._sanitize_dtype(axis)
         if idx is None:
             if axis < 0:
-                return _a.arangei(np.max(self.shape))
-            return _a.arangei(self.shape[axis])
-        idx = _a.asarrayi(idx)
+                return arange(np.max(self.shape), dtype=dtype)
+            return arange(self.shape[axis], dtype=dtype)
+        idx = asarray(idx, dtype=dtype)
         if idx.size == 0:
-            return _a.asarrayi([])
+            return asarray([], dtype=dtype)
         if idx.dtype == bool_:
-            return idx.nonzero()[0].astype(np.int32, copy=False)
+            return idx.nonzero()[0].astype(dtype, copy=False)
         return idx
 
     @_sanitize.register
     def _(self, idx: ndarray, axis: int = 0) -> ndarray:
+        dtype = self._sanitize_dtype(axis)
         if idx.dtype == bool_:
-            return np.flatnonzero(idx).astype(np.int32)
-        return idx.astype(np.int32, copy=False)
+            return np.flatnonzero(idx).astype(dtype)
+        return idx.astype(dtype, copy=False)
 
     @_sanitize.register
     def _(self, idx: slice, axis: int = 0) -> ndarray:
         idx = idx.indices(self.shape[axis])
-        return _a.arangei(*idx)
+        return arange(*idx, dtype=self._sanitize_dtype(axis))
 
     def edges(self, rows: SeqOrScalarInt, exclude: Optional[SeqOrScalarInt] = None):
         """Retrieve edges (connections) of given `rows`
@@ -699,6 +780,8 @@ column indices of the sparse elements
         """
         # Shorthand function for retrieval
         cnz = count_nonzero
+        self._revision += 1
+        self._pattern_revision += 1
 
         # Sort the columns
         cols = unique(self._sanitize(cols, axis=1))
@@ -714,7 +797,7 @@ column indices of the sparse elements
         # Convert to boolean array where we have columns to be deleted
         lidx = isin(col[idx], cols)
         # Count number of deleted entries per row
-        ndel = _a.fromiteri(map(count_nonzero, split(lidx, _a.cumsumi(ncol[:-1]))))
+        ndel = _a.fromiteri(map(count_nonzero, split(lidx, np.cumsum(ncol[:-1]))))
         # Backconvert lidx to deleted indices
         lidx = idx[lidx]
         del idx
@@ -747,17 +830,14 @@ column indices of the sparse elements
 
         # Correct number of elements per column, and the pointers
         ncol[:] -= ndel
-        ptr[1:] -= _a.cumsumi(ndel)
+        ptr[1:] -= np.cumsum(ndel, dtype=ptr.dtype)
 
         if update_col:
-            # Create a count array to subtract
-            count = _a.zerosi(self.shape[1])
-            count[cols] = 1
-            count = _a.cumsumi(count)
-
-            # Recreate pointers due to deleted indices
+            # Recreate pointers due to deleted indices.
+            # The columns are shifted by the number of deleted columns
+            # below them (cols is sorted).
             idx = array_arange(ptr[:-1], n=ncol)
-            col[idx] -= count[col[idx]]
+            col[idx] -= searchsorted(cols, col[idx]).astype(col.dtype, copy=False)
             del idx
 
         # Update number of non-zeroes
@@ -771,6 +851,7 @@ column indices of the sparse elements
     def _clean_columns(self):
         """Remove all intrinsic columns that are not defined in the sparse matrix
         (below 0 or above nc)"""
+        self._pattern_revision += 1
         # Grab pointers
         ptr = self.ptr
         ncol = self.ncol
@@ -784,7 +865,7 @@ column indices of the sparse elements
         # Convert to boolean array where we have columns to be deleted
         lidx = invalid_index(col[idx], nc)
         # Count number of deleted entries per row
-        ndel = _a.fromiteri(map(count_nonzero, split(lidx, _a.cumsumi(ncol[:-1]))))
+        ndel = _a.fromiteri(map(count_nonzero, split(lidx, np.cumsum(ncol[:-1]))))
         # Backconvert lidx to deleted indices
         lidx = idx[lidx]
         del idx
@@ -796,7 +877,7 @@ column indices of the sparse elements
 
         # Update number of entries per row, and pointers
         ncol[:] -= ndel
-        ptr[1:] -= _a.cumsumi(ndel)
+        ptr[1:] -= np.cumsum(ndel, dtype=ptr.dtype)
 
         # Update number of non-zeroes
         self._nnz = int(ncol.sum())
@@ -843,16 +924,16 @@ column indices of the sparse elements
             )
 
         # Now do the translation
-        pvt = _a.arangei(self.shape[1])
-        pvt[old] = new
-
+        self._revision += 1
+        self._pattern_revision += 1
         # Get indices of valid column entries
         if rows is None:
             idx = array_arange(self.ptr[:-1], n=self.ncol)
         else:
             idx = array_arange(self.ptr[rows], n=self.ncol[rows])
-            # Convert the old column indices to new ones
-        self.col[idx] = pvt[self.col[idx]]
+
+        # Convert the old column indices to new ones
+        self.col[idx] = _translate(old, new, self.col[idx])
 
         # After translation, set to not finalized
         self._finalized = False
@@ -901,6 +982,7 @@ column indices of the sparse elements
 
         # Scale values where columns coincide with scaling factor
         self._D[idx[scale_idx]] *= scale
+        self._revision += 1
 
     def toarray(self):
         """Return a dense `numpy.ndarray` which has 3 dimensions (self.shape)"""
@@ -1109,6 +1191,11 @@ column indices of the sparse elements
             # Get how much larger we wish to create the sparse matrix...
             ns = max(self._ns, new_nnz)
 
+            # ...ensure the indices can hold the larger sparsity pattern...
+            self._ensure_index_dtype(len(col) + ns)
+            ptr = self.ptr
+            col = self.col
+
             # ...expand size of the sparsity pattern...
 
             # Insert new empty elements in the column index
@@ -1127,10 +1214,11 @@ column indices of the sparse elements
 
             # Lastly, shift all pointers above this row to account for the
             # new non-zero elements
-            ptr[i1:] += int32(ns)
+            ptr[i1:] += ptr.dtype.type(ns)
 
         if new_n > 0:
             # Ensure that we write the new elements to the matrix...
+            self._pattern_revision += 1
 
             # assign the column indices for the new entries
             # NOTE that this may not assign them in the order
@@ -1138,7 +1226,7 @@ column indices of the sparse elements
             col[ncol_ptr_i : ncol_ptr_i + new_n] = new_j
 
             # Step the size of the stored non-zero elements
-            self.ncol[i] += int32(new_n)
+            self.ncol[i] += new_n
 
             ncol_ptr_i += new_n
 
@@ -1150,7 +1238,24 @@ column indices of the sparse elements
 
         # ... retrieve the indices and return
         if ret_indices:
-            return indices(col[ptr_i:ncol_ptr_i], j, ptr_i)
+            return indices(
+                col[ptr_i:ncol_ptr_i], j.astype(col.dtype, copy=False), ptr_i
+            )
+
+    def _ensure_index_dtype(self, n: int) -> None:
+        """Convert the indices to int64 if `n` elements cannot be indexed by the current data type"""
+        idtype = _index_dtype(n)
+        if np.iinfo(idtype).max > np.iinfo(self.col.dtype).max:
+            self._set_index_dtype(idtype)
+
+    def _set_index_dtype(self, dtype) -> None:
+        """Convert the indices (``ptr``, ``ncol`` and ``col``) to `dtype`"""
+        if self.col.dtype == dtype:
+            return
+        self.ptr = self.ptr.astype(dtype)
+        self.ncol = self.ncol.astype(dtype)
+        self.col = self.col.astype(dtype)
+        self._pattern_revision += 1
 
     def _extend_empty(self, i, n):
         """Extends the sparsity pattern with `n` elements in row `i`
@@ -1179,6 +1284,9 @@ column indices of the sparse elements
         # will reduce the sparsity pattern, which
         # on first expansion calls this part.
         self._finalized = False
+        self._pattern_revision += 1
+
+        self._ensure_index_dtype(len(self.col) + n)
 
         # Insert new empty elements in the column index
         # after the column
@@ -1195,7 +1303,7 @@ column indices of the sparse elements
 
         # Lastly, shift all pointers above this row to account for the
         # new non-zero elements
-        self.ptr[i1:] += int32(n)
+        self.ptr[i1:] += self.ptr.dtype.type(n)
 
     def _get(self, i, j):
         """Retrieves the data pointer arrays of the elements, if it is non-existing, it will return ``-1``
@@ -1255,6 +1363,7 @@ column indices of the sparse elements
 
         i = self._sanitize(key[0], axis=0)
         key1 = self._sanitize(key[1], axis=1)
+        self._revision += 1
         if i.size > 1:
             for I in i:
                 del self[I, key1]
@@ -1267,6 +1376,7 @@ column indices of the sparse elements
         if len(index) == 0:
             # There are no elements to delete...
             return
+        self._pattern_revision += 1
 
         # Get short-hand
         ptr = self.ptr
@@ -1348,6 +1458,7 @@ column indices of the sparse elements
         # Ensure data type... possible casting...
         if data is None:
             return
+        self._revision += 1
 
         # Sadly, converting integers with None
         # will NOT produce nan's.
@@ -1460,6 +1571,86 @@ column indices of the sparse elements
                 # each element have different data
                 self._D[index, :] = data[:, :]
 
+    def set_elements(self, rows, cols, data, op: str = "set") -> None:
+        """Set many elements at once from flat COO arrays
+
+        This is much faster than setting elements through item assignment
+        when many elements are to be set. All elements are sorted, and duplicates
+        merged, in one go, and the matrix will be finalized afterwards.
+
+        Elements already in the matrix are retained, unless they are
+        also present in the new elements.
+
+        Parameters
+        ----------
+        rows : array_like
+           row indices of the elements
+        cols : array_like
+           column indices of the elements
+        data : array_like
+           values of the elements, either of shape ``(len(rows),)`` (same value
+           for all dimensions), ``(len(rows), self.dim)``, or anything
+           that can be broadcasted to it
+        op : {"set", "add"}
+           how duplicate elements (also those already in the matrix) are merged,
+           "set" retains the last element, "add" sums all elements
+
+        Examples
+        --------
+        >>> S = SparseCSR((3, 3))
+        >>> S.set_elements([0, 1, 1], [0, 1, 1], [1., 2., 3.], op="add")
+        >>> S.tocsr().toarray()
+        array([[1., 0., 0.],
+               [0., 5., 0.],
+               [0., 0., 0.]])
+        """
+        if op not in ("set", "add"):
+            raise ValueError(
+                f"{self.__class__.__name__}.set_elements got unknown op={op}, "
+                "should be one of [set, add]"
+            )
+        rows = _a.asarrayl(rows).ravel()
+        cols = _a.asarrayl(cols).ravel()
+        if rows.shape != cols.shape:
+            raise ValueError(
+                f"{self.__class__.__name__}.set_elements requires rows and cols "
+                "to have the same length"
+            )
+        n = len(rows)
+        data = asarray(data, dtype=self.dtype)
+        if data.ndim == 1 and data.size == n:
+            data = data.reshape(-1, 1)
+        data = np.broadcast_to(data, (n, self.dim))
+
+        if invalid_index(rows, self.shape[0]).any():
+            raise IndexError(
+                f"{self.__class__.__name__}.set_elements got row indices "
+                "outside the shape of the matrix"
+            )
+        if invalid_index(cols, self.shape[1]).any():
+            raise IndexError(
+                f"{self.__class__.__name__}.set_elements got column indices "
+                "outside the shape of the matrix"
+            )
+
+        # Existing elements are placed before the new ones, so
+        # that the new ones takes precedence for op="set"
+        old_rows, old_cols, old_D = _to_coo(self)
+        idtype = _index_dtype(max(len(old_rows) + n, self.shape[1]))
+        rows = concatenate((old_rows, rows)).astype(idtype, copy=False)
+        cols = concatenate((old_cols, cols)).astype(idtype, copy=False)
+        D = concatenate((old_D, data), axis=0)
+
+        # lexsort is a stable sort
+        idx = lexsort((cols, rows))
+        self.ptr, self.ncol, self.col, self._D = coo_merge_sorted(
+            rows[idx], cols[idx], D[idx], self.shape[0], op == "add"
+        )
+        self._nnz = len(self.col)
+        self._finalized = True
+        self._revision += 1
+        self._pattern_revision += 1
+
     def __contains__(self, key):
         """Check whether a sparse index is non-zero"""
         # Get indices of sparse data (-1 if non-existing)
@@ -1548,8 +1739,8 @@ column indices of the sparse elements
 
         # The default sizes are not passed
         # Hence we *must* copy the arrays directly
-        new.ptr[:] = self.ptr[:]
-        new.ncol[:] = self.ncol[:]
+        new.ptr = self.ptr.copy()
+        new.ncol = self.ncol.copy()
         new.col = self.col.copy()
         new._nnz = self.nnz
 
@@ -1562,24 +1753,54 @@ column indices of the sparse elements
 
         return new
 
-    def tocsr(self, dim: int = 0, **kwargs) -> csr_matrix:
+    def tocsr(self, dim: int = 0, copy: bool = True, **kwargs) -> csr_matrix:
         """Convert dimension `dim` into a :class:`~scipy.sparse.csr_matrix` format
 
         Parameters
         ----------
         dim :
            dimension of the data returned in a scipy sparse matrix format
+        copy :
+           if false, and the sparse matrix has no empty (unused) elements
+           (e.g. it is finalized), the returned matrix shares the index arrays
+           with this object. The data is shared when ``self.dim == 1``,
+           otherwise only the data of dimension `dim` is copied.
+           In all other cases a copy is returned.
         **kwargs:
            arguments passed to the :class:`~scipy.sparse.csr_matrix` routine
+
+        Notes
+        -----
+        A shared matrix (``copy=False``) is only valid as long as the sparsity
+        pattern of this object is not changed. Adding or deleting elements,
+        or finalizing, re-allocates the arrays of this object, while the returned
+        matrix still refers to the old arrays. Changing values in-place in one
+        of the matrices changes the values of the other (for shared data).
+        The returned matrix should not be modified by `scipy` methods that
+        work in-place on the indices, e.g. `~scipy.sparse.csr_matrix.sort_indices`
+        or `~scipy.sparse.csr_matrix.sum_duplicates`.
         """
         shape = self.shape[:2]
+        if not copy and self.nnz == self.ptr[-1]:
+            # No holes, we can re-use the index arrays
+            m = csr_matrix(
+                (np.ascontiguousarray(self._D[:, dim]), self.col, self.ptr),
+                shape=shape,
+                copy=False,
+                **kwargs,
+            )
+            if not self.finalized:
+                # the columns need not be sorted
+                m.has_sorted_indices = False
+            return m
+
         if self.finalized:
             # Easy case...
             return csr_matrix(
                 (
                     self._D[:, dim].copy(),
-                    self.col.astype(int32, copy=True),
-                    self.ptr.astype(int32, copy=True),
+                    self.col.copy(),
+                    self.ptr.copy(),
                 ),
                 shape=shape,
                 **kwargs,
@@ -1591,7 +1812,7 @@ column indices of the sparse elements
         ptr = _ncol_to_indptr(self.ncol)
 
         return csr_matrix(
-            (self._D[idx, dim].copy(), self.col[idx], ptr.astype(int32, copy=False)),
+            (self._D[idx, dim].copy(), self.col[idx], ptr),
             shape=shape,
             **kwargs,
         )
@@ -1668,7 +1889,9 @@ column indices of the sparse elements
         return new
 
     @classmethod
-    def fromsp(cls, sparse_matrices: OrSequence[SparseMatrix], dtype=None):
+    def fromsp(
+        cls, sparse_matrices: OrSequence[SparseMatrix], dtype=None, copy: bool = True
+    ):
         """Combine multiple single-dimension sparse matrices into one SparseCSR matrix
 
         The different sparse matrices need not have the same sparsity pattern.
@@ -1680,9 +1903,15 @@ column indices of the sparse elements
         dtype : numpy.dtype, optional
             data-type to store in the matrix, default to largest ``dtype`` for the
             passed sparse matrices
+        copy :
+            if false, and only a single matrix is passed, its arrays are adopted
+            without copying them (when their data-types allow it).
+            The returned matrix then shares memory with the passed matrix, see
+            `tocsr` for the lifetime rules of shared matrices.
+            For multiple matrices this flag has no effect.
         """
         if issparse(sparse_matrices) or isinstance(sparse_matrices, SparseCSR):
-            sparse_matrices = list(sparse_matrices)
+            sparse_matrices = [sparse_matrices]
 
         # short-hand
         spmats = sparse_matrices
@@ -1701,18 +1930,29 @@ column indices of the sparse elements
         if len(spmats) == 1:
             spmat = spmats[0]
             if isinstance(spmat, SparseCSR):
-                return spmat.copy(dtype=dtype)
+                if copy or spmat.dtype != dtype:
+                    return spmat.copy(dtype=dtype)
+                # a new matrix sharing the arrays
+                out = cls(spmat.shape, nnzpr=1, nnz=1, dtype=dtype)
+                out.ptr = spmat.ptr
+                out.ncol = spmat.ncol
+                out.col = spmat.col
+                out._nnz = spmat._nnz
+                out._D = spmat._D
+                out._finalized = spmat._finalized
+                return out
 
             # We are dealing with something different from a SparseCSR
             # Likely some scipy.sparse matrix.
             # Use that one.
             m = spmat.tocsr()
             out = cls(m.shape + (1,), nnzpr=1, nnz=1, dtype=dtype)
-            out.col = m.indices.astype(np.int32, copy=True)
-            out.ptr = m.indptr.astype(np.int32, copy=True)
+            idtype = _index_dtype(max(m.nnz, m.shape[1]))
+            out.col = m.indices.astype(idtype, copy=copy)
+            out.ptr = m.indptr.astype(idtype, copy=copy)
             out.ncol = np.diff(out.ptr)
             out._nnz = len(out.col)
-            out._D = m.data.reshape(-1, 1).astype(dtype, copy=True)
+            out._D = m.data.reshape(-1, 1).astype(dtype, copy=copy)
             return out
 
         # Pre-allocate by finding sparsity pattern union
@@ -1779,7 +2019,7 @@ column indices of the sparse elements
             rindices = delete(_a.arangei(self.shape[0]), indices)
 
         else:
-            rindices = delete(_a.arangei(self.shape[1]), indices)
+            rindices = delete(arange(self.shape[1], dtype=self.col.dtype), indices)
 
         return self.sub(rindices)
 
@@ -1809,15 +2049,13 @@ column indices of the sparse elements
         nr = len(ridx)
         nc = count_nonzero(indices < self.shape[1])
 
-        # Fix the pivoting indices with the new indices
-        pvt = _a.fulli([max(self.shape[0], self.shape[1])], -1)
-        pvt[indices] = _a.arangei(len(indices))
-
         # Create the new SparseCSR
         # We use nnzpr = 1 because we will overwrite all quantities afterwards.
         csr = self.__class__((nr, nc, self.shape[2]), dtype=self.dtype, nnz=1)
         # Limit memory
         csr._D = empty([1])
+        # Use the same index data type as this matrix
+        csr._set_index_dtype(self.col.dtype)
 
         # Get views
         ptr1 = csr.ptr
@@ -1833,7 +2071,7 @@ column indices of the sparse elements
         #   [1, :] the new column data
         # We do this because we can then use take on this array
         # and not two arrays.
-        col_data = _a.emptyi([2, ncol1.sum()])
+        col_data = empty([2, ncol1.sum()], dtype=self.ptr.dtype)
 
         # Create a list of ndarrays with indices of elements per row
         # and transfer to a linear index
@@ -1841,17 +2079,22 @@ column indices of the sparse elements
 
         # Reduce the column indices (note this also ensures that
         # it will work on non-finalized sparse matrices)
-        col_data[1, :] = pvt[take(self.col, col_data[0, :])]
+        col_data[1, :] = _translate(
+            indices,
+            arange(len(indices), dtype=self.col.dtype),
+            take(self.col, col_data[0, :]),
+            missing=-1,
+        )
 
         # Count the number of items that are left in the sparse pattern
         # First recreate the new (temporary) pointer
         ptr1[0] = 0
         # Place it directly where it should be
-        _a.cumsumi(ncol1, out=ptr1[1:])
+        np.cumsum(ncol1, out=ptr1[1:])
 
         # Count number of entries
         idx_take = col_data[1, :] >= 0
-        ncol1[:] = _a.fromiteri(map(count_nonzero, split(idx_take, ptr1[1:-1]))).ravel()
+        ncol1[:] = _a.fromiterl(map(count_nonzero, split(idx_take, ptr1[1:-1]))).ravel()
 
         # Convert to indices
         idx_take = idx_take.nonzero()[0]
@@ -1865,7 +2108,7 @@ column indices of the sparse elements
 
         # Set the data for the new sparse csr
         csr.ptr[0] = 0
-        _a.cumsumi(ncol1, out=csr.ptr[1:])
+        np.cumsum(ncol1, out=csr.ptr[1:])
         csr._nnz = len(csr.col)
 
         return csr
@@ -1905,7 +2148,8 @@ column indices of the sparse elements
         # Now we can re-create the sparse matrix
         # All we need is to count the number of non-zeros per column.
         rows, nrow = unique(col, return_counts=True)
-        T.ncol = _a.zerosi(T.shape[0])
+        idtype = _index_dtype(max(self.nnz, T.shape[1]))
+        T.ncol = zeros(T.shape[0], dtype=idtype)
         T.ncol[rows] = nrow
         del rows
 
@@ -1918,7 +2162,7 @@ column indices of the sparse elements
             idx = argsort(col)
 
         # Our new data will then be
-        T.col = row[idx]
+        T.col = row[idx].astype(idtype, copy=False)
         del row
         T._D = D[idx]
         del D
@@ -1986,12 +2230,13 @@ column indices of the sparse elements
                     "doesn't match the broadcast shape {result.shape}"
                 )
             out._finalized = result._finalized
-            out.ncol[:] = result.ncol[:]
-            out.ptr[:] = result.ptr[:]
+            out.ncol = result.ncol.copy()
+            out.ptr = result.ptr.copy()
             # this will copy
             out.col = result.col.copy()
             out._D = result._D.astype(out.dtype)
             out._nnz = result.nnz
+            out._revision += 1
             del result
         else:
             out = NotImplemented
@@ -2022,6 +2267,9 @@ column indices of the sparse elements
             self.ptr = _ncol_to_indptr(self.ncol)
         else:
             self.ptr = state["ptr"]
+        # unpickled objects are not initialized
+        self._revision = getattr(self, "_revision", -1) + 1
+        self._pattern_revision = getattr(self, "_pattern_revision", -1) + 1
 
 
 def _get_reduced_shape(arr):
@@ -2134,7 +2382,7 @@ def _ufunc_sp_sp(ufunc, a, b, **kwargs):
             issorted = mat.has_sorted_indices
         if issorted:
             indexfunc = lambda ocol, matcol, offset: indices(
-                ocol, matcol, offset, both_sorted=True
+                ocol, matcol.astype(ocol.dtype, copy=False), offset, both_sorted=True
             )
         else:
             indexfunc = (
@@ -36,6 +36,7 @@ from sisl.messages import SislError, SislWarning, deprecate_argument, progressba
 from sisl.typing import AtomsIndex, CellAxes, Coord, SeqOrScalarFloat
 from sisl.typing._atom import AtomsLike
 from sisl.typing._common import SeqOrScalarInt
+from sisl.utils.mathematics import fnorm
 from sisl.utils.misc import direction
 from sisl.utils.ranges import list2str
 
@@ -413,6 +414,32 @@ class _SparseGeometry(NDArrayOperatorsMixin):
         """Check whether a sparse index is non-zero"""
         return key in self._csr
 
+    def set_elements(self, rows, cols, data, op: str = "set") -> None:
+        """Set many elements at once from flat COO arrays
+
+        The row and column indices are the indices of the underlying sparse
+        matrix, i.e. columns are supercell indices.
+        The model will be finalized afterwards.
+
+        See `SparseCSR.set_elements` for details on the arguments.
+
+        Parameters
+        ----------
+        rows : array_like
+           row indices of the elements
+        cols : array_like
+           column (supercell) indices of the elements
+        data : array_like
+           values of the elements
+        op : {"set", "add"}
+           how duplicate elements are merged
+
+        See Also
+        --------
+        SparseCSR.set_elements : the underlying called method
+        """
+        self._csr.set_elements(rows, cols, data, op=op)
+
     def set_nsc(self, base_size, *args, **kwargs):
         """Reset the number of allowed supercells in the sparse geometry
 
@@ -565,7 +592,7 @@ class _SparseGeometry(NDArrayOperatorsMixin):
         # Now we can re-create the sparse matrix
         # All we need is to count the number of non-zeros per column.
         rows, nrow = unique(col, return_counts=True)
-        T._csr.ncol = _a.zerosi(size)
+        T._csr.ncol = np.zeros(size, dtype=csr.col.dtype)
         T._csr.ncol[rows] = nrow
         del rows
 
@@ -578,7 +605,7 @@ class _SparseGeometry(NDArrayOperatorsMixin):
             idx = argsort(col)
 
         # Our new data will then be
-        T._csr.col = row[idx]
+        T._csr.col = row[idx].astype(csr.col.dtype, copy=False)
         del row
         T._csr._D = D[idx]
         del D
@@ -669,13 +696,74 @@ class _SparseGeometry(NDArrayOperatorsMixin):
 
         func.R = R
         func.params = params
+        # construct evaluates the shells for all atom pairs at once
+        func.shells = True
 
         return func
 
-    def construct(self, func, na_iR: int = 1000, method: str = "rand", eta=None):
+    def _construct_pairs(self, R: float):
+        """All atom pairs within a distance `R` (including the atom itself)
+
+        Pairs are only returned for supercell connections allowed by the
+        number of supercells.
+
+        Returns
+        -------
+        atoms :
+            the unit-cell atoms
+        neighbors :
+            the neighboring atoms, in supercell indices
+        dist :
+            the distances between the atom pairs
+        """
+        # the neighbor finder imports sisl._core, hence the late import
+        from sisl.geom import NeighborFinder
+
+        geometry = self.geometry
+        lattice = geometry.lattice
+
+        # The neighbor finder requires atoms inside the unit cell.
+        # Shift them there, and correct the supercell offsets afterwards
+        shift = np.floor(geometry.fxyz).astype(np.int32)
+        lattice_uc = lattice.copy()
+        # only search for neighbors where supercell connections are possible
+        lattice_uc.pbc = [bool(nsc > 1) for nsc in lattice.nsc]
+        geometry_uc = Geometry(
+            geometry.xyz - shift @ lattice.cell,
+            atoms=geometry.atoms,
+            lattice=lattice_uc,
+        )
+
+        # NeighborFinder only finds neighbors strictly within R
+        finder = NeighborFinder(geometry_uc, R=R + 1e-4, overlap=False)
+        neighs = finder.find_neighbors(self_interaction=True)
+        atoms = neighs.I
+        neighbors = neighs.J
+        isc = neighs.isc - shift[neighbors] + shift[atoms]
+
+        # remove connections outside the supercell
+        valid = np.all(np.abs(isc) <= lattice.nsc // 2, axis=1)
+        atoms = atoms[valid]
+        isc = isc[valid]
+        neighbors = (
+            lattice.isc_off[isc[:, 0], isc[:, 1], isc[:, 2]] * geometry.na
+            + neighbors[valid]
+        )
+
+        dist = fnorm(geometry.axyz(neighbors) - geometry.xyz[atoms])
+        return atoms, neighbors, dist
+
+    def construct(
+        self,
+        func,
+        na_iR: int = 1000,
+        method: str = "rand",
+        eta=None,
+        vectorized: bool = False,
+    ):
         """Automatically construct the sparse model based on a function that does the setting up of the elements
 
-        This may be called in two variants.
+        This may be called in three variants.
 
         1. Pass a function (`func`), see e.g. ``create_construct``
            which does the setting up.
@@ -686,6 +774,16 @@ class _SparseGeometry(NDArrayOperatorsMixin):
            corresponding to the ``R[i]`` elements.
            In this second case all atoms must only have
            one orbital.
+        3. Pass a vectorized function (`func`) together with ``vectorized=True``.
+           The function is called once with all atom pairs within the
+           radius ``func.R[-1]`` (or the maximum orbital range if `func` has
+           no ``R`` attribute).
+
+        Functions created by `create_construct` (and the tuple/list input) are
+        internally evaluated in the vectorized manner when there
+        is one row per atom. These functions are marked by a ``shells``
+        attribute, and the shells are defined by their ``R``, ``params``
+        and (optionally) ``paramsH`` attributes.
 
         Parameters
         ----------
@@ -702,6 +800,17 @@ class _SparseGeometry(NDArrayOperatorsMixin):
            ...     self[ia, idx[0]] = 0
            ...     self[ia, idx[1]] = -2.7
 
+           With ``vectorized=True`` the function *must* take 4 arguments.
+           1. Is this object (``self``)
+           2. Is the unit-cell atoms of all pairs (``atoms``)
+           3. Is the neighboring atoms of all pairs, in supercell indices (``neighbors``)
+           4. Is the distances between the atoms of all pairs (``dist``)
+           An example `func` could be:
+
+           >>> def func(self, atoms, neighbors, dist):
+           ...     self.set_elements(atoms, neighbors, -2.7 * np.exp(1.42 - dist))
+           >>> func.R = 3
+
         na_iR : int, optional
            number of atoms within the sphere for speeding
            up the `iter_block` loop.
@@ -709,6 +818,8 @@ class _SparseGeometry(NDArrayOperatorsMixin):
            method used in `Geometry.iter_block`, see there for details
         eta : bool, optional
            whether an ETA will be printed
+        vectorized :
+           whether `func` is called once with all atom pairs
 
         See Also
         --------
@@ -744,6 +855,52 @@ class _SparseGeometry(NDArrayOperatorsMixin):
         except AttributeError:
             R = None
 
+        # functions from create_construct only depend on the pairs
+        # when there is one row per atom
+        shells = getattr(func, "shells", False) and self._size == self.geometry.na
+
+        if vectorized or shells:
+            if R is None:
+                R = self.geometry.maxR()
+
+            # Create eta-object
+            eta = progressbar(
+                self.na, f"{self.__class__.__name__ }.construct", "atom", eta
+            )
+            atoms, neighbors, dist = self._construct_pairs(R)
+
+            if vectorized:
+                func(self, atoms, neighbors, dist)
+            else:
+                # bin the distances in shells ( d <= R[0] < d <= R[1] ...)
+                shell = searchsorted(np.ravel(func.R), dist)
+                idx = (shell < len(func.params)).nonzero()[0]
+                atoms = atoms[idx]
+                neighbors = neighbors[idx]
+                shell = shell[idx]
+
+                def as_array(params):
+                    # a parameter may be a single value for all dimensions
+                    return np.array(
+                        [
+                            np.broadcast_to(np.asarray(p, dtype=self.dtype), self.dim)
+                            for p in params
+                        ]
+                    )
+
+                data = as_array(func.params)[shell]
+                paramsH = getattr(func, "paramsH", None)
+                if paramsH is not None:
+                    # lower triangular elements are the Hermitian parameters
+                    lower = neighbors % self.geometry.na < atoms
+                    data[lower] = as_array(paramsH)[shell[lower]]
+
+                self.set_elements(atoms, neighbors, data)
+
+            eta.update(self.na)
+            eta.close()
+            return
+
         iR = self.geometry.iR(na_iR, R=R)
 
         # Create eta-object
@@ -1032,6 +1189,9 @@ class _SparseGeometry(NDArrayOperatorsMixin):
            dimension is the overlap matrix)
         isc : int, optional
            the supercell index, or all (if ``isc=None``)
+        **kwargs :
+           passed to `SparseCSR.tocsr`, use ``copy=False`` to share the
+           index arrays with this object
         """
         if isc is not None:
             raise NotImplementedError(
@@ -1047,7 +1207,13 @@ class _SparseGeometry(NDArrayOperatorsMixin):
         return self._csr.spsame(other._csr)
 
     @classmethod
-    def fromsp(cls, geometry: Geometry, P: OrSequence[SparseMatrix], **kwargs) -> Self:
+    def fromsp(
+        cls,
+        geometry: Geometry,
+        P: OrSequence[SparseMatrix],
+        copy: bool = True,
+        **kwargs,
+    ) -> Self:
         r"""Create a sparse model from a preset `Geometry` and a list of sparse matrices
 
         The passed sparse matrices are in one of `scipy.sparse` formats.
@@ -1059,6 +1225,9 @@ class _SparseGeometry(NDArrayOperatorsMixin):
         P :
            the new sparse matrices that are to be populated in the sparse
            matrix
+        copy :
+           if false, a single passed matrix will share its arrays with the returned
+           object, see `SparseCSR.fromsp`
         **kwargs :
            any arguments that are directly passed to the `__init__` method
            of the class.
@@ -1075,7 +1244,7 @@ class _SparseGeometry(NDArrayOperatorsMixin):
             P = list(P)
 
         p = cls(geometry, len(P), P[0].dtype, 1, **kwargs)
-        p._csr = p._csr.fromsp(P, dtype=kwargs.get("dtype"))
+        p._csr = p._csr.fromsp(P, dtype=kwargs.get("dtype"), copy=copy)
 
         if p._size != P[0].shape[0]:
             raise ValueError(
@@ -1343,7 +1512,6 @@ class SparseAtom(_SparseGeometry):
         structure is completed.
         """
         geom = self.geometry
-        Rij = geom.Rij
 
         # Pointers
         ncol = self._csr.ncol
@@ -1360,9 +1528,11 @@ class SparseAtom(_SparseGeometry):
         R._csr._nnz = self._csr.nnz
         R._csr._D = np.zeros([self._csr._D.shape[0], 3], dtype=dtype)
         R._csr._finalized = self.finalized
-        for ia in range(self.shape[0]):
-            sl = slice(ptr[ia], ptr[ia] + ncol[ia])
-            R._csr._D[sl, :] = Rij(ia, col[sl])
+
+        # Only the supercell coordinates of the elements are calculated
+        idx = array_arange(ptr[:-1], n=ncol)
+        ia = np.repeat(_a.arangei(self.shape[0]), ncol)
+        R._csr._D[idx, :] = geom.sc_xyz[col[idx]] - geom.xyz[ia]
 
         return R
 
@@ -1799,7 +1969,6 @@ class SparseOrbital(_SparseGeometry):
         elif what in ("orbital", "orb"):
             # We create an *exact* copy of the Rij
             R = SparseOrbital(geom, 3, dtype, nnzpr=1)
-            Rij = geom.oRij
 
             # Re-create the sparse matrix data
             R._csr.ptr = ptr.copy()
@@ -1809,9 +1978,10 @@ class SparseOrbital(_SparseGeometry):
             R._csr._D = np.zeros([self._csr._D.shape[0], 3], dtype=dtype)
             R._csr._finalized = self.finalized
 
-            for io in range(self.shape[0]):
-                sl = slice(ptr[io], ptr[io] + ncol[io])
-                R._csr._D[sl, :] = Rij(io, col[sl])
+            # Only the supercell coordinates of the elements are calculated
+            idx = array_arange(ptr[:-1], n=ncol)
+            ia = geom.o2a(np.repeat(_a.arangei(self.shape[0]), ncol))
+            R._csr._D[idx, :] = geom.sc_xyz[geom.o2a(col[idx])] - geom.xyz[ia]
 
         else:
             raise ValueError(
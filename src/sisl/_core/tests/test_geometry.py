@@ -1958,3 +1958,78 @@ def test_geometry_apply():
     data_atom = g.apply(data, "sum", partial(g.a2o, all=True), axis=1)
     assert data_atom.shape == (3, g.na, 4)
     assert np.allclose(data_atom[:, 0], data[:, :2].sum(1))
+
+
+@pytest.mark.parametrize("nsc", [[3, 3, 1], [5, 3, 3]])
+def test_close_spatial_index(nsc):
+    g = sisl_geom.graphene(orthogonal=True).tile(8, 0).tile(6, 1)
+    g.set_nsc(nsc)
+    # move some atoms outside the unit cell
+    g.xyz[::7] += [1.3, -2.1, 0.4]
+    ref = g.copy()
+    ref._spatial_index_min_na = g.na + 1
+    assert g._get_spatial_index() is not None
+    assert ref._get_spatial_index() is None
+
+    def equal(a, b):
+        if isinstance(a, (list, tuple)):
+            return len(a) == len(b) and all(equal(x, y) for x, y in zip(a, b))
+        return np.array_equal(a, b)
+
+    for ia in [0, 7, 50, g.na - 1]:
+        for R in [1.5, (0.1, 1.5, 3.0), 30.0]:
+            kw = dict(R=R, ret_xyz=True, ret_rij=True)
+            assert equal(
+                g.close(ia, ret_isc=True, **kw), ref.close(ia, ret_isc=True, **kw)
+            )
+            assert equal(
+                g.close_sc(ia, isc=[1, 0, 0], **kw),
+                ref.close_sc(ia, isc=[1, 0, 0], **kw),
+            )
+        shapes = [Sphere(1.5, g.xyz[ia]), Cube(5.0, g.xyz[ia])]
+        assert equal(g.within(shapes, ret_rij=True), ref.within(shapes, ret_rij=True))
+        assert equal(
+            g.within_sc(shapes[1], isc=[-1, 0, 0]),
+            ref.within_sc(shapes[1], isc=[-1, 0, 0]),
+        )
+
+    # points far away from all atoms
+    assert len(g.close([-100.0, 0, 0], R=2.0)) == 0
+
+
+def test_close_spatial_index_invalidate():
+    g = sisl_geom.graphene(orthogonal=True).tile(8, 0).tile(6, 1)
+    index = g._get_spatial_index()
+    assert index is g._get_spatial_index()
+    assert 10 not in g.close([-10.0, -10.0, 0.0], R=1.0)
+
+    # in-place changes of the coordinates are picked up
+    g.xyz[10] = [-10.0, -10.0, 0.0]
+    assert 10 in g.close([-10.0, -10.0, 0.0], R=1.0)
+    assert index is not g._get_spatial_index()
+
+
+def test_sc_xyz():
+    g = sisl_geom.graphene().tile(2, 0)
+    g.set_nsc([5, 3, 1])
+    sc_xyz = g.sc_xyz
+    assert sc_xyz.shape == (g.na_s, 3)
+    assert len(sc_xyz) == g.na_s
+
+    ref = g.axyz(np.arange(g.na_s))
+    assert np.allclose(np.asarray(sc_xyz), ref)
+    assert np.allclose(sc_xyz[[3, g.na_s - 1, 7]], ref[[3, g.na_s - 1, 7]])
+    assert np.allclose(sc_xyz[5], ref[5])
+    assert np.allclose(sc_xyz[4:20:3], ref[4:20:3])
+
+    for size in [None, 1, 3 * g.na, 10 * g.na_s]:
+        n = 0
+        for sl, xyz in sc_xyz.blocks(size):
+            assert sl.start == n
+            assert np.allclose(xyz, ref[sl])
+            n = sl.stop
+        assert n == g.na_s
+
+    # the view follows the geometry
+    g.xyz[0] += 1.0
+    assert np.allclose(sc_xyz[g.na], g.axyz(g.na))
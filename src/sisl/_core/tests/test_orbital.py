@@ -220,6 +220,44 @@ class Test_sphericalorbital:
         assert np.allclose(f_univariate, f_spline)
         assert np.allclose(f_univariate, f_default)
 
+    @pytest.mark.parametrize("order", [1, 3])
+    def test_radial_table(self, order, monkeypatch):
+        from sisl._core.orbital import _radial, _radial_tables
+
+        r = np.linspace(0, 4, 300)
+        f = np.exp(-r) * np.sin(r * 2)
+        o = SphericalOrbital(1, (r, f), R=4.0)
+        R = np.linspace(0, 5, 1000)
+        direct = _radial(o, R)
+
+        monkeypatch.setattr(SphericalOrbital, "radial_table_order", order)
+        atol = 1e-6 if order == 1 else 1e-9
+        assert np.allclose(o.radial(R), direct, atol=atol, rtol=0)
+        assert np.allclose(o.radial(R.reshape(10, -1)), o.radial(R).reshape(10, -1))
+        # orbitals with the same radial function share the table
+        for ao in o.toAtomicOrbital():
+            assert np.array_equal(ao.radial(R), o.radial(R))
+        assert len(_radial_tables[o._radial]) == 1
+
+        monkeypatch.setattr(SphericalOrbital, "radial_table_order", 0)
+        assert np.allclose(o.radial(R), direct, atol=0, rtol=0)
+
+    def test_spherical_harmonics(self):
+        from scipy.special import lpmv
+
+        from sisl._core.orbital import _rspherical_harm
+
+        theta = np.linspace(-np.pi, np.pi, 101)
+        cos_phi = np.linspace(-1, 1, 101)
+        for l in range(_max_l + 1):
+            for m in range(-l, l + 1):
+                P = _rspher_harm_fact[l][m] * lpmv(m, l, cos_phi)
+                if m < 0:
+                    P *= np.sin(m * theta)
+                elif m > 0:
+                    P *= np.cos(m * theta)
+                assert np.allclose(_rspherical_harm(l, m, theta, cos_phi), P)
+
     def test_same1(self):
         rf = r_f(6)
         o0 = SphericalOrbital(0, rf)
@@ -498,6 +498,132 @@ def test_finalize1(s1):
     assert not s1.finalized
 
 
+def test_set_elements(s2):
+    rows = [0, 2, 1, 2, 0]
+    cols = [3, 1, 5, 1, 3]
+    s2.set_elements(rows, cols, [[1, 2], [3, 4], [5, 6], [7, 8], [9, 10]])
+    assert s2.finalized
+    assert s2.nnz == 3
+    assert np.allclose(s2[0, 3], [9, 10])
+    assert np.allclose(s2[2, 1], [7, 8])
+    assert np.allclose(s2[1, 5], [5, 6])
+
+    # add to existing elements
+    s2.set_elements([0, 0, 3], [3, 4, 0], [1, 2, 3], op="add")
+    assert s2.finalized
+    assert s2.nnz == 5
+    assert np.allclose(s2[0, 3], [10, 11])
+    assert np.allclose(s2[0, 4], [2, 2])
+    assert np.allclose(s2[3, 0], [3, 3])
+    assert np.allclose(s2[2, 1], [7, 8])
+
+
+def test_set_elements_same_as_setitem(s1d):
+    rng = np.random.default_rng(1234)
+    rows = rng.integers(0, s1d.shape[0], 200)
+    cols = rng.integers(0, s1d.shape[1], 200)
+    data = rng.random(200)
+    ref = s1d.copy()
+    for r, c, d in zip(rows, cols, data):
+        ref[r, c] = d
+    ref.finalize()
+    s1d.set_elements(rows, cols, data)
+    assert ref.spsame(s1d)
+    assert np.allclose(ref.tocsr().toarray(), s1d.tocsr().toarray())
+
+
+def test_set_elements_fail(s1):
+    with pytest.raises(ValueError):
+        s1.set_elements([0], [0], [1], op="mul")
+    with pytest.raises(ValueError):
+        s1.set_elements([0, 1], [0], [1])
+    with pytest.raises(IndexError):
+        s1.set_elements([0], [100], [1])
+
+
+def test_revision():
+    s = SparseCSR((10, 10))
+    rev = s._revision
+    s[0, [1, 2]] = 1.0
+    assert s._revision > rev
+    rev = s._revision
+    s.finalize()
+    # no values have changed
+    assert s._revision == rev
+    s.set_elements([1], [1], [2.0])
+    assert s._revision > rev
+    rev = s._revision
+    s.scale_columns(1, 2.0)
+    assert s._revision > rev
+    rev = s._revision
+    del s[0, 1]
+    assert s._revision > rev
+    rev = s._revision
+    np.multiply(s, 2, out=s)
+    assert s._revision > rev
+
+
+def test_index_dtype_small():
+    s = SparseCSR((10, 100))
+    s[0, [1, 2]] = 1.0
+    assert s.ptr.dtype == np.int32
+    assert s.ncol.dtype == np.int32
+    assert s.col.dtype == np.int32
+
+
+def test_index_dtype_int64():
+    nc = np.iinfo(np.int32).max + 10
+    s = SparseCSR((10, nc))
+    assert s.ptr.dtype == np.int64
+    assert s.ncol.dtype == np.int64
+    assert s.col.dtype == np.int64
+    s[0, [1, nc - 1]] = 1.0
+    s[3, nc - 5] = 2.0
+    s.set_elements([1], [nc - 2], [3.0])
+    assert s.nnz == 4
+    assert s[0, nc - 1] == 1.0
+    assert s[3, nc - 5] == 2.0
+    assert s[1, nc - 2] == 3.0
+    s.finalize()
+    assert s.col.dtype == np.int64
+    csr = s.tocsr()
+    assert csr[3, nc - 5] == 2.0
+    assert SparseCSR.fromsp(csr).col.dtype == np.int64
+
+
+def test_index_dtype_int64_columns():
+    # the column operations must not allocate arrays of the number of columns
+    nc = np.iinfo(np.int32).max * 4
+    s = SparseCSR((4, nc))
+    s[0, [1, nc - 1]] = 1.0
+    s[2, nc - 5] = 2.0
+    s.translate_columns([nc - 1, nc - 5], [nc - 2, 3])
+    assert s[0, nc - 2] == 1.0
+    assert s[2, 3] == 2.0
+    assert s.nnz == 3
+    s.delete_columns([0, 1])
+    assert s.shape[1] == nc - 2
+    assert s.nnz == 2
+    assert s[0, nc - 4] == 1.0
+    assert s[2, 1] == 2.0
+    s2 = s.sub([0, 1, 2])
+    assert s2.col.dtype == np.int64
+    assert s2.nnz == 1
+    assert s2[2, 1] == 2.0
+
+
+def test_index_dtype_ensure(s1):
+    s1[0, [1, 2]] = 1.0
+    s1._ensure_index_dtype(np.iinfo(np.int32).max + 1)
+    assert s1.ptr.dtype == np.int64
+    assert s1.col.dtype == np.int64
+    s1[1, [2, 4]] = 2.0
+    s1.finalize()
+    assert s1.nnz == 4
+    assert s1[1, 4] == 2.0
+    assert np.allclose(s1.toarray()[..., 0], s1.tocsr().toarray())
+
+
 def test_finalize2(s1):
     s1[0, [1, 2, 3]] = 1
     s1[2, [1, 2, 3]] = 1.0
@@ -1502,6 +1628,66 @@ def test_fromsp_csr():
     assert np.abs(csr2 - csr_2).sum() == 0.0
 
 
+def test_fromsp_csr_nocopy():
+    csr1 = sc.sparse.random(10, 100, 0.05, format="csr", random_state=24812)
+
+    csr = SparseCSR.fromsp(csr1, copy=False)
+    assert np.shares_memory(csr.col, csr1.indices)
+    assert np.shares_memory(csr._D, csr1.data)
+    assert np.abs(csr1 - csr.tocsr()).sum() == 0.0
+
+    csr = SparseCSR.fromsp(csr1)
+    assert not np.shares_memory(csr.col, csr1.indices)
+    assert not np.shares_memory(csr._D, csr1.data)
+
+    # a new SparseCSR sharing the arrays
+    csr2 = SparseCSR.fromsp(csr, copy=False)
+    assert csr2 is not csr
+    assert np.shares_memory(csr2.col, csr.col)
+    assert np.shares_memory(csr2._D, csr._D)
+    assert csr2.finalized == csr.finalized
+    assert not np.shares_memory(SparseCSR.fromsp(csr)._D, csr._D)
+
+
+def test_tocsr_nocopy():
+    csr1 = sc.sparse.random(10, 100, 0.01, random_state=24812)
+    csr2 = sc.sparse.random(10, 100, 0.02, random_state=24813)
+    csr = SparseCSR.fromsp([csr1, csr2])
+    csr.finalize()
+
+    csr_1 = csr.tocsr(0, copy=False)
+    assert np.shares_memory(csr_1.indices, csr.col)
+    assert np.shares_memory(csr_1.indptr, csr.ptr)
+    # data is strided, so it has to be copied
+    assert not np.shares_memory(csr_1.data, csr._D)
+    assert np.abs(csr1 - csr_1).sum() == 0.0
+
+    csr = SparseCSR.fromsp(csr1)
+    csr.finalize()
+    csr_1 = csr.tocsr(copy=False)
+    assert np.shares_memory(csr_1.data, csr._D)
+    csr_1.data *= 2
+    assert np.abs(2 * csr1 - csr.tocsr()).sum() == 0.0
+
+    # unsorted columns in a non-finalized matrix are shared, but not
+    # marked as sorted
+    csr = SparseCSR((2, 10), nnzpr=2)
+    csr[0, [4, 1]] = [1.0, 2.0]
+    csr[1, [3, 2]] = [3.0, 4.0]
+    assert not csr.finalized
+    csr_1 = csr.tocsr(copy=False)
+    assert np.shares_memory(csr_1.indices, csr.col)
+    assert not csr_1.has_sorted_indices
+    assert np.allclose(csr_1.toarray(), csr.toarray()[..., 0])
+
+    # with holes in the sparsity pattern, it must copy
+    csr = SparseCSR((10, 100), nnzpr=4)
+    csr[0, 1] = 1.0
+    csr_1 = csr.tocsr(copy=False)
+    assert not np.shares_memory(csr_1.indices, csr.col)
+    assert csr_1[0, 1] == 1.0
+
+
 def test_transform1():
     csr1 = sc.sparse.random(10, 100, 0.01, random_state=24812)
     csr2 = sc.sparse.random(10, 100, 0.02, random_state=24813)
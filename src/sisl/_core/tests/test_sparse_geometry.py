@@ -109,6 +109,75 @@ class TestSparseAtom:
         with pytest.raises(ValueError):
             s1.construct([[0.1, 1.5], [1]])
 
+    @pytest.mark.parametrize("translate", [0, -0.25])
+    def test_construct_vectorized_same(self, setup, translate):
+        g = setup.g.translate(setup.g.cell.sum(0) * translate)
+        R, param = [0.1, 0.8, 1.5], [1, 2, 3]
+        s1 = SparseAtom(g)
+        s1.construct([R, param])
+        assert s1.finalized
+
+        # the same function, but not created by create_construct
+        func = s1.create_construct(R, param)
+
+        def loop(self, ia, atoms, atoms_xyz=None):
+            func(self, ia, atoms, atoms_xyz)
+
+        loop.R = R
+        s2 = SparseAtom(g)
+        s2.construct(loop)
+        s2.finalize()
+        assert s1.spsame(s2)
+        assert np.allclose(s1.tocsr().toarray(), s2.tocsr().toarray())
+
+    def test_construct_vectorized_skewed(self):
+        # the neighbor search must find all pairs in skewed cells
+        from sisl.geom import diamond
+
+        g = diamond(3.57, Atom(6, R=1.6)).tile(3, 0).tile(3, 1).tile(3, 2)
+        g.xyz += np.random.default_rng(42).uniform(-0.1, 0.1, g.xyz.shape)
+        R, param = [0.1, 1.6], [1, 2]
+        s1 = SparseAtom(g)
+        s1.construct([R, param])
+
+        func = s1.create_construct(R, param)
+        func.shells = False
+        s2 = SparseAtom(g)
+        s2.construct(func)
+        s2.finalize()
+        assert s1.nnz == s2.nnz
+        assert s1.spsame(s2)
+        assert np.allclose(s1.tocsr().toarray(), s2.tocsr().toarray())
+
+    def test_construct_vectorized_marker(self, setup):
+        R, param = [0.1, 1.5], [1, 2]
+
+        # R and params attributes alone does not make it a shell function
+        def func(self, ia, atoms, atoms_xyz=None):
+            self[ia, ia] = 1
+
+        func.R = R
+        func.params = param
+        s1 = SparseAtom(setup.g)
+        s1.construct(func)
+        assert s1.nnz == setup.g.na
+        assert s1.create_construct(R, param).shells
+
+    def test_construct_vectorized_func(self, setup):
+        R, param = [0.1, 1.5], [1, 2]
+        s1 = SparseAtom(setup.g)
+        s1.construct([R, param])
+
+        def func(self, atoms, neighbors, dist):
+            shell = (dist > 0.1).astype(np.int32)
+            self.set_elements(atoms, neighbors, np.take(param, shell))
+
+        func.R = R
+        s2 = SparseAtom(setup.g)
+        s2.construct(func, vectorized=True)
+        assert s1.spsame(s2)
+        assert np.allclose(s1.tocsr().toarray(), s2.tocsr().toarray())
+
     def test_untile1(self, setup):
         s1 = SparseAtom(setup.g)
         s1.construct([[0.1, 1.5], [1, 2]])
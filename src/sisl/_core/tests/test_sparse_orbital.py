@@ -482,3 +482,21 @@ def test_translate_sparse_orbitals():
     assert transl_both[1, 1] == 2
     assert transl_both[0, 1] == 3
     assert transl_both[0, 6 + 4] == 4
+
+
+def test_sparse_orbital_set_elements():
+    g = graphene(orthogonal=True).tile(2, 0)
+    S = SparseOrbital(g)
+    S.construct([[0.1, 1.44], [1, 2]])
+    S.finalize()
+
+    rows, cols = S.nonzero()
+    data = S._csr._D[:, 0].copy()
+    B = SparseOrbital(g)
+    B.set_elements(rows, cols, data)
+    assert B.finalized
+    assert B.spsame(S)
+    assert np.allclose(B.tocsr().toarray(), S.tocsr().toarray())
+
+    B.set_elements(rows, cols, data, op="add")
+    assert np.allclose(B.tocsr().toarray(), 2 * S.tocsr().toarray())
@@ -132,6 +132,19 @@ register_environ_variable(
 )
 
 
+register_environ_variable(
+    "SISL_NUM_THREADS",
+    1,
+    dedent(
+        """\
+                          Number of OpenMP threads used in the compiled kernels, e.g. the
+                          phase summation of sparse matrices (Hk, Sk etc.), and the number
+                          of threads searching neighbors in NeighborFinder.
+                          Calculations in the parallel pools of BrillouinZone.apply always use 1."""
+    ),
+    process=int,
+)
+
 register_environ_variable(
     "SISL_PAR_CHUNKSIZE",
     0.1,
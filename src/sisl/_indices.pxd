@@ -14,4 +14,9 @@ ctypedef fused _ints_index_sorted_st:
     int32_t
     int64_t
 
-cdef Py_ssize_t _index_sorted(const ints_st[::1] array, const _ints_index_sorted_st v) noexcept nogil
+ctypedef fused _ints_index_sorted_array_st:
+    int
+    int64_t
+
+cdef Py_ssize_t _index_sorted(const _ints_index_sorted_array_st[::1] array, const _ints_index_sorted_st v) noexcept nogil
+cdef Py_ssize_t _index_sorted_range(const _ints_index_sorted_array_st[::1] array, Py_ssize_t start, Py_ssize_t end, const _ints_index_sorted_st v) noexcept nogil
@@ -9,7 +9,7 @@ import numpy as np
 cimport numpy as cnp
 from numpy cimport dtype, ndarray
 
-from sisl._core._dtypes cimport floats_st, ints_st, type2dtype
+from sisl._core._dtypes cimport floats_st, int_sp_st, ints_st, type2dtype
 
 
 @cython.boundscheck(False)
@@ -573,7 +573,7 @@ cdef inline bint in_1d(const ints_st[::1] array, const ints_st v) noexcept nogil
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.initializedcheck(False)
-def index_sorted(ints_st[::1] a, const ints_st v):
+def index_sorted(int_sp_st[::1] a, const int_sp_st v):
     """ Return index for the value v in a sorted array, otherwise return -1
 
     Parameters
@@ -598,7 +598,7 @@ def index_sorted(ints_st[::1] a, const ints_st v):
 @cython.wraparound(False)
 @cython.initializedcheck(False)
 @cython.cdivision(True)
-cdef Py_ssize_t _index_sorted(const ints_st[::1] a, const _ints_index_sorted_st v) noexcept nogil:
+cdef Py_ssize_t _index_sorted(const _ints_index_sorted_array_st[::1] a, const _ints_index_sorted_st v) noexcept nogil:
     """ Return index for the value v in a sorted array, otherwise return -1
 
     This implements a binary search method
@@ -636,6 +636,52 @@ cdef Py_ssize_t _index_sorted(const ints_st[::1] a, const _ints_index_sorted_st
     return MIN1
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+@cython.cdivision(True)
+cdef Py_ssize_t _index_sorted_range(const _ints_index_sorted_array_st[::1] a,
+                                    Py_ssize_t start, Py_ssize_t end,
+                                    const _ints_index_sorted_st v) noexcept nogil:
+    """ Equivalent to ``_index_sorted(a[start:end], v)`` without creating a slice
+
+    Since no memoryview slice is created, this may be used in `prange` loops.
+
+    Parameters
+    ----------
+    a :
+        array, sorted in the range ``start:end``
+    start, end :
+        the range of `a` to search in
+    v :
+        value to find
+
+    Returns
+    -------
+    int : the index relative to `start`, -1 if not found
+    """
+    cdef Py_ssize_t MIN1 = -1
+    cdef Py_ssize_t i, L, R
+
+    # Simple binary search
+    R = end - 1
+    if R < start:
+        return MIN1
+    elif a[R] < v:
+        return MIN1
+
+    L = start
+    while L <= R:
+        i = (L + R) / 2
+        if a[i] < v:
+            L = i + 1
+        elif v < a[i]:
+            R = i - 1
+        else:
+            return i - start
+    return MIN1
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.initializedcheck(False)
@@ -88,3 +88,39 @@ def xyz_to_spherical_cos_phi(floats_st[::1] x,
                 z[i] = z[i] / R
             else:
                 z[i] = 0.
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+@cython.cdivision(True)
+def uniform_table_eval(const double[::1] r,
+                       const double[:, ::1] coeff,
+                       const double dr):
+    """ Evaluate a piecewise polynomial on the uniform mesh ``i * dr``
+
+    `coeff` holds the polynomial coefficients of each interval (highest
+    order first) in the local coordinate ``r - i * dr``.
+    Points beyond the mesh are evaluated in the last interval.
+    """
+    cdef Py_ssize_t n = coeff.shape[0]
+    cdef Py_ssize_t k = coeff.shape[1]
+    cdef Py_ssize_t i, j, c
+    cdef double t, v
+
+    cdef ndarray[double, mode='c'] F = np.empty([r.shape[0]], dtype=np.float64)
+    cdef double[::1] f = F
+
+    for i in range(r.shape[0]):
+        j = <Py_ssize_t> (r[i] / dr)
+        if j >= n:
+            j = n - 1
+        elif j < 0:
+            j = 0
+        t = r[i] - j * dr
+        v = coeff[j, 0]
+        for c in range(1, k):
+            v = v * t + coeff[j, c]
+        f[i] = v
+
+    return F
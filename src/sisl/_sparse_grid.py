@@ -1,12 +1,15 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
 from typing import Optional, Union
 
 import numpy as np
-from scipy.sparse import issparse, spmatrix
+from scipy.sparse import csr_matrix, issparse, spmatrix
 
-from sisl import Grid, Lattice, SparseCSR
+from sisl import Geometry, Grid, Lattice, SparseCSR
+from sisl._internal import set_module
 from sisl.physics import Overlap
 
 from ._sparse_grid_ops import (
@@ -19,6 +22,28 @@ from ._sparse_grid_ops import (
 )
 from .physics._phase import phase_rsc
 
+__all__ = ["SparseGridOrbitalBZ"]
+
+
+def _basis_arrays(geometry: Geometry) -> dict[str, np.ndarray]:
+    """Plain arrays identifying the basis of `geometry`
+
+    The orbitals are sampled with `Orbital.psi` at the points used by `Orbital.equal`.
+    """
+    R = []
+    psi = []
+    for atom in geometry.atoms.atom:
+        for orb in atom:
+            R.append(orb.R)
+            psi.append(orb.psi(np.linspace(0, orb.R * 2, 999).reshape(-1, 3)))
+    return {
+        "species": geometry.atoms.species,
+        "Z": np.array([atom.Z for atom in geometry.atoms.atom]),
+        "orbitals": np.array([atom.no for atom in geometry.atoms.atom]),
+        "R": np.array(R),
+        "psi": np.array(psi),
+    }
+
 
 class Sparse4DGrid:
     """Stores information on a 3D grid with an extra sparse dimension.
@@ -209,8 +234,139 @@ class Sparse4DGrid:
         return grid
 
 
+@set_module("sisl")
 class SparseGridOrbitalBZ(Sparse4DGrid):
-    """Stores information on a 3D grid with an extra orbital dimension, which is sparse."""
+    """Stores information on a 3D grid with an extra orbital dimension, which is sparse.
+
+    The orbital values on a grid only depend on the geometry (and its basis) and the
+    grid shape. Hence, the same object can be re-used for many density matrices
+    of the same geometry, see the `basis_grid` argument of `DensityMatrix.density`.
+    It can be stored on disk with `write` and re-created with `read`.
+
+    Examples
+    --------
+    >>> basis = SparseGridOrbitalBZ.from_geometry(DM.geometry, grid.shape)
+    >>> basis.write("basis_grid.npz")
+    >>> basis = SparseGridOrbitalBZ.read("basis_grid.npz", DM.geometry)
+    >>> for DM in DMs:
+    ...     DM.density(grid, basis_grid=basis)
+    """
+
+    @classmethod
+    def from_geometry(
+        cls, geometry: Geometry, grid_shape: tuple[int, int, int]
+    ) -> SparseGridOrbitalBZ:
+        """Calculate the orbital values of `geometry` on a grid of shape `grid_shape`
+
+        The atoms are translated to the unit cell, like `DensityMatrix.density` does.
+
+        Parameters
+        ----------
+        geometry:
+            the geometry (with the basis orbitals)
+        grid_shape:
+            the shape of the grid
+        """
+        return geometry.translate2uc()._orbital_values(grid_shape)
+
+    def is_compatible(
+        self, geometry: Geometry, grid_shape: tuple[int, int, int]
+    ) -> bool:
+        """Whether the orbital values are calculated for `geometry` and the grid shape
+
+        The atoms are compared including their orbitals (`Orbital.psi`).
+
+        Parameters
+        ----------
+        geometry:
+            the geometry (translated to the unit cell)
+        grid_shape:
+            the shape of the grid
+        """
+        geom = self.geometry
+        if not (
+            self.grid_shape == tuple(grid_shape)
+            and geom.na == geometry.na
+            and geom.no == geometry.no
+            and np.allclose(geom.cell, geometry.cell)
+            and np.allclose(geom.xyz, geometry.xyz)
+        ):
+            return False
+        atoms, other = geom.atoms, geometry.atoms
+        return (
+            atoms.nspecies == other.nspecies
+            and np.array_equal(atoms.species, other.species)
+            and all(a.equal(b, psi=True) for a, b in zip(atoms.atom, other.atom))
+        )
+
+    def write(self, file) -> None:
+        """Store the orbital values in a numpy ``.npz`` file
+
+        Only plain arrays are stored. The geometry is stored through its
+        coordinates, lattice and a sampling of its orbitals, which are used by `read`
+        to check that the file belongs to the geometry it is read with.
+
+        Parameters
+        ----------
+        file:
+            the file name or file object, see `numpy.savez`
+        """
+        csr = self._csr.tocsr()
+        geometry = self.geometry
+        basis = {f"basis_{key}": v for key, v in _basis_arrays(geometry).items()}
+        np.savez(
+            file,
+            grid_shape=np.array(self.grid_shape),
+            data=csr.data,
+            indices=csr.indices,
+            indptr=csr.indptr,
+            shape=np.array(csr.shape),
+            cell=geometry.cell,
+            xyz=geometry.xyz,
+            nsc=geometry.nsc,
+            **basis,
+        )
+
+    @classmethod
+    def read(cls, file, geometry: Geometry) -> SparseGridOrbitalBZ:
+        """Read orbital values stored with `write`
+
+        Parameters
+        ----------
+        file:
+            the file name or file object, see `numpy.load`
+        geometry:
+            the geometry (with the basis orbitals) the orbital values were calculated for.
+            The atoms are translated to the unit cell, like in `from_geometry`.
+
+        Raises
+        ------
+        ValueError
+            if the file was written for another geometry (or basis)
+        """
+        geometry = geometry.translate2uc()
+        with np.load(file) as f:
+            nsc = f["nsc"]
+            same = (
+                f["xyz"].shape == geometry.xyz.shape
+                and np.allclose(f["cell"], geometry.cell)
+                and np.allclose(f["xyz"], geometry.xyz)
+            )
+            if same:
+                for key, v in _basis_arrays(geometry).items():
+                    stored = f[f"basis_{key}"]
+                    same &= stored.shape == v.shape and np.allclose(stored, v)
+            if not same:
+                raise ValueError(
+                    f"{cls.__name__}.read: the orbital values in {file} are "
+                    "calculated for another geometry or basis."
+                )
+            csr = csr_matrix(
+                (f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"])
+            )
+            grid_shape = tuple(f["grid_shape"].tolist())
+        geometry.set_nsc(nsc)
+        return cls(grid_shape, csr, geometry=geometry)
 
     def get_overlap_matrix(self) -> Overlap:
         """Computes the overlap matrix.
@@ -4,14 +4,17 @@
 import cython
 import cython.cimports.numpy as cnp
 import numpy as np
+from cython.parallel import prange, threadid
 
 from sisl import SparseCSR
+from sisl._threads import get_num_threads
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
 @cython.ccall
+@cython.nogil
 @cython.exceptval(check=False)
 def transpose_raveled_index(
     index: cython.int, grid_shape: cnp.int32_t[:], new_order: cnp.int32_t[:]
@@ -57,6 +60,34 @@ def transpose_raveled_index(
     return new_raveled
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cfunc
+@cython.inline
+@cython.nogil
+@cython.exceptval(check=False)
+def _pair_sc_index(
+    sc_off: cnp.int32_t[:, :],
+    from_sc: cython.int,
+    to_sc: cython.int,
+    isc_off: cnp.int32_t[:, :, :],
+) -> cython.int:
+    """Index (in `isc_off`) of the supercell offset from supercell `from_sc` to `to_sc`."""
+    # If the sc_difference is negative, convert it to positive so that we can
+    # use it to index the isc_off array (we switched off the handling of negative
+    # indices in cython with wraparound(False))
+    d0: cython.int = sc_off[to_sc, 0] - sc_off[from_sc, 0]
+    d1: cython.int = sc_off[to_sc, 1] - sc_off[from_sc, 1]
+    d2: cython.int = sc_off[to_sc, 2] - sc_off[from_sc, 2]
+    if d0 < 0:
+        d0 = isc_off.shape[0] + d0
+    if d1 < 0:
+        d1 = isc_off.shape[1] + d1
+    if d2 < 0:
+        d2 = isc_off.shape[2] + d2
+    return isc_off[d0, d1, d2]
+
+
 # This function should be in sisl._sparse, but I don't know how to import it from there
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -292,6 +323,20 @@ def reduce_grid_matvecs_multiply(
             out[reduced_i, ivec] = out[reduced_i, ivec] + row_value[ivec]
 
 
+def _thread_output(out, num_threads: int, per_thread: bool):
+    """Output array for each thread (a view of `out` if the threads can share it)"""
+    out = np.asarray(out)
+    if per_thread:
+        return np.zeros((num_threads, *out.shape), dtype=out.dtype)
+    return out[None]
+
+
+def _sum_thread_output(out, thread_out):
+    """Add the outputs of all threads to `out`"""
+    out = np.asarray(out)
+    out += np.asarray(thread_out).sum(axis=0)
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
@@ -372,11 +417,13 @@ def reduce_sc_products(
     iaxis: cython.int
 
     # Variables that will help managing orbital pairs that are not within the same cell.
-    sc_diff: cython.int[3]
-    inv_sc_diff: cython.int[3]
     force_same_cell: cython.bint
     same_cell: cython.bint
 
+    # Values of the current row, and of all pairs of the current column i
+    row_value: cython.floating
+    i_row_value: cython.floating
+
     # Boolean to store whether we should reduce row indices
     grid_reduce: cython.bint = reduce_factor > 1
     # Do we need to transpose while reducing?
@@ -388,13 +435,33 @@ def reduce_sc_products(
     # (if any) have been stored in the unit cell. This is what SIESTA does for gamma point calculations
     # with nsc <= 3.
     force_same_cell = True
-    coeffs_nsc = coeffs_isc_off.shape
     for iaxis in range(3):
-        if coeffs_nsc[iaxis] != 1:
+        if coeffs_isc_off.shape[iaxis] != 1:
             force_same_cell = False
 
+    # The rows are distributed among the threads. When the rows are reduced, several rows
+    # are added to the same output row, so each thread accumulates in its own output.
+    num_threads: cython.int = get_num_threads()
+    per_thread: cython.bint = grid_reduce and num_threads > 1
+    tid: cython.int
+    out_tid: cython.int
+    thread_out: cython.floating[:, :] = _thread_output(out, num_threads, per_thread)
+
+    row_start: cython.int
+    row_end: cython.int
+
     # Loop over rows.
-    for row in range(nrows):
+    for row in prange(
+        nrows,
+        nogil=True,
+        schedule="guided",
+        num_threads=num_threads,
+        use_threads_if=num_threads > 1,
+    ):
+        tid = threadid()
+        out_tid = 0
+        if per_thread:
+            out_tid = tid
         # Get the potentially reduced index of the output row where we should store the
         # results for this row.
         reduced_row = row
@@ -410,7 +477,7 @@ def reduce_sc_products(
         row_end = ptr[row + 1]
 
         # Initialize the row value.
-        row_value: cython.floating = 0
+        row_value = 0
 
         # For each row, loop over pairs of columns (ij).
         # We add both ij and ji contributions, therefore we only need to loop over j greater than i.
@@ -420,7 +487,7 @@ def reduce_sc_products(
             icol = col[i]
 
             # Initialize the value for all pairs that we found for i
-            i_row_value: cython.floating = 0
+            i_row_value = 0
 
             # Precompute the supercell index of icol (will compare it to that of jcol)
             icol_sc = icol // uc_ncol
@@ -446,57 +513,49 @@ def reduce_sc_products(
                 # (2) And then calculate the new index for jcol, moving icol to the unit cell
                 # (3) Do the same in the reverse direction (jcol -> icol)
                 if not same_cell:
-                    # Calculate the sc offset between both orbitals.
-                    for iaxis in range(3):
-                        sc_diff[iaxis] = (
-                            data_sc_off[jcol_sc, iaxis] - data_sc_off[icol_sc, iaxis]
-                        )
-                        # Calculate also the offset in the reverse direction
-                        inv_sc_diff[iaxis] = -sc_diff[iaxis]
-
-                        # If the sc_difference is negative, convert it to positive so that we can
-                        # use it to index the isc_off array (we switched off the handling of negative
-                        # indices in cython with wraparound(False))
-                        if sc_diff[iaxis] < 0:
-                            sc_diff[iaxis] = coeffs_nsc[iaxis] + sc_diff[iaxis]
-                        elif inv_sc_diff[iaxis] < 0:
-                            inv_sc_diff[iaxis] = coeffs_nsc[iaxis] + inv_sc_diff[iaxis]
-
                     # Get the supercell offset index of jcol with respect to icol
-                    jpair_sc = coeffs_isc_off[sc_diff[0], sc_diff[1], sc_diff[2]]
+                    jpair_sc = _pair_sc_index(
+                        data_sc_off, icol_sc, jcol_sc, coeffs_isc_off
+                    )
                     # And use it to calculate the supercell index of the j orbital in this ij pair
                     sc_jcol = jpair_sc * uc_ncol + uc_jcol
 
                     # Do the same for the ji pair
-                    ipair_sc = coeffs_isc_off[
-                        inv_sc_diff[0], inv_sc_diff[1], inv_sc_diff[2]
-                    ]
+                    ipair_sc = _pair_sc_index(
+                        data_sc_off, jcol_sc, icol_sc, coeffs_isc_off
+                    )
                     sc_icol = ipair_sc * uc_ncol + uc_icol
 
                 # Add the contribution of this column pair to the row total value. Note that we only
                 # multiply the coefficients by data[j] here. This is because this loop is over all j
                 # that pair with a given i. data[i] is a common factor and therefore we can multiply
                 # after the loop to save operations.
+                # (no in-place operators, they would be reductions of the parallel loop)
                 if same_cell:
                     if icol == jcol:
-                        i_row_value += coeffs[uc_icol, uc_jcol] * data[j]
+                        i_row_value = i_row_value + coeffs[uc_icol, uc_jcol] * data[j]
                     else:
-                        i_row_value += (
-                            coeffs[uc_icol, uc_jcol] + coeffs[uc_jcol, uc_icol]
-                        ) * data[j]
+                        i_row_value = (
+                            i_row_value
+                            + (coeffs[uc_icol, uc_jcol] + coeffs[uc_jcol, uc_icol])
+                            * data[j]
+                        )
                 else:
-                    i_row_value += (
-                        coeffs[uc_icol, sc_jcol] + coeffs[uc_jcol, sc_icol]
-                    ) * data[j]
-
-            # Multiply all the contributions of ij pairs with this i by data[i], as explained inside the j loop.
-            i_row_value *= data[i]
+                    i_row_value = (
+                        i_row_value
+                        + (coeffs[uc_icol, sc_jcol] + coeffs[uc_jcol, sc_icol])
+                        * data[j]
+                    )
 
-            # Add the contribution of all ij pairs for this i to the row value.
-            row_value += i_row_value
+            # Multiply all the contributions of ij pairs with this i by data[i], as explained inside the j loop,
+            # and add the contribution of all ij pairs for this i to the row value.
+            row_value = row_value + i_row_value * data[i]
 
         # Store the row value in the output
-        out[reduced_row] = out[reduced_row] + row_value
+        thread_out[out_tid, reduced_row] = thread_out[out_tid, reduced_row] + row_value
+
+    if per_thread:
+        _sum_thread_output(out, thread_out)
 
 
 @cython.boundscheck(False)
@@ -578,16 +637,19 @@ def reduce_sc_products_multicoeffs(
     ncoeffs: cython.int = coeffs.shape[2]
     icoeff: cython.int
 
-    # Temporal storage to build values
-    row_value: cython.floating[:] = np.zeros(ncoeffs, dtype=np.asarray(data).dtype)
-    i_row_value: cython.floating[:] = np.zeros(ncoeffs, dtype=np.asarray(data).dtype)
+    # Temporal storage to build values (one for each thread)
+    num_threads: cython.int = get_num_threads()
+    row_value: cython.floating[:, :] = np.zeros(
+        (num_threads, ncoeffs), dtype=np.asarray(data).dtype
+    )
+    i_row_value: cython.floating[:, :] = np.zeros(
+        (num_threads, ncoeffs), dtype=np.asarray(data).dtype
+    )
 
     # Index to loop over axes of the grid.
     iaxis: cython.int
 
     # Variables that will help managing orbital pairs that are not within the same cell.
-    sc_diff: cython.int[3]
-    inv_sc_diff: cython.int[3]
     force_same_cell: cython.bint
     same_cell: cython.bint
 
@@ -602,13 +664,32 @@ def reduce_sc_products_multicoeffs(
     # (if any) have been stored in the unit cell. This is what SIESTA does for gamma point calculations
     # with nsc <= 3.
     force_same_cell = True
-    coeffs_nsc = coeffs_isc_off.shape
     for iaxis in range(3):
-        if coeffs_nsc[iaxis] != 1:
+        if coeffs_isc_off.shape[iaxis] != 1:
             force_same_cell = False
 
+    # The rows are distributed among the threads. When the rows are reduced, several rows
+    # are added to the same output row, so each thread accumulates in its own output.
+    per_thread: cython.bint = grid_reduce and num_threads > 1
+    tid: cython.int
+    out_tid: cython.int
+    thread_out: cython.floating[:, :, :] = _thread_output(out, num_threads, per_thread)
+
+    row_start: cython.int
+    row_end: cython.int
+
     # Loop over rows.
-    for row in range(nrows):
+    for row in prange(
+        nrows,
+        nogil=True,
+        schedule="guided",
+        num_threads=num_threads,
+        use_threads_if=num_threads > 1,
+    ):
+        tid = threadid()
+        out_tid = 0
+        if per_thread:
+            out_tid = tid
         # Get the potentially reduced index of the output row where we should store the
         # results for this row.
         reduced_row = row
@@ -624,7 +705,8 @@ def reduce_sc_products_multicoeffs(
         row_end = ptr[row + 1]
 
         # Initialize the row value.
-        row_value[:] = 0
+        for icoeff in range(ncoeffs):
+            row_value[tid, icoeff] = 0
 
         # For each row, loop over pairs of columns (ij).
         # We add both ij and ji contributions, therefore we only need to loop over j greater than i.
@@ -633,7 +715,8 @@ def reduce_sc_products_multicoeffs(
         for i in range(row_start, row_end):
             icol = col[i]
             # Initialize the value for all pairs that we found for i
-            i_row_value[:] = 0
+            for icoeff in range(ncoeffs):
+                i_row_value[tid, icoeff] = 0
 
             # Precompute the supercell index of icol (will compare it to that of jcol)
             icol_sc = icol // uc_ncol
@@ -659,31 +742,17 @@ def reduce_sc_products_multicoeffs(
                 # (2) And then calculate the new index for jcol, moving icol to the unit cell
                 # (3) Do the same in the reverse direction (jcol -> icol)
                 if not same_cell:
-                    # Calculate the sc offset between both orbitals.
-                    for iaxis in range(3):
-                        sc_diff[iaxis] = (
-                            data_sc_off[jcol_sc, iaxis] - data_sc_off[icol_sc, iaxis]
-                        )
-                        # Calculate also the offset in the reverse direction
-                        inv_sc_diff[iaxis] = -sc_diff[iaxis]
-
-                        # If the sc_difference is negative, convert it to positive so that we can
-                        # use it to index the isc_off array (we switched off the handling of negative
-                        # indices in cython with wraparound(False))
-                        if sc_diff[iaxis] < 0:
-                            sc_diff[iaxis] = coeffs_nsc[iaxis] + sc_diff[iaxis]
-                        elif inv_sc_diff[iaxis] < 0:
-                            inv_sc_diff[iaxis] = coeffs_nsc[iaxis] + inv_sc_diff[iaxis]
-
                     # Get the supercell offset index of jcol with respect to icol
-                    jpair_sc = coeffs_isc_off[sc_diff[0], sc_diff[1], sc_diff[2]]
+                    jpair_sc = _pair_sc_index(
+                        data_sc_off, icol_sc, jcol_sc, coeffs_isc_off
+                    )
                     # And use it to calculate the supercell index of the j orbital in this ij pair
                     sc_jcol = jpair_sc * uc_ncol + uc_jcol
 
                     # Do the same for the ji pair
-                    ipair_sc = coeffs_isc_off[
-                        inv_sc_diff[0], inv_sc_diff[1], inv_sc_diff[2]
-                    ]
+                    ipair_sc = _pair_sc_index(
+                        data_sc_off, jcol_sc, icol_sc, coeffs_isc_off
+                    )
                     sc_icol = ipair_sc * uc_ncol + uc_icol
 
                 # Add the contribution of this column pair to the row total value. Note that we only
@@ -695,30 +764,35 @@ def reduce_sc_products_multicoeffs(
                 for icoeff in range(ncoeffs):
                     if same_cell:
                         if icol == jcol:
-                            i_row_value[icoeff] += (
+                            i_row_value[tid, icoeff] += (
                                 coeffs[uc_icol, uc_jcol, icoeff] * data[j]
                             )
                         else:
-                            i_row_value[icoeff] += (
+                            i_row_value[tid, icoeff] += (
                                 coeffs[uc_icol, uc_jcol, icoeff]
                                 + coeffs[uc_jcol, uc_icol, icoeff]
                             ) * data[j]
                     else:
-                        i_row_value[icoeff] += (
+                        i_row_value[tid, icoeff] += (
                             coeffs[uc_icol, sc_jcol, icoeff]
                             + coeffs[uc_jcol, sc_icol, icoeff]
                         ) * data[j]
 
             for icoeff in range(ncoeffs):
                 # Multiply all the contributions of ij pairs with this i by data[i], as explained inside the j loop.
-                i_row_value[icoeff] *= data[i]
+                i_row_value[tid, icoeff] *= data[i]
 
                 # Add the contribution of all ij pairs for this i to the row value.
-                row_value[icoeff] += i_row_value[icoeff]
+                row_value[tid, icoeff] += i_row_value[tid, icoeff]
 
         for icoeff in range(ncoeffs):
             # Store the row value in the output
-            out[reduced_row, icoeff] = out[reduced_row, icoeff] + row_value[icoeff]
+            thread_out[out_tid, reduced_row, icoeff] = (
+                thread_out[out_tid, reduced_row, icoeff] + row_value[tid, icoeff]
+            )
+
+    if per_thread:
+        _sum_thread_output(out, thread_out)
 
 
 @cython.boundscheck(False)
@@ -809,16 +883,19 @@ def reduce_sc_products_multicoeffs_sparse_denseindex(
     ncoeffs: cython.int = coeffs.shape[1]
     icoeff: cython.int
 
-    # Temporal storage to build values
-    row_value: cython.floating[:] = np.zeros(ncoeffs, dtype=np.asarray(data).dtype)
-    i_row_value: cython.floating[:] = np.zeros(ncoeffs, dtype=np.asarray(data).dtype)
+    # Temporal storage to build values (one for each thread)
+    num_threads: cython.int = get_num_threads()
+    row_value: cython.floating[:, :] = np.zeros(
+        (num_threads, ncoeffs), dtype=np.asarray(data).dtype
+    )
+    i_row_value: cython.floating[:, :] = np.zeros(
+        (num_threads, ncoeffs), dtype=np.asarray(data).dtype
+    )
 
     # Index to loop over axes of the grid.
     iaxis: cython.int
 
     # Variables that will help managing orbital pairs that are not within the same cell.
-    sc_diff: cython.int[3]
-    inv_sc_diff: cython.int[3]
     force_same_cell: cython.bint
     same_cell: cython.bint
 
@@ -833,13 +910,32 @@ def reduce_sc_products_multicoeffs_sparse_denseindex(
     # (if any) have been stored in the unit cell. This is what SIESTA does for gamma point calculations
     # with nsc <= 3.
     force_same_cell = True
-    coeffs_nsc = coeffs_isc_off.shape
     for iaxis in range(3):
-        if coeffs_nsc[iaxis] != 1:
+        if coeffs_isc_off.shape[iaxis] != 1:
             force_same_cell = False
 
+    # The rows are distributed among the threads. When the rows are reduced, several rows
+    # are added to the same output row, so each thread accumulates in its own output.
+    per_thread: cython.bint = grid_reduce and num_threads > 1
+    tid: cython.int
+    out_tid: cython.int
+    thread_out: cython.floating[:, :, :] = _thread_output(out, num_threads, per_thread)
+
+    row_start: cython.int
+    row_end: cython.int
+
     # Loop over rows.
-    for row in range(nrows):
+    for row in prange(
+        nrows,
+        nogil=True,
+        schedule="guided",
+        num_threads=num_threads,
+        use_threads_if=num_threads > 1,
+    ):
+        tid = threadid()
+        out_tid = 0
+        if per_thread:
+            out_tid = tid
         # Get the potentially reduced index of the output row where we should store the
         # results for this row.
         reduced_row = row
@@ -855,7 +951,8 @@ def reduce_sc_products_multicoeffs_sparse_denseindex(
         row_end = ptr[row + 1]
 
         # Initialize the row value.
-        row_value[:] = 0
+        for icoeff in range(ncoeffs):
+            row_value[tid, icoeff] = 0
 
         # For each row, loop over pairs of columns (ij).
         # We add both ij and ji contributions, therefore we only need to loop over j greater than i.
@@ -864,7 +961,8 @@ def reduce_sc_products_multicoeffs_sparse_denseindex(
         for i in range(row_start, row_end):
             icol = col[i]
             # Initialize the value for all pairs that we found for i
-            i_row_value[:] = 0
+            for icoeff in range(ncoeffs):
+                i_row_value[tid, icoeff] = 0
 
             # Precompute the supercell index of icol (will compare it to that of jcol)
             icol_sc = icol // uc_ncol
@@ -890,31 +988,17 @@ def reduce_sc_products_multicoeffs_sparse_denseindex(
                 # (2) And then calculate the new index for jcol, moving icol to the unit cell
                 # (3) Do the same in the reverse direction (jcol -> icol)
                 if not same_cell:
-                    # Calculate the sc offset between both orbitals.
-                    for iaxis in range(3):
-                        sc_diff[iaxis] = (
-                            data_sc_off[jcol_sc, iaxis] - data_sc_off[icol_sc, iaxis]
-                        )
-                        # Calculate also the offset in the reverse direction
-                        inv_sc_diff[iaxis] = -sc_diff[iaxis]
-
-                        # If the sc_difference is negative, convert it to positive so that we can
-                        # use it to index the isc_off array (we switched off the handling of negative
-                        # indices in cython with wraparound(False))
-                        if sc_diff[iaxis] < 0:
-                            sc_diff[iaxis] = coeffs_nsc[iaxis] + sc_diff[iaxis]
-                        elif inv_sc_diff[iaxis] < 0:
-                            inv_sc_diff[iaxis] = coeffs_nsc[iaxis] + inv_sc_diff[iaxis]
-
                     # Get the supercell offset index of jcol with respect to icol
-                    jpair_sc = coeffs_isc_off[sc_diff[0], sc_diff[1], sc_diff[2]]
+                    jpair_sc = _pair_sc_index(
+                        data_sc_off, icol_sc, jcol_sc, coeffs_isc_off
+                    )
                     # And use it to calculate the supercell index of the j orbital in this ij pair
                     sc_jcol = jpair_sc * uc_ncol + uc_jcol
 
                     # Do the same for the ji pair
-                    ipair_sc = coeffs_isc_off[
-                        inv_sc_diff[0], inv_sc_diff[1], inv_sc_diff[2]
-                    ]
+                    ipair_sc = _pair_sc_index(
+                        data_sc_off, jcol_sc, icol_sc, coeffs_isc_off
+                    )
                     sc_icol = ipair_sc * uc_ncol + uc_icol
 
                 # Get the index needed to find the coefficients that we want from the coeffs array.
@@ -944,24 +1028,31 @@ def reduce_sc_products_multicoeffs_sparse_denseindex(
                 for icoeff in range(ncoeffs):
                     if same_cell:
                         if icol == jcol:
-                            i_row_value[icoeff] += coeffs[coeff_index, icoeff] * data[j]
+                            i_row_value[tid, icoeff] += (
+                                coeffs[coeff_index, icoeff] * data[j]
+                            )
                         else:
-                            i_row_value[icoeff] += (
+                            i_row_value[tid, icoeff] += (
                                 coeffs[coeff_index, icoeff]
                                 + coeffs[coeff_index2, icoeff]
                             ) * data[j]
                     else:
-                        i_row_value[icoeff] += (
+                        i_row_value[tid, icoeff] += (
                             coeffs[coeff_index, icoeff] + coeffs[coeff_index2, icoeff]
                         ) * data[j]
 
             for icoeff in range(ncoeffs):
                 # Multiply all the contributions of ij pairs with this i by data[i], as explained inside the j loop.
-                i_row_value[icoeff] *= data[i]
+                i_row_value[tid, icoeff] *= data[i]
 
                 # Add the contribution of all ij pairs for this i to the row value.
-                row_value[icoeff] += i_row_value[icoeff]
+                row_value[tid, icoeff] += i_row_value[tid, icoeff]
 
         for icoeff in range(ncoeffs):
             # Store the row value in the output
-            out[reduced_row, icoeff] = out[reduced_row, icoeff] + row_value[icoeff]
+            thread_out[out_tid, reduced_row, icoeff] = (
+                thread_out[out_tid, reduced_row, icoeff] + row_value[tid, icoeff]
+            )
+
+    if per_thread:
+        _sum_thread_output(out, thread_out)
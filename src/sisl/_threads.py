@@ -0,0 +1,64 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+""" Number of threads used by the OpenMP parallel kernels
+
+The default is taken from the ``SISL_NUM_THREADS`` environment variable.
+It may be changed per (Python) thread, so that nested parallel regions
+(e.g. in the pools of `BrillouinZone.apply`) can run the kernels in serial.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from sisl._environ import get_environ_variable
+
+__all__ = ["get_num_threads", "set_num_threads", "num_threads"]
+
+
+_local = threading.local()
+
+
+def get_num_threads() -> int:
+    """Number of threads used by the OpenMP kernels in the current thread"""
+    n = getattr(_local, "num_threads", None)
+    if n is None:
+        n = get_environ_variable("SISL_NUM_THREADS")
+    return max(1, n)
+
+
+def set_num_threads(n: Optional[int]) -> None:
+    """Set the number of threads used by the OpenMP kernels in the current thread
+
+    Parameters
+    ----------
+    n :
+        number of threads, if None the ``SISL_NUM_THREADS`` value is used.
+    """
+    _local.num_threads = n
+
+
+@contextmanager
+def num_threads(n: Optional[int]):
+    """Context for temporarily setting the number of threads used by the OpenMP kernels
+
+    Only the calling thread is affected.
+
+    Parameters
+    ----------
+    n :
+        number of threads, if None the ``SISL_NUM_THREADS`` value is used.
+
+    Examples
+    --------
+    >>> with num_threads(1):
+    ...     Hk = H.Hk()
+    """
+    old = getattr(_local, "num_threads", None)
+    set_num_threads(n)
+    try:
+        yield
+    finally:
+        set_num_threads(old)
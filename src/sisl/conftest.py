@@ -306,6 +306,7 @@ def pytest_configure(config):
         "shape",
         "state",
         "electron",
+        "kpm",
         "phonon",
         "utils",
         "unit",
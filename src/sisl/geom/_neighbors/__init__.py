@@ -5,3 +5,4 @@ from __future__ import annotations
 
 from ._finder import *
 from ._neighborlists import *
+from ._verlet import *
@@ -3,13 +3,15 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Union
 
 import numpy as np
 
 from sisl import Geometry
 from sisl._internal import set_module
+from sisl._threads import get_num_threads
 from sisl.typing import AtomsIndex
 from sisl.utils import size_to_elements
 
@@ -38,6 +40,10 @@ class NeighborFinder:
     Therefore, if one wants to look for neighbors using a different
     R, one needs to create another finder or call `setup`.
 
+    The searches are split in chunks of atoms (or points), which are searched
+    in parallel threads. The number of threads is set by the ``SISL_NUM_THREADS``
+    environment variable.
+
     Parameters
     ----------
     geometry: Geometry
@@ -116,8 +122,16 @@ class NeighborFinder:
 
     """
 
-    #: Memory control of the finder
+    #: Memory control of the finder, the first element is the maximum size of the
+    #: buffers used by the searches (shared by all threads).
+    #: The second element (the grow factor of the buffers) is not used anymore, the
+    #: buffers are sized from the number of atoms in the searched bins.
     memory: tuple[str, float] = ("200MB", 1.5)
+    #: Only the occupied bins are stored if the fraction of occupied bins is below
+    #: this value (e.g. for slabs, wires and molecules with lots of vacuum).
+    #: The memory of the bins then scales with the number of atoms instead of the
+    #: volume of the cell. Small tables (less than 1024 bins) are always stored fully.
+    sparse_occupancy: float = 0.1
     #: Number of bins along each cell direction
     nbins: tuple[int, int, int]
     #: Total number of bins
@@ -136,8 +150,10 @@ class NeighborFinder:
 
     # Data structure
     _list: np.ndarray  # (natoms, )
-    _heads: np.ndarray  # (total_nbins, )
-    _counts: np.ndarray  # (total_nbins, )
+    _heads: np.ndarray  # (total_nbins, ) or (n_occupied + 1, ) for sparse bins
+    _counts: np.ndarray  # (total_nbins, ) or (n_occupied + 1, ) for sparse bins
+    # Sorted scalar indices of the occupied bins, None if all bins are stored.
+    _occupied_bins: Optional[np.ndarray]
 
     def __init__(
         self,
@@ -238,23 +254,18 @@ class NeighborFinder:
 
         # Find the minimum length needed in each lattice vector direction
         # (the more skewed the cell is, the bigger the bins have to be).
-        # The minimum bin size dictated by two lattice vectors (v1, v2) is:
-        #   2 * (max_R / sin[angle(v1, v2)] )
+        # The bins have to be 2 max_R wide perpendicular to the planes spanned
+        # by the other two lattice vectors. The minimum bin size along v1 is:
+        #   2 * max_R * |v1| / h1
+        # where h1 is the height of the cell along v1 (the distance between
+        # the planes spanned by v2 and v3).
         # The factor 2 max_R is taken out and applied after.
-        min_bin_sizes = np.ones(3)
+        cell = self.geometry.cell
         lattice_norms = self.geometry.length
-        for i in range(2):
-            for j in range(i + 1, 3):
-
-                # Compute angle of vectors i and j
-                scalar_prod = np.dot(self.geometry.cell[i], self.geometry.cell[j])
-                cos_alpha = scalar_prod / (lattice_norms[i] * lattice_norms[j])
-
-                # Required bin size along vector i due to its relation with j
-                # This ensures a positive number
-                required_bin_size = 1 / (1 - cos_alpha**2) ** 0.5
-                min_bin_sizes[i] = max(min_bin_sizes[i], required_bin_size)
-                min_bin_sizes[j] = max(min_bin_sizes[j], required_bin_size)
+        heights = abs(np.linalg.det(cell)) / np.linalg.norm(
+            np.cross(cell[[1, 2, 0]], cell[[2, 0, 1]]), axis=1
+        )
+        min_bin_sizes = lattice_norms / heights
 
         bin_size = np.asarray(bin_size)
         if np.any(bin_size < 1):
@@ -270,25 +281,46 @@ class NeighborFinder:
         # a position is exactly at the center of a bin.
         bin_size += 0.001
 
-        self._R_too_big = np.any(bin_size > lattice_norms)
+        # Along non-periodic directions a single bin suffices, since there
+        # are no periodic images to take into account.
+        pbc = self.geometry.lattice.pbc
+        too_big = (bin_size > lattice_norms) & pbc
+        self._R_too_big = np.any(too_big)
         if self._R_too_big:
-            # This means that nsc must be at least 5.
-
+            # The unit cell is tiled along the periodic directions such that the
+            # tiled cell is big enough to fit the bins.
+            # The tiled geometry is periodic with the tiled cell.
+            reps = np.where(too_big, np.ceil(bin_size / lattice_norms), 1).astype(int)
+            self._reps = reps
+
+            # The neighbors can be in the supercells, i.e. ensure the geometry
+            # has enough supercells to represent them.
             # We round the amount of cells needed in each direction
             # to the closest next odd number.
             nsc = np.ceil(bin_size / lattice_norms) // 2 * 2 + 1
-            # And then set it as the number of supercells.
+            nsc = np.where(
+                too_big, np.maximum(nsc, self.geometry.nsc), self.geometry.nsc
+            )
             self.geometry.set_nsc(nsc.astype(int))
+
+            # offsets of each of the tiled cells, the first is the unit cell
+            self._tile_off = np.stack(
+                np.meshgrid(*[np.arange(rep) for rep in reps], indexing="ij"), axis=-1
+            ).reshape(-1, 3)
+            n_tiles = len(self._tile_off)
             if self._aux_R.ndim == 1:
-                self._aux_R = np.tile(self._aux_R, self.geometry.n_s)
+                self._aux_R = np.tile(self._aux_R, n_tiles)
 
-            all_xyz = []
-            for isc in self.geometry.sc_off:
-                ats_xyz = self.geometry.axyz(isc=isc)
-                all_xyz.append(ats_xyz)
+            xyz = self.geometry.xyz
+            cell = self.geometry.cell
+            all_xyz = [xyz + off @ cell for off in self._tile_off]
 
+            lattice = self.geometry.lattice.copy()
+            lattice.cell[:] = cell * reps.reshape(3, 1)
             self._bins_geometry = Geometry(
-                np.concatenate(all_xyz), atoms=self.geometry.atoms
+                np.concatenate(all_xyz),
+                atoms=self.geometry.atoms.tile(n_tiles),
+                lattice=lattice,
             )
 
             # Recompute lattice sizes
@@ -299,7 +331,7 @@ class NeighborFinder:
 
         # Get the number of bins along each cell direction.
         nbins_float = lattice_norms / bin_size
-        self.nbins = tuple(np.floor(nbins_float).astype(int))
+        self.nbins = tuple(np.maximum(np.floor(nbins_float), 1).astype(int))
         self.total_nbins = np.prod(self.nbins)
 
         # Get the scalar bin indices of all atoms
@@ -317,11 +349,40 @@ class NeighborFinder:
         bin_indices: array-like of shape (self.total_nbins, )
             Array containing the scalar bin index for each atom.
         """
+        nbins = self.total_nbins
+        occupied = np.unique(bin_indices)
+        if nbins >= 1024 and len(occupied) < self.sparse_occupancy * nbins:
+            # Only store the occupied bins, the last one being an empty bin
+            # for all the unoccupied bins.
+            self._occupied_bins = occupied
+            bin_indices = np.searchsorted(occupied, bin_indices)
+            nbins = len(occupied) + 1
+        else:
+            self._occupied_bins = None
+
         # Call the fortran routine that builds the table
         self._list, self._heads, self._counts = _operations.build_table(
-            self.total_nbins, bin_indices
+            nbins, bin_indices
         )
 
+    def _get_table_indices(self, scalar_bin_indices):
+        """Converts scalar bin indices to the indices of the bins in the table
+
+        The indices are the same unless only the occupied bins are stored,
+        in which case the unoccupied bins are mapped to an empty bin.
+
+        Parameters
+        -----------
+        scalar_bin_indices: np.ndarray
+            the scalar bin indices, within the unit cell.
+        """
+        occupied = self._occupied_bins
+        if occupied is None:
+            return scalar_bin_indices
+        idx = np.searchsorted(occupied, scalar_bin_indices)
+        idx[idx == len(occupied)] = 0
+        return np.where(occupied[idx] == scalar_bin_indices, idx, len(occupied))
+
     def assert_consistency(self):
         """Asserts that the data structure (self._list, self._heads, self._counts) is consistent.
 
@@ -329,7 +390,12 @@ class NeighborFinder:
         """
         # Check shapes
         assert self._list.shape == (self._bins_geometry.na,)
-        assert self._counts.shape == self._heads.shape == (self.total_nbins,)
+        if self._occupied_bins is None:
+            nbins = self.total_nbins
+        else:
+            nbins = len(self._occupied_bins) + 1
+            assert self._counts[-1] == 0
+        assert self._counts.shape == self._heads.shape == (nbins,)
 
         # Check values
         for i_bin, bin_count in enumerate(self._counts):
@@ -349,8 +415,8 @@ class NeighborFinder:
         Parameters
         -----------
         scalar_bin_indices: np.ndarray of shape ([n_searches], 8)
-            Array containing the bin indices for each search.
-            Bin indices should be within the unit cell!
+            Array containing the bin indices (in the table) for each search,
+            see `_get_table_indices`.
 
         Returns
         -----------
@@ -359,6 +425,86 @@ class NeighborFinder:
         """
         return self._counts[scalar_bin_indices.ravel()].reshape(-1, 8).sum(axis=1)
 
+    def _search_chunks(
+        self,
+        search: Callable,
+        at_counts: np.ndarray,
+        split: bool = True,
+    ):
+        """Runs the searches in chunks, in parallel threads
+
+        The searches are split such that the number of atoms in the searched bins
+        is balanced among the chunks. The buffer of each chunk can then be allocated
+        with the number of atoms in the searched bins, which is the maximum number of
+        pairs that can be found.
+
+        Parameters
+        -----------
+        search:
+            function that runs the searches ``start:stop`` using the given buffers,
+            i.e. ``search(start, stop, neighs, split_indices) -> n_pairs``
+            (without `split_indices` if `split` is false).
+        at_counts: np.ndarray of shape (n_searches, )
+            the maximum number of pairs found by each search,
+            see `_get_search_atom_counts`.
+        split:
+            whether the searches return the breakpoints of each search.
+
+        Returns
+        -----------
+        neighbor_pairs: np.ndarray of shape (n_pairs, 5)
+            the found pairs, in the order of the searches.
+        split_indices: np.ndarray of shape (n_searches, )
+            the breakpoints of each search in `neighbor_pairs` (only if `split`).
+        """
+        n_threads = get_num_threads()
+        n_searches = len(at_counts)
+        cum_counts = np.cumsum(at_counts)
+        total = int(cum_counts[-1]) if n_searches > 0 else 0
+
+        # Each chunk holds its own buffer, whose size is restricted by the memory
+        # limit for all threads.
+        max_pairs = max(1, size_to_elements(self.memory[0], 8 * 5) // n_threads)
+        n_chunks = -(-total // max_pairs)
+        if n_threads > 1:
+            # more chunks than threads for load balancing
+            n_chunks = max(n_chunks, 4 * n_threads)
+        n_chunks = max(1, min(n_chunks, n_searches))
+        bounds = np.searchsorted(
+            cum_counts, np.arange(1, n_chunks) * (total / n_chunks), side="right"
+        )
+        bounds = np.unique(np.concatenate(([0], bounds, [n_searches])))
+
+        def run(start, stop):
+            n = int(at_counts[start:stop].sum())
+            neighs = np.empty([n, 5], dtype=np.int64)
+            if split:
+                split_indices = np.empty(stop - start, dtype=np.int64)
+                n = search(start, stop, neighs, split_indices)
+                return neighs[:n].copy(), split_indices
+            n = search(start, stop, neighs)
+            return neighs[:n].copy(), None
+
+        if n_threads > 1 and len(bounds) > 2:
+            with ThreadPoolExecutor(n_threads) as pool:
+                chunks = list(pool.map(run, bounds[:-1], bounds[1:]))
+        else:
+            chunks = [run(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        if len(chunks) == 0:
+            chunks = [(np.empty([0, 5], dtype=np.int64), np.empty(0, dtype=np.int64))]
+
+        neighbor_pairs = np.concatenate([neighs for neighs, _ in chunks])
+        if not split:
+            return neighbor_pairs
+
+        # Shift the breakpoints by the number of pairs in the previous chunks
+        offsets = np.cumsum([0] + [len(neighs) for neighs, _ in chunks[:-1]])
+        split_ind = np.concatenate(
+            [split_indices + off for (_, split_indices), off in zip(chunks, offsets)]
+        )
+        return neighbor_pairs, split_ind
+
     def _get_bin_indices(self, fxyz, cartesian=False, floor=True):
         """Gets the bin indices for a given fractional coordinate.
 
@@ -477,37 +623,34 @@ class NeighborFinder:
         neighbor_pairs: np.ndarray,  # (n_pairs, 5)
         split_ind: Union[int, np.ndarray],  # (n_queried_atoms, )
     ):
-        """Correction to atom and supercell indices when the binning has been done on a tiled geometry"""
-        is_sc_neigh = neighbor_pairs[:, 1] >= self.geometry.na
-        pbc = self.geometry.lattice.pbc
+        """Correction to atom and supercell indices when the binning has been done on a tiled geometry
 
-        invalid = None
-        if not np.any(pbc):
-            invalid = is_sc_neigh
-        else:
-            pbc_neighs = neighbor_pairs.copy()
+        The neighbors of each atom (or point) are sorted by neighbor index and
+        then supercell index, since the order of the tiles is an internal detail.
+        """
+        split = np.atleast_1d(split_ind)
+        neighbor_pairs = neighbor_pairs[: split[-1]]
+        tile, uc_neigh = np.divmod(neighbor_pairs[:, 1], self.geometry.na)
+
+        neighbor_pairs = neighbor_pairs.copy()
+        neighbor_pairs[:, 1] = uc_neigh
+        # supercell index in the tiled geometry -> supercell index of the unit cell
+        neighbor_pairs[:, 2:] = (
+            neighbor_pairs[:, 2:] * self._reps + self._tile_off[tile]
+        )
 
-            sc_neigh, uc_neigh = np.divmod(
-                neighbor_pairs[:, 1][is_sc_neigh], self.geometry.na
+        segment = np.repeat(np.arange(len(split)), np.diff(split, prepend=0))
+        idx = np.lexsort(
+            (
+                neighbor_pairs[:, 4],
+                neighbor_pairs[:, 3],
+                neighbor_pairs[:, 2],
+                neighbor_pairs[:, 1],
+                segment,
             )
-            isc_neigh = self.geometry.sc_off[sc_neigh]
-
-            pbc_neighs[is_sc_neigh, 1] = uc_neigh
-            pbc_neighs[is_sc_neigh, 2:] = isc_neigh
-
-            if not np.all(pbc):
-                invalid = pbc_neighs[:, 2:][:, ~pbc].any(axis=1)
-
-            neighbor_pairs = pbc_neighs
-
-        if invalid is not None:
-            neighbor_pairs = neighbor_pairs[~invalid]
-            if isinstance(split_ind, int):
-                split_ind = split_ind - invalid.sum()
-            else:
-                split_ind = split_ind - np.cumsum(invalid)[split_ind - 1]
+        )
 
-        return neighbor_pairs, split_ind
+        return neighbor_pairs[idx], split_ind
 
     def find_neighbors(
         self,
@@ -544,38 +687,38 @@ class NeighborFinder:
 
         # Get search indices
         search_indices, isc = self._get_search_indices(
-            self.geometry.fxyz[atoms], cartesian=False
+            self._bins_geometry.fxyz[atoms], cartesian=False
         )
+        search_indices = self._get_table_indices(search_indices)
 
         # Get atom counts
         at_counts = self._get_search_atom_counts(search_indices)
 
-        max_pairs = at_counts.sum()
-        if not self_interaction:
-            max_pairs -= search_indices.shape[0]
-        init_pairs = min(
-            max_pairs,
-            # 8 bytes per element (int64)
-            # While this might be wrong on Win, it shouldn't matter
-            size_to_elements(self.memory[0], 8),
-        )
+        xyz = self._bins_geometry.xyz
+        cell = self._bins_geometry.cell
+        pbc = self.geometry.lattice.pbc
+
+        def search(start, stop, neighs, split_indices):
+            return _operations.get_pairs(
+                atoms,
+                search_indices,
+                isc,
+                self._heads,
+                self._list,
+                self_interaction,
+                xyz,
+                cell,
+                pbc,
+                thresholds,
+                self._overlap,
+                start,
+                stop,
+                neighs,
+                split_indices,
+            )
 
         # Find the neighbor pairs
-        neighbor_pairs, split_ind = _operations.get_pairs(
-            atoms,
-            search_indices,
-            isc,
-            self._heads,
-            self._list,
-            self_interaction,
-            self._bins_geometry.xyz,
-            self._bins_geometry.cell,
-            self.geometry.lattice.pbc,
-            thresholds,
-            self._overlap,
-            init_pairs,
-            self.memory[1],
-        )
+        neighbor_pairs, split_ind = self._search_chunks(search, at_counts)
 
         # Correct neighbor indices for the case where R was too big and
         # we needed to create an auxiliary supercell.
@@ -634,35 +777,34 @@ class NeighborFinder:
         search_indices, isc = self._get_search_indices(
             self.geometry.fxyz, cartesian=False
         )
+        search_indices = self._get_table_indices(search_indices)
 
         # Get atom counts
         at_counts = self._get_search_atom_counts(search_indices)
 
-        max_pairs = at_counts.sum()
-        if not self_interaction:
-            max_pairs -= search_indices.shape[0]
-        init_pairs = min(
-            max_pairs,
-            # 8 bytes per element (int64)
-            # While this might be wrong on Win, it shouldn't matter
-            size_to_elements(self.memory[0], 8),
-        )
+        xyz = self.geometry.xyz
+        cell = self.geometry.cell
+        pbc = self.geometry.lattice.pbc
+
+        def search(start, stop, neighs):
+            return _operations.get_all_unique_pairs(
+                search_indices,
+                isc,
+                self._heads,
+                self._list,
+                self_interaction,
+                xyz,
+                cell,
+                pbc,
+                thresholds,
+                self._overlap,
+                start,
+                stop,
+                neighs,
+            )
 
         # Find all unique neighbor pairs
-        neighbor_pairs = _operations.get_all_unique_pairs(
-            search_indices,
-            isc,
-            self._heads,
-            self._list,
-            self_interaction,
-            self.geometry.xyz,
-            self.geometry.cell,
-            self.geometry.lattice.pbc,
-            thresholds,
-            self._overlap,
-            init_pairs,
-            self.memory[1],
-        )
+        neighbor_pairs = self._search_chunks(search, at_counts, split=False)
 
         return UniqueNeighborList(self.geometry, neighbor_pairs)
 
@@ -689,32 +831,34 @@ class NeighborFinder:
         search_indices, isc = self._get_search_indices(
             xyz.dot(self._bins_geometry.icell.T) % 1, cartesian=False
         )
+        search_indices = self._get_table_indices(search_indices)
 
         # Get atom counts
         at_counts = self._get_search_atom_counts(search_indices)
 
-        max_pairs = at_counts.sum()
-        init_pairs = min(
-            max_pairs,
-            # 8 bytes per element (int64)
-            # While this might be wrong on Win, it shouldn't matter
-            size_to_elements(self.memory[0], 8),
-        )
+        bins_xyz = self._bins_geometry.xyz
+        cell = self._bins_geometry.cell
+        pbc = self.geometry.lattice.pbc
+
+        def search(start, stop, neighs, split_indices):
+            return _operations.get_close(
+                xyz,
+                search_indices,
+                isc,
+                self._heads,
+                self._list,
+                bins_xyz,
+                cell,
+                pbc,
+                thresholds,
+                start,
+                stop,
+                neighs,
+                split_indices,
+            )
 
         # Find the neighbor pairs
-        neighbor_pairs, split_ind = _operations.get_close(
-            xyz,
-            search_indices,
-            isc,
-            self._heads,
-            self._list,
-            self._bins_geometry.xyz,
-            self._bins_geometry.cell,
-            self.geometry.lattice.pbc,
-            thresholds,
-            init_pairs,
-            self.memory[1],
-        )
+        neighbor_pairs, split_ind = self._search_chunks(search, at_counts)
 
         # Correct neighbor indices for the case where R was too big and
         # we needed to create an auxiliary supercell.
@@ -83,11 +83,16 @@ def get_pairs(
     pbc: cnp.npy_bool[:],
     thresholds: cnp.float64_t[:],
     overlap: cython.bint,
-    init_npairs: cython.size_t,
-    grow_factor: cnp.float64_t,
+    start: cython.Py_ssize_t,
+    stop: cython.Py_ssize_t,
+    neighs: cnp.int64_t[:, :],
+    split_indices: cnp.int64_t[:],
 ):
     r"""Gets (possibly duplicated) pairs of neighbor atoms.
 
+    Only the searches ``start:stop`` are performed, and the GIL is released
+    so that several chunks of searches can run in parallel threads.
+
     Parameters
     ---------
     at_indices:
@@ -127,140 +132,127 @@ def get_pairs(
         If false, two atoms are considered neighbors if the second atom
         is within the sphere of the first atom. Note that this implies that
         atom :math:`I` might be atom :math:`J`'s neighbor while the opposite is not true.
-    init_npairs:
-        The initial number of pairs that can be found.
-        It is used to allocate the `neighs` array. This is computed
-        in python with the help of the `counts` array constructed
-        by `build_table`.
-        This is not limiting the final size, but is used to pre-allocate
-        a growing array.
-    grow_factor:
-        the grow factor of the size when the neighbor list needs
-        to grow.
-
-    Returns
-    --------
+    start:
+        the first search to perform.
+    stop:
+        the search after the last one to perform.
     neighs:
-        contains the atom indices of all pairs of neighbor atoms.
+        output array for the pairs of neighbor atoms (and the supercell
+        index of the neighbor), it must be able to hold all the atoms
+        in the 8 bins of the searches, see `NeighborFinder._get_search_atom_counts`.
     split_indices:
-        array containing the breakpoints in `neighs`. These
-        breakpoints delimit the position where one can find pairs
+        output array of length ``stop - start`` for the breakpoints in `neighs`.
+        These breakpoints delimit the position where one can find pairs
         for each 8 bin search. It can be used later to quickly
         split `neighs` on the multiple individual searches.
-    """
-    N_ind = at_indices.shape[0]
 
-    ref_xyz: cnp.float64_t[:] = np.empty(3, dtype=np.float64)
-    neigh_isc: cnp.int64_t[:] = np.empty(3, dtype=np.int64)
-
-    def grow():
-        nonlocal neighs_obj, neighs, grow_factor
-
-        n: cython.size_t = neighs.shape[0]
-        new_neighs_obj = np.empty([int(n * grow_factor), 5], dtype=np.int64)
-        new_neighs_obj[:n, :] = neighs_obj[:, :]
-        neighs_obj = new_neighs_obj
-        neighs = neighs_obj
-
-    neighs_obj: cnp.ndarray = np.empty([init_npairs, 5], dtype=np.int64)
-    neighs: cnp.int64_t[:, :] = neighs_obj
-
-    split_indices_obj: cnp.ndarray = np.zeros(N_ind, dtype=np.int64)
-    split_indices: cnp.int64_t[:] = split_indices_obj
+    Returns
+    --------
+    int:
+        the number of pairs stored in `neighs`.
+    """
+    search_index: cython.Py_ssize_t
+    at: cnp.int64_t
+    j: cython.int
+    i: cython.int
+    bin_index: cnp.int64_t
+    neigh_at: cnp.int64_t
+    isc0: cnp.int64_t
+    isc1: cnp.int64_t
+    isc2: cnp.int64_t
+    skip: cython.bint
+    ref_xyz: cnp.float64_t[3]
+    dist: cnp.float64_t
+    threshold: cnp.float64_t
 
     # Counter for filling neighs
-    i_pair: cython.size_t = 0
-
-    for search_index in range(N_ind):
-        at = at_indices[search_index]
+    i_pair: cython.Py_ssize_t = 0
 
-        for j in range(8):
-            # Find the bin index.
-            bin_index: cnp.int64_t = indices[search_index, j]
+    with cython.nogil:
+        for search_index in range(start, stop):
+            at = at_indices[search_index]
 
-            # Get the first atom index in this bin
-            neigh_at: cnp.int64_t = heads[bin_index]
+            for j in range(8):
+                # Find the bin index.
+                bin_index = indices[search_index, j]
 
-            # If there are no atoms in this bin, do not even bother
-            # checking supercell indices.
-            if neigh_at == -1:
-                continue
+                # Get the first atom index in this bin
+                neigh_at = heads[bin_index]
 
-            # Find the supercell indices for this bin
-            neigh_isc[:] = iscs[search_index, j, :]
+                # If there are no atoms in this bin, do not even bother
+                # checking supercell indices.
+                if neigh_at == -1:
+                    continue
 
-            # And check if this bin corresponds to the unit cell
-            not_unit_cell: cython.bint = (
-                neigh_isc[0] != 0 or neigh_isc[1] != 0 or neigh_isc[2] != 0
-            )
+                # Find the supercell indices for this bin
+                isc0 = iscs[search_index, j, 0]
+                isc1 = iscs[search_index, j, 1]
+                isc2 = iscs[search_index, j, 2]
 
-            ref_xyz[:] = xyz[at, :]
-            if not_unit_cell:
-                # If we are looking at a neighboring cell in a direction
-                # where there are no periodic boundary conditions, go to
-                # next bin.
-                should_not_check = False
-                for i in range(3):
-                    if not pbc[i] and neigh_isc[i] != 0:
-                        should_not_check = True
-                if should_not_check:
-                    continue
-                # Otherwise, move the atom to the neighbor cell. We do this
-                # instead of moving potential neighbors to the unit cell
-                # because in this way we reduce the number of operations.
                 for i in range(3):
-                    ref_xyz[i] -= (
-                        cell[0, i] * neigh_isc[0]
-                        + cell[1, i] * neigh_isc[1]
-                        + cell[2, i] * neigh_isc[2]
+                    ref_xyz[i] = xyz[at, i]
+
+                # And check if this bin corresponds to the unit cell
+                if isc0 != 0 or isc1 != 0 or isc2 != 0:
+                    # If we are looking at a neighboring cell in a direction
+                    # where there are no periodic boundary conditions, go to
+                    # next bin.
+                    skip = (
+                        (not pbc[0] and isc0 != 0)
+                        or (not pbc[1] and isc1 != 0)
+                        or (not pbc[2] and isc2 != 0)
                     )
-
-            # Loop through all atoms that are in this bin.
-            # If neigh_at == -1, this means no more atoms are in this bin.
-            while neigh_at >= 0:
-                # If this is a self interaction and the user didn't want them,
-                # go to next atom.
-                if not self_interaction and at == neigh_at:
+                    if skip:
+                        continue
+                    # Otherwise, move the atom to the neighbor cell. We do this
+                    # instead of moving potential neighbors to the unit cell
+                    # because in this way we reduce the number of operations.
+                    for i in range(3):
+                        ref_xyz[i] -= (
+                            cell[0, i] * isc0 + cell[1, i] * isc1 + cell[2, i] * isc2
+                        )
+
+                # Loop through all atoms that are in this bin.
+                # If neigh_at == -1, this means no more atoms are in this bin.
+                while neigh_at >= 0:
+                    # If this is a self interaction and the user didn't want them,
+                    # go to next atom.
+                    if not self_interaction and at == neigh_at:
+                        neigh_at = list_array[neigh_at]
+                        continue
+
+                    # Calculate the distance between the atom and the potential
+                    # neighbor.
+                    dist = 0.0
+                    for i in range(3):
+                        dist += (xyz[neigh_at, i] - ref_xyz[i]) ** 2
+                    dist = sqrt(dist)
+
+                    # Get the threshold for this pair of atoms
+                    threshold = thresholds[at]
+                    if overlap:
+                        # If the user wants to check for sphere overlaps, we have
+                        # to sum the radius of the neighbor to the threshold
+                        threshold = threshold + thresholds[neigh_at]
+
+                    if dist < threshold:
+                        # Store the pair of neighbors.
+                        neighs[i_pair, 0] = at
+                        neighs[i_pair, 1] = neigh_at
+                        neighs[i_pair, 2] = isc0
+                        neighs[i_pair, 3] = isc1
+                        neighs[i_pair, 4] = isc2
+
+                        # Increment the pair index
+                        i_pair = i_pair + 1
+
+                    # Get the next atom in this bin.
                     neigh_at = list_array[neigh_at]
-                    continue
-
-                # Calculate the distance between the atom and the potential
-                # neighbor.
-                dist: float = 0.0
-                for i in range(3):
-                    dist += (xyz[neigh_at, i] - ref_xyz[i]) ** 2
-                dist = sqrt(dist)
 
-                # Get the threshold for this pair of atoms
-                threshold: float = thresholds[at]
-                if overlap:
-                    # If the user wants to check for sphere overlaps, we have
-                    # to sum the radius of the neighbor to the threshold
-                    threshold = threshold + thresholds[neigh_at]
+            # We have finished this search, store the breakpoint.
+            split_indices[search_index - start] = i_pair
 
-                if dist < threshold:
-
-                    if i_pair >= neighs.shape[0]:
-                        grow()
-
-                    # Store the pair of neighbors.
-                    neighs[i_pair, 0] = at
-                    neighs[i_pair, 1] = neigh_at
-                    neighs[i_pair, 2] = neigh_isc[0]
-                    neighs[i_pair, 3] = neigh_isc[1]
-                    neighs[i_pair, 4] = neigh_isc[2]
-
-                    # Increment the pair index
-                    i_pair = i_pair + 1
-
-                # Get the next atom in this bin. Sum 1 to get fortran index.
-                neigh_at = list_array[neigh_at]
-
-        # We have finished this search, store the breakpoint.
-        split_indices[search_index] = i_pair
-
-    # We copy to allow GC to remove the full array
-    return neighs_obj[:i_pair, :].copy(), split_indices_obj
+    return i_pair
 
 
 @cython.boundscheck(False)
@@ -276,11 +268,15 @@ def get_all_unique_pairs(
     pbc: cnp.npy_bool[:],
     thresholds: cnp.float64_t[:],
     overlap: cython.bint,
-    init_npairs: cython.size_t,
-    grow_factor: cnp.float64_t,
+    start: cython.Py_ssize_t,
+    stop: cython.Py_ssize_t,
+    neighs: cnp.int64_t[:, :],
 ):
     r"""Gets all unique pairs of atoms that are neighbors.
 
+    Only the atoms ``start:stop`` are searched, and the GIL is released
+    so that several chunks of atoms can run in parallel threads.
+
     Parameters
     ---------
     indices:
@@ -317,145 +313,132 @@ def get_all_unique_pairs(
         If false, two atoms are considered neighbors if the second atom
         is within the sphere of the first atom. Note that this implies that
         atom :math:`I` might be atom :math:`J`'s neighbor while the opposite is not true.
-    init_npairs:
-        The initial number of pairs that can be found.
-        It is used to allocate the `neighs` array. This is computed
-        in python with the help of the `counts` array constructed
-        by `build_table`.
-        This is not limiting the final size, but is used to pre-allocate
-        a growing array.
-    grow_factor:
-        the grow factor of the size when the neighbor list needs
-        to grow.
-
-    Returns
-    --------
+    start:
+        the first atom to search neighbors for.
+    stop:
+        the atom after the last one to search neighbors for.
     neighs:
-        contains the atom indices of all unique neighbor pairs
+        output array for the unique neighbor pairs, it must be able to
+        hold all the atoms in the 8 bins of the searches,
+        see `NeighborFinder._get_search_atom_counts`.
         First column of atoms is sorted in increasing order.
         Columns 3 to 5 contain the supercell indices of the neighbor
         atom (the one in column 2, column 1 atoms are always in the
         unit cell).
-    """
-
-    N_ats = list_array.shape[0]
-
-    ref_xyz: cnp.float64_t[:] = np.empty(3, dtype=np.float64)
-    neigh_isc: cnp.int64_t[:] = np.empty(3, dtype=np.int64)
-
-    def grow():
-        nonlocal neighs_obj, neighs, grow_factor
-
-        n: cython.size_t = neighs.shape[0]
-        new_neighs_obj = np.empty([int(n * grow_factor), 5], dtype=np.int64)
-        new_neighs_obj[:n, :] = neighs_obj[:, :]
-        neighs_obj = new_neighs_obj
-        neighs = neighs_obj
 
-    neighs_obj: cnp.ndarray = np.empty([init_npairs, 5], dtype=np.int64)
-    neighs: cnp.int64_t[:, :] = neighs_obj
+    Returns
+    --------
+    int:
+        the number of pairs stored in `neighs`.
+    """
+    at: cython.Py_ssize_t
+    j: cython.int
+    i: cython.int
+    bin_index: cnp.int64_t
+    neigh_at: cnp.int64_t
+    isc0: cnp.int64_t
+    isc1: cnp.int64_t
+    isc2: cnp.int64_t
+    skip: cython.bint
+    ref_xyz: cnp.float64_t[3]
+    dist: cnp.float64_t
+    threshold: cnp.float64_t
 
     # Counter for filling neighs
-    i_pair: cython.size_t = 0
-
-    for at in range(N_ats):
-        if self_interaction:
-            if i_pair >= neighs.shape[0]:
-                grow()
-
-            # Add the self interaction
-            neighs[i_pair, 0] = at
-            neighs[i_pair, 1] = at
-            neighs[i_pair, 2:] = 0
-
-            # Increment the pair index
-            i_pair += 1
-
-        for j in range(8):
-            # Find the bin index.
-            bin_index: cnp.int64_t = indices[at, j]
-
-            # Get the first atom index in this bin
-            neigh_at: cnp.int64_t = heads[bin_index]
-
-            # If there are no atoms in this bin, do not even bother
-            # checking supercell indices.
-            if neigh_at == -1:
-                continue
-
-            # Find the supercell indices for this bin
-            neigh_isc[:] = iscs[at, j, :]
-
-            # And check if this bin corresponds to the unit cell
-            not_unit_cell: cython.bint = (
-                neigh_isc[0] != 0 or neigh_isc[1] != 0 or neigh_isc[2] != 0
-            )
-
-            ref_xyz[:] = xyz[at, :]
-            if not_unit_cell:
-                # If we are looking at a neighboring cell in a direction
-                # where there are no periodic boundary conditions, go to
-                # next bin.
-                should_not_check = False
-                for i in range(3):
-                    if not pbc[i] and neigh_isc[i] != 0:
-                        should_not_check = True
-                if should_not_check:
+    i_pair: cython.Py_ssize_t = 0
+
+    with cython.nogil:
+        for at in range(start, stop):
+            if self_interaction:
+                # Add the self interaction
+                neighs[i_pair, 0] = at
+                neighs[i_pair, 1] = at
+                neighs[i_pair, 2] = 0
+                neighs[i_pair, 3] = 0
+                neighs[i_pair, 4] = 0
+
+                # Increment the pair index
+                i_pair += 1
+
+            for j in range(8):
+                # Find the bin index.
+                bin_index = indices[at, j]
+
+                # Get the first atom index in this bin
+                neigh_at = heads[bin_index]
+
+                # If there are no atoms in this bin, do not even bother
+                # checking supercell indices.
+                if neigh_at == -1:
                     continue
-                # Otherwise, move the atom to the neighbor cell. We do this
-                # instead of moving potential neighbors to the unit cell
-                # because in this way we reduce the number of operations.
-                for i in range(3):
-                    ref_xyz[i] -= (
-                        cell[0, i] * neigh_isc[0]
-                        + cell[1, i] * neigh_isc[1]
-                        + cell[2, i] * neigh_isc[2]
-                    )
-
-            # Loop through all atoms that are in this bin.
-            # If neigh_at == -1, this means no more atoms are in this bin.
-            while neigh_at >= 0:
-                # If neigh_at is smaller than at, we already stored
-                # this pair when performing the search for neigh_at.
-                # The following atoms will have even lower indices
-                # So we can just move to the next bin.
-                if neigh_at <= at:
-                    break
-
-                # Calculate the distance between the atom and the potential
-                # neighbor.
-                dist: float = 0.0
-                for i in range(3):
-                    dist += (xyz[neigh_at, i] - ref_xyz[i]) ** 2
-                dist = sqrt(dist)
-
-                # Get the threshold for this pair of atoms
-                threshold: float = thresholds[at]
-                if overlap:
-                    # If the user wants to check for sphere overlaps, we have
-                    # to sum the radius of the neighbor to the threshold
-                    threshold = threshold + thresholds[neigh_at]
-
-                if dist < threshold:
-                    if i_pair >= neighs.shape[0]:
-                        grow()
 
-                    # Store the pair of neighbors.
-                    neighs[i_pair, 0] = at
-                    neighs[i_pair, 1] = neigh_at
-                    neighs[i_pair, 2] = neigh_isc[0]
-                    neighs[i_pair, 3] = neigh_isc[1]
-                    neighs[i_pair, 4] = neigh_isc[2]
+                # Find the supercell indices for this bin
+                isc0 = iscs[at, j, 0]
+                isc1 = iscs[at, j, 1]
+                isc2 = iscs[at, j, 2]
 
-                    # Increment the pair index
-                    i_pair += 1
-
-                # Get the next atom in this bin. Sum 1 to get fortran index.
-                neigh_at = list_array[neigh_at]
+                for i in range(3):
+                    ref_xyz[i] = xyz[at, i]
+
+                # And check if this bin corresponds to the unit cell
+                if isc0 != 0 or isc1 != 0 or isc2 != 0:
+                    # If we are looking at a neighboring cell in a direction
+                    # where there are no periodic boundary conditions, go to
+                    # next bin.
+                    skip = (
+                        (not pbc[0] and isc0 != 0)
+                        or (not pbc[1] and isc1 != 0)
+                        or (not pbc[2] and isc2 != 0)
+                    )
+                    if skip:
+                        continue
+                    # Otherwise, move the atom to the neighbor cell. We do this
+                    # instead of moving potential neighbors to the unit cell
+                    # because in this way we reduce the number of operations.
+                    for i in range(3):
+                        ref_xyz[i] -= (
+                            cell[0, i] * isc0 + cell[1, i] * isc1 + cell[2, i] * isc2
+                        )
+
+                # Loop through all atoms that are in this bin.
+                # If neigh_at == -1, this means no more atoms are in this bin.
+                while neigh_at >= 0:
+                    # If neigh_at is smaller than at, we already stored
+                    # this pair when performing the search for neigh_at.
+                    # The following atoms will have even lower indices
+                    # So we can just move to the next bin.
+                    if neigh_at <= at:
+                        break
+
+                    # Calculate the distance between the atom and the potential
+                    # neighbor.
+                    dist = 0.0
+                    for i in range(3):
+                        dist += (xyz[neigh_at, i] - ref_xyz[i]) ** 2
+                    dist = sqrt(dist)
+
+                    # Get the threshold for this pair of atoms
+                    threshold = thresholds[at]
+                    if overlap:
+                        # If the user wants to check for sphere overlaps, we have
+                        # to sum the radius of the neighbor to the threshold
+                        threshold = threshold + thresholds[neigh_at]
+
+                    if dist < threshold:
+                        # Store the pair of neighbors.
+                        neighs[i_pair, 0] = at
+                        neighs[i_pair, 1] = neigh_at
+                        neighs[i_pair, 2] = isc0
+                        neighs[i_pair, 3] = isc1
+                        neighs[i_pair, 4] = isc2
+
+                        # Increment the pair index
+                        i_pair += 1
+
+                    # Get the next atom in this bin.
+                    neigh_at = list_array[neigh_at]
 
-    # Return the array of neighbors, but only the filled part
-    # We copy to remove the unneeded data-sizes
-    return neighs_obj[:i_pair].copy()
+    return i_pair
 
 
 @cython.boundscheck(False)
@@ -470,11 +453,16 @@ def get_close(
     cell: cnp.float64_t[:, :],
     pbc: cnp.npy_bool[:],
     thresholds: cnp.float64_t[:],
-    init_npairs: cython.size_t,
-    grow_factor: cnp.float64_t,
+    start: cython.Py_ssize_t,
+    stop: cython.Py_ssize_t,
+    neighs: cnp.int64_t[:, :],
+    split_indices: cnp.int64_t[:],
 ):
     r"""Gets the atoms that are close to given positions
 
+    Only the positions ``start:stop`` are searched, and the GIL is released
+    so that several chunks of positions can run in parallel threads.
+
     Parameters
     ---------
     search_xyz:
@@ -506,124 +494,110 @@ def get_close(
         be considered.
     thresholds:
         the threshold radius for each atom in the geometry.
-    init_npairs:
-        The initial number of pairs that can be found.
-        It is used to allocate the `neighs` array. This is computed
-        in python with the help of the `counts` array constructed
-        by `build_table`.
-        This is not limiting the final size, but is used to pre-allocate
-        a growing array.
-    grow_factor:
-        the grow factor of the size when the neighbor list needs
-        to grow.
-
-    Returns
-    --------
+    start:
+        the first position to search atoms for.
+    stop:
+        the position after the last one to search atoms for.
     neighs:
-        contains the atom indices of all pairs of neighbor atoms.
+        output array for the pairs of positions and atoms (and the supercell
+        index of the atom), it must be able to hold all the atoms
+        in the 8 bins of the searches, see `NeighborFinder._get_search_atom_counts`.
     split_indices:
-        array containing the breakpoints in `neighs`. These
-        breakpoints delimit the position where one can find pairs
+        output array of length ``stop - start`` for the breakpoints in `neighs`.
+        These breakpoints delimit the position where one can find pairs
         for each 8 bin search. It can be used later to quickly
         split `neighs` on the multiple individual searches.
-    """
-
-    N_ind = search_xyz.shape[0]
-
-    ref_xyz: cnp.float64_t[:] = np.empty(3, dtype=np.float64)
-    neigh_isc: cnp.int64_t[:] = np.empty(3, dtype=np.int64)
-
-    def grow():
-        nonlocal neighs_obj, neighs, grow_factor
-
-        n: cython.size_t = neighs.shape[0]
-        new_neighs_obj = np.empty([int(n * grow_factor), 5], dtype=np.int64)
-        new_neighs_obj[:n, :] = neighs_obj[:, :]
-        neighs_obj = new_neighs_obj
-        neighs = neighs_obj
-
-    neighs_obj: cnp.ndarray = np.empty([init_npairs, 5], dtype=np.int64)
-    neighs: cnp.int64_t[:, :] = neighs_obj
-
-    split_indices_obj: cnp.ndarray = np.zeros(N_ind, dtype=np.int64)
-    split_indices: cnp.int64_t[:] = split_indices_obj
 
-    i_pair: cython.size_t = 0
-
-    for search_index in range(N_ind):
-        for j in range(8):
-            # Find the bin index.
-            bin_index: cnp.int64_t = indices[search_index, j]
-
-            # Get the first atom index in this bin
-            neigh_at: cnp.int64_t = heads[bin_index]
-
-            # If there are no atoms in this bin, do not even bother
-            # checking supercell indices.
-            if neigh_at == -1:
-                continue
-
-            # Find the supercell indices for this bin
-            neigh_isc[:] = iscs[search_index, j, :]
+    Returns
+    --------
+    int:
+        the number of pairs stored in `neighs`.
+    """
+    search_index: cython.Py_ssize_t
+    j: cython.int
+    i: cython.int
+    bin_index: cnp.int64_t
+    neigh_at: cnp.int64_t
+    isc0: cnp.int64_t
+    isc1: cnp.int64_t
+    isc2: cnp.int64_t
+    skip: cython.bint
+    ref_xyz: cnp.float64_t[3]
+    dist: cnp.float64_t
+    threshold: cnp.float64_t
+
+    i_pair: cython.Py_ssize_t = 0
+
+    with cython.nogil:
+        for search_index in range(start, stop):
+            for j in range(8):
+                # Find the bin index.
+                bin_index = indices[search_index, j]
+
+                # Get the first atom index in this bin
+                neigh_at = heads[bin_index]
+
+                # If there are no atoms in this bin, do not even bother
+                # checking supercell indices.
+                if neigh_at == -1:
+                    continue
 
-            # And check if this bin corresponds to the unit cell
-            not_unit_cell: cython.bint = (
-                neigh_isc[0] != 0 or neigh_isc[1] != 0 or neigh_isc[2] != 0
-            )
+                # Find the supercell indices for this bin
+                isc0 = iscs[search_index, j, 0]
+                isc1 = iscs[search_index, j, 1]
+                isc2 = iscs[search_index, j, 2]
 
-            ref_xyz[:] = search_xyz[search_index, :]
-            if not_unit_cell:
-                # If we are looking at a neighboring cell in a direction
-                # where there are no periodic boundary conditions, go to
-                # next bin.
-                should_not_check = False
-                for i in range(3):
-                    if not pbc[i] and neigh_isc[i] != 0:
-                        should_not_check = True
-                if should_not_check:
-                    continue
-                # Otherwise, move the atom to the neighbor cell. We do this
-                # instead of moving potential neighbors to the unit cell
-                # because in this way we reduce the number of operations.
                 for i in range(3):
-                    ref_xyz[i] -= (
-                        cell[0, i] * neigh_isc[0]
-                        + cell[1, i] * neigh_isc[1]
-                        + cell[2, i] * neigh_isc[2]
+                    ref_xyz[i] = search_xyz[search_index, i]
+
+                # And check if this bin corresponds to the unit cell
+                if isc0 != 0 or isc1 != 0 or isc2 != 0:
+                    # If we are looking at a neighboring cell in a direction
+                    # where there are no periodic boundary conditions, go to
+                    # next bin.
+                    skip = (
+                        (not pbc[0] and isc0 != 0)
+                        or (not pbc[1] and isc1 != 0)
+                        or (not pbc[2] and isc2 != 0)
                     )
+                    if skip:
+                        continue
+                    # Otherwise, move the atom to the neighbor cell. We do this
+                    # instead of moving potential neighbors to the unit cell
+                    # because in this way we reduce the number of operations.
+                    for i in range(3):
+                        ref_xyz[i] -= (
+                            cell[0, i] * isc0 + cell[1, i] * isc1 + cell[2, i] * isc2
+                        )
+
+                # Loop through all atoms that are in this bin.
+                # If neigh_at == -1, this means no more atoms are in this bin.
+                while neigh_at >= 0:
+                    # Calculate the distance between the atom and the potential
+                    # neighbor.
+                    dist = 0.0
+                    for i in range(3):
+                        dist += (xyz[neigh_at, i] - ref_xyz[i]) ** 2
+                    dist = sqrt(dist)
+
+                    # Get the threshold for the potential neighbor
+                    threshold = thresholds[neigh_at]
+
+                    if dist < threshold:
+                        # Store the pair of neighbors.
+                        neighs[i_pair, 0] = search_index
+                        neighs[i_pair, 1] = neigh_at
+                        neighs[i_pair, 2] = isc0
+                        neighs[i_pair, 3] = isc1
+                        neighs[i_pair, 4] = isc2
+
+                        # Increment the pair index
+                        i_pair = i_pair + 1
+
+                    # Get the next atom in this bin.
+                    neigh_at = list_array[neigh_at]
 
-            # Loop through all atoms that are in this bin.
-            # If neigh_at == -1, this means no more atoms are in this bin.
-            while neigh_at >= 0:
-                # Calculate the distance between the atom and the potential
-                # neighbor.
-                dist: float = 0.0
-                for i in range(3):
-                    dist += (xyz[neigh_at, i] - ref_xyz[i]) ** 2
-                dist = sqrt(dist)
-
-                # Get the threshold for the potential neighbor
-                threshold: float = thresholds[neigh_at]
-
-                if dist < threshold:
-
-                    if i_pair >= neighs.shape[0]:
-                        grow()
-
-                    # Store the pair of neighbors.
-                    neighs[i_pair, 0] = search_index
-                    neighs[i_pair, 1] = neigh_at
-                    neighs[i_pair, 2] = neigh_isc[0]
-                    neighs[i_pair, 3] = neigh_isc[1]
-                    neighs[i_pair, 4] = neigh_isc[2]
-
-                    # Increment the pair index
-                    i_pair = i_pair + 1
-
-                # Get the next atom in this bin. Sum 1 to get fortran index.
-                neigh_at = list_array[neigh_at]
-
-        # We have finished this search, store the breakpoint.
-        split_indices[search_index] = i_pair
+            # We have finished this search, store the breakpoint.
+            split_indices[search_index - start] = i_pair
 
-    return neighs_obj[:i_pair, :].copy(), split_indices_obj
+    return i_pair
@@ -0,0 +1,253 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+
+from sisl import Geometry
+from sisl._internal import set_module
+
+from ._finder import NeighborFinder
+from ._neighborlists import FullNeighborList, UniqueNeighborList
+
+__all__ = [
+    "VerletNeighborFinder",
+]
+
+
+@set_module("sisl.geom")
+class VerletNeighborFinder:
+    r"""Incremental neighbor finding along a trajectory, using a Verlet skin.
+
+    The finder stores all pairs of atoms within the radius plus a `skin`
+    margin (the candidates), calculated with the *reference* positions of the atoms.
+    As long as no atom has moved more than half the skin away from its reference
+    position, the neighbors are found by only checking the candidates.
+
+    When some atoms move further than half the skin, only those atoms are moved
+    to new bins, and only their candidates are searched again (their current position
+    becomes their reference position). Hence, most frames of a trajectory only cost
+    :math:`\mathcal O(N_{\mathrm{moved}})` searches, instead of a full
+    `NeighborFinder` construction for each frame.
+
+    The returned neighbors are the same as those of a `NeighborFinder`
+    for the geometry of the frame, although the neighbors of each atom are sorted
+    by the neighbor index and the supercell index.
+    Without self interactions, the periodic images of an atom are never
+    considered neighbors of the atom (`NeighborFinder` finds them when
+    the cell is too small for the bins).
+
+    Parameters
+    ----------
+    geometry:
+        the initial geometry of the trajectory
+    R: float or array-like of shape (geometry.na), optional
+        The radius to consider two atoms neighbors, see `NeighborFinder`.
+    skin:
+        the additional margin for the candidate pairs.
+        A larger skin requires fewer searches, but more candidates to be checked.
+    overlap:
+        whether two atoms are neighbors if their spheres overlap, see `NeighborFinder`.
+    bin_size:
+        the factor for the bin sizes, see `NeighborFinder`.
+
+    Examples
+    --------
+
+    Find the neighbors of all frames in a trajectory:
+
+    .. code-block:: python
+
+        import sisl
+
+        geometries = sisl.get_sile("md.xyz").read_geometry[:]
+
+        finder = sisl.geom.VerletNeighborFinder(geometries[0], R=1.6, skin=0.4)
+        for geometry in geometries:
+            finder.update(geometry)
+            neighbors = finder.find_neighbors()
+
+    See Also
+    --------
+    NeighborFinder: the finder used to search for the candidates.
+    """
+
+    #: The geometry of the current frame
+    geometry: Geometry
+    #: The radius for each atom in the geometry
+    R: np.ndarray
+    #: The skin margin of the candidates
+    skin: float
+    #: Number of atoms that were searched in each update (the number of atoms
+    #: for full searches).
+    searched: list[int]
+
+    def __init__(
+        self,
+        geometry: Geometry,
+        R: Optional[Union[float, np.ndarray]] = None,
+        skin: float = 0.5,
+        overlap: bool = False,
+        bin_size: Union[float, tuple[float, float, float]] = 1,
+    ):
+        if skin < 0:
+            raise ValueError(
+                f"{self.__class__.__name__} requires a non-negative skin, got {skin}"
+            )
+        self._R = R
+        self.skin = skin
+        self._overlap = overlap
+        self._bin_size = bin_size
+        self.searched = []
+        self._build(geometry)
+
+    def _build(self, geometry: Geometry) -> None:
+        """Search all candidates using the current positions as reference positions"""
+        self.geometry = geometry.copy()
+
+        R = self._R
+        if R is None:
+            R = geometry.atoms.maxR(all=True)
+        self.R = np.broadcast_to(np.asarray(R, dtype=np.float64), geometry.na)
+
+        # The candidates are searched with the skin
+        if self._overlap:
+            R = self.R + self.skin / 2
+        else:
+            R = self.R + self.skin
+        self._finder = NeighborFinder(
+            geometry, R=R, overlap=self._overlap, bin_size=self._bin_size
+        )
+        self._bins = self._finder._get_bin_indices(self._finder.geometry.fxyz)
+        pairs = self._finder.find_neighbors(self_interaction=True)._finder_results
+        # Range of the supercell indices used in the sorting keys. The searches of
+        # the moved atoms only find neighbors in the adjacent cells, the tiled
+        # geometries (with larger supercell indices) are always searched fully.
+        self._nsc = np.full(3, 3)
+        if len(pairs) > 0:
+            self._nsc = np.maximum(self._nsc, np.abs(pairs[:, 2:]).max(0) * 2 + 1)
+        self._candidates = pairs[np.argsort(self._key(pairs), kind="stable")]
+        self._offsets = self._candidates[:, 2:] @ self.geometry.cell
+        self.searched.append(geometry.na)
+
+    def _key(self, pairs: np.ndarray) -> np.ndarray:
+        """Scalar key which orders pairs by atom, neighbor and supercell index"""
+        key = pairs[:, 0] * self.geometry.na + pairs[:, 1]
+        for i, nsc in enumerate(self._nsc):
+            key = key * nsc + pairs[:, 2 + i] + nsc // 2
+        return key
+
+    def update(self, geometry: Geometry) -> None:
+        """Move the atoms to the positions in `geometry`
+
+        Only the atoms that have moved more than half the skin (compared to their
+        reference positions) are searched again.
+        If the lattice or the number of atoms change, all atoms are searched again.
+
+        Parameters
+        ----------
+        geometry:
+            the geometry of the next frame
+        """
+        old = self.geometry
+        if (
+            geometry.na != old.na
+            or not np.allclose(geometry.cell, old.cell)
+            or not np.array_equal(geometry.nsc, old.nsc)
+            or not np.array_equal(geometry.lattice.pbc, old.lattice.pbc)
+        ):
+            self._build(geometry)
+            return
+
+        finder = self._finder
+        fxyz = geometry.fxyz
+        if np.any((fxyz < -1e-8) | (fxyz > (1 + 1e-8))):
+            raise ValueError(
+                f"Coordinates outside the unit cell are not supported by {self.__class__.__name__} for now. "
+                "You can do geometry.translate2uc() to move atoms to the unit cell, but note that "
+                "this will change the supercell indices of the connections and might not be compatible "
+                "with the indices of your sparse matrices, for example."
+            )
+
+        xyz = geometry.xyz
+        self.geometry.xyz[:] = xyz
+
+        # finder.geometry holds the reference positions
+        disp = np.linalg.norm(xyz - finder.geometry.xyz, axis=1)
+        moved = (disp > self.skin / 2).nonzero()[0]
+        if len(moved) == 0:
+            self.searched.append(0)
+            return
+        if finder._R_too_big or len(moved) > old.na // 2:
+            # The bins of a tiled geometry can't be updated, and if most atoms
+            # have moved a full search is faster.
+            self._build(geometry)
+            return
+
+        # Re-bin the moved atoms at their new reference positions
+        finder.geometry.xyz[moved] = xyz[moved]
+        self._bins[moved] = finder._get_bin_indices(fxyz[moved])
+        finder._build_table(self._bins)
+
+        # Candidates of the moved atoms, these are searched against the reference
+        # positions of all atoms, so all candidates are consistent.
+        new = finder.find_neighbors(atoms=moved, self_interaction=True)._finder_results
+        is_moved = np.zeros(old.na, dtype=bool)
+        is_moved[moved] = True
+        cand = self._candidates
+        keep = ~(is_moved[cand[:, 0]] | is_moved[cand[:, 1]])
+        cand = cand[keep]
+        # the reverse candidates for the atoms that did not move
+        rev = new[~is_moved[new[:, 1]]]
+        rev = np.column_stack((rev[:, 1], rev[:, 0], -rev[:, 2:]))
+        # merge the new candidates into the sorted candidates
+        new = np.concatenate((new, rev))
+        new = new[np.argsort(self._key(new), kind="stable")]
+        idx = np.searchsorted(self._key(cand), self._key(new))
+        self._candidates = np.insert(cand, idx, new, axis=0)
+        self._offsets = np.insert(
+            self._offsets[keep], idx, new[:, 2:] @ self.geometry.cell, axis=0
+        )
+        self.searched.append(len(moved))
+
+    def find_neighbors(self, self_interaction: bool = False) -> FullNeighborList:
+        """Find the neighbors of all atoms in the current frame
+
+        Parameters
+        ----------
+        self_interaction:
+            whether to consider an atom (and its periodic images) a neighbor of itself.
+        """
+        pairs = self._candidates
+        I, J = pairs[:, 0], pairs[:, 1]
+        xyz = self.geometry.xyz
+        d = xyz[J] + self._offsets - xyz[I]
+        threshold = self.R[I]
+        if self._overlap:
+            threshold = threshold + self.R[J]
+        keep = np.einsum("ij,ij->i", d, d) < threshold**2
+        if not self_interaction:
+            keep &= I != J
+        pairs = pairs[keep]
+        split_ind = np.cumsum(np.bincount(pairs[:, 0], minlength=self.geometry.na))
+        return FullNeighborList(self.geometry, pairs, split_indices=split_ind)
+
+    def find_unique_pairs(self, self_interaction: bool = False) -> UniqueNeighborList:
+        r"""Find unique neighbor pairs in the current frame
+
+        Only the connections where :math:`I \le J` are returned, see `NeighborFinder.find_unique_pairs`.
+
+        Parameters
+        ----------
+        self_interaction:
+            whether to consider an atom a neighbor of itself.
+        """
+        if not self._overlap and (self._R is None or np.ndim(self._R) != 0):
+            raise ValueError(
+                "Unique atom pairs do not make sense if we are not looking for sphere overlaps."
+                " Please create the finder again setting `overlap` to `True` if you wish so."
+            )
+        return self.find_neighbors(self_interaction=self_interaction).to_unique()
@@ -9,7 +9,8 @@ import numpy as np
 import pytest
 
 from sisl import Geometry, Lattice
-from sisl.geom import NeighborFinder
+from sisl._threads import num_threads
+from sisl.geom import NeighborFinder, VerletNeighborFinder, diamond, graphene
 from sisl.geom._neighbors import (
     AtomNeighborList,
     CoordNeighborList,
@@ -309,7 +310,9 @@ def test_R_too_big(pbc):
 
     expected_neighs = [[0, 1, 0, 0, 0], [0, 0, 0, 0, 0]]
     if pbc:
-        expected_neighs.insert(0, [0, 1, -1, 0, 0])
+        # the cell is tiled, and the neighbors are sorted by atom and
+        # supercell index
+        expected_neighs = [[0, 0, 0, 0, 0], [0, 1, -1, 0, 0], [0, 1, 0, 0, 0]]
     expected_neighs = [np.array(expected_neighs)]
 
     for point_neighs, expected_point_neighs in zip(neighs, expected_neighs):
@@ -321,6 +324,29 @@ def test_R_too_big(pbc):
             assert np.all(point_neighs.isc == expected_point_neighs[:, 2:])
 
 
+def test_R_too_big_2d(pbc):
+    """Neighbors in a small 2D cell, where the cell is tiled in both directions"""
+    geom = graphene()
+    set_pbc(geom, pbc)
+
+    neighfinder = NeighborFinder(geom, R=1.5)
+    neighs = neighfinder.find_neighbors()
+
+    for at_neighs in neighs:
+        idx = geom.close(at_neighs.atom, R=1.5)
+        idx = idx[idx != at_neighs.atom]
+        isc = geom.a2isc(idx)
+        if not pbc:
+            idx = idx[np.all(isc == 0, axis=1)]
+        assert at_neighs.n_neighbors == len(idx)
+        # sorted by neighbor index
+        assert np.all(np.diff(at_neighs.J) >= 0)
+        assert np.all(
+            np.sort(at_neighs.J + geom.sc_index(at_neighs.isc) * geom.na)
+            == np.sort(idx)
+        )
+
+
 def test_bin_sizes():
     geom = Geometry([[0, 0, 0], [1, 0, 0]], lattice=[2, 10, 10])
 
@@ -382,3 +408,145 @@ def test_skewed_cell(pbc):
     assert neighfinder.nbins == (2, 3, 8)
     # Atoms should have one neighbor
     assert neighfinder.find_neighbors()[0].n_neighbors == 1
+
+
+def test_skewed_cell_3d():
+    """Cells skewed in all directions (e.g. FCC) require bins sized by
+    the heights of the cell, the angles between the lattice vectors are not enough.
+    """
+    R = 1.6
+    geom = diamond(3.57).tile(3, 0).tile(3, 1).tile(3, 2)
+    geom.xyz += np.random.default_rng(42).uniform(-0.1, 0.1, geom.xyz.shape)
+    geom = geom.translate2uc()
+
+    neighs = NeighborFinder(geom, R=R, overlap=False).find_neighbors()
+    n_neighs = [len(geom.close(ia, R=R)) - 1 for ia in geom]
+    assert np.all(neighs.n_neighbors == n_neighs)
+
+
+@pytest.mark.parametrize("n_threads", [1, 3])
+def test_chunked_searches(pbc, n_threads):
+    geom = graphene().tile(8, 0).tile(7, 1)
+    set_pbc(geom, pbc)
+    geom.xyz[:, 2] += np.random.default_rng(42).random(geom.na) * 0.1
+
+    finder = NeighborFinder(geom, R=1.5)
+    neighs = finder.find_neighbors()
+    partial = finder.find_neighbors(atoms=np.arange(10, 50, 3))
+    unique = NeighborFinder(geom, R=0.75, overlap=True).find_unique_pairs()
+    points = geom.xyz[::5] + 0.3
+    close = finder.find_close(points)
+
+    # many small chunks, searched in parallel threads
+    finder.memory = ("2kB", 1.5)
+    with num_threads(n_threads):
+        chunked = finder.find_neighbors()
+        assert np.all(chunked._finder_results == neighs._finder_results)
+        assert np.all(chunked._split_indices == neighs._split_indices)
+
+        chunked = finder.find_neighbors(atoms=np.arange(10, 50, 3))
+        assert np.all(chunked._finder_results == partial._finder_results)
+        assert np.all(chunked._split_indices == partial._split_indices)
+
+        u_finder = NeighborFinder(geom, R=0.75, overlap=True)
+        u_finder.memory = ("2kB", 1.5)
+        chunked = u_finder.find_unique_pairs()
+        assert np.all(chunked._finder_results == unique._finder_results)
+
+        chunked = finder.find_close(points)
+        assert np.all(chunked._finder_results == close._finder_results)
+        assert np.all(chunked._split_indices == close._split_indices)
+
+
+def test_sparse_bins(pbc):
+    # slab with lots of vacuum, and a molecule in a big box
+    slab = graphene().tile(8, 0).tile(6, 1)
+    slab.lattice.cell[2, 2] = 300
+    mol = Geometry(graphene().xyz + 50, lattice=[100, 100, 100])
+
+    for geom in (slab, mol):
+        set_pbc(geom, pbc)
+
+        finder = NeighborFinder(geom, R=1.5)
+        finder.assert_consistency()
+        assert finder._occupied_bins is not None
+        assert len(finder._counts) < finder.total_nbins
+        neighs = finder.find_neighbors()
+        unique = finder.find_unique_pairs(self_interaction=True)
+        points = geom.xyz[::3] + 0.3
+        close = finder.find_close(points)
+
+        # storing all bins gives the same neighbors
+        finder.sparse_occupancy = 0
+        finder.setup(R=1.5)
+        finder.assert_consistency()
+        assert finder._occupied_bins is None
+        assert len(finder._counts) == finder.total_nbins
+        dense = finder.find_neighbors()
+        assert np.all(dense._finder_results == neighs._finder_results)
+        assert np.all(dense._split_indices == neighs._split_indices)
+        dense = finder.find_unique_pairs(self_interaction=True)
+        assert np.all(dense._finder_results == unique._finder_results)
+        dense = finder.find_close(points)
+        assert np.all(dense._finder_results == close._finder_results)
+
+
+def _sorted_pairs(neighbors):
+    pairs = neighbors._finder_results
+    return pairs[np.lexsort(pairs.T[::-1])]
+
+
+@pytest.mark.parametrize("overlap", [True, False])
+def test_verlet_trajectory(pbc, overlap):
+    geom = graphene().tile(6, 0).tile(6, 1)
+    geom.lattice.cell[2, 2] = 10
+    geom.xyz[:, 2] = 5
+    set_pbc(geom, pbc)
+    rng = np.random.default_rng(42)
+    R = rng.random(geom.na) * 0.5 + 0.6 if overlap else 1.6
+
+    finder = VerletNeighborFinder(geom, R=R, skin=0.4, overlap=overlap)
+    for _ in range(10):
+        geom = geom.copy()
+        geom.xyz += rng.normal(scale=0.05, size=geom.xyz.shape)
+        geom.xyz = (geom.fxyz % 1) @ geom.cell
+        finder.update(geom)
+
+        ref = NeighborFinder(geom, R=R, overlap=overlap)
+        for self_interaction in (True, False):
+            neighs = finder.find_neighbors(self_interaction=self_interaction)
+            assert isinstance(neighs, FullNeighborList)
+            expected = ref.find_neighbors(self_interaction=self_interaction)
+            assert np.all(_sorted_pairs(neighs) == _sorted_pairs(expected))
+            assert np.all(neighs.split_indices == expected.split_indices)
+
+        if overlap:
+            unique = finder.find_unique_pairs()
+            assert isinstance(unique, UniqueNeighborList)
+            expected = ref.find_unique_pairs()
+            assert np.all(_sorted_pairs(unique) == _sorted_pairs(expected))
+
+    # the first search is for all atoms, then only the moved atoms are searched
+    assert finder.searched[0] == geom.na
+    assert 0 < max(finder.searched[1:]) < geom.na
+
+
+def test_verlet_no_move():
+    geom = graphene().tile(4, 0).tile(4, 1)
+    finder = VerletNeighborFinder(geom, R=1.5, skin=0.2)
+    geom = geom.copy()
+    geom.xyz[:, 2] += 0.05
+    finder.update(geom)
+    assert finder.searched == [geom.na, 0]
+    assert np.allclose(finder.geometry.xyz, geom.xyz)
+    neighs = finder.find_neighbors()
+    assert np.all(neighs.n_neighbors == 3)
+
+    # changing the cell searches all atoms
+    finder.update(geom.tile(2, 0))
+    assert finder.searched[-1] == geom.na * 2
+
+    with pytest.raises(ValueError):
+        VerletNeighborFinder(geom, R=1.5, skin=-0.1)
+    with pytest.raises(ValueError):
+        VerletNeighborFinder(geom, R=[1.5] * geom.na).find_unique_pairs()
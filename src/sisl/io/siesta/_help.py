@@ -94,7 +94,7 @@ def _csr_to_sc_off(geom, sc_off, csr):
 def _csr_from(col_from, csr):
     """Internal routine to convert columns in a SparseCSR matrix"""
     # local csr matrix ordering
-    col_to = _a.arangei(csr.shape[1])
+    col_to = np.arange(csr.shape[1], dtype=csr.col.dtype)
     csr.translate_columns(col_from, col_to)
 
 
@@ -10,7 +10,7 @@ import numpy as np
 
 from sisl import Atom, AtomGhost, Atoms, Geometry, Grid, Lattice, SphericalOrbital
 from sisl._array import aranged, array_arange
-from sisl._core.sparse import _ncol_to_indptr
+from sisl._core.sparse import _index_dtype, _ncol_to_indptr
 from sisl._internal import set_module
 from sisl.messages import deprecation
 from sisl.physics import (
@@ -175,10 +175,13 @@ class ncSileSiesta(SileCDFSiesta):
         # array, hence just allocate the smallest amount possible)
         C = cls(geom, dim, nnzpr=1)
 
-        C._csr.ncol = np.array(sp.variables["n_col"][:], np.int32)
+        idtype = _index_dtype(
+            max(len(sp.dimensions["nnzs"]), len(self._dimension("no_s")))
+        )
+        C._csr.ncol = np.array(sp.variables["n_col"][:], idtype)
         # Update maximum number of connections (in case future stuff happens)
         C._csr.ptr = _ncol_to_indptr(C._csr.ncol)
-        C._csr.col = np.array(sp.variables["list_col"][:], np.int32) - 1
+        C._csr.col = np.array(sp.variables["list_col"][:], idtype) - 1
 
         # Copy information over
         C._csr._nnz = len(C._csr.col)
@@ -209,10 +212,13 @@ class ncSileSiesta(SileCDFSiesta):
         # array, hence just allocate the smallest amount possible)
         C = cls(geom, spin, nnzpr=1, orthogonal=orthogonal)
 
-        C._csr.ncol = np.array(sp.variables["n_col"][:], np.int32)
+        idtype = _index_dtype(
+            max(len(sp.dimensions["nnzs"]), len(self._dimension("no_s")))
+        )
+        C._csr.ncol = np.array(sp.variables["n_col"][:], idtype)
         # Update maximum number of connections (in case future stuff happens)
         C._csr.ptr = _ncol_to_indptr(C._csr.ncol)
-        C._csr.col = np.array(sp.variables["list_col"][:], np.int32) - 1
+        C._csr.col = np.array(sp.variables["list_col"][:], idtype) - 1
 
         # Copy information over
         C._csr._nnz = len(C._csr.col)
@@ -483,7 +489,7 @@ class ncSileSiesta(SileCDFSiesta):
         self._crt_dim(self, "one", 1)
         self._crt_dim(self, "n_s", np.prod(geometry.nsc, dtype=np.int32))
         self._crt_dim(self, "xyz", 3)
-        self._crt_dim(self, "no_s", np.prod(geometry.nsc, dtype=np.int32) * geometry.no)
+        self._crt_dim(self, "no_s", geometry.no_s)
         self._crt_dim(self, "no_u", geometry.no)
         self._crt_dim(self, "na_u", geometry.na)
 
@@ -540,7 +546,7 @@ class ncSileSiesta(SileCDFSiesta):
             v = self._crt_var(
                 sp,
                 "list_col",
-                "i4",
+                "i8" if csr.col.dtype == np.int64 else "i4",
                 ("nnzs",),
                 chunksizes=(len(csr.col),),
                 **self._cmp_args,
@@ -99,6 +99,20 @@ def test_nc_multiple_checks(sisl_tmp, sisl_system, sort):
         DM.write(sile, sort=sort)
 
 
+def test_nc_int64_indices(sisl_tmp, sisl_system):
+    f = sisl_tmp("gr.nc")
+    tb = Hamiltonian(sisl_system.gtb)
+    tb.construct([sisl_system.R, sisl_system.t])
+    tb.finalize()
+    tb._csr._ensure_index_dtype(np.iinfo(np.int32).max + 1)
+    tb.write(ncSileSiesta(f, "w"))
+
+    with ncSileSiesta(f) as sile:
+        assert sile.groups["SPARSE"].variables["list_col"].dtype == np.int64
+        ntb = sile.read_hamiltonian()
+    assert np.allclose(tb.Hk([0.1, 0.2, 0]).toarray(), ntb.Hk([0.1, 0.2, 0]).toarray())
+
+
 def test_nc_overlap(sisl_tmp, sisl_system):
     f = sisl_tmp("gr.nc")
     tb = Hamiltonian(sisl_system.gtb)
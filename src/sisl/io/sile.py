@@ -1615,6 +1615,8 @@ class SileCDF(BaseSile):
 
     _is_inside_zip: bool = False
     _buffer_instance: Optional[BufferSileCDF] = None
+    # whether complex variables are supported (requires netCDF4>=1.7)
+    _auto_complex: bool = False
 
     def __init__(self, filename, mode="r", lvl=0, access=1, *args, **kwargs):
         # Open mode
@@ -1669,8 +1671,9 @@ class SileCDF(BaseSile):
                     self.fh = self._buffer_instance.fh
 
             else:
+                kwargs = {"auto_complex": True} if self._auto_complex else {}
                 self.__dict__["fh"] = netCDF4.Dataset(
-                    str(self.file), self._mode, format="NETCDF4"
+                    str(self.file), self._mode, format="NETCDF4", **kwargs
                 )
 
         return self
@@ -11,7 +11,7 @@ import sisl._array as _a
 
 # Import the geometry object
 from sisl import Atom, Geometry, Lattice, SparseOrbitalBZSpin
-from sisl._core.sparse import _ncol_to_indptr
+from sisl._core.sparse import _index_dtype, _ncol_to_indptr
 
 # Import sile objects
 from sisl._internal import set_module
@@ -496,7 +496,7 @@ class deltancSileTBtrans(SileCDFTBtrans):
             v = self._crt_var(
                 lvl,
                 "list_col",
-                "i4",
+                "i8" if delta._csr.col.dtype == np.int64 else "i4",
                 ("nnzs",),
                 chunksizes=(delta._csr.nnz,),
                 **self._cmp_args,
@@ -649,10 +649,13 @@ class deltancSileTBtrans(SileCDFTBtrans):
         # array, hence just allocate the smallest amount possible)
         C = cls(geom, nspin, nnzpr=1, dtype=dtype, orthogonal=True)
 
-        C._csr.ncol = _a.arrayi(lvl.variables["n_col"][:])
+        idtype = _index_dtype(
+            max(len(lvl.dimensions["nnzs"]), len(self._dimension("no_s")))
+        )
+        C._csr.ncol = np.array(lvl.variables["n_col"][:], idtype)
         # Update maximum number of connections (in case future stuff happens)
         C._csr.ptr = _ncol_to_indptr(C._csr.ncol)
-        C._csr.col = _a.arrayi(lvl.variables["list_col"][:]) - 1
+        C._csr.col = np.array(lvl.variables["list_col"][:], idtype) - 1
 
         # Copy information over
         C._csr._nnz = len(C._csr.col)
@@ -289,6 +289,48 @@ eigh = _partial(sl.eigh, check_finite=False, overwrite_a=False, overwrite_b=Fals
 eigh_destroy = _partial(sl.eigh, check_finite=False, overwrite_a=True, overwrite_b=True)
 __all__ += _append("eigh", ["", "_destroy"])
 
+
+@set_module("sisl.linalg")
+def eigh_batch(a, b=None, eigvals_only: bool = False):
+    """Solve a stack of (generalized) Hermitian eigenvalue problems
+
+    The matrices are solved in one call to `numpy.linalg.eigh` which loops
+    the stack in C. For small to medium sized matrices this avoids the
+    overhead of solving one problem at a time.
+
+    Parameters
+    ----------
+    a : (..., M, M) array_like
+       Hermitian matrices to solve the eigenvalue problems for
+    b : (..., M, M) array_like, optional
+       positive definite Hermitian matrices (e.g. overlap matrices) for
+       the generalized eigenvalue problems
+    eigvals_only :
+       whether only the eigenvalues should be returned
+
+    Returns
+    -------
+    w : (..., M) numpy.ndarray
+       eigenvalues in ascending order
+    v : (..., M, M) numpy.ndarray
+       eigenvectors (columns), only returned if `eigvals_only` is false
+    """
+    a = np.asarray(a)
+    if b is not None:
+        # Reduce to a standard problem: L^-1 a L^-H
+        L = np.linalg.cholesky(b)
+        a = np.linalg.solve(L, a)
+        a = np.linalg.solve(L, a.conj().swapaxes(-1, -2))
+    if eigvals_only:
+        return np.linalg.eigvalsh(a)
+    w, v = np.linalg.eigh(a)
+    if b is not None:
+        v = np.linalg.solve(L.conj().swapaxes(-1, -2), v)
+    return w, v
+
+
+__all__ += ["eigh_batch"]
+
 eigvalsh = _partial(
     sl.eigvalsh, check_finite=False, overwrite_a=False, overwrite_b=False
 )
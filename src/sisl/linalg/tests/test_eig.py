@@ -7,7 +7,7 @@ import numpy as np
 import pytest
 import scipy.linalg as sl
 
-from sisl.linalg import eig, eig_destroy, eigh, eigh_destroy
+from sisl.linalg import eig, eig_destroy, eigh, eigh_batch, eigh_destroy
 
 pytestmark = [pytest.mark.linalg, pytest.mark.eig]
 
@@ -58,3 +58,18 @@ def test_eigh_d1():
     x, v = eigh_destroy(a)
     assert np.allclose(xs, x)
     assert np.allclose(vs, v)
+
+
+def test_eigh_batch():
+    np.random.seed(1204982)
+    a = np.random.rand(4, 10, 10) + 1j * np.random.rand(4, 10, 10)
+    a = a + a.conj().swapaxes(1, 2)
+    b = np.random.rand(4, 10, 10)
+    b = b @ b.swapaxes(1, 2) + np.eye(10) * 10
+    x = eigh_batch(a, eigvals_only=True)
+    xb, vb = eigh_batch(a, b)
+    for i in range(4):
+        assert np.allclose(x[i], sl.eigh(a[i], eigvals_only=True))
+        xs = sl.eigh(a[i], b[i], eigvals_only=True)
+        assert np.allclose(xs, xb[i])
+        assert np.allclose(a[i] @ vb[i], b[i] @ vb[i] * xb[i])
@@ -21,6 +21,8 @@ Brillouin zone
    BrillouinZone - base class
    MonkhorstPack - MP class
    BandStructure - bandstructure class
+   SharedMemoryPool - process pool for parallel k-point calculations
+   ThreadPool - thread pool for parallel k-point calculations
 
 
 Spin configuration
@@ -110,7 +112,7 @@ from .self_energy import *
 
 # isort: split
 
-from . import electron, phonon
+from . import electron, kpm, phonon
 from .electron import (
     CoefficientElectron,
     EigenstateElectron,
@@ -131,6 +133,7 @@ from .phonon import (
 # isort: split
 
 from ._brillouinzone_apply import *
+from ._brillouinzone_pool import *
 from ._ufuncs_brillouinzone import *
 from ._ufuncs_densitymatrix import *
 from ._ufuncs_dynamicalmatrix import *
@@ -7,9 +7,15 @@ from __future__ import annotations
 
 This module should not expose any methods!
 """
+import hashlib
 import operator as op
+import os
+import pickle
+import time
 from functools import reduce, wraps
 from itertools import zip_longest
+from pathlib import Path
+from types import CodeType, FunctionType
 
 import numpy as np
 import xarray
@@ -29,12 +35,13 @@ from sisl._core.oplist import oplist
 from sisl._dispatcher import AbstractDispatch
 from sisl._environ import get_environ_variable
 from sisl._internal import set_module
-from sisl.messages import SislError, progressbar, warn
+from sisl.messages import SislError, info, progressbar, warn
 from sisl.unit import units
 from sisl.utils.mathematics import cart2spher
 from sisl.utils.misc import allow_kwargs
 
 # Stuff used for patching
+from ._brillouinzone_pool import SharedMemoryPool, ThreadPool, _BrillouinZonePool
 from .brillouinzone import BrillouinZone, MonkhorstPack
 
 # We expose the Apply and ParentApply classes
@@ -72,15 +79,21 @@ def _pool_procs(pool, size: int):
 
         in this case it just uses defaults.
 
+    pool = "shm" | "shm:<int>" | "threads" | "threads:<int>"
+
+        use a `SharedMemoryPool` or `ThreadPool` (with the default, or the
+        specified number of processors).
+
     pool = int | bool, {run}
 
         here the {run} is the arguments used for the mapping
-        tool in the parallel region (i.e. `imap(..., **run)`
+        tool in the parallel region (i.e. `imap(..., **run)`, only
+        ``chunksize`` for `SharedMemoryPool` and `ThreadPool`).
 
     pool = int | bool, {init}, {run}
 
         here the {init} is the arguments used for the constructor
-        of the ProcessPool (except ``nodes``).
+        of the ProcessPool (or `SharedMemoryPool`/`ThreadPool`) (except ``nodes``).
         And {run} is equivalent to the before.
     """
     nprocs = get_environ_variable("SISL_NUM_PROCS")
@@ -112,7 +125,23 @@ def _pool_procs(pool, size: int):
         else:
             pool = 1
 
-    if isinstance(pool, int):
+    if isinstance(pool, str):
+        pools = {"shm": SharedMemoryPool, "threads": ThreadPool}
+        name, _, ncpus = pool.partition(":")
+        if name not in pools:
+            raise ValueError(
+                f"Unknown pool specification '{pool}', expected one of "
+                f"{list(pools)} optionally with ':<int>'"
+            )
+        ncpus = int(ncpus) if ncpus else nprocs
+        if ncpus <= 1:
+            return None, run
+
+        pool = pools[name](ncpus, **init)
+
+    if isinstance(pool, _BrillouinZonePool):
+        ncpus = pool.ncpus
+    elif isinstance(pool, int):
         if pool <= 1:
             return None, run
 
@@ -148,6 +177,16 @@ def _pool_procs(pool, size: int):
             nchunk = size // tmp
         run["chunksize"] = nchunk
 
+    if isinstance(pool, _BrillouinZonePool):
+        unknown = set(run) - {"chunksize"}
+        if unknown:
+            raise ValueError(
+                f"{pool.__class__.__name__} only accepts 'chunksize' as run "
+                f"arguments, got {sorted(unknown)}"
+            )
+        # workers are started for each calculation
+        return pool, run
+
     # Prepare the pool, just in case it has already been used.
     pool.terminate()
     pool.join()
@@ -155,6 +194,290 @@ def _pool_procs(pool, size: int):
     return pool, run
 
 
+class _ApplyOut:
+    """Output arrays for `NDArrayApply`, optionally streamed to a file
+
+    Parameters
+    ----------
+    out : str or Path or None
+        if None, the arrays are created in memory.
+        A ``.npy`` file will create memory-mapped arrays, and a ``.nc`` file will
+        write NetCDF variables (chunked per k-point, through `~sisl.io.SileCDF`)
+        as the values are calculated.
+        When `unzip` is true, the ``.npy`` files are suffixed with ``_<index>``.
+    unzip :
+        whether the values are a tuple of values (each stored in a separate array)
+    empty :
+        function creating the in-memory arrays, ``empty(shape, dtype)``
+    """
+
+    def __init__(self, out, unzip: bool, empty=np.empty):
+        self.path = None if out is None else Path(out)
+        if self.path is not None and self.path.suffix not in (".npy", ".nc"):
+            raise ValueError(
+                f"{self.__class__.__name__} can only stream to .npy or .nc files, "
+                f"got {self.path}"
+            )
+        self.unzip = unzip
+        self._empty = empty
+        self._names = []
+        self._sile = None
+        self._complex = False
+
+    def create(self, nk: int, v):
+        """Create the output array for `nk` k-points, with the first value `v`"""
+        v = np.asarray(v)
+        shape = (nk, *v.shape)
+        path = self.path
+        i = len(self._names)
+
+        if path is None:
+            out = self._empty(shape, v.dtype)
+            name = None
+
+        elif path.suffix == ".npy":
+            if self.unzip:
+                path = path.with_name(f"{path.stem}_{i}{path.suffix}")
+            out = np.lib.format.open_memmap(path, mode="w+", dtype=v.dtype, shape=shape)
+            name = path
+
+        else:
+            from sisl.io.sile import SileCDF
+
+            if self._sile is None:
+                self._sile = SileCDF(path, "w", lvl=1, _open=False)
+                try:
+                    # complex numbers requires auto_complex (netCDF4>=1.7)
+                    self._sile._auto_complex = True
+                    self._sile._open()
+                except TypeError:
+                    self._sile._auto_complex = False
+                    self._sile._open()
+            sile = self._sile
+            if v.dtype.kind == "c" and not sile._auto_complex:
+                sile.close()
+                self._sile = None
+                raise ValueError(
+                    f"{self.__class__.__name__} cannot store complex values in {path}, "
+                    "netCDF4>=1.7 is required; use a .npy file instead."
+                )
+            self._complex |= v.dtype.kind == "c"
+            name = f"v{i}" if self.unzip else "v"
+            sile._crt_dim(sile.fh, "k", nk)
+            dims = ["k"]
+            for j, n in enumerate(v.shape, 1):
+                dims.append(f"{name}_{j}")
+                sile._crt_dim(sile.fh, dims[-1], n)
+            out = sile._crt_var(
+                sile.fh,
+                name,
+                v.dtype,
+                dims,
+                chunksizes=(1, *v.shape),
+                **sile._cmp_args,
+            )
+
+        out[0] = v
+        self._names.append(name)
+        return out
+
+    def finalize(self, a):
+        """Close the output, and return lazily opened arrays of the output"""
+        path = self.path
+        if path is None:
+            # arrays created by `empty` may be memory-mapped
+            if self.unzip:
+                return tuple(map(np.asarray, a))
+            return np.asarray(a)
+
+        if path.suffix == ".npy":
+            for ai in a if self.unzip else (a,):
+                ai.flush()
+            a = tuple(np.load(name, mmap_mode="r") for name in self._names)
+        else:
+            self._sile.close()
+            self._sile = None
+            kwargs = {"auto_complex": True} if self._complex else {}
+            ds = xarray.open_dataset(path, engine="netcdf4", **kwargs)
+            a = tuple(ds[name] for name in self._names)
+
+        if self.unzip:
+            return a
+        return a[0]
+
+
+class _HashWriter:
+    """File-like object which only updates `digest` with the written data"""
+
+    def __init__(self, digest):
+        self.digest = digest
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        return len(data)
+
+
+class _Checkpoint:
+    """Checkpoint of an accumulated value over the k-points
+
+    The checkpoint file stores the completed k-point indices and the
+    accumulated value. The checkpoint is only used if the `key` matches,
+    i.e. when the same calculation is re-run.
+
+    The checkpoint file is read with `pickle.load`, which may execute
+    arbitrary code. Only use checkpoint files from trusted sources.
+
+    Parameters
+    ----------
+    path : str or Path
+        file to store the checkpoint in
+    key : str
+        identification of the calculation
+    nk :
+        number of k-points
+    interval :
+        minimum time (in seconds) between writing the checkpoint
+    """
+
+    def __init__(self, path, key: str, nk: int, interval: float):
+        self.path = Path(path)
+        self.key = key
+        self.interval = interval
+        self.done = np.zeros(nk, dtype=bool)
+        self.value = None
+        self._time = time.monotonic()
+
+        if self.path.is_file():
+            with open(self.path, "rb") as fh:
+                data = pickle.load(fh)
+            if data["key"] == self.key and len(data["done"]) == nk:
+                self.done = data["done"]
+                self.value = data["value"]
+            else:
+                info(
+                    f"{self.__class__.__name__} ignoring checkpoint {self.path} "
+                    "since it belongs to another calculation."
+                )
+
+    @staticmethod
+    def create_key(bz, method, args, kwargs, wrap) -> str:
+        """Create a key that identifies the calculation
+
+        The key is created from the k-points, weights, parent object, method,
+        arguments, and `wrap`. For functions the byte-code, default arguments
+        and closure variables of `wrap` are part of the key (global variables
+        are not), other callables are pickled.
+
+        The objects are pickled directly into the hash, i.e. the (possibly large)
+        parent object is never stored as a pickled copy.
+        """
+        digest = hashlib.sha256()
+        try:
+            pickle.dump(
+                (
+                    bz.__class__.__name__,
+                    bz.k,
+                    bz.weight,
+                    bz.parent,
+                    method.__name__,
+                    args,
+                    kwargs,
+                ),
+                _HashWriter(digest),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception as e:
+            raise ValueError(
+                "checkpointing requires the parent object and all "
+                "arguments to be picklable"
+            ) from e
+        try:
+            pickle.dump(
+                _Checkpoint._func_state(wrap, set()),
+                _HashWriter(digest),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception as e:
+            raise ValueError(
+                "checkpointing requires wrap to be picklable, or a function "
+                "with picklable default arguments and closure variables"
+            ) from e
+        return digest.hexdigest()
+
+    @staticmethod
+    def _func_state(func, seen):
+        """Picklable state of `func` which changes when `func` does something else"""
+        if not isinstance(func, FunctionType):
+            if isinstance(func, type):
+                # classes are pickled by reference, also local ones
+                return f"{func.__module__}.{func.__qualname__}"
+            return func
+
+        name = f"{func.__module__}.{func.__qualname__}"
+        if id(func) in seen:
+            # recursive functions
+            return name
+        seen.add(id(func))
+
+        def code_state(code):
+            consts = tuple(
+                code_state(c) if isinstance(c, CodeType) else c for c in code.co_consts
+            )
+            return (code.co_code, consts, code.co_names)
+
+        closure = tuple(
+            _Checkpoint._func_state(cell.cell_contents, seen)
+            for cell in func.__closure__ or ()
+        )
+        return (
+            name,
+            code_state(func.__code__),
+            func.__defaults__,
+            func.__kwdefaults__,
+            closure,
+        )
+
+    def save(self) -> None:
+        """Write the checkpoint file"""
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(
+                {"key": self.key, "done": self.done, "value": self.value},
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        # atomic replacement, to not corrupt the checkpoint
+        os.replace(tmp, self.path)
+        self._time = time.monotonic()
+
+    def update(self, i: int, value) -> None:
+        """Mark k-point `i` as done, with the accumulated `value` (including `i`)"""
+        self.done[i] = True
+        self.value = value
+        if time.monotonic() - self._time >= self.interval:
+            self.save()
+
+    def finish(self) -> None:
+        """Remove the checkpoint file once the calculation has finished"""
+        self.path.unlink(missing_ok=True)
+
+
+def _lazy_dataarray(array, coords, dims, name, attrs):
+    """Return `array` (a lazily loaded `xarray.DataArray`) with new coordinates and names
+
+    This is equivalent to ``xarray.DataArray(array.values, coords, dims, name, attrs)``
+    without loading the values.
+    """
+    # a template with the correct coordinates, without any memory
+    template = xarray.DataArray(
+        np.broadcast_to(np.zeros((), dtype=array.dtype), array.shape),
+        coords=coords,
+        dims=dims,
+    )
+    array = array.rename(dict(zip(array.dims, template.dims)))
+    return array.assign_coords(template.coords).rename(name).assign_attrs(attrs)
+
+
 @set_module("sisl.physics")
 class BrillouinZoneApply(AbstractDispatch):
     # this dispatch function will do stuff on the BrillouinZone object
@@ -180,6 +503,15 @@ class BrillouinZoneParentApply(BrillouinZoneApply):
         eta = progressbar(len(bz), f"{bz.__class__.__name__}.{eta_key}", "k", eta)
         return bz, parent, wrap, eta
 
+    def _reject_out(self):
+        """Raise an error if ``out`` is specified, reduced values are not streamed"""
+        out = self._attrs.get("out")
+        if out is not None:
+            raise ValueError(
+                f"{self.__class__.__name__} does not store the reduced value in "
+                f"out={out}, only array and xarray applies can write to out."
+            )
+
     def __getattr__(self, key):
         # We need to offload the dispatcher to retrieve
         # methods from the parent object
@@ -187,6 +519,87 @@ class BrillouinZoneParentApply(BrillouinZoneApply):
         method = getattr(self._obj.parent, key)
         return self.dispatch(method)
 
+    def _checkpoint_dispatch(self, method, weighted: bool, eta_key: str):
+        """Dispatch the method by accumulating (summing) values with checkpoints
+
+        The checkpoint file is specified with the ``checkpoint`` attribute,
+        and ``checkpoint_interval`` is the minimum time (in seconds) between
+        writing the checkpoint (defaults to 60 seconds).
+
+        Parameters
+        ----------
+        weighted :
+            whether the values should be multiplied by the k-point weights
+        """
+        pool, pool_run = _pool_procs(self._attrs.get("pool"), len(self._get_object()))
+        path = self._attrs["checkpoint"]
+        interval = self._attrs.get("checkpoint_interval", 60)
+
+        def iter_values(idx, args, kwargs, wrap, wrap_kw, parent, k, w):
+            """Yield the values of the k-points in `idx`"""
+            if len(idx) == 0:
+                return
+
+            if pool is None:
+                for i in idx:
+                    yield wrap_kw(
+                        method(*args, k=k[i], **kwargs),
+                        parent=parent,
+                        k=k[i],
+                        weight=w[i],
+                    )
+                return
+
+            if isinstance(pool, _BrillouinZonePool):
+                yield from pool.imap(
+                    method, k[idx], w[idx], args, kwargs, wrap, **pool_run
+                )
+                return
+
+            pool.restart(True)
+
+            def func(k, w):
+                return wrap_kw(
+                    method(*args, k=k, **kwargs), parent=parent, k=k, weight=w
+                )
+
+            try:
+                yield from pool.imap(func, k[idx], w[idx], **pool_run)
+            finally:
+                pool.close()
+                pool.join()
+
+        @wraps(method)
+        def func(*args, wrap=None, eta=None, **kwargs):
+            key = _Checkpoint.create_key(self._obj, method, args, kwargs, wrap)
+            bz, parent, wrap_kw, eta = self._parse_kwargs(wrap, eta, eta_key=eta_key)
+            k = bz.k
+            w = bz.weight
+
+            ckpt = _Checkpoint(path, key, len(k), interval)
+            v = ckpt.value
+            eta.update(int(ckpt.done.sum()))
+            idx = (~ckpt.done).nonzero()[0]
+
+            try:
+                values = iter_values(idx, args, kwargs, wrap, wrap_kw, parent, k, w)
+                for i, vi in zip(idx, values):
+                    vi = _asoplist(vi)
+                    if weighted:
+                        vi = vi * w[i]
+                    v = vi if v is None else v + vi
+                    ckpt.update(i, v)
+                    eta.update()
+            except BaseException:
+                # store the progress on interrupts and errors
+                ckpt.save()
+                raise
+            eta.close()
+            ckpt.finish()
+            return v
+
+        return func
+
 
 @set_module("sisl.physics")
 class IteratorApply(BrillouinZoneParentApply):
@@ -216,6 +629,18 @@ class IteratorApply(BrillouinZoneParentApply):
                     eta.update()
                 eta.close()
 
+        elif isinstance(pool, _BrillouinZonePool):
+
+            @wraps(method)
+            def func(*args, wrap=None, eta=None, **kwargs):
+                bz, _, _, eta = self._parse_kwargs(wrap, eta, eta_key=eta_key)
+                for ret in pool.imap(
+                    method, bz.k, bz.weight, args, kwargs, wrap, **pool_run
+                ):
+                    eta.update()
+                    yield ret
+                eta.close()
+
         else:
 
             @wraps(method)
@@ -230,16 +655,17 @@ class IteratorApply(BrillouinZoneParentApply):
                         method(*args, k=k, **kwargs), parent=parent, k=k, weight=w
                     )
 
-                for ret in pool.imap(func, k, w, **pool_run):
-                    eta.update()
-                    yield ret
-
-                # TODO notify users that this may be bad when used with zip
-                # unless this generator is the first argument of zip
-                # zip has left-to-right checks of length and stops querying
-                # elements as soon as the left-most one stops.
-                pool.close()
-                pool.join()
+                try:
+                    for ret in pool.imap(func, k, w, **pool_run):
+                        eta.update()
+                        yield ret
+                finally:
+                    # TODO notify users that this may be bad when used with zip
+                    # unless this generator is the first argument of zip
+                    # zip has left-to-right checks of length and stops querying
+                    # elements as soon as the left-most one stops.
+                    pool.close()
+                    pool.join()
                 eta.close()
 
         return func
@@ -252,6 +678,9 @@ class SumApply(IteratorApply):
 
     def dispatch(self, method):
         """Dispatch the method by summing"""
+        self._reject_out()
+        if self._attrs.get("checkpoint") is not None:
+            return self._checkpoint_dispatch(method, weighted=False, eta_key="sum")
         iter_func = super().dispatch(method, eta_key="sum")
 
         @wraps(method)
@@ -336,11 +765,6 @@ class NDArrayApply(BrillouinZoneParentApply):
         pool, pool_run = _pool_procs(self._attrs.get("pool"), len(self._get_object()))
         unzip = self._attrs.get("zip", self._attrs.get("unzip", False))
 
-        def _create_v(nk, v):
-            out = np.empty((nk, *v.shape), dtype=v.dtype)
-            out[0] = v
-            return out
-
         if pool is None:
 
             @wraps(method)
@@ -349,6 +773,7 @@ class NDArrayApply(BrillouinZoneParentApply):
                 k = bz.k
                 nk = len(k)
                 w = bz.weight
+                out = _ApplyOut(self._attrs.get("out"), unzip)
 
                 # Get first values
                 v = wrap(
@@ -357,7 +782,7 @@ class NDArrayApply(BrillouinZoneParentApply):
                 eta.update()
 
                 if unzip:
-                    a = tuple(_create_v(nk, vi) for vi in v)
+                    a = tuple(out.create(nk, vi) for vi in v)
                     for i, ki in enumerate(k[1:], 1):
                         v = wrap(
                             method(*args, k=ki, **kwargs),
@@ -369,7 +794,7 @@ class NDArrayApply(BrillouinZoneParentApply):
                             ai[i] = vi
                         eta.update()
                 else:
-                    a = _create_v(nk, v)
+                    a = out.create(nk, v)
                     del v
                     for i, ki in enumerate(k[1:], 1):
                         a[i] = wrap(
@@ -381,7 +806,44 @@ class NDArrayApply(BrillouinZoneParentApply):
                         eta.update()
                 eta.close()
 
-                return a
+                return out.finalize(a)
+
+        elif isinstance(pool, _BrillouinZonePool):
+
+            @wraps(method)
+            def func(*args, wrap=None, eta=None, **kwargs):
+                bz, parent, wrap_kw, eta = self._parse_kwargs(
+                    wrap, eta, eta_key=eta_key
+                )
+                k = bz.k
+                nk = len(k)
+                w = bz.weight
+                out = _ApplyOut(self._attrs.get("out"), unzip, pool.empty)
+
+                # Get first values to determine the shape of the output
+                t0 = time.perf_counter()
+                v = wrap_kw(
+                    method(*args, k=k[0], **kwargs), parent=parent, k=k[0], weight=w[0]
+                )
+                t0 = time.perf_counter() - t0
+                eta.update()
+
+                if unzip:
+                    a = tuple(out.create(nk, vi) for vi in v)
+                else:
+                    a = out.create(nk, v)
+                del v
+
+                # the workers write directly into the output
+                pool.fill(
+                    a, method, k, w, args, kwargs, wrap, start=1, eta=eta, **pool_run
+                )
+                if isinstance(pool, ThreadPool):
+                    # the first k-point is calculated here
+                    pool.timings[0] = t0
+                eta.close()
+
+                return out.finalize(a)
 
         else:
 
@@ -392,32 +854,35 @@ class NDArrayApply(BrillouinZoneParentApply):
                 k = bz.k
                 nk = len(k)
                 w = bz.weight
+                out = _ApplyOut(self._attrs.get("out"), unzip)
 
                 def func(k, w):
                     return wrap(
                         method(*args, k=k, **kwargs), parent=parent, k=k, weight=w
                     )
 
-                it = pool.imap(func, k, w, **pool_run)
-                v = next(it)
-                eta.update()
+                try:
+                    it = pool.imap(func, k, w, **pool_run)
+                    v = next(it)
+                    eta.update()
 
-                if unzip:
-                    a = tuple(_create_v(nk, vi) for vi in v)
-                    for i, v in enumerate(it, 1):
-                        for ai, vi in zip(a, v):
-                            ai[i] = vi
-                        eta.update()
-                else:
-                    a = _create_v(nk, v)
-                    for i, v in enumerate(it, 1):
-                        a[i] = v
-                        eta.update()
-                del v
-                pool.close()
-                pool.join()
+                    if unzip:
+                        a = tuple(out.create(nk, vi) for vi in v)
+                        for i, v in enumerate(it, 1):
+                            for ai, vi in zip(a, v):
+                                ai[i] = vi
+                            eta.update()
+                    else:
+                        a = out.create(nk, v)
+                        for i, v in enumerate(it, 1):
+                            a[i] = v
+                            eta.update()
+                    del v
+                finally:
+                    pool.close()
+                    pool.join()
                 eta.close()
-                return a
+                return out.finalize(a)
 
         return func
 
@@ -429,6 +894,9 @@ class AverageApply(BrillouinZoneParentApply):
 
     def dispatch(self, method):
         """Dispatch the method by averaging"""
+        self._reject_out()
+        if self._attrs.get("checkpoint") is not None:
+            return self._checkpoint_dispatch(method, weighted=True, eta_key="average")
         pool, pool_run = _pool_procs(self._attrs.get("pool"), len(self._get_object()))
 
         if pool is None:
@@ -467,6 +935,23 @@ class AverageApply(BrillouinZoneParentApply):
                 eta.close()
                 return v
 
+        elif isinstance(pool, _BrillouinZonePool):
+
+            @wraps(method)
+            def func(*args, wrap=None, eta=None, **kwargs):
+                bz, _, _, eta = self._parse_kwargs(wrap, eta, eta_key="average")
+                w = bz.weight
+
+                iret = pool.imap(method, bz.k, w, args, kwargs, wrap, **pool_run)
+                avg = _asoplist(next(iret)) * w[0]
+                eta.update()
+                for i, v in enumerate(iret, 1):
+                    avg += _asoplist(v) * w[i]
+                    eta.update()
+
+                eta.close()
+                return avg
+
         else:
 
             @wraps(method)
@@ -482,15 +967,16 @@ class AverageApply(BrillouinZoneParentApply):
                         wrap(method(*args, k=k, **kwargs), parent=parent, k=k, weight=w)
                     )
 
-                iret = pool.imap(func, k, w, **pool_run)
-                avg = next(iret)
-                eta.update()
-                for it in iret:
-                    avg += it
+                try:
+                    iret = pool.imap(func, k, w, **pool_run)
+                    avg = next(iret)
                     eta.update()
-
-                pool.close()
-                pool.join()
+                    for it in iret:
+                        avg += it
+                        eta.update()
+                finally:
+                    pool.close()
+                    pool.join()
 
                 eta.close()
                 return avg
@@ -556,6 +1042,8 @@ class XArrayApply(NDArrayApply):
                     coords, dims = _fix_coords_dims(
                         len(bz), array, coords, dims, prefix=f"{name}.v"
                     )
+                    if isinstance(array, xarray.DataArray):
+                        return _lazy_dataarray(array, coords, dims, name, {})
                     return xarray.DataArray(array, coords=coords, dims=dims, name=name)
 
                 if isinstance(name, str):
@@ -580,6 +1068,8 @@ class XArrayApply(NDArrayApply):
                 array = array_func(*args, **kwargs)
                 coords, dims = _fix_coords_dims(len(bz), array, coords, dims)
                 attrs = {"bz": bz, "parent": bz.parent}
+                if isinstance(array, xarray.DataArray):
+                    return _lazy_dataarray(array, coords, dims, name, attrs)
                 return xarray.DataArray(
                     array, coords=coords, dims=dims, name=name, attrs=attrs
                 )
@@ -0,0 +1,656 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+""" Pools for parallel calculations in `BrillouinZone.apply` """
+import io
+import mmap
+import os
+import pickle
+import tempfile
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
+from threading import Lock
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from sisl._internal import set_module
+from sisl._threads import num_threads, set_num_threads
+from sisl.utils.misc import allow_kwargs
+
+__all__ = ["SharedMemoryPool", "ThreadPool"]
+
+
+# State of the worker processes, populated by `_worker_init`
+_worker = {}
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to an existing shared memory block (without tracking it)"""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # python < 3.13 does not have the track argument
+        return SharedMemory(name=name)
+
+
+class _SharedPickler(pickle.Pickler):
+    """Pickler that moves large arrays into shared memory blocks
+
+    The arrays are replaced by references to the shared memory blocks,
+    and `_SharedUnpickler` re-attaches them without copying any data.
+    """
+
+    def __init__(self, file, shms: list, min_nbytes: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shms = shms
+        self._min_nbytes = min_nbytes
+        self._published = {}
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray:
+            return None
+        if obj.dtype.hasobject or obj.nbytes < max(1, self._min_nbytes):
+            return None
+
+        key = id(obj)
+        if key in self._published:
+            return self._published[key][1]
+
+        shm = SharedMemory(create=True, size=obj.nbytes)
+        self._shms.append(shm)
+        np.ndarray(obj.shape, dtype=obj.dtype, buffer=shm.buf)[...] = obj
+        pid = ("sisl-shm", shm.name, obj.shape, obj.dtype.str)
+        # keep obj alive to ensure the id is not re-used
+        self._published[key] = (obj, pid)
+        return pid
+
+
+class _SharedUnpickler(pickle.Unpickler):
+    """Unpickler re-attaching arrays published by `_SharedPickler`"""
+
+    def __init__(self, file, shms: list):
+        super().__init__(file)
+        self._shms = shms
+
+    def persistent_load(self, pid):
+        tag, name, shape, dtype = pid
+        if tag != "sisl-shm":
+            raise pickle.UnpicklingError(f"unsupported persistent id {tag}")
+        shm = _attach(name)
+        # the block has to be kept alive while the array is in use
+        self._shms.append(shm)
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _dumps_shared(obj, shms: list, min_nbytes: int) -> bytes:
+    """Pickle `obj` with all large arrays moved to shared memory blocks (appended to `shms`)"""
+    f = io.BytesIO()
+    _SharedPickler(f, shms, min_nbytes).dump(obj)
+    return f.getvalue()
+
+
+def _loads_shared(data: bytes, shms: list):
+    """Un-pickle `data` created by `_dumps_shared`"""
+    return _SharedUnpickler(io.BytesIO(data), shms).load()
+
+
+def _try_dumps(obj) -> Optional[bytes]:
+    """Pickle `obj` if possible, otherwise return None"""
+    try:
+        return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return None
+
+
+def _worker_release() -> None:
+    """Detach the shared memory blocks of a worker process (at exit)"""
+    shms = _worker.get("shms", [])
+    # the arrays using the blocks have to be removed before closing them
+    _worker.clear()
+    for shm in shms:
+        try:
+            shm.close()
+        except BufferError:  # pragma: no cover
+            # still in use, the block is released when the process ends
+            pass
+
+
+def _worker_init(payload: bytes, wrap: Optional[bytes], out: Sequence, chunksize: int):
+    """Initialize a worker process by attaching to the shared data"""
+    # the k-points are already distributed, the kernels should run serially
+    set_num_threads(1)
+    Finalize(None, _worker_release, exitpriority=10)
+    shms = []
+    parent, method, args, kwargs, k, w = _loads_shared(payload, shms)
+    if wrap is not None:
+        wrap = allow_kwargs("parent", "k", "weight")(pickle.loads(wrap))
+
+    outs = []
+    for kind, name, offset, shape, dtype in out:
+        if kind == "file":
+            outs.append(
+                np.memmap(name, dtype=dtype, mode="r+", offset=offset, shape=shape)
+            )
+        else:
+            shm = _attach(name)
+            shms.append(shm)
+            outs.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+
+    _worker.clear()
+    _worker.update(
+        shms=shms,
+        parent=parent,
+        method=method,
+        args=args,
+        kwargs=kwargs,
+        k=k,
+        w=w,
+        wrap=wrap,
+        out=outs,
+        chunksize=chunksize,
+    )
+
+
+def _worker_call(i: int):
+    """Calculate the (wrapped) value at the i'th k-point"""
+    wk = _worker
+    k = wk["k"][i]
+    v = wk["method"](*wk["args"], k=k, **wk["kwargs"])
+    if wk["wrap"] is None:
+        return v
+    return wk["wrap"](v, parent=wk["parent"], k=k, weight=wk["w"][i])
+
+
+def _worker_imap(start: int) -> list:
+    """Return the values for a chunk of k-points"""
+    stop = min(start + _worker["chunksize"], len(_worker["k"]))
+    return [_worker_call(i) for i in range(start, stop)]
+
+
+def _worker_fill(start: int) -> int:
+    """Write the values for a chunk of k-points directly in the shared output"""
+    out = _worker["out"]
+    stop = min(start + _worker["chunksize"], len(_worker["k"]))
+    for i in range(start, stop):
+        v = _worker_call(i)
+        if len(out) == 1:
+            out[0][i] = v
+        else:
+            for o, vi in zip(out, v):
+                o[i] = vi
+    return stop - start
+
+
+def _unlink(name: str) -> None:
+    """Remove a file, if possible"""
+    try:
+        os.unlink(name)
+    except OSError:  # pragma: no cover
+        # e.g. Windows does not allow removing files in use
+        pass
+
+
+def _release(shms: list) -> None:
+    """Close and remove shared memory blocks"""
+    for shm in shms:
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:  # pragma: no cover
+            pass
+    shms.clear()
+
+
+class _BrillouinZonePool:
+    """Base class for pools with direct knowledge of the `BrillouinZone.apply` calls
+
+    Sub-classes should implement `imap` and `fill`.
+    """
+
+    ncpus: int
+
+    def __repr__(self) -> str:
+        return f"<{self.__module__}.{self.__class__.__name__} ncpus={self.ncpus}>"
+
+    def empty(self, shape, dtype) -> np.ndarray:
+        """Create an (uninitialized) output array for `fill`"""
+        return np.empty(shape, dtype=dtype)
+
+
+@set_module("sisl.physics")
+class SharedMemoryPool(_BrillouinZonePool):
+    r"""Process pool using shared memory for the parent object of a Brillouin zone
+
+    In contrast to ``pathos`` pools, the parent object (e.g. a `Hamiltonian`)
+    is not pickled for every chunk of k-points.
+    Instead all large arrays of the parent (the sparse matrix arrays, the geometry
+    coordinates etc.) are published once in shared memory blocks, and the workers
+    re-attach them without copying.
+    Only the k-point indices are sent to the workers.
+
+    The workers are started for each calculation (like ``pool.restart`` for ``pathos``)
+    and the shared memory blocks are released when the calculation finishes.
+
+    Parameters
+    ----------
+    ncpus :
+        number of worker processes
+    mp_context :
+        the multiprocessing context (or its name) used to start the workers.
+        Defaults to the default context of `multiprocessing`.
+    min_nbytes :
+        arrays smaller than this (in bytes) are pickled, instead of being
+        moved to shared memory
+
+    Notes
+    -----
+    The arrays attached in the workers share their memory, methods that
+    change the parent object in-place should not be used.
+
+    A ``wrap`` function is called in the workers if it can be pickled
+    (i.e. it is defined at module level). Otherwise the raw values are
+    returned and `wrap` is called in the main process.
+    """
+
+    def __init__(self, ncpus: int, mp_context=None, min_nbytes: int = 2**16):
+        self.ncpus = ncpus
+        if isinstance(mp_context, str):
+            mp_context = get_context(mp_context)
+        self.mp_context = mp_context
+        self.min_nbytes = min_nbytes
+        # finalizers removing the files created by `empty`
+        self._files = {}
+
+    def empty(self, shape, dtype) -> np.ndarray:
+        """Create an (uninitialized) output array for `fill`, which the workers can write in directly
+
+        On systems with a memory file-system (``/dev/shm``) the array is memory-mapped
+        to a temporary file in it, and the workers write in the same memory.
+        The file is removed once the workers have finished (or when the array
+        is garbage collected).
+        Otherwise a regular array is returned, and the values are copied from
+        a shared memory block once the workers have finished.
+        """
+        dtype = np.dtype(dtype)
+        if not os.path.isdir("/dev/shm") or np.prod(shape) * dtype.itemsize == 0:
+            return super().empty(shape, dtype)
+        fd, name = tempfile.mkstemp(prefix="sisl-", dir="/dev/shm")
+        os.close(fd)
+        try:
+            out = np.memmap(name, dtype=dtype, mode="w+", shape=shape)
+        except BaseException:
+            _unlink(name)
+            raise
+        self._files[name] = weakref.finalize(out, _unlink, name)
+        return out
+
+    def _executor(self, shms, method, k, w, args, kwargs, wrap, out, chunksize):
+        parent = getattr(method, "__self__", None)
+        payload = _dumps_shared(
+            (parent, method, args, kwargs, k, w), shms, self.min_nbytes
+        )
+        return ProcessPoolExecutor(
+            max_workers=self.ncpus,
+            mp_context=self.mp_context,
+            initializer=_worker_init,
+            initargs=(payload, wrap, out, chunksize),
+        )
+
+    def imap(
+        self,
+        method: Callable,
+        k: np.ndarray,
+        w: np.ndarray,
+        args: Sequence = (),
+        kwargs: Optional[dict] = None,
+        wrap: Optional[Callable] = None,
+        chunksize: int = 1,
+    ) -> Iterator[Any]:
+        """Iterate the values of ``wrap(method(*args, k=k[i], **kwargs))`` for all k-points
+
+        Parameters
+        ----------
+        method :
+            the method to call, typically a method of the parent object
+        k :
+            the k-points
+        w :
+            the weights of the k-points
+        args :
+            positional arguments passed to `method`
+        kwargs :
+            keyword arguments passed to `method`
+        wrap :
+            function to post-process the returned values,
+            ``wrap(v, parent=parent, k=k, weight=w)``
+        chunksize :
+            number of k-points calculated in each task
+        """
+        if kwargs is None:
+            kwargs = {}
+        chunksize = max(1, chunksize)
+        wrap_pickle = None if wrap is None else _try_dumps(wrap)
+        if wrap is not None and wrap_pickle is None:
+            # call it here
+            parent = getattr(method, "__self__", None)
+            wrap_local = allow_kwargs("parent", "k", "weight")(wrap)
+        else:
+            wrap_local = None
+
+        shms = []
+        try:
+            with self._executor(
+                shms, method, k, w, args, kwargs, wrap_pickle, (), chunksize
+            ) as executor:
+                i = 0
+                for values in executor.map(_worker_imap, range(0, len(k), chunksize)):
+                    for v in values:
+                        if wrap_local is not None:
+                            v = wrap_local(v, parent=parent, k=k[i], weight=w[i])
+                        i += 1
+                        yield v
+        finally:
+            _release(shms)
+
+    def fill(
+        self,
+        out,
+        method: Callable,
+        k: np.ndarray,
+        w: np.ndarray,
+        args: Sequence = (),
+        kwargs: Optional[dict] = None,
+        wrap: Optional[Callable] = None,
+        chunksize: int = 1,
+        start: int = 0,
+        eta=None,
+    ) -> None:
+        """Write ``wrap(method(*args, k=k[i], **kwargs))`` into ``out[i]`` for all k-points
+
+        The workers write their values directly into the output arrays
+        (indexed by the k-point), and only the number of calculated k-points
+        is returned to the main process.
+        Memory-mapped arrays (`numpy.memmap`, e.g. created by `empty`) are written
+        directly by the workers, other arrays are written in shared memory
+        blocks and copied once the workers have finished.
+
+        Parameters
+        ----------
+        out : array_like or tuple of array_like
+            the output array(s), the first dimension corresponds to the k-points.
+            If a tuple, `method` (or `wrap`) should return a tuple of the same length.
+            If not `numpy.ndarray`, the values are written by the main process.
+        start :
+            the first k-point to calculate, prior elements in `out` are left untouched
+        eta :
+            progress bar with an ``update`` method
+        *args :
+            see `imap`
+        """
+        if kwargs is None:
+            kwargs = {}
+        chunksize = max(1, chunksize)
+        is_tuple = isinstance(out, tuple)
+        outs = out if is_tuple else (out,)
+
+        wrap_pickle = None if wrap is None else _try_dumps(wrap)
+        if (wrap is not None and wrap_pickle is None) or not all(
+            isinstance(o, np.ndarray) for o in outs
+        ):
+            # wrap can only be called here, or the output can only be
+            # written here, so the values have to be returned
+            it = self.imap(method, k[start:], w[start:], args, kwargs, wrap, chunksize)
+            for i, v in enumerate(it, start):
+                if is_tuple:
+                    for o, vi in zip(outs, v):
+                        o[i] = vi
+                else:
+                    out[i] = v
+                if eta is not None:
+                    eta.update()
+            return
+
+        shms = []
+        shared = []
+        files = []
+        try:
+            specs = []
+            for o in outs:
+                if isinstance(o, np.memmap) and isinstance(o.base, mmap.mmap):
+                    # the workers can write directly in the file
+                    o.flush()
+                    specs.append(("file", o.filename, o.offset, o.shape, o.dtype.str))
+                    shared.append(None)
+                    if o.filename in self._files:
+                        files.append(self._files.pop(o.filename))
+                    continue
+                shm = SharedMemory(create=True, size=max(1, o.nbytes))
+                shms.append(shm)
+                shared.append(np.ndarray(o.shape, dtype=o.dtype, buffer=shm.buf))
+                specs.append(("shm", shm.name, 0, o.shape, o.dtype.str))
+
+            with self._executor(
+                shms, method, k, w, args, kwargs, wrap_pickle, specs, chunksize
+            ) as executor:
+                for n in executor.map(_worker_fill, range(start, len(k), chunksize)):
+                    if eta is not None:
+                        eta.update(n)
+
+            for i, o in enumerate(outs):
+                if shared[i] is not None:
+                    o[start:] = shared[i][start:]
+        finally:
+            # the views have to be removed before the blocks can be closed
+            shared.clear()
+            _release(shms)
+            # the memory-mapped arrays are still usable (on POSIX systems)
+            for remove in files:
+                remove()
+
+
+def _available_cpus() -> int:
+    """Number of CPUs available to this process"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover
+        return os.cpu_count() or 1
+
+
+@set_module("sisl.physics")
+class ThreadPool(_BrillouinZonePool):
+    r"""Thread pool for k-point calculations in a single process
+
+    The LAPACK routines (e.g. ``eigh``) release the GIL, so threads may run
+    k-points in parallel without starting new processes, nor pickling anything.
+
+    The available CPUs are split between the k-point threads, and the
+    threads used by BLAS/LAPACK in each k-point calculation.
+    I.e. using 4 threads on a 16 core machine will limit BLAS to 4 threads.
+    Limiting the BLAS threads requires the package ``threadpoolctl``, hence
+    an `ImportError` is raised if it is not installed (unless ``blas_threads=0``).
+
+    The calculation time of each k-point is recorded in `timings`,
+    which may be used to choose the split of the threads.
+
+    Parameters
+    ----------
+    ncpus :
+        number of threads running k-points
+    blas_threads :
+        number of BLAS threads used by each k-point thread, defaults to
+        the available CPUs divided by `ncpus` (at least 1).
+        If 0, the BLAS threads will not be limited.
+
+    Examples
+    --------
+    >>> pool = ThreadPool(4)
+    >>> eigs = bz.apply.renew(pool=pool).array.eigh()
+    >>> pool.timings.sum()
+    """
+
+    def __init__(self, ncpus: int, blas_threads: Optional[int] = None):
+        self.ncpus = ncpus
+        self._blas_threads = blas_threads
+        if self.blas_threads > 0:
+            try:
+                import threadpoolctl
+            except ImportError as e:
+                raise ImportError(
+                    f"{self.__class__.__name__} requires the threadpoolctl package "
+                    "to limit the BLAS threads, install it or pass blas_threads=0."
+                ) from e
+        self.timings = np.empty(0)
+        """ calculation time (in seconds) of each k-point in the latest calculation """
+        self._blas_lock = Lock()
+        self._blas_count = 0
+        self._blas_limit = None
+
+    @property
+    def blas_threads(self) -> int:
+        """Number of BLAS threads used by each of the k-point threads"""
+        if self._blas_threads is None:
+            return max(1, _available_cpus() // self.ncpus)
+        return self._blas_threads
+
+    def _limit_blas(self):
+        """Context limiting the BLAS threads"""
+        blas_threads = self.blas_threads
+        if blas_threads <= 0:
+            return nullcontext()
+        from threadpoolctl import threadpool_limits
+
+        return threadpool_limits(limits=blas_threads, user_api="blas")
+
+    @contextmanager
+    def _task_limit_blas(self):
+        """Limit the BLAS threads while any of the tasks are running
+
+        The BLAS limits are process wide, hence the limit is entered by
+        the first running task, and released by the last one.
+        """
+        with self._blas_lock:
+            if self._blas_count == 0:
+                self._blas_limit = self._limit_blas()
+                self._blas_limit.__enter__()
+            self._blas_count += 1
+        try:
+            yield
+        finally:
+            with self._blas_lock:
+                self._blas_count -= 1
+                if self._blas_count == 0:
+                    limit, self._blas_limit = self._blas_limit, None
+                    limit.__exit__(None, None, None)
+
+    def _run(self, method, k, w, args, kwargs, wrap, chunksize, start, func):
+        """Run `func(i, value)` for all k-points, returns an iterator over the chunk results
+
+        At most ``2 * ncpus`` chunks are queued, so that the results are not
+        calculated (and kept) far ahead of the consumer.
+        """
+        if kwargs is None:
+            kwargs = {}
+        if wrap is not None:
+            parent = getattr(method, "__self__", None)
+            wrap = allow_kwargs("parent", "k", "weight")(wrap)
+        chunksize = max(1, chunksize)
+        nk = len(k)
+        timings = np.full(nk, np.nan)
+        self.timings = timings
+
+        def chunk(begin):
+            ret = []
+            with self._task_limit_blas(), num_threads(1):
+                for i in range(begin, min(begin + chunksize, nk)):
+                    t0 = time.perf_counter()
+                    v = method(*args, k=k[i], **kwargs)
+                    if wrap is not None:
+                        v = wrap(v, parent=parent, k=k[i], weight=w[i])
+                    timings[i] = time.perf_counter() - t0
+                    ret.append(func(i, v))
+            return ret
+
+        begins = iter(range(start, nk, chunksize))
+        with ThreadPoolExecutor(max_workers=self.ncpus) as executor:
+            futures = deque(
+                executor.submit(chunk, begin)
+                for begin in islice(begins, 2 * self.ncpus)
+            )
+            try:
+                while futures:
+                    ret = futures.popleft().result()
+                    for begin in islice(begins, 1):
+                        futures.append(executor.submit(chunk, begin))
+                    yield ret
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def imap(
+        self,
+        method: Callable,
+        k: np.ndarray,
+        w: np.ndarray,
+        args: Sequence = (),
+        kwargs: Optional[dict] = None,
+        wrap: Optional[Callable] = None,
+        chunksize: int = 1,
+    ) -> Iterator[Any]:
+        """Iterate the values of ``wrap(method(*args, k=k[i], **kwargs))`` for all k-points
+
+        See `SharedMemoryPool.imap` for details.
+        """
+
+        def value(i, v):
+            return v
+
+        for values in self._run(method, k, w, args, kwargs, wrap, chunksize, 0, value):
+            yield from values
+
+    def fill(
+        self,
+        out,
+        method: Callable,
+        k: np.ndarray,
+        w: np.ndarray,
+        args: Sequence = (),
+        kwargs: Optional[dict] = None,
+        wrap: Optional[Callable] = None,
+        chunksize: int = 1,
+        start: int = 0,
+        eta=None,
+    ) -> None:
+        """Write ``wrap(method(*args, k=k[i], **kwargs))`` into ``out[i]`` for all k-points
+
+        See `SharedMemoryPool.fill` for details.
+        """
+        outs = out if isinstance(out, tuple) else (out,)
+        if all(isinstance(o, np.ndarray) for o in outs):
+            lock = nullcontext()
+        else:
+            # e.g. NetCDF variables are not thread-safe
+            lock = Lock()
+
+        def write(i, v):
+            with lock:
+                if isinstance(out, tuple):
+                    for o, vi in zip(out, v):
+                        o[i] = vi
+                else:
+                    out[i] = v
+
+        for values in self._run(
+            method, k, w, args, kwargs, wrap, chunksize, start, write
+        ):
+            if eta is not None:
+                eta.update(len(values))
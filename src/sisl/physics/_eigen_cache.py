@@ -0,0 +1,139 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+
+from sisl._internal import set_module
+
+__all__ = ["EigenCache"]
+
+
+def _nbytes(value) -> int:
+    """Number of bytes used by the arrays in `value`"""
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return value.nbytes
+
+
+def _copy(value):
+    """Copy the arrays in `value` (users may change the returned arrays in-place)"""
+    if isinstance(value, tuple):
+        return tuple(v.copy() for v in value)
+    return value.copy()
+
+
+@set_module("sisl.physics")
+class EigenCache:
+    r"""Least-recently-used cache of eigenvalue decompositions
+
+    The cache stores the results of `SparseOrbitalBZ.eigh` keyed on the
+    matrix revision, the :math:`\mathbf k`-point, the gauge, the spin component and
+    other arguments.
+    When the total size of the stored arrays exceeds `max_bytes` the least
+    recently used decompositions are evicted.
+
+    The cache is enabled through `SparseOrbitalBZ.set_eigen_cache`.
+
+    Parameters
+    ----------
+    max_bytes :
+        maximum number of bytes stored in the cache
+
+    Attributes
+    ----------
+    hits :
+        number of look-ups that were found in the cache
+    misses :
+        number of look-ups that were not found in the cache
+    evictions :
+        number of decompositions removed due to the size limit
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__module__}.{self.__class__.__name__} size={len(self)}, "
+            f"nbytes={self.nbytes}, max_bytes={self.max_bytes}, hits={self.hits}, "
+            f"misses={self.misses}, evictions={self.evictions}>"
+        )
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Statistics of the cache usage"""
+        return {
+            "size": len(self),
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(self, key, default: Any = None):
+        """Return a copy of the cached value for `key`, or `default` if not present
+
+        Parameters
+        ----------
+        key :
+            the key of the value
+        default :
+            returned if `key` is not present
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+        return _copy(value)
+
+    def put(self, key, value) -> None:
+        """Store `value` (an array, or a tuple of arrays) in the cache
+
+        Values larger than `max_bytes` are not stored.
+
+        Parameters
+        ----------
+        key :
+            the key of the value
+        value :
+            the value to be stored, a copy is stored
+        """
+        nbytes = _nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+        value = _copy(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= _nbytes(old)
+            while self._data and self.nbytes + nbytes > self.max_bytes:
+                _, old = self._data.popitem(last=False)
+                self.nbytes -= _nbytes(old)
+                self.evictions += 1
+            self._data[key] = value
+            self.nbytes += nbytes
+
+    def clear(self) -> None:
+        """Remove all stored values (the statistics are retained)"""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
@@ -0,0 +1,198 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from threading import local
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sps
+from scipy.sparse.linalg import LinearOperator, lobpcg, splu
+
+from sisl._internal import set_module
+from sisl.linalg import eigh
+
+__all__ = ["EigshWarmStart"]
+
+
+@set_module("sisl.physics")
+class EigshWarmStart:
+    r"""State of the warm-started iterative eigensolver used in `SparseOrbitalBZ.eigsh`
+
+    The eigenvectors of the latest calculation are stored and used as the
+    initial subspace for the next calculation.
+    The subspace is local to each thread, so that threads in a `ThreadPool`
+    carry their own subspaces along their k-points.
+
+    Attributes
+    ----------
+    iterations : list of int
+        number of iterations used by each of the calculations (in the order they
+        were done)
+    """
+
+    def __init__(self):
+        self._local = local()
+        self.iterations = []
+
+    def __repr__(self) -> str:
+        return f"<{self.__module__}.{self.__class__.__name__} calls={len(self.iterations)}>"
+
+    @property
+    def subspace(self) -> Optional[np.ndarray]:
+        """The subspace used for the next calculation in this thread (eigenvectors as columns)"""
+        return getattr(self._local, "X", None)
+
+    @subspace.setter
+    def subspace(self, X: Optional[np.ndarray]) -> None:
+        self._local.X = X
+
+    def reset(self) -> None:
+        """Remove the stored subspaces and the iteration counts"""
+        self._local = local()
+        self.iterations = []
+
+    def solve(
+        self,
+        P,
+        S,
+        n: int,
+        eigvals_only: bool = True,
+        which: str = "SM",
+        sigma: Optional[float] = None,
+        X0: Optional[np.ndarray] = None,
+        tol: Optional[float] = None,
+        maxiter: int = 100,
+    ):
+        r"""Calculate `n` eigenpairs of :math:`\mathbf P\mathbf x = \lambda\mathbf S\mathbf x` with LOBPCG
+
+        Eigenvalues close to `sigma` are calculated in shift-invert mode
+        using a sparse LU decomposition of :math:`\mathbf P - \sigma\mathbf S`.
+
+        Parameters
+        ----------
+        P : scipy.sparse.spmatrix
+            Hermitian matrix
+        S : scipy.sparse.spmatrix or None
+            overlap matrix, None for orthogonal basis sets
+        n :
+            number of eigenpairs
+        eigvals_only :
+            whether only the eigenvalues should be returned
+        which : {"SM", "SA", "LA"}
+            which eigenvalues to calculate, smallest magnitude (closest to `sigma`),
+            smallest algebraic or largest algebraic
+        sigma :
+            calculate the eigenvalues closest to `sigma`, defaults to 0 for ``which="SM"``
+        X0 :
+            initial subspace, defaults to the stored subspace (or a random subspace)
+        tol :
+            residual tolerance, see `scipy.sparse.linalg.lobpcg`. The default
+            tolerance yields eigenvalues accurate to roughly :math:`10^{-9}`, whereas
+            the eigenvectors are less accurate
+        maxiter :
+            maximum number of iterations
+        """
+        N = P.shape[0]
+        if sigma is None and which == "SM":
+            sigma = 0.0
+        elif sigma is None and which not in ("SA", "LA"):
+            raise ValueError(
+                f"{self.__class__.__name__}.solve only supports which in [SM, SA, LA], got {which}"
+            )
+
+        # additional (guard) vectors improves the convergence of the
+        # requested eigenpairs substantially
+        m = n + max(2, n // 2)
+
+        if 5 * m >= N:
+            # LOBPCG is not suited for such small problems
+            w, v = eigh(P.toarray(), None if S is None else S.toarray())
+            if sigma is not None:
+                idx = np.sort(np.argsort(np.abs(w - sigma), kind="stable")[:n])
+            elif which == "SA":
+                idx = np.arange(n)
+            else:
+                idx = np.arange(N - n, N)
+            w, X = w[idx], v[:, idx]
+            self.iterations.append(0)
+
+        else:
+            dtype = np.result_type(P.dtype, np.float64)
+            if S is not None:
+                dtype = np.result_type(dtype, S.dtype)
+
+            if X0 is None:
+                X0 = self.subspace
+            if X0 is None or X0.shape[0] != N:
+                X0 = np.empty([N, 0])
+            if X0.shape[1] < m:
+                rng = np.random.default_rng(1234)
+                X0 = np.hstack((X0, rng.random((N, m - X0.shape[1])) - 0.5))
+            X0 = X0[:, :m].astype(dtype, copy=False)
+
+            if sigma is None:
+                A, B = P, S
+                largest = which == "LA"
+            else:
+                if S is None:
+                    shift = sps.identity(N, dtype=dtype, format="csc") * sigma
+                else:
+                    shift = S * sigma
+                lu = splu(sps.csc_matrix(P - shift))
+
+                # The eigenvalues of (P - sigma S)^-1 S (P - sigma S)^-1 are
+                # 1/(lambda - sigma)^2, i.e. largest for those closest to sigma
+                if S is None:
+
+                    def matmat(v):
+                        return lu.solve(lu.solve(v))
+
+                else:
+
+                    def matmat(v):
+                        return S @ lu.solve(S @ lu.solve(S @ v))
+
+                A = LinearOperator(
+                    (N, N), matvec=matmat, matmat=matmat, rmatvec=matmat, dtype=dtype
+                )
+                B = S
+                largest = True
+
+            w, X, rnorms = lobpcg(
+                A,
+                X0,
+                B=B,
+                tol=tol,
+                maxiter=maxiter,
+                largest=largest,
+                retResidualNormsHistory=True,
+            )
+            self.iterations.append(len(rnorms) - 1)
+
+            # Rayleigh-Ritz in the converged subspace, in shift-invert mode
+            # eigenvalues at sigma +- d are degenerate and may be mixed
+            PX = X.conj().T @ (P @ X)
+            if S is None:
+                SX = X.conj().T @ X
+            else:
+                SX = X.conj().T @ (S @ X)
+            w, c = eigh((PX + PX.conj().T) / 2, (SX + SX.conj().T) / 2)
+            X = X @ c
+            if sigma is None:
+                idx = np.argsort(w)
+            else:
+                idx = np.argsort(np.abs(w - sigma), kind="stable")
+            self.subspace = X[:, idx].copy()
+            if which == "LA" and sigma is None:
+                idx = idx[-n:]
+            else:
+                idx = np.sort(idx[:n]) if sigma is not None else idx[:n]
+            w, X = w[idx], X[:, idx]
+            idx = np.argsort(w)
+            w, X = w[idx], X[:, idx]
+
+        if eigvals_only:
+            return w
+        return w, X
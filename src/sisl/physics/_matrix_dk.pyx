@@ -16,6 +16,7 @@ from ._phase import *
 
 __all__ = [
     "matrix_dk",
+    "matrix_dk_batch",
     "matrik_dk_nc",
     "matrik_dk_diag",
     "matrik_dk_so",
@@ -65,6 +66,39 @@ def matrix_dk(gauge, M, const int_sp_st idx, sc, cnp.ndarray[floats_st] k, dtype
     return d1.asformat(format), d2.asformat(format), d3.asformat(format)
 
 
+def matrix_dk_batch(gauge, M, const int_sp_st idx, sc, cnp.ndarray[floats_st, ndim=2] K, dtype, format):
+    """ Dense matrix derivatives for multiple k-points, returned as 3 ``(nk, no, no)`` arrays """
+    if format not in ("array", "matrix", "dense"):
+        raise ValueError(f"matrix_dk: multiple k-points requires a dense format, got {format}")
+
+    K = np.ascontiguousarray(K)
+    dtype = phase_dtype_k(K, M.dtype, dtype, True)
+
+    gauge = comply_gauge(gauge)
+    if gauge == "atomic":
+        M.finalize()
+        rij = M.Rij()._csr._D
+        iRs = 1j * rij.reshape(1, -1, 3) * phase_rij_k(rij, sc, K, dtype)[:, :, None]
+        del rij
+        p_opt = 0
+    elif gauge == "lattice":
+        iRs = phase_rsc_k(sc, K, dtype)[:, :, None]
+        iRs = 1j * np.dot(sc.sc_off, sc.cell).reshape(1, -1, 3) * iRs
+        p_opt = 1
+    else:
+        raise ValueError("phase_dk: gauge must be in [lattice, atomic]")
+    iRs = np.ascontiguousarray(iRs, dtype=dtype)
+
+    csr = M._csr
+    nr = csr.shape[0]
+    shape = (K.shape[0], nr, nr)
+    x = np.empty(shape, dtype=dtype)
+    y = np.empty(shape, dtype=dtype)
+    z = np.empty(shape, dtype=dtype)
+    phase3_array_k(csr.ptr, csr.ncol, csr.col, csr._D, idx, iRs, p_opt, x, y, z)
+    return x, y, z
+
+
 def matrix_dk_nc(gauge, M, sc, cnp.ndarray[floats_st] k, dtype, format):
     dtype = phase_dtype(k, M.dtype, dtype, True)
     p_opt, iRs = phase_dk(gauge, M, sc, k, dtype)
@@ -6,7 +6,10 @@ cimport cython
 import numpy as np
 cimport numpy as cnp
 
+from scipy.sparse import csr_matrix
+
 from sisl._core._dtypes cimport floats_st, int_sp_st
+
 from ._common import comply_gauge
 from ._matrix_phase import *
 from ._matrix_phase_sc import *
@@ -15,6 +18,7 @@ from ._phase cimport is_gamma
 
 __all__ = [
     "matrix_k",
+    "matrix_k_batch",
     "matrix_k_nc",
     "matrix_k_so",
     "matrix_k_diag",
@@ -47,7 +51,7 @@ def phase_dk(gauge, M, sc, cnp.ndarray[floats_st] K, dtype):
 
     return p_opt, phases
 
-def matrix_k(gauge, M, const int_sp_st idx, sc, cnp.ndarray[floats_st] k, dtype, format):
+def matrix_k(gauge, M, const int_sp_st idx, sc, cnp.ndarray[floats_st] k, dtype, format, out=None):
     dtype = phase_dtype(k, M.dtype, dtype)
     p_opt, phases = phase_dk(gauge, M, sc, k, dtype)
 
@@ -63,6 +67,8 @@ def matrix_k(gauge, M, const int_sp_st idx, sc, cnp.ndarray[floats_st] k, dtype,
     csr = M._csr
 
     if format.startswith("sc:") or format == "sc":
+        if out is not None:
+            raise ValueError(f"matrix_k: out argument is not supported for format={format}")
         if format == "sc":
             format = "csr"
         else:
@@ -76,9 +82,86 @@ def matrix_k(gauge, M, const int_sp_st idx, sc, cnp.ndarray[floats_st] k, dtype,
 
 
     if format in ("array", "matrix", "dense"):
-        return phase_array(csr.ptr, csr.ncol, csr.col, csr._D, udx, phases, p_opt)
+        if out is None:
+            return phase_array(csr.ptr, csr.ncol, csr.col, csr._D, udx, phases, p_opt)
+
+        nr = csr.shape[0]
+        if out.shape != (nr, nr) or out.dtype != phases.dtype:
+            raise ValueError(f"matrix_k: out argument has wrong shape or dtype, "
+                             f"expected {(nr, nr)} and {phases.dtype}")
+        phase_array_into(csr.ptr, csr.ncol, csr.col, csr._D, udx, phases, p_opt, out)
+        return out
+
+    if out is not None:
+        if format != "csr":
+            raise ValueError(f"matrix_k: out argument is only supported for format "
+                             f"in [csr, array], got {format}")
+        if not csr.finalized:
+            raise ValueError("matrix_k: out argument requires a finalized matrix, "
+                             "call finalize() first")
+
+    if not csr.finalized:
+        return phase_csr(csr.ptr, csr.ncol, csr.col, csr._D, udx, phases, p_opt).asformat(format)
+
+    # Re-use the folded sparsity pattern
+    plan = M.assembly_plan()
+    if out is None:
+        V = np.empty(plan.nnz, dtype=phases.dtype)
+    else:
+        if out.shape != plan.shape or out.nnz != plan.nnz or out.dtype != phases.dtype:
+            raise ValueError("matrix_k: out argument is not compatible with the "
+                             "assembly plan, or has the wrong dtype")
+        V = out.data
+
+    phase_csr_into(csr.ptr, csr.ncol, csr.col, csr._D, udx, phases, p_opt, plan.index, V)
+
+    if out is not None:
+        return out
+
+    # The index arrays are copied to ensure the plan is not altered by in-place
+    # operations on the returned matrix (e.g. eliminate_zeros).
+    return csr_matrix((V, plan.indices.copy(), plan.indptr.copy()),
+                      shape=plan.shape).asformat(format)
+
+
+def matrix_k_batch(gauge, M, const int_sp_st idx, sc, cnp.ndarray[floats_st, ndim=2] K, dtype, format, out=None):
+    """ Dense matrices for multiple k-points, returned in a ``(nk, no, no)`` array """
+    if format not in ("array", "matrix", "dense"):
+        raise ValueError(f"matrix_k: multiple k-points requires a dense format, got {format}")
+
+    K = np.ascontiguousarray(K)
+    dtype = phase_dtype_k(K, M.dtype, dtype)
+
+    gauge = comply_gauge(gauge)
+    if gauge == "atomic":
+        M.finalize()
+        phases = phase_rij_k(M.Rij()._csr._D, sc, K, dtype)
+        p_opt = 0
+    elif gauge == "lattice":
+        phases = phase_rsc_k(sc, K, dtype)
+        p_opt = 1
+    else:
+        raise ValueError("phase_k: gauge must be in [lattice, atomic]")
 
-    return phase_csr(csr.ptr, csr.ncol, csr.col, csr._D, idx, phases, p_opt).asformat(format)
+    cdef int_sp_st udx = idx
+    cdef int_sp_st shapem1 = M.shape[-1]
+    if idx < 0:
+        udx += shapem1
+    if udx < 0 or shapem1 <= udx:
+        d = shapem1
+        raise ValueError(f"matrix_k: unknown index specification {idx} must be in 0:{d}")
+
+    csr = M._csr
+    nr = csr.shape[0]
+    shape = (K.shape[0], nr, nr)
+    if out is None:
+        out = np.empty(shape, dtype=phases.dtype)
+    elif out.shape != shape or out.dtype != phases.dtype:
+        raise ValueError(f"matrix_k: out argument has wrong shape or dtype, "
+                         f"expected {shape} and {phases.dtype}")
+
+    phase_array_k(csr.ptr, csr.ncol, csr.col, csr._D, udx, phases, p_opt, out)
+    return out
 
 
 def matrix_k_nc(gauge, M, sc, cnp.ndarray[floats_st] k, dtype, format):
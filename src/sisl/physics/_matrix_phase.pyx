@@ -3,6 +3,7 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 # cython: boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
 cimport cython
+from cython.parallel cimport parallel, prange, threadid
 
 import numpy as np
 
@@ -10,7 +11,9 @@ cimport numpy as cnp
 
 from scipy.sparse import csr_matrix
 
-from sisl._indices cimport _index_sorted
+from sisl._threads import get_num_threads
+
+from sisl._indices cimport _index_sorted_range
 
 from sisl._core._sparse import fold_csr_matrix, fold_csr_matrix_diag
 
@@ -42,6 +45,9 @@ from ._matrix_utils cimport (
 __all__ = [
     "phase_csr",
     "phase_array",
+    "phase_csr_into",
+    "phase_array_into",
+    "phase_array_k",
     "phase_csr_nc",
     "phase_array_nc",
     "phase_csr_diag",
@@ -90,7 +96,6 @@ def phase_csr(const int_sp_st[::1] ptr,
     cdef int_sp_st[::1] v_ptr = V_PTR
     cdef int_sp_st[::1] v_ncol = V_NCOL
     cdef int_sp_st[::1] v_col = V_COL
-    cdef int_sp_st[::1] tmp
 
     # This may fail, when floatcomplexs_st is complex, but phases_st is float
     cdef object dtype = type2dtype[phases_st](1)
@@ -101,33 +106,31 @@ def phase_csr(const int_sp_st[::1] ptr,
     cdef int_sp_st nr = ncol.shape[0]
     cdef int_sp_st r, ind, s, s_idx, c
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
 
-                    tmp = v_col[v_ptr[r]:v_ptr[r] + v_ncol[r]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[r], v_ptr[r] + v_ncol[r], c)
                     v[v_ptr[r] + s_idx] += <phases_st> D[ind, idx]
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
 
-                    tmp = v_col[v_ptr[r]:v_ptr[r] + v_ncol[r]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[r], v_ptr[r] + v_ncol[r], c)
                     v[v_ptr[r] + s_idx] += <phases_st> (D[ind, idx] * phases[ind])
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
                     s = col[ind] / nr
 
-                    tmp = v_col[v_ptr[r]:v_ptr[r] + v_ncol[r]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[r], v_ptr[r] + v_ncol[r], c)
                     v[v_ptr[r] + s_idx] += <phases_st> (D[ind, idx] * phases[s])
 
     return csr_matrix((V, V_COL, V_PTR), shape=(nr, nr))
@@ -141,7 +144,6 @@ def phase_array(const int_sp_st[::1] ptr,
                 const phases_st[::1] phases,
                 const int_sp_st p_opt):
 
-    cdef int_sp_st[::1] tmp
     cdef int_sp_st nr = ncol.shape[0]
 
     cdef object dtype = type2dtype[phases_st](1)
@@ -151,21 +153,22 @@ def phase_array(const int_sp_st[::1] ptr,
     # Local columns
     cdef int_sp_st r, ind, s, c
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
                     v[r, c] += <phases_st> (D[ind, idx])
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
                     v[r, c] += <phases_st> (D[ind, idx] * phases[ind])
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
                     s = col[ind] / nr
@@ -174,6 +177,126 @@ def phase_array(const int_sp_st[::1] ptr,
     return V
 
 
+def phase_csr_into(const int_sp_st[::1] ptr,
+                   const int_sp_st[::1] ncol,
+                   const int_sp_st[::1] col,
+                   floatcomplexs_st[:, ::1] D,
+                   const int_sp_st idx,
+                   const phases_st[::1] phases,
+                   const int_sp_st p_opt,
+                   const int_sp_st[::1] fold_idx,
+                   phases_st[::1] v):
+    """ Fold the sparse elements into the pre-allocated data array `v`
+
+    The folded sparsity pattern is implicitly defined by `fold_idx`
+    which contains the index of each sparse element in `v`, see
+    `fold_csr_matrix_index`.
+    """
+
+    # Local columns
+    cdef int_sp_st nr = ncol.shape[0]
+    cdef int_sp_st r, ind, s
+
+    v[:] = 0
+
+    cdef int num_threads = get_num_threads()
+    with nogil:
+        if p_opt == -1:
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                for ind in range(ptr[r], ptr[r] + ncol[r]):
+                    v[fold_idx[ind]] += <phases_st> D[ind, idx]
+
+        elif p_opt == 0:
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                for ind in range(ptr[r], ptr[r] + ncol[r]):
+                    v[fold_idx[ind]] += <phases_st> (D[ind, idx] * phases[ind])
+
+        else:
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                for ind in range(ptr[r], ptr[r] + ncol[r]):
+                    s = col[ind] / nr
+                    v[fold_idx[ind]] += <phases_st> (D[ind, idx] * phases[s])
+
+
+def phase_array_into(const int_sp_st[::1] ptr,
+                     const int_sp_st[::1] ncol,
+                     const int_sp_st[::1] col,
+                     floatcomplexs_st[:, ::1] D,
+                     const int_sp_st idx,
+                     const phases_st[::1] phases,
+                     const int_sp_st p_opt,
+                     phases_st[:, ::1] v):
+    """ Equivalent to `phase_array` but stores the result in the pre-allocated `v` """
+
+    # Local columns
+    cdef int_sp_st nr = ncol.shape[0]
+    cdef int_sp_st r, ind, s, c
+
+    v[:, :] = 0
+
+    cdef int num_threads = get_num_threads()
+    with nogil:
+        if p_opt == -1:
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                for ind in range(ptr[r], ptr[r] + ncol[r]):
+                    c = col[ind] % nr
+                    v[r, c] += <phases_st> (D[ind, idx])
+
+        elif p_opt == 0:
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                for ind in range(ptr[r], ptr[r] + ncol[r]):
+                    c = col[ind] % nr
+                    v[r, c] += <phases_st> (D[ind, idx] * phases[ind])
+
+        else:
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                for ind in range(ptr[r], ptr[r] + ncol[r]):
+                    c = col[ind] % nr
+                    s = col[ind] / nr
+                    v[r, c] += <phases_st> (D[ind, idx] * phases[s])
+
+
+def phase_array_k(const int_sp_st[::1] ptr,
+                  const int_sp_st[::1] ncol,
+                  const int_sp_st[::1] col,
+                  floatcomplexs_st[:, ::1] D,
+                  const int_sp_st idx,
+                  const phases_st[:, ::1] phases,
+                  const int_sp_st p_opt,
+                  phases_st[:, :, ::1] v):
+    """ Dense matrices for multiple k-points stored in `v` with shape ``(nk, nr, nr)``
+
+    The phases for the ``ik``'th k-point are stored in ``phases[ik]``,
+    `p_opt` has the same meaning as for the other routines (except -1
+    is not allowed).
+    """
+
+    # Local columns
+    cdef int_sp_st nr = ncol.shape[0]
+    cdef Py_ssize_t nk = v.shape[0]
+    cdef Py_ssize_t ik
+    cdef int_sp_st r, ind, s, c
+
+    v[:, :, :] = 0
+
+    cdef int num_threads = get_num_threads()
+    with nogil:
+        if p_opt == 0:
+            for ik in range(nk):
+                for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                    for ind in range(ptr[r], ptr[r] + ncol[r]):
+                        c = col[ind] % nr
+                        v[ik, r, c] += <phases_st> (D[ind, idx] * phases[ik, ind])
+
+        else:
+            for ik in range(nk):
+                for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                    for ind in range(ptr[r], ptr[r] + ncol[r]):
+                        c = col[ind] % nr
+                        s = col[ind] / nr
+                        v[ik, r, c] += <phases_st> (D[ind, idx] * phases[ik, s])
+
+
 def phase_csr_diag(const int_sp_st[::1] ptr,
                    const int_sp_st[::1] ncol,
                    const int_sp_st[::1] col,
@@ -188,7 +311,6 @@ def phase_csr_diag(const int_sp_st[::1] ptr,
     cdef int_sp_st[::1] v_ptr = V_PTR
     cdef int_sp_st[::1] v_ncol = V_NCOL
     cdef int_sp_st[::1] v_col = V_COL
-    cdef int_sp_st[::1] tmp
 
     cdef object dtype = type2dtype[complexs_st](1)
     cdef cnp.ndarray[complexs_st, mode='c'] V = np.zeros([v_col.shape[0]], dtype=dtype)
@@ -200,42 +322,40 @@ def phase_csr_diag(const int_sp_st[::1] ptr,
 
     cdef complexs_st d
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * per_row
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = <complexs_st> D[ind, idx]
                     for ic in range(per_row):
                         v[v_ptr[rr+ic] + s_idx] += d
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * per_row
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = phases[ind] * D[ind, idx]
                     for ic in range(per_row):
                         v[v_ptr[rr+ic] + s_idx] += d
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * per_row
                     s = col[ind] / nr
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = phases[s] * D[ind, idx]
                     for ic in range(per_row):
@@ -254,7 +374,6 @@ def phase_array_diag(const int_sp_st[::1] ptr,
                      const int_sp_st p_opt,
                      const int_sp_st per_row):
 
-    cdef int_sp_st[::1] tmp
     cdef int_sp_st nr = ncol.shape[0]
 
     cdef object dtype = type2dtype[complexs_st](1)
@@ -266,9 +385,10 @@ def phase_array_diag(const int_sp_st[::1] ptr,
 
     cdef complexs_st d
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * per_row
@@ -277,7 +397,7 @@ def phase_array_diag(const int_sp_st[::1] ptr,
                         v[rr + ic, c + ic] += d
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * per_row
@@ -286,7 +406,7 @@ def phase_array_diag(const int_sp_st[::1] ptr,
                         v[rr + ic, c + ic] += d
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * per_row
@@ -310,7 +430,6 @@ def phase_csr_nc(const int_sp_st[::1] ptr,
     cdef int_sp_st[::1] v_ptr = V_PTR
     cdef int_sp_st[::1] v_ncol = V_NCOL
     cdef int_sp_st[::1] v_col = V_COL
-    cdef int_sp_st[::1] tmp
 
     cdef object dtype = type2dtype[complexs_st](1)
     cdef cnp.ndarray[complexs_st, mode='c'] V = np.zeros([v_col.shape[0]], dtype=dtype)
@@ -323,52 +442,56 @@ def phase_csr_nc(const int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_nc func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nc_cmplx
     else:
         func = matrix_box_nc_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
                     matrix_add_csr_nc(v_ptr, rr, s_idx, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
                     ph = phases[ind]
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
                     matrix_add_csr_nc(v_ptr, rr, s_idx, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
                     s = col[ind] / nr
                     ph = phases[s]
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
@@ -385,7 +508,6 @@ def phase_array_nc(const int_sp_st[::1] ptr,
                    const complexs_st[::1] phases,
                    const int_sp_st p_opt):
 
-    cdef int_sp_st[::1] tmp
     cdef int_sp_st nr = ncol.shape[0]
 
     cdef object dtype = type2dtype[complexs_st](1)
@@ -398,17 +520,24 @@ def phase_array_nc(const int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_nc func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nc_cmplx
     else:
         func = matrix_box_nc_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -418,7 +547,7 @@ def phase_array_nc(const int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -429,7 +558,7 @@ def phase_array_nc(const int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -455,7 +584,6 @@ def phase_csr_so(const int_sp_st[::1] ptr,
     cdef int_sp_st[::1] v_ptr = V_PTR
     cdef int_sp_st[::1] v_ncol = V_NCOL
     cdef int_sp_st[::1] v_col = V_COL
-    cdef int_sp_st[::1] tmp
 
     cdef object dtype = type2dtype[complexs_st](1)
     cdef cnp.ndarray[complexs_st, mode='c'] V = np.zeros([v_col.shape[0]], dtype=dtype)
@@ -468,52 +596,56 @@ def phase_csr_so(const int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_so func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_so_cmplx
     else:
         func = matrix_box_so_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
                     matrix_add_csr_nc(v_ptr, rr, s_idx, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
                     ph = phases[ind]
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
                     matrix_add_csr_nc(v_ptr, rr, s_idx, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
                     s = col[ind] / nr
                     ph = phases[s]
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
@@ -542,17 +674,24 @@ def phase_array_so(const int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_so func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_so_cmplx
     else:
         func = matrix_box_so_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -562,7 +701,7 @@ def phase_array_so(const int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -573,7 +712,7 @@ def phase_array_so(const int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -599,7 +738,6 @@ def phase_csr_nambu(const int_sp_st[::1] ptr,
     cdef int_sp_st[::1] v_ptr = V_PTR
     cdef int_sp_st[::1] v_ncol = V_NCOL
     cdef int_sp_st[::1] v_col = V_COL
-    cdef int_sp_st[::1] tmp
 
     cdef object dtype = type2dtype[complexs_st](1)
     cdef cnp.ndarray[complexs_st, mode='c'] V = np.zeros([v_col.shape[0]], dtype=dtype)
@@ -612,52 +750,56 @@ def phase_csr_nambu(const int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_nambu func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0] * 16
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nambu_cmplx
     else:
         func = matrix_box_nambu_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 16], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
                     matrix_add_csr_nambu(v_ptr, rr, s_idx, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
                     ph = phases[ind]
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
                     matrix_add_csr_nambu(v_ptr, rr, s_idx, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
                     s = col[ind] / nr
                     ph = phases[s]
 
-                    tmp = v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]]
-                    s_idx = _index_sorted(tmp, c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
                     func(d, ph, M)
@@ -686,17 +828,24 @@ def phase_array_nambu(const int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_nambu func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0] * 16
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nambu_cmplx
     else:
         func = matrix_box_nambu_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 16], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
@@ -706,7 +855,7 @@ def phase_array_nambu(const int_sp_st[::1] ptr,
                     matrix_add_array_nambu(rr, c, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
@@ -717,7 +866,7 @@ def phase_array_nambu(const int_sp_st[::1] ptr,
                     matrix_add_array_nambu(rr, c, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
@@ -3,6 +3,7 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 # cython: boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
 cimport cython
+from cython.parallel cimport parallel, prange, threadid
 
 import numpy as np
 
@@ -10,7 +11,9 @@ cimport numpy as cnp
 
 from scipy.sparse import csr_matrix
 
-from sisl._indices cimport _index_sorted
+from sisl._threads import get_num_threads
+
+from sisl._indices cimport _index_sorted_range
 
 from sisl._core._sparse import fold_csr_matrix
 
@@ -41,6 +44,7 @@ from ._matrix_utils cimport (
 __all__ = [
     "phase3_csr",
     "phase3_array",
+    "phase3_array_k",
     "phase3_csr_nc",
     "phase3_array_nc",
     "phase3_csr_so",
@@ -86,23 +90,24 @@ def phase3_csr(const int_sp_st[::1] ptr,
 
     cdef floatcomplexs_st d
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
-                    s_idx = _index_sorted(v_col[v_ptr[r]:v_ptr[r] + v_ncol[r]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[r], v_ptr[r] + v_ncol[r], c)
                     d = D[ind, idx]
                     vx[v_ptr[r] + s_idx] += <phases_st> (d * phases[ind, 0])
                     vy[v_ptr[r] + s_idx] += <phases_st> (d * phases[ind, 1])
                     vz[v_ptr[r] + s_idx] += <phases_st> (d * phases[ind, 2])
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
                     s = col[ind] / nr
-                    s_idx = _index_sorted(v_col[v_ptr[r]:v_ptr[r] + v_ncol[r]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[r], v_ptr[r] + v_ncol[r], c)
                     d = D[ind, idx]
                     vx[v_ptr[r] + s_idx] += <phases_st> (d * phases[s, 0])
                     vy[v_ptr[r] + s_idx] += <phases_st> (d * phases[s, 1])
@@ -135,9 +140,10 @@ def phase3_array(const int_sp_st[::1] ptr,
     cdef int_sp_st r, ind, s, c
     cdef floatcomplexs_st d
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
                     d = D[ind, idx]
@@ -146,7 +152,7 @@ def phase3_array(const int_sp_st[::1] ptr,
                     vz[r, c] += <phases_st> (d * phases[ind, 2])
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] % nr
                     s = col[ind] / nr
@@ -158,6 +164,54 @@ def phase3_array(const int_sp_st[::1] ptr,
     return Vx, Vy, Vz
 
 
+def phase3_array_k(const int_sp_st[::1] ptr,
+                   const int_sp_st[::1] ncol,
+                   const int_sp_st[::1] col,
+                   floatcomplexs_st[:, ::1] D,
+                   const int_sp_st idx,
+                   const phases_st[:, :, ::1] phases,
+                   const int_sp_st p_opt,
+                   phases_st[:, :, ::1] vx,
+                   phases_st[:, :, ::1] vy,
+                   phases_st[:, :, ::1] vz):
+    """ Equivalent to `phase3_array` for multiple k-points, ``phases[ik]`` are the phases of the ``ik``'th k-point """
+
+    cdef int_sp_st nr = ncol.shape[0]
+    cdef Py_ssize_t nk = vx.shape[0]
+    cdef Py_ssize_t ik
+
+    # Local columns
+    cdef int_sp_st r, ind, s, c
+    cdef floatcomplexs_st d
+
+    vx[:, :, :] = 0
+    vy[:, :, :] = 0
+    vz[:, :, :] = 0
+
+    cdef int num_threads = get_num_threads()
+    with nogil:
+        if p_opt == 0:
+            for ik in range(nk):
+                for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                    for ind in range(ptr[r], ptr[r] + ncol[r]):
+                        c = col[ind] % nr
+                        d = D[ind, idx]
+                        vx[ik, r, c] += <phases_st> (d * phases[ik, ind, 0])
+                        vy[ik, r, c] += <phases_st> (d * phases[ik, ind, 1])
+                        vz[ik, r, c] += <phases_st> (d * phases[ik, ind, 2])
+
+        else:
+            for ik in range(nk):
+                for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                    for ind in range(ptr[r], ptr[r] + ncol[r]):
+                        c = col[ind] % nr
+                        s = col[ind] / nr
+                        d = D[ind, idx]
+                        vx[ik, r, c] += <phases_st> (d * phases[ik, s, 0])
+                        vy[ik, r, c] += <phases_st> (d * phases[ik, s, 1])
+                        vz[ik, r, c] += <phases_st> (d * phases[ik, s, 2])
+
+
 ###
 # Non-collinear code
 ###
@@ -190,20 +244,25 @@ def phase3_csr_nc(const int_sp_st[::1] ptr,
     cdef int_sp_st s_idx
     cdef floatcomplexs_st *d
     cdef f_matrix_box_nc func
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nc_cmplx
     else:
         func = matrix_box_nc_real
 
-    with nogil:
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
-                    s_idx = _index_sorted(v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
 
@@ -220,13 +279,13 @@ def phase3_csr_nc(const int_sp_st[::1] ptr,
                     matrix_add_csr_nc(v_ptr, rr, s_idx, vz, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
                     s = col[ind] / nr
 
-                    s_idx = _index_sorted(v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
 
@@ -268,16 +327,21 @@ def phase3_array_nc(const int_sp_st[::1] ptr,
     cdef int_sp_st s_idx
     cdef floatcomplexs_st *d
     cdef f_matrix_box_nc func
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nc_cmplx
     else:
         func = matrix_box_nc_real
 
-    with nogil:
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -297,7 +361,7 @@ def phase3_array_nc(const int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, vz, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -353,20 +417,25 @@ def phase3_csr_so(const int_sp_st[::1] ptr,
     cdef int_sp_st s_idx
     cdef f_matrix_box_so func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_so_cmplx
     else:
         func = matrix_box_so_real
 
-    with nogil:
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
-                    s_idx = _index_sorted(v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
 
@@ -383,13 +452,13 @@ def phase3_csr_so(const int_sp_st[::1] ptr,
                     matrix_add_csr_nc(v_ptr, rr, s_idx, vz, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
                     s = col[ind] / nr
 
-                    s_idx = _index_sorted(v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
 
@@ -431,16 +500,21 @@ def phase3_array_so(const int_sp_st[::1] ptr,
     cdef int_sp_st s_idx
     cdef f_matrix_box_so func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_so_cmplx
     else:
         func = matrix_box_so_real
 
-    with nogil:
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -460,7 +534,7 @@ def phase3_array_so(const int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, vz, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 2
@@ -511,20 +585,25 @@ def phase3_csr_nambu(const int_sp_st[::1] ptr,
     cdef int_sp_st s_idx
     cdef f_matrix_box_nambu func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0] * 16
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nambu_cmplx
     else:
         func = matrix_box_nambu_real
 
-    with nogil:
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 16], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
-                    s_idx = _index_sorted(v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
 
@@ -541,13 +620,13 @@ def phase3_csr_nambu(const int_sp_st[::1] ptr,
                     matrix_add_csr_nambu(v_ptr, rr, s_idx, vz, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
                     s = col[ind] / nr
 
-                    s_idx = _index_sorted(v_col[v_ptr[rr]:v_ptr[rr] + v_ncol[rr]], c)
+                    s_idx = _index_sorted_range(v_col, v_ptr[rr], v_ptr[rr] + v_ncol[rr], c)
 
                     d = &D[ind, 0]
 
@@ -589,16 +668,21 @@ def phase3_array_nambu(const int_sp_st[::1] ptr,
     cdef int_sp_st s_idx
     cdef f_matrix_box_nambu func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0] * 16
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nambu_cmplx
     else:
         func = matrix_box_nambu_real
 
-    with nogil:
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 16], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
@@ -618,7 +702,7 @@ def phase3_array_nambu(const int_sp_st[::1] ptr,
                     matrix_add_array_nambu(rr, c, vz, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = (col[ind] % nr) * 4
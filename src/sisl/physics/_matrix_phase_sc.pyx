@@ -3,6 +3,7 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 # cython: boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
 cimport cython
+from cython.parallel cimport parallel, prange, threadid
 
 import numpy as np
 
@@ -10,6 +11,8 @@ cimport numpy as cnp
 
 from scipy.sparse import csr_matrix
 
+from sisl._threads import get_num_threads
+
 from sisl._core._dtypes cimport (
     complexs_st,
     floatcomplexs_st,
@@ -19,7 +22,6 @@ from sisl._core._dtypes cimport (
     type2dtype,
 )
 from sisl._core._sparse cimport ncol2ptr
-from sisl._indices cimport _index_sorted
 
 from ._matrix_utils cimport (
     f_matrix_box_nambu,
@@ -89,20 +91,22 @@ def phase_sc_csr(int_sp_st[::1] ptr,
     v_ncol[:] = ncol[:]
 
     # This abstraction allows to handle non-finalized CSR matrices
-    cind = 0
+    # Pre-calculate the pointers, so that each row is independent
+    ncol2ptr(nr, ncol, v_ptr, 1, 1)
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
-                v_ptr[r] = cind
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                cind = v_ptr[r]
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     v[cind] = <phases_st> D[ind, idx]
                     v_col[cind] = col[ind]
                     cind = cind + 1
 
         elif p_opt == 0:
-            for r in range(nr):
-                v_ptr[r] = cind
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                cind = v_ptr[r]
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     ph = phases[ind]
                     v[cind] = <phases_st> (D[ind, idx] * ph)
@@ -110,16 +114,14 @@ def phase_sc_csr(int_sp_st[::1] ptr,
                     cind = cind + 1
 
         else:
-            for r in range(nr):
-                v_ptr[r] = cind
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
+                cind = v_ptr[r]
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     ph = phases[col[ind] / nr]
                     v[cind] = <phases_st> (D[ind, idx] * ph)
                     v_col[cind] = col[ind]
                     cind = cind + 1
 
-    v_ptr[nr] = cind
-
     return csr_matrix((V, V_COL, V_PTR), shape=(nr, nc))
 
 
@@ -141,20 +143,21 @@ def phase_sc_array(int_sp_st[::1] ptr,
     cdef int_sp_st r, c, ind
     cdef phases_st ph
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     v[r, col[ind]] = <phases_st> D[ind, idx]
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     ph = phases[ind]
                     v[r, col[ind]] = <phases_st> (D[ind, idx] * ph)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     ph = phases[col[ind] / nr]
                     v[r, col[ind]] = <phases_st> (D[ind, idx] * ph)
@@ -189,7 +192,7 @@ def phase_sc_csr_nc(int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_nc func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nc_cmplx
@@ -199,10 +202,17 @@ def phase_sc_csr_nc(int_sp_st[::1] ptr,
     # We have to do it manually due to the double elements per matrix element
     ncol2ptr(nr, ncol, v_ptr, 2, 2)
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 v_ncol[rr] = ncol[r] * 2
                 v_ncol[rr+1] = ncol[r] * 2
@@ -222,7 +232,7 @@ def phase_sc_csr_nc(int_sp_st[::1] ptr,
                     cind = cind + 2
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 v_ncol[rr] = ncol[r] * 2
                 v_ncol[rr+1] = ncol[r] * 2
@@ -243,7 +253,7 @@ def phase_sc_csr_nc(int_sp_st[::1] ptr,
                     cind = cind + 2
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 v_ncol[rr] = ncol[r] * 2
                 v_ncol[rr+1] = ncol[r] * 2
@@ -284,17 +294,24 @@ def phase_sc_array_nc(int_sp_st[::1] ptr,
     cdef int_sp_st r, rr, c, ind
     cdef floatcomplexs_st *d
     cdef f_matrix_box_nc func
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nc_cmplx
     else:
         func = matrix_box_nc_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 2
@@ -304,7 +321,7 @@ def phase_sc_array_nc(int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 2
@@ -315,7 +332,7 @@ def phase_sc_array_nc(int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 2
@@ -359,9 +376,10 @@ def phase_sc_csr_diag(int_sp_st[::1] ptr,
     # one per column
     ncol2ptr(nr, ncol, v_ptr, per_row, 1)
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ir in range(per_row):
                     v_ncol[rr+ir] = ncol[r]
@@ -377,7 +395,7 @@ def phase_sc_csr_diag(int_sp_st[::1] ptr,
                     cind = cind + 1
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ir in range(per_row):
                     v_ncol[rr+ir] = ncol[r]
@@ -394,7 +412,7 @@ def phase_sc_csr_diag(int_sp_st[::1] ptr,
                     cind = cind + 1
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ir in range(per_row):
                     v_ncol[rr+ir] = ncol[r]
@@ -432,9 +450,10 @@ def phase_sc_array_diag(int_sp_st[::1] ptr,
     cdef complexs_st d
     cdef int_sp_st r, rr, c, ind, ic
 
+    cdef int num_threads = get_num_threads()
     with nogil:
         if p_opt == -1:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * per_row
@@ -443,7 +462,7 @@ def phase_sc_array_diag(int_sp_st[::1] ptr,
                         v[rr+ic, c+ic] = d
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * per_row
@@ -452,7 +471,7 @@ def phase_sc_array_diag(int_sp_st[::1] ptr,
                         v[rr+ic, c+ic] = d
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static", num_threads=num_threads, use_threads_if=num_threads > 1):
                 rr = r * per_row
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * per_row
@@ -490,7 +509,7 @@ def phase_sc_csr_so(int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_so func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_so_cmplx
@@ -500,10 +519,17 @@ def phase_sc_csr_so(int_sp_st[::1] ptr,
     # We have to do it manually due to the double elements per matrix element
     ncol2ptr(nr, ncol, v_ptr, 2, 2)
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 v_ncol[rr] = ncol[r] * 2
                 v_ncol[rr+1] = ncol[r] * 2
@@ -523,7 +549,7 @@ def phase_sc_csr_so(int_sp_st[::1] ptr,
                     cind = cind + 2
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 v_ncol[rr] = ncol[r] * 2
                 v_ncol[rr+1] = ncol[r] * 2
@@ -544,7 +570,7 @@ def phase_sc_csr_so(int_sp_st[::1] ptr,
                     cind = cind + 2
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 v_ncol[rr] = ncol[r] * 2
                 v_ncol[rr+1] = ncol[r] * 2
@@ -585,17 +611,24 @@ def phase_sc_array_so(int_sp_st[::1] ptr,
     cdef int_sp_st r, rr, c, ind
     cdef f_matrix_box_so func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0, 0, 0, 0]
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_so_cmplx
     else:
         func = matrix_box_so_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 4], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 2
@@ -605,7 +638,7 @@ def phase_sc_array_so(int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 2
@@ -616,7 +649,7 @@ def phase_sc_array_so(int_sp_st[::1] ptr,
                     matrix_add_array_nc(rr, c, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 2
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 2
@@ -656,7 +689,7 @@ def phase_sc_csr_nambu(int_sp_st[::1] ptr,
     cdef complexs_st ph
     cdef f_matrix_box_nambu func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0] * 16
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nambu_cmplx
@@ -666,10 +699,17 @@ def phase_sc_csr_nambu(int_sp_st[::1] ptr,
     # We have to do it manually due to the quadrouble elements per matrix element
     ncol2ptr(nr, ncol, v_ptr, 4, 4)
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 16], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 v_ncol[rr] = ncol[r] * 4
                 v_ncol[rr+1] = ncol[r] * 4
@@ -693,7 +733,7 @@ def phase_sc_csr_nambu(int_sp_st[::1] ptr,
                     cind = cind + 4
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 v_ncol[rr] = ncol[r] * 4
                 v_ncol[rr+1] = ncol[r] * 4
@@ -718,7 +758,7 @@ def phase_sc_csr_nambu(int_sp_st[::1] ptr,
                     cind = cind + 4
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 v_ncol[rr] = ncol[r] * 4
                 v_ncol[rr+1] = ncol[r] * 4
@@ -763,17 +803,24 @@ def phase_sc_array_nambu(int_sp_st[::1] ptr,
     cdef int_sp_st r, rr, c, ind
     cdef f_matrix_box_nambu func
     cdef floatcomplexs_st *d
-    cdef complexs_st *M = [0] * 16
+    cdef complexs_st *M
 
     if floatcomplexs_st in complexs_st:
         func = matrix_box_nambu_cmplx
     else:
         func = matrix_box_nambu_real
 
-    with nogil:
+    # constant phase for p_opt == -1
+    ph = 1. + 0j
+
+    cdef int num_threads = get_num_threads()
+    # work array of each thread
+    cdef complexs_st[:, ::1] work = np.empty([num_threads, 16], dtype=dtype)
+    with nogil, parallel(num_threads=num_threads, use_threads_if=num_threads > 1):
+        M = &work[threadid(), 0]
+
         if p_opt == -1:
-            ph = 1. + 0j
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 4
@@ -783,7 +830,7 @@ def phase_sc_array_nambu(int_sp_st[::1] ptr,
                     matrix_add_array_nambu(rr, c, v, M)
 
         elif p_opt == 0:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 4
@@ -794,7 +841,7 @@ def phase_sc_array_nambu(int_sp_st[::1] ptr,
                     matrix_add_array_nambu(rr, c, v, M)
 
         else:
-            for r in range(nr):
+            for r in prange(nr, schedule="static"):
                 rr = r * 4
                 for ind in range(ptr[r], ptr[r] + ncol[r]):
                     c = col[ind] * 4
@@ -0,0 +1,103 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from weakref import ref
+
+from sisl._core._sparse import fold_csr_matrix, fold_csr_matrix_index
+
+__all__ = ["FoldPlan"]
+
+
+class FoldPlan:
+    r"""Assembly plan for folding a supercell sparse matrix into the primary unit-cell
+
+    Creating a matrix at a given :math:`\mathbf k` requires the supercell
+    columns to be folded into the unit-cell columns.
+    The folded sparsity pattern only depends on the sparsity pattern of the
+    supercell matrix, and not on the k-point.
+    This plan stores the folded sparsity pattern together with the position of each
+    supercell element in the folded data.
+    Subsequent k-points then only need to calculate the phases and scatter the
+    data into the folded data array.
+
+    The plan is only usable for the sparse matrix it was created from, and only
+    as long as its sparsity pattern is unchanged, see `is_valid`.
+
+    Parameters
+    ----------
+    csr : SparseCSR
+        a finalized sparse matrix to create the plan for
+    """
+
+    __slots__ = (
+        "_ptr",
+        "_ncol",
+        "_col",
+        "_shape",
+        "_revision",
+        "indptr",
+        "indices",
+        "index",
+    )
+
+    def __init__(self, csr):
+        if not csr.finalized:
+            raise ValueError(
+                f"{self.__class__.__name__} requires a finalized sparse matrix"
+            )
+
+        # Keep weak references to the arrays describing the sparsity pattern.
+        # Any change to the sparsity pattern either replaces these arrays,
+        # or un-finalizes the matrix.
+        self._ptr = ref(csr.ptr)
+        self._ncol = ref(csr.ncol)
+        self._col = ref(csr.col)
+        self._shape = csr.shape[:2]
+        # in-place changes (e.g. translate_columns) are tracked by the revision
+        self._revision = csr._pattern_revision
+
+        indptr, ncol, indices = fold_csr_matrix(csr.ptr, csr.ncol, csr.col)
+        self.indptr = indptr
+        """ int-array, pointer array of the folded matrix """
+        self.indices = indices
+        """ int-array, column indices of the folded matrix """
+        self.index = fold_csr_matrix_index(
+            csr.ptr, csr.ncol, csr.col, indptr, ncol, indices
+        )
+        """ int-array, index of each sparse element in the folded data """
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the folded matrix"""
+        nr = len(self.indptr) - 1
+        return (nr, nr)
+
+    @property
+    def nnz(self) -> int:
+        """Number of non-zero elements in the folded matrix"""
+        return len(self.indices)
+
+    def is_valid(self, csr) -> bool:
+        """Whether this plan still represents the sparsity pattern of `csr`
+
+        Any change of the sparsity pattern made through the methods of `csr`
+        invalidates the plan.
+
+        Parameters
+        ----------
+        csr : SparseCSR
+            the sparse matrix to check against
+        """
+        return (
+            csr.finalized
+            and self._shape == csr.shape[:2]
+            and self._revision == csr._pattern_revision
+            and self._ptr() is csr.ptr
+            and self._ncol() is csr.ncol
+            and self._col() is csr.col
+        )
+
+    def __repr__(self) -> str:
+        return f"<{self.__module__}.{self.__class__.__name__} shape={self.shape}, nnz={self.nnz}>"
@@ -4,7 +4,9 @@
 cimport cython
 from libc.math cimport fabs, fabsf
 
-from numpy import complex64, complex128, dot, exp, float32, float64, ndarray, ones, pi
+from numpy import ascontiguousarray, complex64, complex128, dot
+from numpy import dtype as np_dtype
+from numpy import exp, float32, float64, ndarray, ones, pi, zeros
 
 from sisl._core._dtypes cimport floats_st
 
@@ -79,3 +81,29 @@ def phase_rij(rij, sc, const floats_st[::1] k, dtype):
         phases = exp(1j * dot(rij, dot(k, sc.rcell))).astype(dtype, copy=False)
 
     return phases
+
+
+def phase_dtype_k(const floats_st[:, ::1] K, M_dtype, R_dtype, force_complex: bool=False):
+    """ Equivalent to `phase_dtype` for multiple k-points """
+    cdef Py_ssize_t ik
+    for ik in range(K.shape[0]):
+        if not is_gamma(K[ik]):
+            return phase_dtype(K[ik], M_dtype, R_dtype, force_complex)
+    return phase_dtype(zeros(3), M_dtype, R_dtype, force_complex)
+
+
+def _phase_k_cast(phases, dtype):
+    if np_dtype(dtype).kind != "c":
+        # only Gamma-points, so the imaginary part is 0
+        phases = phases.real
+    return ascontiguousarray(phases, dtype=dtype)
+
+
+def phase_rsc_k(sc, K, dtype):
+    """ Calculate the phases for the supercell interactions for multiple k-points, shape ``(nk, n_s)`` """
+    return _phase_k_cast(exp((2j * pi) * dot(K, sc.sc_off.T)), dtype)
+
+
+def phase_rij_k(rij, sc, K, dtype):
+    """ Calculate the phases for the distance matrix for multiple k-points, shape ``(nk, nnz)`` """
+    return _phase_k_cast(exp(1j * dot(dot(K, sc.rcell), rij.T)), dtype)
@@ -82,6 +82,36 @@ to use `~sisl.oplist` to handle cases of `BrillouinZone.apply.average` and `Bril
 
 Which does mathematical operations (averaging/summing) using `~sisl.oplist`.
 
+For many k-points, the results of ``array`` and ``xarray`` may not fit in memory.
+Instead the values may be streamed to a file, as they are calculated:
+
+>>> bs = si.BandStructure(H, [[0, 0, 0], [0.5, 0, 0]], 1000000)
+>>> bs_eig = bs.apply.renew(out="eig.npy").array.eigh()
+
+A ``.npy`` file will be memory-mapped, and the returned array is a read-only
+`numpy.memmap` of the file. A ``.nc`` file stores the values in a NetCDF
+variable (chunked per k-point), and the returned array is a lazily loaded
+`xarray.DataArray`. Complex values can only be stored in NetCDF files with
+``netCDF4>=1.7``. With ``unzip=True`` the ``.npy`` files are suffixed with
+the index of the values, i.e. ``eig_0.npy`` and ``eig_1.npy``.
+
+Long running ``average`` and ``sum`` calculations may be checkpointed, so they
+can be resumed after an interruption:
+
+>>> DOS = mp.apply.renew(checkpoint="DOS.ckpt").average.eigenstate(wrap=wrap_DOS)
+
+The completed k-points and the partially accumulated value are stored in
+the checkpoint file (at most every ``checkpoint_interval`` seconds, default 60,
+and when the calculation is interrupted by an error).
+Re-running the same calculation (same k-points, parent, method, arguments and ``wrap``)
+will continue from the checkpoint. The checkpoint file is removed once the calculation
+finishes.
+For functions, the code, default arguments and closure variables of ``wrap`` identify
+the calculation, so a ``wrap`` closing over mutable state (e.g. a counter) will not
+resume. Checkpointing requires these (or ``wrap`` itself) to be picklable.
+The checkpoint file is read with `pickle.load`, which may execute arbitrary code,
+so only resume from checkpoint files you have created yourself.
+
 
 Parallel calculations
 ---------------------
@@ -130,6 +160,34 @@ The ``Pool`` should implement some standard methods that are
 existing in the ``pathos`` enviroment such as ``Pool.restart`` and ``Pool.terminate``
 and ``imap`` and ``uimap`` methods. See the ``pathos`` documentation for details.
 
+The ``pathos`` pools pickle the parent object for every chunk of k-points, which
+may be costly for large systems. Instead one may use a pool based on the standard
+library which shares the parent through shared memory:
+
+>>> with mp.apply.renew(pool="shm:4") as par:
+...     par.eigh()
+
+Here the arrays of the parent (sparse matrix and geometry) are published once in
+shared memory, and the workers attach them without copying. For ``array`` the
+workers write their values directly in a shared output array.
+Using ``pool="shm"`` will use the default number of processors.
+Note that ``wrap`` functions are only called in the workers if they
+can be pickled (e.g. module level functions), otherwise they will be called in the main process.
+
+Since LAPACK routines release the GIL, threads may also be used (no new processes, nor
+pickling):
+
+>>> with mp.apply.renew(pool="threads:4") as par:
+...     par.eigh()
+
+The available CPUs are split between the k-point threads and the BLAS threads
+(requires ``threadpoolctl``). To control the split and inspect the time
+spent per k-point, pass a `~sisl.physics.ThreadPool` instead:
+
+>>> pool = si.physics.ThreadPool(4, blas_threads=2)
+>>> eigs = mp.apply.renew(pool=pool).array.eigh()
+>>> pool.timings
+
 Finally, the performance of the parallel pools are generally very dependent
 on the chunksize of the jobs. By default the chunksize is controlled by
 ``SISL_PAR_CHUNKSIZE``, and playing with this can heavily impact performance.
@@ -3,8 +3,9 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from numbers import Integral
-from typing import Literal, Optional
+from typing import Literal, Optional, Union
 
 import numpy as np
 from numpy import add, dot, logical_and, repeat, subtract, unique
@@ -15,13 +16,17 @@ from scipy.sparse import tril, triu
 import sisl._array as _a
 from sisl import BoundaryCondition as BC
 from sisl import Geometry, Grid, Lattice
+from sisl._core._spatial_index import SpatialIndex
 from sisl._core.sparse import SparseCSR, _ncol_to_indptr
 from sisl._core.sparse_geometry import SparseOrbital
 from sisl._indices import indices_fabs_le, indices_le
 from sisl._internal import set_module
 from sisl._math_small import xyz_to_spherical_cos_phi
+from sisl._threads import get_num_threads
 from sisl.messages import deprecate_argument, progressbar, warn
 from sisl.typing import GaugeType, KPoint
+from sisl.utils import size_to_elements
+from sisl.utils.mathematics import fnorm
 
 from .sparse import SparseOrbitalBZSpin, _get_spin
 from .spin import Spin
@@ -29,6 +34,35 @@ from .spin import Spin
 __all__ = ["DensityMatrix"]
 
 
+def _xyz2sphericalR(xyz, offset, R):
+    """Spherical coordinates of the points `xyz` within `R` of `offset` (and their indices)"""
+    rx = xyz[:, 0] - offset[0]
+    idx = indices_fabs_le(rx, R)
+    ry = xyz[idx, 1] - offset[1]
+    ix = indices_fabs_le(ry, R)
+    ry = ry[ix]
+    idx = idx[ix]
+    rz = xyz[idx, 2] - offset[2]
+    ix = indices_fabs_le(rz, R)
+    ry = ry[ix]
+    rz = rz[ix]
+    idx = idx[ix]
+    if len(idx) == 0:
+        return [], [], [], []
+    rx = rx[idx]
+
+    # Calculate radius ** 2
+    ix = indices_le(rx**2 + ry**2 + rz**2, R**2)
+    idx = idx[ix]
+    if len(idx) == 0:
+        return [], [], [], []
+    rx = rx[ix]
+    ry = ry[ix]
+    rz = rz[ix]
+    xyz_to_spherical_cos_phi(rx, ry, rz)
+    return idx, rx, ry, rz
+
+
 class _densitymatrix(SparseOrbitalBZSpin):
 
     def mulliken(self, projection: Literal["orbital", "atom"] = "orbital"):
@@ -140,7 +174,9 @@ class _densitymatrix(SparseOrbitalBZSpin):
         spinor=None,
         atol: float = 1e-7,
         eta: Optional[bool] = False,
-        method: Literal["pre-compute", "direct"] = "pre-compute",
+        method: Literal["pre-compute", "direct", "blocked"] = "pre-compute",
+        memory: Union[int, str] = "200MB",
+        basis_grid=None,
         **kwargs,
     ):
         r"""Expand the density matrix to the charge density on a grid
@@ -185,6 +221,18 @@ class _densitymatrix(SparseOrbitalBZSpin):
            It determines if the orbital values are computed on the fly (direct) or they are all pre-computed
            on the grid at the beginning (pre-compute).
            Pre computing orbitals results in a faster computation, but it requires more memory.
+           The blocked method splits the grid into blocks, and only pre-computes the orbitals
+           overlapping each block. The blocks are calculated in parallel threads
+           (see ``SISL_NUM_THREADS``) while keeping the memory below `memory`.
+        memory:
+           the maximum memory used for the orbital values in the blocked method (shared by all
+           threads), either in bytes or a string with units, e.g. ``"1GB"``.
+        basis_grid : SparseGridOrbitalBZ or str, optional
+           pre-computed orbital values on the grid (or a file written with
+           `~sisl.SparseGridOrbitalBZ.write`) for the pre-compute method.
+           When calculating the density of many density matrices with the same geometry
+           and grid, the orbital values are then only calculated once, see
+           `~sisl.SparseGridOrbitalBZ.from_geometry`.
 
         Notes
         -----
@@ -196,9 +244,27 @@ class _densitymatrix(SparseOrbitalBZSpin):
         # same result.
         uc_dm = self.translate2uc()
 
+        if basis_grid is not None and method != "pre-compute":
+            raise ValueError(
+                f"{self.__class__.__name__}.density can only use basis_grid with method='pre-compute'."
+            )
+
         if method == "pre-compute":
-            # Compute orbital values on the grid
-            psi_values = uc_dm.geometry._orbital_values(grid.shape)
+            if basis_grid is None:
+                # Compute orbital values on the grid
+                psi_values = uc_dm.geometry._orbital_values(grid.shape)
+            else:
+                from sisl._sparse_grid import SparseGridOrbitalBZ
+
+                if isinstance(basis_grid, SparseGridOrbitalBZ):
+                    psi_values = basis_grid
+                else:
+                    psi_values = SparseGridOrbitalBZ.read(basis_grid, uc_dm.geometry)
+                if not psi_values.is_compatible(uc_dm.geometry, grid.shape):
+                    raise ValueError(
+                        f"{self.__class__.__name__}.density got a basis_grid calculated "
+                        "for another geometry or grid shape."
+                    )
 
             # Here we just set the nsc to whatever the psi values have.
             # If the nsc is bigger in the DM, then some elements of the DM will be discarded.
@@ -284,6 +350,13 @@ class _densitymatrix(SparseOrbitalBZSpin):
                 )
         elif method == "direct":
             self._density_direct(grid, csrDM, atol=atol, eta=eta)
+        elif method == "blocked":
+            uc_dm._density_blocked(grid, csrDM, atol=atol, eta=eta, memory=memory)
+        else:
+            raise ValueError(
+                f"{self.__class__.__name__}.density got unknown method={method}, "
+                "should be one of [pre-compute, direct, blocked]."
+            )
 
     def _density_direct(
         self, grid: Grid, csrDM, atol: float = 1e-7, eta: Optional[bool] = None
@@ -394,34 +467,6 @@ class _densitymatrix(SparseOrbitalBZSpin):
             xyz_to_spherical_cos_phi(rx, ry, rz)
             return rx, ry, rz
 
-        def xyz2sphericalR(xyz, offset, R):
-            """Calculate the spherical coordinates from indices"""
-            rx = xyz[:, 0] - offset[0]
-            idx = indices_fabs_le(rx, R)
-            ry = xyz[idx, 1] - offset[1]
-            ix = indices_fabs_le(ry, R)
-            ry = ry[ix]
-            idx = idx[ix]
-            rz = xyz[idx, 2] - offset[2]
-            ix = indices_fabs_le(rz, R)
-            ry = ry[ix]
-            rz = rz[ix]
-            idx = idx[ix]
-            if len(idx) == 0:
-                return [], [], [], []
-            rx = rx[idx]
-
-            # Calculate radius ** 2
-            ix = indices_le(rx**2 + ry**2 + rz**2, R**2)
-            idx = idx[ix]
-            if len(idx) == 0:
-                return [], [], [], []
-            rx = rx[ix]
-            ry = ry[ix]
-            rz = rz[ix]
-            xyz_to_spherical_cos_phi(rx, ry, rz)
-            return idx, rx, ry, rz
-
         # Looping atoms in the sparse pattern is better since we can pre-calculate
         # the radial parts and then add them.
         # First create a SparseOrbital matrix, then convert to SparseAtom
@@ -508,7 +553,7 @@ class _densitymatrix(SparseOrbitalBZSpin):
                 ja_xyz = axyz(ja) + cell_offset
 
                 # Reduce the ia'th grid points to those that connects to the ja'th atom
-                ja_idx, ja_r, ja_theta, ja_cos_phi = xyz2sphericalR(
+                ja_idx, ja_r, ja_theta, ja_cos_phi = _xyz2sphericalR(
                     grid_xyz, ja_xyz, jR
                 )
 
@@ -614,6 +659,197 @@ class _densitymatrix(SparseOrbitalBZSpin):
         # Reset the error code for division
         np.seterr(**old_err)
 
+    def _density_blocked(
+        self,
+        grid: Grid,
+        csrDM,
+        atol: float = 1e-7,
+        eta: Optional[bool] = None,
+        memory: Union[int, str] = "200MB",
+    ):
+        r"""Compute the density in blocks of grid points, in parallel threads
+
+        For each block the values of the orbitals overlapping the block are calculated,
+        :math:`\boldsymbol\phi`, and the density of the block is contracted
+        with the density matrix elements between these orbitals
+
+        .. math::
+            \boldsymbol\rho(\mathbf r) = \sum_{ij}\phi_i(\mathbf r)\mathbf D_{ij}\phi_j(\mathbf r)
+
+        The blocks are split until the orbital values fit in the memory.
+
+        Parameters
+        ----------
+        grid :
+           the grid on which to add the density (the density is in ``e/Ang^3``)
+        csrDM : scipy.sparse.csr_matrix
+           the density matrix elements to expand, of shape ``(no, no_s)``
+        atol :
+           DM tolerance for accepted values
+        eta :
+           show a progressbar on stdout
+        memory :
+           maximum memory of the orbital values for all threads
+        """
+        geometry = self.geometry
+        no = geometry.no
+        n_threads = get_num_threads()
+        # Memory for the orbital values and their product with the DM, per thread
+        max_elements = max(1, size_to_elements(memory, 16) // n_threads)
+
+        csrDM = csr_matrix(csrDM)
+        csrDM.data = np.where(np.fabs(csrDM.data) > atol, csrDM.data, 0.0)
+        csrDM.eliminate_zeros()
+
+        # Retrieve all atoms within the grid supercell
+        # (and the neighbors that connect into the cell)
+        lattice = grid.lattice.copy()
+        pbc = [
+            bc == BC.PERIODIC or geometry.nsc[i] > 1
+            for i, bc in enumerate(grid.lattice.boundary_condition[:, 0])
+        ]
+        add_R = _a.fulld(3, geometry.maxR())
+        o = lattice.to.Cuboid(orthogonal=True)
+        lattice = Lattice(o._v + np.diag(2 * add_R), origin=o.origin - add_R)
+        IA, XYZ, ISC = geometry.within_inf(lattice, periodic=pbc)
+        XYZ -= grid.lattice.origin.reshape(1, 3)
+
+        R = geometry.atoms.maxR(all=True)[IA]
+        if np.any(R <= 0.0):
+            warn(
+                f"{self.__class__.__name__}.density skips atoms without wave-functions."
+            )
+            idx = (R > 0.0).nonzero()[0]
+            IA, XYZ, ISC, R = IA[idx], XYZ[idx], ISC[idx], R[idx]
+        if len(IA) == 0:
+            return
+        index = SpatialIndex(XYZ, bin_size=R.max())
+        n_orbs = geometry.atoms.lasto[IA] - geometry.atoms.firsto[IA] + 1
+
+        # Keys of the orbitals of the atoms (unit-cell orbital and supercell offset)
+        isc_min = ISC.min(0) - geometry.nsc // 2
+        isc_dims = ISC.max(0) - isc_min + geometry.nsc // 2 + 1
+
+        def orbital_keys(io, isc):
+            return np.ravel_multi_index((isc - isc_min).T, isc_dims) * no + io
+
+        dcell = grid.dcell
+        corners = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+
+        def atoms_in_block(block):
+            """Atoms (indices in IA) overlapping with the grid points in `block`"""
+            lo = np.array([sl.start for sl in block])
+            hi = np.array([sl.stop - 1 for sl in block])
+            xyz = (lo + corners * (hi - lo)) @ dcell
+            center = xyz.mean(0)
+            radius = np.sqrt(((xyz - center) ** 2).sum(1).max())
+            atoms = index.candidates(center, radius + R.max())
+            dist = np.sqrt(((XYZ[atoms] - center) ** 2).sum(1))
+            return atoms[dist <= radius + R[atoms] + 1e-8]
+
+        def n_points(block):
+            return np.prod([sl.stop - sl.start for sl in block])
+
+        def halve(block):
+            """Split the longest side of `block` in two"""
+            lengths = [
+                (sl.stop - sl.start) * fnorm(d) if sl.stop - sl.start > 1 else 0.0
+                for sl, d in zip(block, dcell)
+            ]
+            axis = int(np.argmax(lengths))
+            sl = block[axis]
+            mid = (sl.start + sl.stop) // 2
+            first, second = list(block), list(block)
+            first[axis] = slice(sl.start, mid)
+            second[axis] = slice(mid, sl.stop)
+            return tuple(first), tuple(second)
+
+        def split(block):
+            """Split `block` until the orbital values fit in the memory"""
+            atoms = atoms_in_block(block)
+            size = n_points(block)
+            if size == 1 or size * n_orbs[atoms].sum() <= max_elements:
+                return [(block, atoms)]
+            first, second = halve(block)
+            return split(first) + split(second)
+
+        blocks = split(tuple(slice(0, n) for n in grid.shape))
+        while n_threads > 1 and len(blocks) < 4 * n_threads:
+            # more blocks than threads for load balancing
+            costs = [n_points(block) * n_orbs[atoms].sum() for block, atoms in blocks]
+            i = int(np.argmax(costs))
+            if n_points(blocks[i][0]) == 1:
+                break
+            blocks[i : i + 1] = [(b, atoms_in_block(b)) for b in halve(blocks[i][0])]
+
+        def calc_block(block, atoms):
+            """Add the density of the grid points in `block`"""
+            shape = [sl.stop - sl.start for sl in block]
+            idx = np.stack(
+                np.meshgrid(
+                    *[np.arange(sl.start, sl.stop) for sl in block], indexing="ij"
+                ),
+                axis=-1,
+            ).reshape(-1, 3)
+            grid_xyz = idx @ dcell
+            del idx
+
+            # Values of all orbitals overlapping the block
+            psi = np.zeros([n_orbs[atoms].sum(), len(grid_xyz)])
+            i = 0
+            for a in atoms:
+                atom = geometry.atoms[IA[a]]
+                a_idx, a_r, a_theta, a_cos_phi = _xyz2sphericalR(grid_xyz, XYZ[a], R[a])
+                if len(a_idx) > 0:
+                    for o in atom.orbitals:
+                        o_idx = indices_le(a_r, o.R)
+                        psi[i, a_idx[o_idx]] = o.psi_spher(
+                            a_r[o_idx], a_theta[o_idx], a_cos_phi[o_idx], cos_phi=True
+                        )
+                        i += 1
+                else:
+                    i += atom.no
+            del grid_xyz
+
+            # The density matrix elements between the orbitals of the block
+            IO = geometry.atoms.firsto[IA[atoms]]
+            io = _a.array_arange(IO, n=n_orbs[atoms])
+            isc = np.repeat(ISC[atoms], n_orbs[atoms], axis=0)
+            keys = orbital_keys(io, isc)
+            order = np.argsort(keys)
+            keys = keys[order]
+
+            D = csrDM[io].tocoo()
+            js, jo = np.divmod(D.col, no)
+            jkeys = orbital_keys(jo, isc[D.row] + geometry.sc_off[js])
+            col = np.searchsorted(keys, jkeys).clip(max=len(keys) - 1)
+            found = keys[col] == jkeys
+            D = csr_matrix(
+                (D.data[found], (D.row[found], order[col[found]])),
+                shape=(len(io), len(io)),
+            )
+
+            rho = np.einsum("ij,ij->j", psi, D @ psi)
+            grid.grid[block] += rho.reshape(shape)
+
+        eta = progressbar(
+            len(blocks), f"{self.__class__.__name__}.density", "block", eta
+        )
+
+        old_err = np.seterr(divide="ignore", invalid="ignore")
+        try:
+            if n_threads > 1 and len(blocks) > 1:
+                with ThreadPoolExecutor(n_threads) as pool:
+                    for _ in pool.map(lambda b: calc_block(*b), blocks):
+                        eta.update()
+            else:
+                for block in blocks:
+                    calc_block(*block)
+                    eta.update()
+        finally:
+            np.seterr(**old_err)
+        eta.close()
+
 
 @set_module("sisl.physics")
 class DensityMatrix(_densitymatrix):
@@ -102,6 +102,11 @@ class DynamicalMatrix(SparseOrbitalBZ):
            return in `numpy.ndarray` (`'array'`/`'dense'`/`'matrix'`).
            Prefixing with 'sc:', or simply 'sc' returns the matrix in supercell format
            with phases.
+        out : numpy.ndarray or scipy.sparse.csr_matrix, optional
+           store the dynamical matrix in this (pre-allocated) matrix, only for `format`
+           ``'csr'`` (finalized matrices) and ``'array'``.
+           A sparse `out` matrix must be returned from a prior call, see `assembly_plan`.
+           A `ValueError` is raised if `out` cannot be used.
 
         See Also
         --------
@@ -42,9 +42,10 @@ automatically passes the correct ``S`` because it knows the states :math:`\mathb
    EigenstateElectron
 
 """
+
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from functools import reduce
 from typing import TYPE_CHECKING, Any, Literal, Optional, Union
 
@@ -1357,15 +1358,23 @@ def wavefunction(
     where :math:`j` is the orbital index and :math:`\mathbf r_j` is the orbital position.
 
 
+    Several states can be projected at once by passing a list of grids, one for each state.
+    The orbital values are then only calculated once and contracted with all states:
+
+    >>> grids = [Grid(...) for _ in range(len(states))]
+    >>> wavefunction(states, grids)
+
     Parameters
     ----------
     v : array_like
        coefficients for the orbital expansion on the real-space grid.
        If `v` is a complex array then the `grid` *must* be complex as well. The coefficients
        must be using the *lattice* gauge.
-    grid : Grid
+    grid : Grid or sequence of Grid
        grid on which the wavefunction will be plotted.
        If multiple eigenstates are in this object, they will be summed.
+       If a sequence of grids (with the same lattice and shape), each state in `v`
+       is added to its own grid (``v.shape[0]`` must equal the number of grids).
     geometry : Geometry, optional
        geometry where the orbitals are defined. This geometry's orbital count must match
        the number of elements in `v`.
@@ -1396,6 +1405,21 @@ def wavefunction(
                 f"wavefunction: k passed and k in info does not match: {k} and {v.info.get('k')}"
             )
         v = v.state
+    batched = not isinstance(grid, Grid)
+    if batched:
+        grids = list(grid)
+        if len(grids) == 0:
+            raise ValueError("wavefunction: requires at least one grid.")
+        if not all(isinstance(g, Grid) for g in grids):
+            raise ValueError("wavefunction: requires a Grid, or a sequence of Grid.")
+        grid = grids[0]
+        for g in grids[1:]:
+            if g.shape != grid.shape or not g.lattice.equal(grid.lattice):
+                raise ValueError(
+                    "wavefunction: all grids must have the same shape and lattice."
+                )
+    else:
+        grids = [grid]
     if geometry is None:
         geometry = grid.geometry
     if geometry is None:
@@ -1416,33 +1440,45 @@ def wavefunction(
             "Translating all into the primary unit cell could disable this information"
         )
 
-    # In case the user has passed several vectors we sum them to plot the summed state
-    if v.ndim == 2:
-        if v.shape[0] > 1:
-            info(
-                f"wavefunction: summing {v.shape[0]} different state coefficients, will continue silently!"
+    v = np.asarray(v)
+    if batched:
+        # one state per grid
+        if v.ndim == 1:
+            v = v.reshape(1, -1)
+        if v.ndim != 2 or v.shape[0] != len(grids):
+            raise ValueError(
+                f"wavefunction: requires one state per grid, got {len(grids)} grids "
+                f"and coefficients with shape {v.shape}."
             )
-        v = v.sum(0)
+    else:
+        # In case the user has passed several vectors we sum them to plot the summed state
+        if v.ndim == 2:
+            if v.shape[0] > 1:
+                info(
+                    f"wavefunction: summing {v.shape[0]} different state coefficients, will continue silently!"
+                )
+            v = v.sum(0)
+        v = v.reshape(1, -1)
 
     if spin is None:
-        if len(v) // 2 == geometry.no:
+        if v.shape[1] // 2 == geometry.no:
             # the input corresponds to a non-collinear calculation
-            v = v.reshape(-1, 2)[:, spinor]
+            v = v.reshape(len(v), -1, 2)[..., spinor]
             info(
                 "wavefunction: assumes the input wavefunction coefficients to originate from a non-colinear calculation!"
             )
-        elif len(v) // 4 == geometry.no:
+        elif v.shape[1] // 4 == geometry.no:
             # the input corresponds to a NAMBU calculation
-            v = v.reshape(-1, 4)[:, spinor]
+            v = v.reshape(len(v), -1, 4)[..., spinor]
             info(
                 "wavefunction: assumes the input wavefunction coefficients to originatefrom a nambu calculation!"
             )
 
     elif spin.kind > Spin.POLARIZED:
         # For non-colinear+nambu cases the user selects the spinor component.
-        v = v.reshape(-1, spin.spinor)[:, spinor]
+        v = v.reshape(len(v), -1, spin.spinor)[..., spinor]
 
-    if len(v) != geometry.no:
+    if v.shape[1] != geometry.no:
         raise ValueError(
             "wavefunction: require wavefunction coefficients corresponding to number of orbitals in the geometry."
         )
@@ -1459,16 +1495,11 @@ def wavefunction(
     # complex valued.
     # Likewise if a k-point has been passed.
     is_complex = np.iscomplexobj(v) or has_k
-    if is_complex and not np.iscomplexobj(grid.grid):
+    if is_complex and not all(np.iscomplexobj(g.grid) for g in grids):
         raise SislError(
             "wavefunction: input coefficients are complex, while grid only contains real."
         )
 
-    if is_complex:
-        psi_init = _a.zerosz
-    else:
-        psi_init = _a.zerosd
-
     # Extract sub variables used throughout the loop
     shape = _a.asarrayi(grid.shape)
     dcell = grid.dcell
@@ -1573,11 +1604,13 @@ def wavefunction(
         bc == BC.PERIODIC or geometry.nsc[i] > 1
         for i, bc in enumerate(grid.lattice.boundary_condition[:, 0])
     ]
-    if grid.geometry is None:
+    if any(g.geometry is None for g in grids):
         # Create the actual geometry that encompass the grid
         ia, xyz, _ = geometry.within_inf(lattice, periodic=pbc)
         if len(ia) > 0:
-            grid.set_geometry(Geometry(xyz, geometry.atoms[ia], lattice=lattice))
+            for g in grids:
+                if g.geometry is None:
+                    g.set_geometry(Geometry(xyz, geometry.atoms[ia], lattice=lattice))
 
     # Instead of looping all atoms in the supercell we find the exact atoms
     # and their supercell indices.
@@ -1668,8 +1701,11 @@ def wavefunction(
         if has_k:
             phase = exp(1j * phk.dot(isc))
 
-        # Allocate a temporary array where we add the psi elements
-        psi = psi_init(n)
+        # Allocate a temporary array where we store the orbital values, these
+        # are contracted with all states at once.
+        phi_o = _a.zerosd([atom.no, n])
+        coeff = v[:, io : io + atom.no] * phase
+        jo = 0
 
         # Loop on orbitals on this atom, grouped by radius
         for os in atom.iter(True):
@@ -1681,7 +1717,7 @@ def wavefunction(
                     f"wavefunction: Orbital(s) '{os}' does not have a wave-function, skipping orbital!"
                 )
                 # Skip these orbitals
-                io += len(os)
+                jo += len(os)
                 continue
 
             # Downsize to the correct indices
@@ -1700,21 +1736,21 @@ def wavefunction(
 
             # Loop orbitals with the same radius
             for o in os:
-                # Evaluate psi component of the wavefunction and add it for this atom
-                psi[idx1] += o.psi_spher(r1, theta1, phi1, cos_phi=True) * (
-                    v[io] * phase
-                )
-                io += 1
+                # Evaluate psi component of the orbital for this atom
+                phi_o[jo, idx1] = o.psi_spher(r1, theta1, phi1, cos_phi=True)
+                jo += 1
 
         # Clean-up
         del idx1, r1, theta1, phi1, idx, r, theta, phi
 
-        # Convert to correct shape and add the current atom contribution to the wavefunction
-        psi = psi.reshape(idxM - idxm)
-        grid.grid[idxm[0] : idxM[0], idxm[1] : idxM[1], idxm[2] : idxM[2]] += psi
+        # Contract all states with the orbital values, and add the
+        # current atom contribution to the wavefunctions
+        psi = (coeff @ phi_o).reshape(-1, *(idxM - idxm))
+        for g, psi_s in zip(grids, psi):
+            g.grid[idxm[0] : idxM[0], idxm[1] : idxM[1], idxm[2] : idxM[2]] += psi_s
 
         # Clean-up
-        del psi
+        del psi, phi_o
 
         # Step progressbar
         eta.update()
@@ -1833,6 +1869,10 @@ class _electron_State:
 
         See `~sisl.physics.electron.wavefunction` for argument details, the arguments not present
         in this method are automatically passed from this object.
+
+        If `grid` is a sequence of grids, each state is expanded on its own grid
+        (there must be one grid per state). The orbital values are only calculated
+        once for all states.
         """
         spin = getattr(self.parent, "spin", None)
 
@@ -1841,7 +1881,12 @@ class _electron_State:
         else:
             geometry = getattr(self.parent, "geometry", None)
 
-        if not isinstance(grid, Grid):
+        if isinstance(grid, Grid):
+            pass
+        elif isinstance(grid, Sequence) and all(isinstance(g, Grid) for g in grid):
+            # one grid per state
+            pass
+        else:
             # probably the grid is a Real, or a tuple that denotes the shape
             # at least this makes it easier to parse
             grid = Grid(grid, geometry=geometry, dtype=self.dtype)
@@ -327,6 +327,7 @@ class EnergyDensityMatrix(_densitymatrix):
 
         for i in range(self.spin.spinor):
             self._csr._D[:, i].real += DM._csr._D[:, i].real * E[i]
+        self._csr._revision += 1
 
     @staticmethod
     def read(sile, *args, **kwargs):
@@ -3,13 +3,22 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 from __future__ import annotations
 
+from typing import Optional, Union
+
 import numpy as np
+import numpy.typing as npt
 
 import sisl._array as _a
 from sisl._internal import set_module
-from sisl.typing import GaugeType, KPoint
-
-from ._common import comply_gauge
+from sisl.typing import (
+    GaugeType,
+    KPoint,
+    ProjectionTypeHadamard,
+    ProjectionTypeHadamardAtoms,
+)
+
+from . import kpm
+from ._common import comply_gauge, comply_projection
 from .distribution import get_distribution
 from .electron import EigenstateElectron, EigenvalueElectron
 from .sparse import SparseOrbitalBZSpin
@@ -137,7 +146,10 @@ class Hamiltonian(SparseOrbitalBZSpin):
         Parameters
         ----------
         k :
-           the k-point to setup the Hamiltonian at
+           the k-point to setup the Hamiltonian at.
+           Passing multiple k-points, with shape ``(nk, 3)``, returns the
+           Hamiltonians in a single array of shape ``(nk, no, no)`` (requires
+           a dense `format`, only for unpolarized and polarized Hamiltonians).
         dtype : numpy.dtype , optional
            the data type of the returned matrix. Do NOT request non-complex
            data-type for non-Gamma k.
@@ -156,6 +168,11 @@ class Hamiltonian(SparseOrbitalBZSpin):
            if the Hamiltonian is a spin polarized one can extract the specific spin direction
            matrix by passing an integer (0 or 1). If the Hamiltonian is not `Spin.POLARIZED`
            this keyword is ignored.
+        out : numpy.ndarray or scipy.sparse.csr_matrix, optional
+           store the Hamiltonian in this (pre-allocated) matrix, only for unpolarized and
+           polarized Hamiltonians in `format` ``'csr'`` (finalized matrices) and ``'array'``.
+           A sparse `out` matrix must be returned from a prior call, see `assembly_plan`.
+           A `ValueError` is raised if `out` cannot be used.
 
         See Also
         --------
@@ -203,7 +220,10 @@ class Hamiltonian(SparseOrbitalBZSpin):
         Parameters
         ----------
         k :
-           the k-point to setup the Hamiltonian at
+           the k-point to setup the Hamiltonian at.
+           Passing multiple k-points, with shape ``(nk, 3)``, returns
+           the derivatives for each direction in arrays of shape ``(nk, no, no)``
+           (requires a dense `format`, only for unpolarized and polarized Hamiltonians).
         dtype : numpy.dtype , optional
            the data type of the returned matrix. Do NOT request non-complex
            data-type for non-Gamma k.
@@ -334,6 +354,7 @@ class Hamiltonian(SparseOrbitalBZSpin):
             # should be shifted.
             for i in range(nspin):
                 self._csr._D[:, i].real += self._csr._D[:, self.S_idx].real * E[i]
+            self._csr._revision += 1
 
     def eigenvalue(self, k: KPoint = (0, 0, 0), gauge: GaugeType = "lattice", **kwargs):
         """Calculate the eigenvalues at `k` and return an `EigenvalueElectron` object containing all eigenvalues for a given `k`
@@ -418,6 +439,245 @@ class Hamiltonian(SparseOrbitalBZSpin):
         # Since eigh returns the eigenvectors [:, i] we have to transpose
         return EigenstateElectron(v.T, e, self, **info)
 
+    def eigenstate_window(
+        self,
+        E: tuple[float, float],
+        k: KPoint = (0, 0, 0),
+        n: Optional[int] = None,
+        degree: Optional[int] = None,
+        bounds: Optional[tuple[float, float]] = None,
+        gauge: GaugeType = "lattice",
+        tol: float = 1e-8,
+        maxiter: int = 100,
+        seed=None,
+        **kwargs,
+    ):
+        r"""Calculate the eigenstates at `k` with energies in the window `E` using Chebyshev filtering
+
+        Only sparse matrix-vector products with :math:`\mathbf H(\mathbf k)` (and
+        :math:`\mathbf S(\mathbf k)`) are required, see `sisl.physics.kpm.eigh_window`.
+        This makes it possible to calculate the states close to the Fermi level of
+        very large systems, where the factorization required by ``eigsh(sigma=...)``
+        is too memory demanding.
+
+        Parameters
+        ----------
+        E :
+            the lower and upper energy of the eigenstates
+        k :
+            the k-point at which to evaluate the eigenstates at
+        n :
+            upper estimate of the number of eigenstates in `E`, defaults to a
+            stochastic estimate
+        degree :
+            degree of the Chebyshev filter, see `sisl.physics.kpm.eigh_window`
+        bounds :
+            bounds of the spectrum, if not provided they will be estimated using
+            `sisl.physics.kpm.spectral_bounds`
+        gauge :
+            the gauge used for calculating the eigenstates
+        tol :
+            convergence tolerance of the residuals
+        maxiter :
+            maximum number of filter iterations
+        seed : int or numpy.random.Generator, optional
+            seed for the random initial subspace
+        **kwargs :
+            passed directly to `Hk` (e.g. ``spin`` for polarized calculations)
+
+        Examples
+        --------
+        Calculate the PDOS of the states within 1 eV of the Fermi level
+
+        >>> H.shift(-Ef)
+        >>> es = H.eigenstate_window((-1, 1))
+        >>> PDOS = es.PDOS(np.linspace(-1, 1, 200))
+
+        See Also
+        --------
+        eigenstate : all eigenstates using a dense or sparse eigenvalue routine
+
+        Returns
+        -------
+        EigenstateElectron
+        """
+        gauge = comply_gauge(gauge)
+        format = kwargs.pop("format", None)
+        M = self.Hk(k, gauge=gauge, format="csr", **kwargs)
+        S = None
+        if not self.orthogonal:
+            S = self.Sk(k, gauge=gauge, format="csr", dtype=kwargs.get("dtype"))
+        e, v = kpm.eigh_window(
+            M,
+            E,
+            S=S,
+            bounds=bounds,
+            n=n,
+            degree=degree,
+            tol=tol,
+            maxiter=maxiter,
+            seed=seed,
+        )
+        info = {"k": k, "gauge": gauge}
+        for name in ("spin",):
+            if name in kwargs:
+                info[name] = kwargs[name]
+        if format is not None:
+            info["format"] = format
+        return EigenstateElectron(v.T, e, self, **info)
+
+    def _kpm_moments(self, N, k, R, bounds, gauge, seed, projection, kwargs):
+        """Calculate the KPM moments at `k`, returns the moments and the used bounds"""
+        gauge = comply_gauge(gauge)
+        M = self.Hk(k, gauge=gauge, format="csr", **kwargs)
+        S = None
+        if not self.orthogonal:
+            S = self.Sk(k, gauge=gauge, format="csc", dtype=kwargs.get("dtype"))
+        if bounds is None:
+            bounds = kpm.spectral_bounds(M, S)
+        mu = kpm.moments(M, N, bounds, S=S, R=R, projection=projection, seed=seed)
+        return mu, bounds
+
+    def kpm_DOS(
+        self,
+        E: npt.ArrayLike,
+        k: KPoint = (0, 0, 0),
+        N: int = 256,
+        R: int = 16,
+        kernel: str = "jackson",
+        bounds: Optional[tuple[float, float]] = None,
+        gauge: GaugeType = "lattice",
+        seed=None,
+        **kwargs,
+    ) -> np.ndarray:
+        r"""Calculate the DOS at `k` using the kernel polynomial method (no diagonalization)
+
+        The Chebyshev moments are calculated using stochastic trace estimation
+        on the sparse :math:`\mathbf H(\mathbf k)`, see `sisl.physics.kpm` for details.
+        The computational cost scales linearly with the number of orbitals.
+
+        The energy resolution is approximately :math:`\pi (E_{\max} - E_{\min}) / (2N)`
+        for the Jackson kernel.
+
+        Parameters
+        ----------
+        E :
+            energies to calculate the DOS at
+        k :
+            the k-point at which to evaluate the DOS at
+        N :
+            number of Chebyshev moments
+        R :
+            number of random vectors used for the stochastic trace
+        kernel :
+            kernel used for damping the Gibbs oscillations, see `sisl.physics.kpm.reconstruct`
+        bounds :
+            bounds of the spectrum, if not provided they will be estimated using
+            `sisl.physics.kpm.spectral_bounds`
+        gauge :
+            the gauge used for calculating the Hamiltonian
+        seed : int or numpy.random.Generator, optional
+            seed for the random vectors
+        **kwargs :
+            passed directly to `Hk` (e.g. ``spin`` for polarized calculations)
+
+        Examples
+        --------
+        Average the DOS over the Brillouin zone
+
+        >>> E = np.linspace(-4, 4, 400)
+        >>> bz = MonkhorstPack(H, [10, 10, 1])
+        >>> DOS = bz.apply.average.kpm_DOS(E, N=512)
+
+        See Also
+        --------
+        kpm_PDOS : projected DOS using the kernel polynomial method
+        EigenstateElectron.DOS : DOS using the eigenvalues
+
+        Returns
+        -------
+        numpy.ndarray
+            DOS calculated at energies, has same length as `E`
+        """
+        mu, bounds = self._kpm_moments(N, k, R, bounds, gauge, seed, "trace", kwargs)
+        return kpm.reconstruct(E, mu, bounds, kernel)
+
+    def kpm_PDOS(
+        self,
+        E: npt.ArrayLike,
+        k: KPoint = (0, 0, 0),
+        N: int = 256,
+        R: int = 16,
+        kernel: str = "jackson",
+        bounds: Optional[tuple[float, float]] = None,
+        gauge: GaugeType = "lattice",
+        projection: Union[
+            ProjectionTypeHadamard, ProjectionTypeHadamardAtoms
+        ] = "orbitals",
+        seed=None,
+        **kwargs,
+    ) -> np.ndarray:
+        r"""Calculate the projected DOS at `k` using the kernel polynomial method (no diagonalization)
+
+        The diagonal elements of the Chebyshev moments are all estimated from the
+        same random vectors, so the cost is the same as for `kpm_DOS`. However,
+        the statistical error of each orbital is larger than for the total DOS.
+
+        For non-orthogonal basis sets the PDOS corresponds to the Mulliken projections
+        (equivalent to `EigenstateElectron.PDOS`).
+        For non-colinear spin configurations the spin components are summed.
+
+        Parameters
+        ----------
+        E :
+            energies to calculate the projected DOS at
+        k :
+            the k-point at which to evaluate the projected DOS at
+        N :
+            number of Chebyshev moments
+        R :
+            number of random vectors used for the stochastic estimation
+        kernel :
+            kernel used for damping the Gibbs oscillations, see `sisl.physics.kpm.reconstruct`
+        bounds :
+            bounds of the spectrum, if not provided they will be estimated using
+            `sisl.physics.kpm.spectral_bounds`
+        gauge :
+            the gauge used for calculating the Hamiltonian
+        projection :
+            whether the DOS should be projected on orbitals or atoms
+        seed : int or numpy.random.Generator, optional
+            seed for the random vectors
+        **kwargs :
+            passed directly to `Hk` (e.g. ``spin`` for polarized calculations)
+
+        See Also
+        --------
+        kpm_DOS : total DOS using the kernel polynomial method
+        EigenstateElectron.PDOS : projected DOS using the eigenstates
+
+        Returns
+        -------
+        numpy.ndarray
+            projected DOS calculated at energies, has dimension ``(no, len(E))``,
+            or ``(na, len(E))`` for atomic projections.
+        """
+        projection = comply_projection(projection)
+        if projection not in ("hadamard", "hadamard:atoms"):
+            raise ValueError(
+                f"{self.__class__.__name__}.kpm_PDOS got wrong 'projection' argument: {projection}."
+            )
+        mu, bounds = self._kpm_moments(N, k, R, bounds, gauge, seed, "diagonal", kwargs)
+        # reduce spin components to the orbitals
+        mu = mu.reshape(self.no, -1, N).sum(1)
+        if projection == "hadamard:atoms":
+            # sum per atom, atoms without orbitals have zero PDOS
+            geom = self.geometry
+            mua = np.zeros([geom.na, N], dtype=mu.dtype)
+            np.add.at(mua, geom.o2a(np.arange(geom.no)), mu)
+            mu = mua
+        return kpm.reconstruct(E, mu, bounds, kernel)
+
     @staticmethod
     def read(sile, *args, **kwargs):
         """Reads Hamiltonian from `Sile` using `read_hamiltonian`.
@@ -0,0 +1,551 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+r"""Kernel polynomial method
+============================
+
+The kernel polynomial method (KPM) expands spectral quantities in Chebyshev
+polynomials of a rescaled matrix, :math:`\tilde{\mathbf H} = (\mathbf H - b) / a`,
+whose spectrum lies within :math:`[-1, 1]`.
+The expansion coefficients (moments) only require sparse matrix-vector products,
+and the traces are estimated stochastically with random vectors.
+Hence the computational cost scales linearly with the number of orbitals, as opposed
+to the cubic scaling of a full diagonalization.
+
+.. math::
+   \mu_n &= \frac1R\sum_r \langle r | T_n(\tilde{\mathbf H}) | r\rangle
+   \\
+   \mathrm{DOS}(E) &= \frac{1}{a\pi\sqrt{1-x^2}}\Big[g_0\mu_0 + 2\sum_{n\ge1} g_n\mu_n T_n(x)\Big],
+   \quad x = (E - b) / a
+
+where :math:`g_n` are the kernel coefficients that damp the Gibbs oscillations
+of the truncated expansion.
+
+The `Hamiltonian.kpm_DOS` and `Hamiltonian.kpm_PDOS` methods combine these routines,
+and can be used with `BrillouinZone.apply` for :math:`\mathbf k`-averaging.
+
+A Chebyshev expansion of the indicator function of an energy window
+filters out the eigenstates outside the window. `eigh_window` uses this filter
+in a subspace iteration to calculate the eigenstates in an energy window
+(e.g. around the Fermi level) of very large matrices, without any factorization.
+
+   spectral_bounds
+   moments
+   reconstruct
+   eigh_window
+   jackson_kernel
+   lorentz_kernel
+
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Literal, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import scipy.sparse as sps
+from numpy.polynomial.chebyshev import chebval
+from scipy.sparse.linalg import splu
+
+from sisl._internal import set_module
+from sisl.linalg import eigh, eigsh
+from sisl.messages import warn
+
+from ._common import comply_projection
+
+__all__ = ["spectral_bounds", "moments", "reconstruct", "eigh_window"]
+__all__ += ["jackson_kernel", "lorentz_kernel"]
+
+
+@set_module("sisl.physics.kpm")
+def jackson_kernel(N: int) -> np.ndarray:
+    r"""Jackson kernel coefficients for `N` moments
+
+    .. math::
+       g_n = \frac{(N - n + 1)\cos\frac{\pi n}{N+1} + \sin\frac{\pi n}{N+1}\cot\frac{\pi}{N+1}}{N+1}
+
+    The Jackson kernel is strictly positive and yields a broadening
+    of approximately :math:`\pi a / N`.
+
+    Parameters
+    ----------
+    N :
+       number of moments
+    """
+    n = np.arange(N)
+    q = np.pi / (N + 1)
+    return ((N - n + 1) * np.cos(q * n) + np.sin(q * n) / np.tan(q)) / (N + 1)
+
+
+@set_module("sisl.physics.kpm")
+def lorentz_kernel(N: int, lambda_: float = 4.0) -> np.ndarray:
+    r"""Lorentz kernel coefficients for `N` moments
+
+    .. math::
+       g_n = \frac{\sinh[\lambda(1 - n/N)]}{\sinh\lambda}
+
+    The Lorentz kernel is the preferred kernel for Green function quantities,
+    it yields a Lorentzian broadening of :math:`\lambda a / N`.
+
+    Parameters
+    ----------
+    N :
+       number of moments
+    lambda_ :
+       broadening parameter, typically between 3 and 5
+    """
+    n = np.arange(N)
+    return np.sinh(lambda_ * (1 - n / N)) / np.sinh(lambda_)
+
+
+_kernels = {
+    "jackson": jackson_kernel,
+    "lorentz": lorentz_kernel,
+}
+
+
+def _get_kernel(kernel, N: int) -> np.ndarray:
+    """Return the kernel coefficients for `N` moments"""
+    if isinstance(kernel, str):
+        try:
+            kernel = _kernels[kernel.lower()]
+        except KeyError:
+            raise ValueError(
+                f"kpm: unknown kernel '{kernel}', must be one of {list(_kernels)}"
+            )
+    if callable(kernel):
+        kernel = kernel(N)
+    kernel = np.asarray(kernel)
+    if kernel.shape != (N,):
+        raise ValueError(
+            f"kpm: kernel coefficients must have shape ({N},), got {kernel.shape}"
+        )
+    return kernel
+
+
+@set_module("sisl.physics.kpm")
+def spectral_bounds(
+    M,
+    S=None,
+    margin: float = 0.05,
+    tol: float = 1e-4,
+) -> tuple[float, float]:
+    r"""Estimate the bounds of the spectrum of `M` using the Lanczos algorithm
+
+    The extremal eigenvalues are calculated with `scipy.sparse.linalg.eigsh`,
+    and the returned interval is widened by `margin` to ensure that the
+    rescaled matrix has its spectrum strictly within :math:`[-1, 1]`.
+
+    Parameters
+    ----------
+    M : scipy.sparse.spmatrix or numpy.ndarray
+       Hermitian matrix
+    S : scipy.sparse.spmatrix or numpy.ndarray, optional
+       overlap matrix for the generalized eigenvalue problem
+    margin :
+       relative widening of the spectral interval
+    tol :
+       tolerance for the extremal eigenvalues
+
+    Returns
+    -------
+    tuple of float
+       lower and upper bounds of the spectrum
+    """
+    n = M.shape[0]
+    if n <= 64:
+        # Dense calculations are much faster for small matrices
+        if sps.issparse(M):
+            M = M.toarray()
+        if sps.issparse(S):
+            S = S.toarray()
+        e = eigh(M, S, eigvals_only=True)
+        emin, emax = e[0], e[-1]
+    else:
+        kwargs = dict(k=1, M=S, tol=tol, return_eigenvectors=False)
+        emin = eigsh(M, which="SA", **kwargs)[0]
+        emax = eigsh(M, which="LA", **kwargs)[0]
+
+    pad = (emax - emin) * margin / 2
+    if pad == 0.0:
+        # a flat spectrum, we need a finite interval
+        pad = max(abs(emin), 1.0) * margin
+    return float(emin - pad), float(emax + pad)
+
+
+def _scaling(bounds) -> tuple[float, float]:
+    """Return the scale and shift for the bounds"""
+    emin, emax = bounds
+    if emax <= emin:
+        raise ValueError(f"kpm: bounds must be an increasing interval, got {bounds}")
+    return (emax - emin) / 2, (emax + emin) / 2
+
+
+@set_module("sisl.physics.kpm")
+def moments(
+    M,
+    N: int,
+    bounds: tuple[float, float],
+    S=None,
+    R: int = 16,
+    projection: Literal["trace", "diagonal", "hadamard"] = "trace",
+    seed=None,
+) -> np.ndarray:
+    r"""Calculate the Chebyshev moments of `M` using stochastic trace estimation
+
+    For non-orthogonal basis sets the moments are calculated for
+    :math:`\mathbf H\mathbf S^{-1}` which has the same (generalized) eigenvalues,
+    and whose diagonal elements equal the Mulliken projections.
+    The overlap matrix will be LU-factorized once.
+
+    Parameters
+    ----------
+    M : scipy.sparse.spmatrix
+       Hermitian matrix
+    N :
+       number of moments
+    bounds :
+       bounds of the spectrum of `M`, see `spectral_bounds`
+    S : scipy.sparse.spmatrix, optional
+       overlap matrix
+    R :
+       number of random vectors used for estimating the traces.
+       The statistical error decreases as :math:`1/\sqrt{R n}` for
+       the total moments of an :math:`n\times n` matrix.
+    projection :
+       whether the moments should be the trace of the Chebyshev polynomials (``trace``)
+       or their diagonal elements (``diagonal``, or equivalently ``hadamard``)
+    seed : int or numpy.random.Generator, optional
+       seed for the random vectors
+
+    Returns
+    -------
+    numpy.ndarray
+       moments with shape ``(N,)`` for ``projection="trace"``, or
+       ``(M.shape[0], N)`` for ``projection="diagonal"``/``projection="hadamard"``
+    """
+    if N < 2:
+        raise ValueError(f"kpm.moments requires at least 2 moments, got N={N}")
+    try:
+        projection = comply_projection(projection)
+    except KeyError:
+        pass
+    if projection not in ("trace", "diagonal", "hadamard"):
+        raise ValueError(
+            f"kpm.moments got wrong 'projection' argument: {projection}, must be one of [trace, diagonal, hadamard]"
+        )
+
+    a, b = _scaling(bounds)
+    n = M.shape[0]
+    is_complex = np.iscomplexobj(M) or np.iscomplexobj(S)
+
+    if S is None:
+
+        def matvec(v):
+            return (M @ v - b * v) / a
+
+    else:
+        S = splu(sps.csc_matrix(S))
+
+        def matvec(v):
+            return (M @ S.solve(v) - b * v) / a
+
+    rng = np.random.default_rng(seed)
+    if is_complex:
+        r = np.exp(2j * np.pi * rng.random((n, R)))
+    else:
+        r = rng.choice([-1.0, 1.0], size=(n, R))
+    rc = r.conj()
+
+    if projection == "trace":
+        mu = np.empty(N)
+
+        def proj(v):
+            return (rc * v).real.sum() / R
+
+    else:
+        mu = np.empty([n, N])
+
+        def proj(v):
+            return (rc * v).real.sum(1) / R
+
+    v0 = r
+    v1 = matvec(v0)
+    mu[..., 0] = proj(v0)
+    mu[..., 1] = proj(v1)
+    for m in range(2, N):
+        v0, v1 = v1, 2 * matvec(v1) - v0
+        mu[..., m] = proj(v1)
+
+    return mu
+
+
+@set_module("sisl.physics.kpm")
+def reconstruct(
+    E: npt.ArrayLike,
+    mu: np.ndarray,
+    bounds: tuple[float, float],
+    kernel: Union[Literal["jackson", "lorentz"], Callable, npt.ArrayLike] = "jackson",
+) -> np.ndarray:
+    r"""Reconstruct the spectral density at energies `E` from Chebyshev moments
+
+    Parameters
+    ----------
+    E :
+       energies to calculate the density at
+    mu :
+       Chebyshev moments, the last dimension corresponds to the moments
+    bounds :
+       the bounds used for calculating the moments
+    kernel :
+       kernel used for damping the Gibbs oscillations, either a name, a function
+       accepting the number of moments, or the kernel coefficients
+
+    Returns
+    -------
+    numpy.ndarray
+       the density with shape ``mu.shape[:-1] + E.shape``, energies outside
+       the bounds have zero density
+    """
+    E = np.asarray(E, dtype=np.float64)
+    mu = np.asarray(mu)
+    a, b = _scaling(bounds)
+    N = mu.shape[-1]
+
+    c = mu * _get_kernel(kernel, N)
+    c[..., 1:] *= 2
+
+    x = (E - b) / a
+    inside = np.abs(x) < 1
+    xi = x[inside]
+
+    DOS = np.zeros(mu.shape[:-1] + E.shape)
+    DOS[..., inside] = chebval(xi, np.moveaxis(c, -1, 0)) / (
+        np.pi * a * np.sqrt(1 - xi**2)
+    )
+    return DOS
+
+
+def _window_coefficients(x1: float, x2: float, N: int) -> np.ndarray:
+    """Jackson damped Chebyshev coefficients of the indicator function of :math:`[x_1, x_2]`"""
+    t1, t2 = np.arccos(x1), np.arccos(x2)
+    n = np.arange(1, N)
+    c = np.empty(N)
+    c[0] = (t1 - t2) / np.pi
+    c[1:] = 2 * (np.sin(n * t1) - np.sin(n * t2)) / (n * np.pi)
+    return c * jackson_kernel(N)
+
+
+def _overlap_solver(S, tol: float = 1e-10, maxiter: int = 1000):
+    r"""Return a function solving :math:`\mathbf S\mathbf x = \mathbf v` for the columns of :math:`\mathbf v`
+
+    The overlap matrix is well conditioned, so Jacobi preconditioned conjugate
+    gradients converge in few iterations, using only sparse matrix products.
+    """
+    d = S.diagonal().real.reshape(-1, 1)
+
+    def dot(x, y):
+        return (x.conj() * y).sum(0).real
+
+    def solve(v):
+        x = np.zeros_like(v)
+        r = v.copy()
+        z = r / d
+        p = z.copy()
+        rz = dot(r, z)
+        rtol = tol * np.linalg.norm(v, axis=0)
+        for _ in range(maxiter):
+            Sp = S @ p
+            pSp = dot(p, Sp)
+            alpha = np.divide(rz, pSp, out=np.zeros_like(rz), where=pSp != 0)
+            x += alpha * p
+            r -= alpha * Sp
+            if np.all(np.linalg.norm(r, axis=0) <= rtol):
+                break
+            z = r / d
+            rz_new = dot(r, z)
+            beta = np.divide(rz_new, rz, out=np.zeros_like(rz), where=rz != 0)
+            p = z + beta * p
+            rz = rz_new
+        return x
+
+    return solve
+
+
+def _filter(matvec, V: np.ndarray, coef: np.ndarray) -> np.ndarray:
+    r"""Calculate :math:`\sum_n c_n T_n(\tilde{\mathbf M})\mathbf V`"""
+    V0 = V
+    V1 = matvec(V0)
+    Y = coef[0] * V0 + coef[1] * V1
+    for c in coef[2:]:
+        V0, V1 = V1, 2 * matvec(V1) - V0
+        Y += c * V1
+    return Y
+
+
+@set_module("sisl.physics.kpm")
+def eigh_window(
+    M,
+    window: tuple[float, float],
+    S=None,
+    bounds: Optional[tuple[float, float]] = None,
+    n: Optional[int] = None,
+    degree: Optional[int] = None,
+    tol: float = 1e-8,
+    maxiter: int = 100,
+    eigvals_only: bool = False,
+    seed=None,
+):
+    r"""Calculate the eigenpairs with eigenvalues in `window` using Chebyshev filtered subspace iteration
+
+    A subspace is repeatedly filtered by a (Jackson damped) Chebyshev expansion
+    of the indicator function of `window`, followed by a Rayleigh-Ritz
+    step, until the residuals of all Ritz pairs in the window are below `tol`.
+    Only sparse matrix products with `M` (and `S`) are required, contrary to
+    shift-invert methods which factorize :math:`\mathbf M - \sigma\mathbf S`.
+
+    For non-orthogonal basis sets the filter is applied to :math:`\mathbf S^{-1}\mathbf M`,
+    where :math:`\mathbf S^{-1}` is applied with preconditioned conjugate gradients.
+
+    Parameters
+    ----------
+    M : scipy.sparse.spmatrix
+       Hermitian matrix
+    window :
+       the lower and upper energy of the eigenvalues to calculate
+    S : scipy.sparse.spmatrix, optional
+       overlap matrix
+    bounds :
+       bounds of the spectrum of `M`, see `spectral_bounds`
+    n :
+       upper estimate of the number of eigenvalues in `window`, defaults to
+       a stochastic estimate using the filter
+    degree :
+       degree of the filter polynomial, defaults to a degree that resolves the
+       width of `window`. Narrow windows require higher degrees.
+    tol :
+       convergence tolerance of the residuals, relative to the largest magnitude
+       of the spectrum
+    maxiter :
+       maximum number of filter iterations
+    eigvals_only :
+       whether only the eigenvalues should be returned
+    seed : int or numpy.random.Generator, optional
+       seed for the random vectors
+
+    Returns
+    -------
+    eigenvalues : numpy.ndarray
+       the eigenvalues in `window`, in ascending order
+    eigenvectors : numpy.ndarray
+       the eigenvectors as columns (not returned if `eigvals_only`)
+    """
+    E1, E2 = window
+    if E2 <= E1:
+        raise ValueError(
+            f"kpm.eigh_window requires an increasing energy window, got {window}"
+        )
+
+    def select(w, v):
+        idx = ((E1 <= w) & (w <= E2)).nonzero()[0]
+        if eigvals_only:
+            return w[idx]
+        return w[idx], v[:, idx]
+
+    def dense():
+        Md = M.toarray() if sps.issparse(M) else M
+        Sd = S.toarray() if sps.issparse(S) else S
+        return select(*eigh(Md, Sd))
+
+    N = M.shape[0]
+    if N <= 64:
+        return dense()
+
+    if bounds is None:
+        bounds = spectral_bounds(M, S)
+    a, b = _scaling(bounds)
+    x1 = max((E1 - b) / a, -1.0)
+    x2 = min((E2 - b) / a, 1.0)
+    if degree is None:
+        # The Jackson broadening is ~pi / degree (in scaled units), it should
+        # be small compared to the window to separate the states outside it
+        degree = int(np.clip(np.ceil(8 * np.pi / max(x2 - x1, 1e-3)), 16, 4000))
+    coef = _window_coefficients(x1, x2, degree)
+
+    dtype = np.result_type(M.dtype, np.float64)
+    if S is not None:
+        dtype = np.result_type(dtype, S.dtype)
+    is_complex = np.issubdtype(dtype, np.complexfloating)
+
+    if S is None:
+
+        def matvec(v):
+            return (M @ v - b * v) / a
+
+    else:
+        solve = _overlap_solver(S)
+
+        def matvec(v):
+            return (solve(M @ v) - b * v) / a
+
+    rng = np.random.default_rng(seed)
+
+    def random(m):
+        if is_complex:
+            return np.exp(2j * np.pi * rng.random((N, m)))
+        return rng.random((N, m)) - 0.5
+
+    if n is None:
+        R = 16
+        r = random(R)
+        n = int(np.ceil((r.conj() * _filter(matvec, r, coef)).real.sum() / R))
+    m = int(1.25 * max(n, 0)) + 8
+    if 4 * m >= N:
+        # the subspace is too large for the iterations to be efficient
+        return dense()
+
+    scale = tol * max(abs(bounds[0]), abs(bounds[1]))
+    Y = _filter(matvec, random(m), coef)
+    res = np.full(1, np.inf)
+    for _ in range(maxiter):
+        V, _ = np.linalg.qr(Y)
+        MV = M @ V
+        SV = V if S is None else S @ V
+        PM = V.conj().T @ MV
+        PS = V.conj().T @ SV
+        w, c = eigh((PM + PM.conj().T) / 2, (PS + PS.conj().T) / 2)
+        X = V @ c
+        inside = ((E1 <= w) & (w <= E2)).nonzero()[0]
+
+        if len(inside) > m - 4:
+            # the subspace is too small to contain the window (and guard vectors)
+            m2 = int(1.5 * m)
+            if 4 * m2 >= N:
+                return dense()
+            Y = _filter(matvec, np.hstack((X, random(m2 - m))), coef)
+            m = m2
+            continue
+
+        # Ritz vectors mixing states on both sides of the window may have
+        # Ritz values inside it. Their filter quotients are much smaller
+        # than the filter at their Ritz value, and they are discarded.
+        Y = _filter(matvec, X, coef)
+        q = ((SV @ c[:, inside]).conj() * Y[:, inside]).sum(0).real
+        inside = inside[q >= chebval((w[inside] - b) / a, coef) / 2]
+
+        res = np.linalg.norm(
+            MV @ c[:, inside] - (SV @ c[:, inside]) * w[inside], axis=0
+        )
+        if np.all(res <= scale):
+            break
+    else:
+        warn(
+            f"kpm.eigh_window did not converge in {maxiter} iterations, "
+            f"the largest residual is {res.max()}"
+        )
+
+    if eigvals_only:
+        return w[inside]
+    return w[inside], X[:, inside]
@@ -31,6 +31,9 @@ from sisl.typing import (
 from sisl.typing._common import RotationType
 from sisl.utils.mathematics import parse_rotation
 
+from ._common import comply_gauge
+from ._eigen_cache import EigenCache
+from ._eigsh_warm import EigshWarmStart
 from ._matrix_ddk import (
     matrix_ddk,
     matrix_ddk_diag,
@@ -40,12 +43,21 @@ from ._matrix_ddk import (
 )
 from ._matrix_dk import (
     matrix_dk,
+    matrix_dk_batch,
     matrix_dk_diag,
     matrix_dk_nambu,
     matrix_dk_nc,
     matrix_dk_so,
 )
-from ._matrix_k import matrix_k, matrix_k_diag, matrix_k_nambu, matrix_k_nc, matrix_k_so
+from ._matrix_k import (
+    matrix_k,
+    matrix_k_batch,
+    matrix_k_diag,
+    matrix_k_nambu,
+    matrix_k_nc,
+    matrix_k_so,
+)
+from ._matrix_plan import FoldPlan
 from .spin import Spin
 
 __all__ = ["SparseOrbitalBZ", "SparseOrbitalBZSpin"]
@@ -55,6 +67,22 @@ __all__ = ["SparseOrbitalBZ", "SparseOrbitalBZSpin"]
 warnings.filterwarnings("ignore", category=SparseEfficiencyWarning, module=__name__)
 
 
+def _multiple_k(k) -> bool:
+    """Whether `k` contains more than one k-point (a single row is a single k-point)"""
+    return np.ndim(k) == 2 and len(k) > 1
+
+
+def _single_k(k) -> np.ndarray:
+    """Return `k` as a single k-point, raises an error for multiple k-points"""
+    k = _a.asarrayd(k)
+    if _multiple_k(k):
+        raise ValueError(
+            "multiple k-points are only supported for Pk, Sk, dPk and eigh of "
+            f"unpolarized and polarized matrices, got k with shape {k.shape}"
+        )
+    return k.ravel()
+
+
 def _get_spin(
     M,
     spin: Spin,
@@ -353,6 +381,7 @@ class SparseOrbitalBZ(SparseOrbital):
         geometry: Geometry,
         P: Union[OrSequence[SparseMatrix], SparseMatrixPhysical],
         S: Optional[Union[SparseMatrix, SparseMatrixPhysical]] = None,
+        copy: bool = True,
         **kwargs,
     ) -> Self:
         r"""Create a sparse model from a preset `Geometry` and a list of sparse matrices
@@ -375,6 +404,9 @@ class SparseOrbitalBZ(SparseOrbital):
            If the passed matrix is a non-orthogonal `sisl` matrix object
            (e.g. a `Hamiltonian`), then it will take the overlap part of the
            object and pass that along. See examples for details.
+        copy :
+           if false, a single passed matrix will share its arrays with the returned
+           object, see `SparseCSR.fromsp`
         **kwargs :
            any arguments that are directly passed to the `__init__` method
            of the class.
@@ -474,7 +506,7 @@ class SparseOrbitalBZ(SparseOrbital):
             kwargs["orthogonal"] = False
 
         p = cls(geometry, dim, P[0].dtype, 1, **kwargs)
-        p._csr = p._csr.fromsp(P, dtype=kwargs.get("dtype"))
+        p._csr = p._csr.fromsp(P, dtype=kwargs.get("dtype"), copy=copy)
 
         if p._size != P[0].shape[0]:
             raise ValueError(
@@ -517,6 +549,150 @@ class SparseOrbitalBZ(SparseOrbital):
         """
         yield from self.geometry.iter_orbitals(atoms=atoms, local=local)
 
+    def assembly_plan(self) -> FoldPlan:
+        r"""Assembly plan used for folding the sparse matrix into k-point matrices
+
+        The folded sparsity pattern of a matrix at a given :math:`\mathbf k` does
+        not depend on :math:`\mathbf k`. The plan stores the folded pattern,
+        and the location of each supercell element in the folded data.
+        Once created, the matrix at a given :math:`\mathbf k` only requires the phases
+        and a single scatter operation of the data.
+
+        The plan is created once and cached on this object. It is re-created when the sparsity
+        pattern changes. Changing only the values of already existing elements
+        does not invalidate the plan.
+
+        Notes
+        -----
+        This will finalize the sparse matrix.
+        The plan is automatically used when calculating the matrices at :math:`\mathbf k`
+        in `format` ``"csr"`` (or other sparse formats) for finalized matrices.
+
+        Examples
+        --------
+        Sweeping many k-points with a re-used output matrix.
+
+        >>> H.finalize()
+        >>> Hk = H.Hk(k[0])
+        >>> for ik in k[1:]:
+        ...     H.Hk(ik, out=Hk)
+        """
+        self.finalize()
+        plan = getattr(self, "_assembly_plan", None)
+        if plan is None or not plan.is_valid(self._csr):
+            plan = FoldPlan(self._csr)
+            self._assembly_plan = plan
+        return plan
+
+    @property
+    def eigen_cache(self) -> Optional[EigenCache]:
+        """The cache of eigenvalue decompositions, or None if not enabled, see `set_eigen_cache`"""
+        return getattr(self, "_eigen_cache", None)
+
+    def set_eigen_cache(
+        self, max_bytes: Optional[int] = 256 * 1024**2
+    ) -> Optional[EigenCache]:
+        r"""Enable, or disable, caching of the eigenvalue decompositions calculated by `eigh`
+
+        Subsequent calls to `eigh` (and thus also `eigenvalue`, `eigenstate`,
+        `fermi_level` etc.) with the same arguments will return the cached
+        decomposition instead of re-diagonalizing.
+        This is useful when the same k-points are analyzed several times.
+
+        The full decomposition (eigenvalues and eigenvectors) is always calculated
+        and stored, also when only the eigenvalues are requested. Hence each
+        k-point is only diagonalized once, e.g. for calculating the Fermi level
+        followed by the eigenstates.
+
+        The cache is invalidated when the matrix elements are changed through
+        the methods of this object. Changing the underlying data arrays
+        directly is *not* tracked, call ``eigen_cache.clear()`` in that case.
+
+        Notes
+        -----
+        The cache is not transferred to other processes (e.g. when using
+        a `SharedMemoryPool` in `BrillouinZone.apply`), nor is it copied by `copy`.
+
+        Parameters
+        ----------
+        max_bytes :
+            maximum number of bytes stored in the cache, the least recently used
+            decompositions are evicted when the limit is reached.
+            If None, or 0, the cache is disabled (and removed).
+
+        Examples
+        --------
+        >>> H.set_eigen_cache(2 * 1024**3)
+        >>> bz = MonkhorstPack(H, [10, 10, 1])
+        >>> Ef = H.fermi_level(bz, q=1)
+        >>> DOS = bz.apply.average.eigenstate(wrap=lambda es: es.DOS(E))
+        >>> H.eigen_cache.stats["hits"] == len(bz)
+        True
+
+        Returns
+        -------
+        EigenCache or None
+            the cache used
+        """
+        if not max_bytes:
+            self._eigen_cache = None
+            return None
+        cache = self.eigen_cache
+        if cache is None:
+            cache = EigenCache(max_bytes)
+            self._eigen_cache = cache
+        else:
+            cache.max_bytes = max_bytes
+        return cache
+
+    def _eigh_cached(self, func, k, gauge, eigvals_only: bool, spin, dtype, kwargs):
+        """Return ``func(eigvals_only)`` and use the eigen cache (if enabled)
+
+        The cache always stores the full decomposition, so that a later
+        call requesting the eigenvectors does not diagonalize again.
+        """
+        cache = self.eigen_cache
+        if cache is None:
+            return func(eigvals_only)
+
+        k = _a.asarrayd(k)
+        if _multiple_k(k):
+            # batched k-points are not cached
+            return func(eigvals_only)
+        k = k.ravel()
+        try:
+            extra = tuple(sorted(kwargs.items()))
+            hash(extra)
+        except TypeError:
+            return func(eigvals_only)
+
+        gauge = comply_gauge(gauge)
+        if gauge == "atomic":
+            # the phases depend on the orbital positions
+            geom = hash(self.geometry.xyz.tobytes())
+        else:
+            geom = None
+        if dtype is not None:
+            dtype = np.dtype(dtype).str
+        key = (
+            id(self._csr),
+            self._csr._revision,
+            geom,
+            tuple(k.tolist()),
+            gauge,
+            spin,
+            dtype,
+            extra,
+        )
+
+        ret = cache.get(key)
+        if ret is None:
+            ret = func(False)
+            cache.put(key, ret)
+        if eigvals_only:
+            return ret[0]
+        return ret
+
     def _Pk(
         self,
         k: KPoint = (0, 0, 0),
@@ -524,6 +700,7 @@ class SparseOrbitalBZ(SparseOrbital):
         gauge: GaugeType = "lattice",
         format: str = "csr",
         _dim=0,
+        out=None,
     ):
         r"""Sparse matrix (`scipy.sparse.csr_matrix`) at `k` for a polarized system
 
@@ -535,9 +712,17 @@ class SparseOrbitalBZ(SparseOrbital):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out : numpy.ndarray or scipy.sparse.csr_matrix, optional
+           store the result in this matrix (only for `format` ``"csr"`` and ``"array"``).
+           A sparse `out` matrix must be returned from a prior call with the same sparsity pattern.
         """
-        k = _a.asarrayd(k).ravel()
-        return matrix_k(gauge, self, _dim, self.lattice, k, dtype, format)
+        k = _a.asarrayd(k)
+        if _multiple_k(k):
+            return matrix_k_batch(
+                gauge, self, _dim, self.lattice, k, dtype, format, out
+            )
+        k = k.ravel()
+        return matrix_k(gauge, self, _dim, self.lattice, k, dtype, format, out)
 
     def _dPk(
         self,
@@ -558,7 +743,10 @@ class SparseOrbitalBZ(SparseOrbital):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _a.asarrayd(k)
+        if _multiple_k(k):
+            return matrix_dk_batch(gauge, self, _dim, self.lattice, k, dtype, format)
+        k = k.ravel()
         return matrix_dk(gauge, self, _dim, self.lattice, k, dtype, format)
 
     def _ddPk(
@@ -580,7 +768,7 @@ class SparseOrbitalBZ(SparseOrbital):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_ddk(gauge, self, _dim, self.lattice, k, dtype, format)
 
     def Sk(
@@ -616,7 +804,10 @@ class SparseOrbitalBZ(SparseOrbital):
         Parameters
         ----------
         k :
-           the k-point to setup the overlap at (default Gamma point)
+           the k-point to setup the overlap at (default Gamma point).
+           Passing multiple k-points, with shape ``(nk, 3)``, returns the
+           overlap matrices in a single array of shape ``(nk, no, no)`` (requires
+           a dense `format`).
         dtype : numpy.dtype, optional
            the data type of the returned matrix. Do NOT request non-complex
            data-type for non-Gamma k.
@@ -630,6 +821,11 @@ class SparseOrbitalBZ(SparseOrbital):
            Prefixing with "sc:", or simply "sc" returns the matrix in supercell format
            with phases. This is useful for e.g. bond-current calculations where individual
            hopping + phases are required.
+        out : numpy.ndarray or scipy.sparse.csr_matrix, optional
+           store the overlap matrix in this (pre-allocated) matrix.
+           Only applicable for non-orthogonal, non-spin-box matrices in `format` ``"csr"`` (finalized matrices)
+           and ``"array"``. A sparse `out` matrix must be returned from a prior call.
+           A `ValueError` is raised if `out` cannot be used.
 
         See Also
         --------
@@ -653,10 +849,23 @@ class SparseOrbitalBZ(SparseOrbital):
         **kwargs,
     ):
         r"""For an orthogonal case we always return the identity matrix"""
+        if kwargs.get("out") is not None:
+            raise ValueError(
+                f"{self.__class__.__name__}.Sk: out argument is not supported for orthogonal matrices"
+            )
         if dtype is None:
             dtype = np.float64
         nr = len(self)
         nc = nr
+        if _multiple_k(k):
+            if format not in ("array", "matrix", "dense"):
+                raise ValueError(
+                    f"{self.__class__.__name__}.Sk: multiple k-points requires a dense format, got {format}"
+                )
+            S = np.zeros([len(k), nr, nc], dtype=dtype)
+            idx = _a.arangei(nr)
+            S[:, idx, idx] = 1.0
+            return S
         if "sc:" in format:
             format = format[3:]
             nc = self.n_s * nr
@@ -681,6 +890,7 @@ class SparseOrbitalBZ(SparseOrbital):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Overlap matrix in a `scipy.sparse.csr_matrix` at `k`.
 
@@ -692,8 +902,12 @@ class SparseOrbitalBZ(SparseOrbital):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out :
+           store the result in this matrix, see `Sk`
         """
-        return self._Pk(k, dtype=dtype, gauge=gauge, format=format, _dim=self.S_idx)
+        return self._Pk(
+            k, dtype=dtype, gauge=gauge, format=format, _dim=self.S_idx, out=out
+        )
 
     def dSk(
         self,
@@ -791,7 +1005,7 @@ class SparseOrbitalBZ(SparseOrbital):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_dk_nc_diag(
             gauge, self, self.S_idx, self.lattice, k, dtype, format
         )
@@ -893,7 +1107,7 @@ class SparseOrbitalBZ(SparseOrbital):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_ddk_diag(
             gauge, self, self.S_idx, 2, self.lattice, k, dtype, format
         )
@@ -916,7 +1130,7 @@ class SparseOrbitalBZ(SparseOrbital):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_ddk_diag(
             gauge, self, self.S_idx, 4, self.lattice, k, dtype, format
         )
@@ -959,15 +1173,34 @@ class SparseOrbitalBZ(SparseOrbital):
         Setup the system and overlap matrix with respect to
         the given k-point and calculate the eigenvalues.
 
-        All subsequent arguments gets passed directly to `scipy.linalg.eigh`
+        All subsequent arguments gets passed directly to `scipy.linalg.eigh`.
+
+        Passing multiple k-points (shape ``(nk, 3)``) solves all eigenvalue problems
+        in one call using `sisl.linalg.eigh_batch`, in which case `kwargs` (other than
+        ``dtype``) are not allowed.
+
+        The decompositions may be cached for subsequent calls, see `set_eigen_cache`.
         """
         dtype = kwargs.pop("dtype", None)
-        P = self.Pk(k=k, dtype=dtype, gauge=gauge, format="array")
-        if self.orthogonal:
-            return lin.eigh_destroy(P, eigvals_only=eigvals_only, **kwargs)
+        if _multiple_k(k) and kwargs:
+            raise ValueError(
+                f"{self.__class__.__name__}.eigh does not accept {list(kwargs)} "
+                "for multiple k-points"
+            )
 
-        S = self.Sk(k=k, dtype=dtype, gauge=gauge, format="array")
-        return lin.eigh_destroy(P, S, eigvals_only=eigvals_only, **kwargs)
+        def func(eigvals_only):
+            P = self.Pk(k=k, dtype=dtype, gauge=gauge, format="array")
+            if self.orthogonal:
+                if P.ndim == 3:
+                    return lin.eigh_batch(P, eigvals_only=eigvals_only)
+                return lin.eigh_destroy(P, eigvals_only=eigvals_only, **kwargs)
+
+            S = self.Sk(k=k, dtype=dtype, gauge=gauge, format="array")
+            if P.ndim == 3:
+                return lin.eigh_batch(P, S, eigvals_only=eigvals_only)
+            return lin.eigh_destroy(P, S, eigvals_only=eigvals_only, **kwargs)
+
+        return self._eigh_cached(func, k, gauge, eigvals_only, 0, dtype, kwargs)
 
     def eigsh(
         self,
@@ -989,6 +1222,15 @@ class SparseOrbitalBZ(SparseOrbital):
         n :
             number of eigenvalues to calculate.
             Defaults to the `n` smallest magnitude eigevalues.
+        warm_start : bool or numpy.ndarray, optional
+            if true, use a LOBPCG solver initialized with the eigenvectors of the
+            previous (warm-started) call, instead of ARPACK.
+            Neighbouring k-points (e.g. along a `BandStructure`) have nearly identical
+            eigenvectors, hence only a few iterations are required.
+            An array is used as the initial eigenvectors (columns).
+            In this mode only ``which`` (``"SM"``, ``"SA"`` or ``"LA"``), ``sigma``
+            (target energy, e.g. the Fermi level), ``tol`` and ``maxiter`` are accepted
+            as `kwargs`. The iteration counts are stored in ``eigsh_warm_start.iterations``.
         **kwargs:
             arguments passed directly to `scipy.sparse.linalg.eigsh`.
 
@@ -997,6 +1239,14 @@ class SparseOrbitalBZ(SparseOrbital):
         The performance and accuracy of this method depends heavily on `kwargs`.
         Playing around with a small test example before doing large scale calculations
         is adviced!
+
+        Examples
+        --------
+        Calculate the 10 bands closest to the Fermi level along a band structure path
+
+        >>> bs = BandStructure(H, [[0, 0, 0], [0.5, 0, 0]], 100)
+        >>> eig = bs.apply.array.eigsh(n=10, sigma=Ef, warm_start=True)
+        >>> H.eigsh_warm_start.iterations
         """
         # We always request the smallest eigenvalues...
         kwargs.update({"which": kwargs.get("which", "SM")})
@@ -1004,10 +1254,32 @@ class SparseOrbitalBZ(SparseOrbital):
         dtype = kwargs.pop("dtype", None)
 
         P = self.Pk(k=k, dtype=dtype, gauge=gauge)
-        if self.orthogonal:
-            return lin.eigsh(P, k=n, return_eigenvectors=not eigvals_only, **kwargs)
-        S = self.Sk(k=k, dtype=dtype, gauge=gauge)
-        return lin.eigsh(P, M=S, k=n, return_eigenvectors=not eigvals_only, **kwargs)
+        S = None
+        if not self.orthogonal:
+            S = self.Sk(k=k, dtype=dtype, gauge=gauge)
+        return self._eigsh(P, S, n, eigvals_only, kwargs)
+
+    @property
+    def eigsh_warm_start(self) -> Optional[EigshWarmStart]:
+        """State of the warm-started `eigsh` calculations, None if no warm-started calculations has been done"""
+        return getattr(self, "_eigsh_warm_start", None)
+
+    def _eigsh(self, P, S, n: int, eigvals_only: bool, kwargs):
+        """Calculate the eigenpairs using ARPACK, or the warm-started LOBPCG solver"""
+        warm_start = kwargs.pop("warm_start", False)
+        if warm_start is None or warm_start is False:
+            if S is None:
+                return lin.eigsh(P, k=n, return_eigenvectors=not eigvals_only, **kwargs)
+            return lin.eigsh(
+                P, M=S, k=n, return_eigenvectors=not eigvals_only, **kwargs
+            )
+
+        # setdefault is atomic, threads will share the state
+        state = self.__dict__.setdefault("_eigsh_warm_start", EigshWarmStart())
+        X0 = None
+        if warm_start is not True:
+            X0 = np.asarray(warm_start)
+        return state.solve(P, S, n, eigvals_only, X0=X0, **kwargs)
 
     def astype(self, dtype, copy: bool = True) -> Self:
         """Convert the stored data-type to something else
@@ -1471,6 +1743,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
             func.R = R
             func.params = params
             func.paramsH = paramsH
+            func.shells = True
 
             return func
 
@@ -1511,6 +1784,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Sparse matrix (`scipy.sparse.csr_matrix`) at `k`
 
@@ -1522,8 +1796,10 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out : numpy.ndarray or scipy.sparse.csr_matrix, optional
+           store the result in this matrix (only for `format` ``"csr"`` and ``"array"``)
         """
-        return self._Pk(k, dtype=dtype, gauge=gauge, format=format)
+        return self._Pk(k, dtype=dtype, gauge=gauge, format=format, out=out)
 
     def _Pk_polarized(
         self,
@@ -1532,6 +1808,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Sparse matrix (`scipy.sparse.csr_matrix`) at `k` for a polarized system
 
@@ -1545,8 +1822,10 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out : numpy.ndarray or scipy.sparse.csr_matrix, optional
+           store the result in this matrix (only for `format` ``"csr"`` and ``"array"``)
         """
-        return self._Pk(k, dtype=dtype, gauge=gauge, format=format, _dim=spin)
+        return self._Pk(k, dtype=dtype, gauge=gauge, format=format, _dim=spin, out=out)
 
     def _Pk_non_colinear(
         self,
@@ -1554,6 +1833,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Sparse matrix (`scipy.sparse.csr_matrix`) at `k` for a non-collinear system
 
@@ -1565,8 +1845,14 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out :
+           not supported for non-colinear matrices, must be None
         """
-        k = _a.asarrayd(k).ravel()
+        if out is not None:
+            raise ValueError(
+                f"{self.__class__.__name__}.Pk: out argument is not supported for non-colinear matrices"
+            )
+        k = _single_k(k)
         return matrix_k_nc(gauge, self, self.lattice, k, dtype, format)
 
     def _Pk_spin_orbit(
@@ -1575,6 +1861,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Sparse matrix (`scipy.sparse.csr_matrix`) at `k` for a spin-orbit system
 
@@ -1586,8 +1873,14 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out :
+           not supported for spin-orbit matrices, must be None
         """
-        k = _a.asarrayd(k).ravel()
+        if out is not None:
+            raise ValueError(
+                f"{self.__class__.__name__}.Pk: out argument is not supported for spin-orbit matrices"
+            )
+        k = _single_k(k)
         return matrix_k_so(gauge, self, self.lattice, k, dtype, format)
 
     def _Pk_nambu(
@@ -1596,6 +1889,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Sparse matrix (`scipy.sparse.csr_matrix`) at `k` for a Nambu system
 
@@ -1607,8 +1901,14 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out :
+           not supported for Nambu matrices, must be None
         """
-        k = _a.asarrayd(k).ravel()
+        if out is not None:
+            raise ValueError(
+                f"{self.__class__.__name__}.Pk: out argument is not supported for Nambu matrices"
+            )
+        k = _single_k(k)
         return matrix_k_nambu(gauge, self, self.lattice, k, dtype, format)
 
     def _dPk_unpolarized(
@@ -1672,7 +1972,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_dk_nc(gauge, self, self.lattice, k, dtype, format)
 
     def _dPk_spin_orbit(
@@ -1693,7 +1993,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_dk_so(gauge, self, self.lattice, k, dtype, format)
 
     def _dPk_nambu(
@@ -1714,7 +2014,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_dk_nambu(gauge, self, self.lattice, k, dtype, format)
 
     def _ddPk_non_colinear(
@@ -1735,7 +2035,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_ddk_nc(gauge, self, self.lattice, k, dtype, format)
 
     def _ddPk_spin_orbit(
@@ -1756,7 +2056,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_ddk_so(gauge, self, self.lattice, k, dtype, format)
 
     def _ddPk_nambu(
@@ -1777,7 +2077,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_ddk_nambu(gauge, self, self.lattice, k, dtype, format)
 
     def _Sk(
@@ -1786,6 +2086,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Overlap matrix in a `scipy.sparse.csr_matrix` at `k`.
 
@@ -1797,8 +2098,12 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out :
+           store the result in this matrix, see `Sk`
         """
-        return self._Pk(k, dtype=dtype, gauge=gauge, format=format, _dim=self.S_idx)
+        return self._Pk(
+            k, dtype=dtype, gauge=gauge, format=format, _dim=self.S_idx, out=out
+        )
 
     def _Sk_non_colinear(
         self,
@@ -1806,6 +2111,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Overlap matrix (`scipy.sparse.csr_matrix`) at `k` for a non-collinear system
 
@@ -1817,8 +2123,14 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out :
+           not supported for non-colinear matrices, must be None
         """
-        k = _a.asarrayd(k).ravel()
+        if out is not None:
+            raise ValueError(
+                f"{self.__class__.__name__}.Sk: out argument is not supported for non-colinear matrices"
+            )
+        k = _single_k(k)
         return matrix_k_diag(gauge, self, self.S_idx, 2, self.lattice, k, dtype, format)
 
     def _Sk_nambu(
@@ -1827,6 +2139,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         dtype=None,
         gauge: GaugeType = "lattice",
         format: str = "csr",
+        out=None,
     ):
         r"""Overlap matrix (`scipy.sparse.csr_matrix`) at `k` for a Nambu system
 
@@ -1838,8 +2151,14 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
            default to `numpy.complex128`
         gauge :
            chosen gauge
+        out :
+           not supported for Nambu matrices, must be None
         """
-        k = _a.asarrayd(k).ravel()
+        if out is not None:
+            raise ValueError(
+                f"{self.__class__.__name__}.Sk: out argument is not supported for Nambu matrices"
+            )
+        k = _single_k(k)
         return matrix_k_diag(gauge, self, self.S_idx, 4, self.lattice, k, dtype, format)
 
     def _dSk_non_colinear(
@@ -1860,7 +2179,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_dk_diag(
             gauge, self, self.S_idx, 2, self.lattice, k, dtype, format
         )
@@ -1883,7 +2202,7 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         gauge :
            chosen gauge
         """
-        k = _a.asarrayd(k).ravel()
+        k = _single_k(k)
         return matrix_dk_diag(
             gauge, self, self.S_idx, 4, self.lattice, k, dtype, format
         )
@@ -1938,7 +2257,13 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         Setup the system and overlap matrix with respect to
         the given k-point and calculate the eigenvalues.
 
-        All subsequent arguments gets passed directly to `scipy.linalg.eigh`
+        All subsequent arguments gets passed directly to `scipy.linalg.eigh`.
+
+        Passing multiple k-points (shape ``(nk, 3)``) solves all eigenvalue problems
+        in one call using `sisl.linalg.eigh_batch` (only for unpolarized and polarized
+        matrices), in which case `kwargs` (other than ``dtype`` and ``spin``) are not allowed.
+
+        The decompositions may be cached for subsequent calls, see `set_eigen_cache`.
 
         Parameters
         ----------
@@ -1948,17 +2273,31 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         """
         spin = kwargs.pop("spin", 0)
         dtype = kwargs.pop("dtype", None)
+        if self.spin.kind != Spin.POLARIZED:
+            spin = 0
+        if _multiple_k(k) and kwargs:
+            raise ValueError(
+                f"{self.__class__.__name__}.eigh does not accept {list(kwargs)} "
+                "for multiple k-points"
+            )
 
-        if self.spin.kind == Spin.POLARIZED:
-            P = self.Pk(k=k, dtype=dtype, gauge=gauge, spin=spin, format="array")
-        else:
-            P = self.Pk(k=k, dtype=dtype, gauge=gauge, format="array")
+        def func(eigvals_only):
+            if self.spin.kind == Spin.POLARIZED:
+                P = self.Pk(k=k, dtype=dtype, gauge=gauge, spin=spin, format="array")
+            else:
+                P = self.Pk(k=k, dtype=dtype, gauge=gauge, format="array")
 
-        if self.orthogonal:
-            return lin.eigh_destroy(P, eigvals_only=eigvals_only, **kwargs)
+            if self.orthogonal:
+                if P.ndim == 3:
+                    return lin.eigh_batch(P, eigvals_only=eigvals_only)
+                return lin.eigh_destroy(P, eigvals_only=eigvals_only, **kwargs)
 
-        S = self.Sk(k=k, dtype=dtype, gauge=gauge, format="array")
-        return lin.eigh_destroy(P, S, eigvals_only=eigvals_only, **kwargs)
+            S = self.Sk(k=k, dtype=dtype, gauge=gauge, format="array")
+            if P.ndim == 3:
+                return lin.eigh_batch(P, S, eigvals_only=eigvals_only)
+            return lin.eigh_destroy(P, S, eigvals_only=eigvals_only, **kwargs)
+
+        return self._eigh_cached(func, k, gauge, eigvals_only, spin, dtype, kwargs)
 
     def eigsh(
         self,
@@ -1983,6 +2322,15 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
         spin : int, optional
            the spin-component to calculate the eigenvalue spectrum of, note that
            this parameter is only valid for `Spin.POLARIZED` matrices.
+        warm_start : bool or numpy.ndarray, optional
+            if true, use a LOBPCG solver initialized with the eigenvectors of the
+            previous (warm-started) call, instead of ARPACK.
+            Neighbouring k-points (e.g. along a `BandStructure`) have nearly identical
+            eigenvectors, hence only a few iterations are required.
+            An array is used as the initial eigenvectors (columns).
+            In this mode only ``which`` (``"SM"``, ``"SA"`` or ``"LA"``), ``sigma``
+            (target energy, e.g. the Fermi level), ``tol`` and ``maxiter`` are accepted
+            as `kwargs`. The iteration counts are stored in ``eigsh_warm_start.iterations``.
         **kwargs:
             arguments passed directly to `scipy.sparse.linalg.eigsh`.
 
@@ -2001,10 +2349,10 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
             P = self.Pk(k=k, dtype=dtype, spin=spin, gauge=gauge)
         else:
             P = self.Pk(k=k, dtype=dtype, gauge=gauge)
-        if self.orthogonal:
-            return lin.eigsh(P, k=n, return_eigenvectors=not eigvals_only, **kwargs)
-        S = self.Sk(k=k, dtype=dtype, gauge=gauge)
-        return lin.eigsh(P, M=S, k=n, return_eigenvectors=not eigvals_only, **kwargs)
+        S = None
+        if not self.orthogonal:
+            S = self.Sk(k=k, dtype=dtype, gauge=gauge)
+        return self._eigsh(P, S, n, eigvals_only, kwargs)
 
     @deprecate_argument(
         "hermitian",
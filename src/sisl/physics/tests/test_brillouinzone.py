@@ -3,8 +3,12 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 from __future__ import annotations
 
+import gc
 import math as m
-from itertools import product
+import os
+import pickle
+import threading
+from itertools import product, zip_longest
 
 import numpy as np
 import pytest
@@ -536,6 +540,276 @@ class TestMonkhorstPack:
             for v1, v2 in zip(papply[method](), apply[method]()):
                 assert np.allclose(v1, v2)
 
+    @pytest.mark.parametrize(
+        "pool",
+        [
+            "shm:2",
+            ("shm:2", {"min_nbytes": 1}, {}),
+            "threads:2",
+            ("threads:3", {"blas_threads": 1}, {"chunksize": 2}),
+        ],
+    )
+    def test_bz_parallel_pool(self, pool):
+        from sisl import Hamiltonian, geom
+
+        g = geom.graphene()
+        H = Hamiltonian(g)
+        H.construct([[0.1, 1.44], [0, -2.7]])
+
+        bz = MonkhorstPack(H, [2, 2, 1], trs=False)
+
+        apply = bz.apply
+        papply = bz.apply.renew(pool=pool)
+        assert str(apply) != str(papply)
+
+        for method in ("iter", "average", "sum", "array", "list", "oplist"):
+            for v1, v2 in zip_longest(papply[method].eigh(), apply[method].eigh()):
+                assert np.allclose(v1, v2)
+
+        # non-picklable wraps are called in the main process
+        def wrap(es):
+            return es.eig
+
+        assert np.allclose(
+            papply.array.eigenstate(wrap=wrap), apply.array.eigenstate(wrap=wrap)
+        )
+        eig1, state1 = papply.renew(unzip=True).array.eigh(
+            eigvals_only=False, dtype=np.complex128
+        )
+        eig2, state2 = apply.renew(unzip=True).array.eigh(
+            eigvals_only=False, dtype=np.complex128
+        )
+        assert np.allclose(eig1, eig2)
+        assert np.allclose(np.abs(state1), np.abs(state2))
+
+    def test_bz_parallel_shm_pickle(self):
+        from sisl import Hamiltonian, geom
+        from sisl.physics._brillouinzone_pool import (
+            _dumps_shared,
+            _loads_shared,
+            _release,
+        )
+
+        H = Hamiltonian(geom.graphene())
+        H.construct([[0.1, 1.44], [0, -2.7]])
+
+        shms = []
+        data = _dumps_shared(H, shms, 1)
+        assert len(shms) > 0
+        attached = []
+        H2 = _loads_shared(data, attached)
+        assert len(attached) == len(shms)
+        assert np.allclose(
+            H.Hk([0.1, 0.2, 0]).toarray(), H2.Hk([0.1, 0.2, 0]).toarray()
+        )
+        del H2
+        gc.collect()
+        for shm in attached:
+            shm.close()
+        _release(shms)
+
+    def test_bz_parallel_threads_timings(self):
+        from sisl import Hamiltonian, geom
+        from sisl.physics import ThreadPool
+
+        H = Hamiltonian(geom.graphene())
+        H.construct([[0.1, 1.44], [0, -2.7]])
+        bz = MonkhorstPack(H, [3, 3, 1], trs=False)
+
+        pool = ThreadPool(2, blas_threads=1)
+        assert pool.blas_threads == 1
+        eigs = bz.apply.renew(pool=pool).array.eigh()
+        assert np.allclose(eigs, bz.apply.array.eigh())
+        assert pool.timings.shape == (len(bz),)
+        assert np.all(pool.timings >= 0)
+
+        list(bz.apply.renew(pool=pool).iter.eigh())
+        assert np.all(pool.timings >= 0)
+
+        # abandoned iterators does not calculate all k-points, nor keeps the limits
+        it = bz.apply.renew(pool=(pool, {}, {"chunksize": 1})).iter.eigh()
+        next(it)
+        it.close()
+        assert np.isnan(pool.timings).any()
+        assert pool._blas_count == 0
+
+    def test_bz_parallel_threads_no_threadpoolctl(self, monkeypatch):
+        import sys
+
+        from sisl.physics import ThreadPool
+
+        monkeypatch.setitem(sys.modules, "threadpoolctl", None)
+        with pytest.raises(ImportError, match="blas_threads=0"):
+            ThreadPool(2, blas_threads=1)
+        # not limiting the BLAS threads is fine
+        assert ThreadPool(2, blas_threads=0).blas_threads == 0
+
+    def test_bz_parallel_shm_empty(self):
+        from sisl import Hamiltonian, geom
+        from sisl.physics import SharedMemoryPool
+
+        H = Hamiltonian(geom.graphene())
+        H.construct([[0.1, 1.44], [0, -2.7]])
+        bz = MonkhorstPack(H, [3, 3, 1], trs=False)
+
+        def sisl_files():
+            if os.path.isdir("/dev/shm"):
+                return {f for f in os.listdir("/dev/shm") if f.startswith("sisl-")}
+            return set()
+
+        files = sisl_files()
+        pool = SharedMemoryPool(2)
+        eigs = bz.apply.renew(pool=pool).array.eigh()
+        # the workers wrote directly in the returned array
+        assert type(eigs) is np.ndarray
+        assert np.allclose(eigs, bz.apply.array.eigh())
+        assert len(pool._files) == 0
+        assert sisl_files() == files
+
+    def test_bz_parallel_shm_error(self):
+        from sisl import Hamiltonian, geom
+
+        H = Hamiltonian(geom.graphene())
+        bz = MonkhorstPack(H, [2, 2, 1], trs=False)
+        with pytest.raises(ValueError):
+            bz.apply.renew(pool="unknown:2").array.eigh()
+        # only chunksize can be passed to the pools
+        with pytest.raises(ValueError, match="chunksize"):
+            bz.apply.renew(pool=("shm:2", {}, {"timeout": 1})).array.eigh()
+
+    @pytest.mark.parametrize("suffix", [".npy", ".nc"])
+    @pytest.mark.parametrize("pool", [None, "shm:2", "threads:2"])
+    def test_bz_out_file(self, tmp_path, suffix, pool):
+        if suffix == ".nc":
+            pytest.importorskip("netCDF4")
+        from sisl import Hamiltonian, geom
+
+        H = Hamiltonian(geom.graphene())
+        H.construct([[0.1, 1.44], [0, -2.7]])
+        bz = MonkhorstPack(H, [2, 2, 1], trs=False)
+        apply = bz.apply.renew(pool=pool)
+
+        eig = bz.apply.array.eigh()
+        out = tmp_path / f"eig{suffix}"
+        a = apply.renew(out=out).array.eigh()
+        assert out.is_file()
+        assert not isinstance(a, np.ndarray) or isinstance(a, np.memmap)
+        assert np.allclose(np.asarray(a), eig)
+
+        da = apply.renew(out=tmp_path / f"da{suffix}").dataarray.eigh()
+        assert da.dims == ("k", "v1")
+        assert np.allclose(da.values, eig)
+
+        ds = apply.renew(out=tmp_path / f"ds{suffix}", unzip=True).dataarray.eigh(
+            eigvals_only=False, dtype=np.complex128, name=["eig", "state"]
+        )
+        assert np.allclose(ds["eig"].values, eig)
+        assert ds["state"].dims == ("k", "state.v1", "state.v2")
+        assert ds["state"].dtype == np.complex128
+
+    def test_bz_out_file_nc_complex(self, tmp_path, monkeypatch):
+        netCDF4 = pytest.importorskip("netCDF4")
+        from sisl import Hamiltonian, geom
+
+        class Dataset(netCDF4.Dataset):
+            # emulate netCDF4<1.7 which has no complex support
+            def __init__(self, *args, **kwargs):
+                if "auto_complex" in kwargs:
+                    raise TypeError("auto_complex")
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(netCDF4, "Dataset", Dataset)
+
+        H = Hamiltonian(geom.graphene())
+        H.construct([[0.1, 1.44], [0, -2.7]])
+        bz = MonkhorstPack(H, [2, 2, 1], trs=False)
+        eig = bz.apply.array.eigh()
+        a = bz.apply.renew(out=tmp_path / "eig.nc").array.eigh()
+        assert np.allclose(np.asarray(a), eig)
+        with pytest.raises(ValueError, match="complex"):
+            bz.apply.renew(out=tmp_path / "state.nc", unzip=True).array.eigh(
+                eigvals_only=False, dtype=np.complex128
+            )
+
+    def test_bz_out_file_error(self, tmp_path):
+        from sisl import Hamiltonian, geom
+
+        H = Hamiltonian(geom.graphene())
+        bz = MonkhorstPack(H, [2, 2, 1], trs=False)
+        with pytest.raises(ValueError):
+            bz.apply.renew(out=tmp_path / "eig.txt").array.eigh()
+        # reduced values are not written to out
+        for method in ("sum", "average"):
+            with pytest.raises(ValueError, match="out="):
+                bz.apply.renew(out=tmp_path / "eig.npy")[method].eigh()
+
+    @pytest.mark.parametrize("method", ["average", "sum"])
+    @pytest.mark.parametrize("pool", [None, "threads:2"])
+    def test_bz_checkpoint(self, tmp_path, method, pool):
+        from sisl import Hamiltonian, geom
+
+        H = Hamiltonian(geom.graphene())
+        H.construct([[0.1, 1.44], [0, -2.7]])
+        bz = MonkhorstPack(H, [3, 3, 1], trs=False)
+        E = np.linspace(-3, 3, 20)
+        ckpt = tmp_path / "checkpoint.pkl"
+        apply = bz.apply.renew(checkpoint=ckpt, checkpoint_interval=0, pool=pool)
+
+        class Interrupt(Exception):
+            pass
+
+        # the state is stored as attributes, closure variables are part of the
+        # checkpoint key.
+        # The values are accumulated in order, so interrupting at a specific
+        # k-point also works for pools (which may calculate k-points ahead).
+        def wrap(es, k):
+            wrap.calls.append(k)
+            if wrap.interrupt and np.allclose(k, wrap.interrupt_k):
+                raise Interrupt
+            return es.DOS(E)
+
+        wrap.calls = []
+        wrap.interrupt = True
+        wrap.interrupt_k = bz.k[4]
+
+        ref = bz.apply[method].eigenstate(wrap=lambda es: es.DOS(E))
+        DOS_k = bz.apply.array.eigenstate(wrap=lambda es: es.DOS(E))
+        if method == "average":
+            DOS_k *= bz.weight.reshape(-1, 1)
+        with pytest.raises(Interrupt):
+            apply[method].eigenstate(wrap=wrap)
+        assert ckpt.is_file()
+        with open(ckpt, "rb") as fh:
+            data = pickle.load(fh)
+        done = data["done"]
+        assert np.all(done == (np.arange(len(bz)) < 4))
+        # the stored value is the sum of the completed k-points
+        assert np.allclose(data["value"], DOS_k[done].sum(0))
+
+        # resume, only the remaining k-points are calculated
+        wrap.calls.clear()
+        wrap.interrupt = False
+        DOS = apply[method].eigenstate(wrap=wrap)
+        assert not ckpt.is_file()
+        assert np.allclose(np.sort(wrap.calls, axis=0), np.sort(bz.k[~done], axis=0))
+        assert np.allclose(DOS, ref)
+
+        # another wrap does not resume from the checkpoint
+        wrap.calls.clear()
+        wrap.interrupt = True
+        with pytest.raises(Interrupt):
+            apply[method].eigenstate(wrap=wrap)
+        wrap.calls.clear()
+        wrap.interrupt = False
+        DOS = apply[method].eigenstate(wrap=lambda es, k: wrap(es, k) * 2)
+        assert len(wrap.calls) == len(bz)
+        assert np.allclose(DOS, ref * 2)
+
+        # wraps that cannot be identified are refused
+        lock = threading.Lock()
+        with pytest.raises(ValueError, match="wrap"):
+            apply[method].eigenstate(wrap=lambda es: lock and es.DOS(E))
+
     def test_as_single(self):
         from sisl import Hamiltonian, geom
 
@@ -88,7 +88,7 @@ def setup():
 
 @pytest.fixture(
     scope="module",
-    params=["direct", "pre-compute"],
+    params=["direct", "pre-compute", "blocked"],
 )
 def density_method(request):
     return request.param
@@ -571,6 +571,31 @@ class TestDensityMatrix:
         grid = Grid(0.2, geometry=setup.D.geometry.copy(), lattice=lattice)
         D.density(grid, method=density_method)
 
+    @pytest.mark.parametrize("threads", [1, 2])
+    def test_rho_blocked(self, setup, threads):
+        from sisl._threads import num_threads
+
+        D = setup.D.copy()
+        D.construct(setup.func)
+        grid = Grid(0.2, geometry=setup.D.geometry)
+        D.density(grid, method="direct")
+        # small memory forces many blocks
+        blocked = grid.copy()
+        blocked.fill(0.0)
+        with num_threads(threads):
+            D.density(blocked, method="blocked", memory="20kB")
+        assert np.allclose(grid.grid, blocked.grid)
+
+        # smaller grid than the geometry
+        lattice = setup.D.geometry.cell.copy() / 2
+        grid = Grid(0.2, geometry=setup.D.geometry.copy(), lattice=lattice)
+        D.density(grid, method="direct")
+        blocked = grid.copy()
+        blocked.fill(0.0)
+        with num_threads(threads):
+            D.density(blocked, method="blocked", memory="20kB")
+        assert np.allclose(grid.grid, blocked.grid)
+
     def test_rho_fail_p(self, density_method):
         bond = 1.42
         sq3h = 3.0**0.5 * 0.5
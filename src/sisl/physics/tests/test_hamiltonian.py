@@ -2235,6 +2235,40 @@ def test_wavefunction_eta():
     ES.sub(0).wavefunction(grid, eta=True)
 
 
+@pytest.mark.parametrize("spin", ["unpolarized", "nc"])
+def test_wavefunction_batched(spin):
+    N = 50
+    o1 = SphericalOrbital(0, (np.linspace(0, 2, N), np.exp(-np.linspace(0, 100, N))))
+    G = Geometry([[1] * 3, [2] * 3], Atom(6, o1), lattice=[4, 4, 4])
+    if spin == "nc":
+        H = Hamiltonian(G, spin=Spin("nc"))
+        R, param = [0.1, 1.5], [[0.0, 0.0, 0.1, -0.1], [1.0, 1.0, 0.1, -0.1]]
+    else:
+        H = Hamiltonian(G)
+        R, param = [0.1, 1.5], [1.0, 0.1]
+    H.construct([R, param])
+    ES = H.eigenstate(k=[0.1, 0, 0])
+    grids = [Grid(0.2, dtype=np.complex128, geometry=H.geometry) for _ in ES]
+    ES.wavefunction(grids)
+    for i, grid in enumerate(grids):
+        single = Grid(0.2, dtype=np.complex128, geometry=H.geometry)
+        ES.sub(i).wavefunction(single)
+        assert np.allclose(grid.grid, single.grid)
+    assert not np.allclose(grids[0].grid, grids[1].grid)
+
+    with pytest.raises(ValueError):
+        ES.wavefunction(grids + grids[:1])
+    # one grid with several states is also a mismatch
+    with pytest.raises(ValueError, match="one state per grid"):
+        ES.wavefunction(grids[:1])
+
+    # a tuple of grids is the same as a list
+    tgrids = tuple(Grid(0.2, dtype=np.complex128, geometry=H.geometry) for _ in ES)
+    ES.wavefunction(tgrids)
+    for grid, tgrid in zip(grids, tgrids):
+        assert np.allclose(grid.grid, tgrid.grid)
+
+
 def test_hamiltonian_fromsp_overlap():
     G = Geometry([[1] * 3, [2] * 3], Atom(6), lattice=[4, 4, 4])
     H = Hamiltonian(G, spin=Spin("nc"), orthogonal=False)
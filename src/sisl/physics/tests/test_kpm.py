@@ -0,0 +1,235 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import scipy.sparse as sps
+
+from sisl import Atom, Hamiltonian, MonkhorstPack, geom
+from sisl.physics import kpm
+
+pytestmark = [pytest.mark.physics, pytest.mark.kpm]
+
+
+@pytest.fixture
+def setup():
+    class t:
+        def __init__(self):
+            self.g = geom.graphene().tile(6, 0).tile(6, 1)
+            self.H = Hamiltonian(self.g)
+            self.H.construct([(0.1, 1.44), (0.0, -2.7)])
+            self.E = np.linspace(-10, 10, 401)
+
+    return t()
+
+
+def test_kernels():
+    g = kpm.jackson_kernel(64)
+    assert g.shape == (64,)
+    assert g[0] == pytest.approx(1)
+    assert np.all(np.diff(g) < 0)
+    g = kpm.lorentz_kernel(64)
+    assert g[0] == pytest.approx(1)
+    assert np.all(np.diff(g) < 0)
+
+
+def test_spectral_bounds(setup):
+    Hk = setup.H.Hk([0.1, 0.2, 0])
+    eig = np.linalg.eigvalsh(Hk.toarray())
+    emin, emax = kpm.spectral_bounds(Hk)
+    assert emin < eig[0] and eig[-1] < emax
+    assert emax - emin < (eig[-1] - eig[0]) * 1.1
+
+
+def test_moments_exact(setup):
+    # with all unit vectors the stochastic trace is exact
+    Hk = setup.H.Hk().toarray()
+    bounds = kpm.spectral_bounds(Hk)
+    a, b = (bounds[1] - bounds[0]) / 2, (bounds[1] + bounds[0]) / 2
+    x = (np.linalg.eigvalsh(Hk) - b) / a
+    mu = kpm.moments(setup.H.Hk(), 16, bounds, R=64, seed=42)
+    exact = np.polynomial.chebyshev.chebvander(x, 15).sum(0)
+    # relative error of the trace ~ 1/sqrt(R n)
+    assert np.allclose(mu, exact, atol=0.05 * len(x))
+
+
+def test_moments_fail(setup):
+    Hk = setup.H.Hk()
+    with pytest.raises(ValueError):
+        kpm.moments(Hk, 1, (-10, 10))
+    with pytest.raises(ValueError):
+        kpm.moments(Hk, 10, (10, -10))
+    with pytest.raises(ValueError):
+        kpm.moments(Hk, 10, (-10, 10), projection="matrix")
+
+
+def test_reconstruct_normalization(setup):
+    H = setup.H
+    E = setup.E
+    DOS = H.kpm_DOS(E, N=128, R=8, seed=1)
+    assert DOS.shape == E.shape
+    assert np.trapezoid(DOS, E) == pytest.approx(H.no, rel=1e-2)
+    DOS = H.kpm_DOS(E, N=128, R=8, seed=1, kernel="lorentz")
+    assert np.trapezoid(DOS, E) == pytest.approx(H.no, rel=2e-2)
+
+
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_kpm_DOS_eigenstate(setup, orthogonal):
+    if orthogonal:
+        H = setup.H
+    else:
+        H = Hamiltonian(setup.g, orthogonal=False)
+        H.construct([(0.1, 1.44), ([0.0, 1.0], [-2.7, 0.1])])
+    E = setup.E
+    k = [0.1, 0.2, 0]
+
+    DOS = H.kpm_DOS(E, k, N=256, R=32, seed=2)
+    # compare the integrated number of states (insensitive to the broadening)
+    eig = H.eigh(k)
+    nstates = (eig.reshape(1, -1) <= E.reshape(-1, 1)).sum(1)
+    ikpm = np.concatenate(([0], np.cumsum((DOS[1:] + DOS[:-1]) / 2 * np.diff(E))))
+    assert np.abs(ikpm - nstates).max() < 0.1 * H.no
+
+
+def test_kpm_PDOS(setup):
+    H = setup.H
+    E = setup.E
+    DOS = H.kpm_DOS(E, N=64, R=4, seed=3)
+    PDOS = H.kpm_PDOS(E, N=64, R=4, seed=3)
+    assert PDOS.shape == (H.no, len(E))
+    assert np.allclose(PDOS.sum(0), DOS)
+
+    # each orbital has exactly one state
+    assert np.allclose(np.trapezoid(PDOS, E), 1, rtol=1e-2)
+
+    with pytest.raises(ValueError):
+        H.kpm_PDOS(E, projection="trace")
+
+
+def test_kpm_PDOS_atoms():
+    g = geom.graphene(atoms=Atom(6, [1.44, 1.44])).tile(3, 0)
+    g.set_nsc([1, 1, 1])
+    M = sps.random(g.no, g.no, density=0.3, random_state=4)
+    H = Hamiltonian.fromsp(g, M + M.T)
+    E = np.linspace(-6, 6, 11)
+    PDOS = H.kpm_PDOS(E, N=32, seed=4)
+    PDOSa = H.kpm_PDOS(E, N=32, seed=4, projection="atoms")
+    assert PDOSa.shape == (H.na, len(E))
+    assert np.allclose(PDOS.reshape(H.na, 2, -1).sum(1), PDOSa)
+
+
+@pytest.mark.parametrize("spin", ["polarized", "non-colinear", "spin-orbit"])
+def test_kpm_spin(setup, spin):
+    H = Hamiltonian(setup.g, spin=spin)
+    on = np.zeros(H.dim)
+    hop = np.zeros(H.dim)
+    on[:2] = 0.2, -0.2
+    hop[:2] = -2.7
+    H.construct([(0.1, 1.44), (on, hop)])
+    E = setup.E
+    nbasis = H.Hk().shape[0]
+    DOS = H.kpm_DOS(E, N=128, R=4, seed=5)
+    assert np.trapezoid(DOS, E) == pytest.approx(nbasis, rel=1e-2)
+    PDOS = H.kpm_PDOS(E, N=128, R=4, seed=5)
+    assert PDOS.shape == (H.no, len(E))
+    assert np.allclose(PDOS.sum(0), DOS)
+
+
+@pytest.mark.parametrize("spin", ["non-colinear", "spin-orbit"])
+def test_kpm_PDOS_spin_sum(spin):
+    # decoupled orbitals, each orbital has 2 states at e +- d
+    g = geom.graphene(atoms=Atom(6, [1.44, 1.44]))
+    g.set_nsc([1, 1, 1])
+    H = Hamiltonian(g, spin=spin)
+    e = np.array([-6.0, -2.0, 2.0, 6.0])
+    d = 0.5
+    for io in range(H.no):
+        on = np.zeros(H.dim)
+        on[:2] = e[io] + d, e[io] - d
+        H[io, io] = on
+    E = np.linspace(-8, 8, 1601)
+    # the diagonal is exact for diagonal matrices
+    PDOS = H.kpm_PDOS(E, N=256, R=1, seed=1)
+    assert PDOS.shape == (H.no, len(E))
+    for io in range(H.no):
+        idx = np.abs(E - e[io]) < 1.5
+        assert np.trapezoid(PDOS[io, idx], E[idx]) == pytest.approx(2, abs=0.05)
+        assert np.trapezoid(PDOS[io, ~idx], E[~idx]) == pytest.approx(0, abs=0.05)
+        # peaks of both spin components
+        for ie in (e[io] - d, e[io] + d):
+            idx = np.abs(E - ie) < 0.3
+            assert np.trapezoid(PDOS[io, idx], E[idx]) == pytest.approx(1, abs=0.05)
+
+    PDOSa = H.kpm_PDOS(E, N=256, R=1, seed=1, projection="atoms")
+    assert np.allclose(PDOS.reshape(H.na, 2, -1).sum(1), PDOSa)
+
+
+def test_kpm_moments_projection_fail(setup):
+    Hk = setup.H.Hk()
+    bounds = kpm.spectral_bounds(Hk)
+    mu = kpm.moments(Hk, 4, bounds, R=2, projection="hadamard", seed=1)
+    assert mu.shape == (setup.H.no, 4)
+    with pytest.raises(ValueError, match="hadamard"):
+        kpm.moments(Hk, 4, bounds, projection="unknown")
+
+
+def test_kpm_brillouinzone(setup):
+    H = setup.H
+    E = setup.E
+    bz = MonkhorstPack(H, [2, 2, 1])
+    bounds = kpm.spectral_bounds(H.Hk())
+    DOS = bz.apply.average.kpm_DOS(E, N=64, R=4, bounds=bounds, seed=6)
+    assert DOS.shape == E.shape
+    ref = sum(
+        w * H.kpm_DOS(E, k, N=64, R=4, bounds=bounds, seed=6)
+        for k, w in zip(bz.k, bz.weight)
+    )
+    assert np.allclose(DOS, ref)
+
+
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_eigh_window(orthogonal):
+    g = geom.graphene().tile(14, 0).tile(14, 1)
+    H = Hamiltonian(g, orthogonal=orthogonal)
+    if orthogonal:
+        H.construct([(0.1, 1.44), (0.0, -2.7)])
+    else:
+        H.construct([(0.1, 1.44), ((0.0, 1.0), (-2.7, 0.1))])
+    k = [0.1, 0.2, 0]
+    Hk = H.Hk(k, format="csr")
+    Sk = None if orthogonal else H.Sk(k, format="csr")
+    eig = H.eigh(k)
+    ref = eig[(-1 <= eig) & (eig <= 1)]
+    # small enough subspace to use the filtered iterations
+    assert 0 < len(ref) < H.no // 16
+
+    e, v = kpm.eigh_window(Hk, (-1, 1), S=Sk, seed=1)
+    assert np.allclose(e, ref)
+    assert v.shape == (H.no, len(ref))
+    Sv = v if orthogonal else Sk @ v
+    assert np.allclose(Hk @ v, Sv * e)
+    assert np.allclose(v.conj().T @ Sv, np.eye(len(e)))
+    e = kpm.eigh_window(Hk, (-1, 1), S=Sk, n=len(ref), eigvals_only=True, seed=2)
+    assert np.allclose(e, ref)
+
+
+def test_eigh_window_small(setup):
+    Hk = setup.H.Hk()
+    eig = setup.H.eigh()
+    e = kpm.eigh_window(Hk, (-1, 2), eigvals_only=True)
+    assert np.allclose(e, eig[(-1 <= eig) & (eig <= 2)])
+    with pytest.raises(ValueError):
+        kpm.eigh_window(Hk, (1, -1))
+
+
+def test_eigenstate_window(setup):
+    H = setup.H.tile(3, 0).tile(3, 1)
+    k = [0.1, 0.2, 0]
+    es = H.eigenstate_window((-1, 1), k, seed=1)
+    ref = H.eigenstate(k)
+    ref = ref.sub((-1 <= ref.eig) & (ref.eig <= 1))
+    assert np.allclose(es.eig, ref.eig)
+    assert np.allclose(es.norm2(), 1)
+    assert np.allclose(es.PDOS(setup.E), ref.PDOS(setup.E))
@@ -86,6 +86,48 @@ def test_eigsh_non_orthogonal():
     sp.eigsh(n=1)
 
 
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_eigsh_warm_start(orthogonal):
+    sp = SparseOrbitalBZ(_get().tile(10, 0).tile(10, 1), orthogonal=orthogonal)
+    if orthogonal:
+        sp.construct([(0.1, 1.44), (0.05, -2.7)])
+    else:
+        sp.construct([(0.1, 1.44), ([0.05, 1.0], [-2.7, 0.1])])
+    assert sp.eigsh_warm_start is None
+
+    for k in ([0, 0, 0], [0.02, 0, 0], [0.04, 0, 0]):
+        eig = sp.eigsh(k, n=6, sigma=0.4, which="LM")
+        weig, wv = sp.eigsh(k, n=6, sigma=0.4, warm_start=True, eigvals_only=False)
+        assert np.allclose(np.sort(eig), weig)
+        # the residuals are limited by the LOBPCG tolerance
+        Pk = sp.Pk(k)
+        if orthogonal:
+            assert np.allclose(Pk @ wv, wv * weig, atol=1e-5)
+        else:
+            assert np.allclose(Pk @ wv, sp.Sk(k) @ wv * weig, atol=1e-5)
+
+    state = sp.eigsh_warm_start
+    assert len(state.iterations) == 3
+    assert state.subspace is not None
+    # a converged subspace converges immediately
+    sp.eigsh([0.04, 0, 0], n=6, sigma=0.4, warm_start=True)
+    assert state.iterations[-1] <= 1
+    state.reset()
+    assert state.subspace is None
+    assert len(state.iterations) == 0
+
+
+def test_eigsh_warm_start_small():
+    sp = SparseOrbitalBZ(_get())
+    sp.construct([(0.1, 1.44), (0.0, -2.7)])
+    # too small for an iterative solver
+    eig = sp.eigsh([0.1, 0, 0], n=1, which="SA", warm_start=True)
+    assert np.allclose(eig, sp.eigh([0.1, 0, 0])[:1])
+    assert sp.eigsh_warm_start.iterations == [0]
+    with pytest.raises(ValueError):
+        sp.eigsh(n=1, which="LM", warm_start=True)
+
+
 def test_pickle_non_orthogonal():
     import pickle as p
 
@@ -184,6 +226,10 @@ def test_sparse_orbital_bz_non_colinear(sisl_allclose):
     run_Pk_hermitian_tests(M)
     run_Pk_hermitian_tests(MH)
 
+    out = M.Pk(format="array")
+    with pytest.raises(ValueError):
+        M.Pk(format="array", out=out)
+
 
 def _so_real2cmplx(p):
     return [p[0] + 1j * p[4], p[1] + 1j * p[5], p[2] + 1j * p[3], p[6] + 1j * p[7]]
@@ -870,3 +916,228 @@ def test_sparseorbital_fromsp_orthogonal():
     M1 = SparseOrbitalBZ.fromsp(gr, M, S=M)
     assert M1.shape == (no, no_s, 3)
     assert not M1.orthogonal
+
+
+@pytest.mark.parametrize("gauge", ["lattice", "atomic"])
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_sparseorbital_assembly_plan(gauge, orthogonal):
+    g = geom.graphene().tile(2, 0)
+    M = SparseOrbitalBZ(g, orthogonal=orthogonal)
+    if orthogonal:
+        M.construct([(0.1, 1.44), (0, -2.7)])
+    else:
+        M.construct([(0.1, 1.44), ([0, 1.0], [-2.7, 0.1])])
+
+    k = [0.1, 0.2, 0.3]
+    # non-finalized does not use the plan
+    Pk = M.Pk(k, gauge=gauge).toarray()
+    if not orthogonal:
+        Sk = M.Sk(k, gauge=gauge).toarray()
+
+    plan = M.assembly_plan()
+    assert M.finalized
+    assert plan is M.assembly_plan()
+    assert plan.shape == (M.no, M.no)
+    assert np.allclose(M.Pk(k, gauge=gauge).toarray(), Pk)
+    assert np.allclose(M.Pk(k, gauge=gauge, format="array"), Pk)
+    if not orthogonal:
+        assert np.allclose(M.Sk(k, gauge=gauge).toarray(), Sk)
+
+    # re-use output arrays
+    out = M.Pk(gauge=gauge, dtype=np.complex128)
+    assert M.Pk(k, gauge=gauge, out=out) is out
+    assert np.allclose(out.toarray(), Pk)
+    out = np.empty([M.no, M.no], dtype=np.complex128)
+    assert M.Pk(k, gauge=gauge, format="array", out=out) is out
+    assert np.allclose(out, Pk)
+    with pytest.raises(ValueError):
+        M.Pk(k, gauge=gauge, format="array", out=out[1:])
+    # out arguments that cannot be honoured
+    with pytest.raises(ValueError):
+        M.Pk(k, gauge=gauge, format="coo", out=M.Pk(k, format="coo"))
+    with pytest.raises(ValueError):
+        M.Pk(k, gauge=gauge, format="sc:array", out=out)
+    if orthogonal:
+        with pytest.raises(ValueError):
+            M.Sk(k, gauge=gauge, format="array", out=out)
+
+    # changing values retains the plan
+    M[0, 0, 0] = 2.0
+    assert plan is M.assembly_plan()
+    # in-place changes of the sparsity pattern does not
+    M.finalize()
+    M._csr.translate_columns([1, 2], [2, 1])
+    assert not plan.is_valid(M._csr)
+    M.finalize()
+    assert not plan.is_valid(M._csr)
+    plan = M.assembly_plan()
+    # changing the sparsity pattern does not
+    M[0, M.no + 1, 0] = 2.0
+    assert not plan.is_valid(M._csr)
+    if gauge == "lattice":
+        # non-finalized matrices cannot use a sparse out
+        # (the atomic gauge finalizes the matrix)
+        out = M.Pk(gauge=gauge, dtype=np.complex128)
+        with pytest.raises(ValueError):
+            M.Pk(k, gauge=gauge, out=out)
+    assert plan is not M.assembly_plan()
+
+
+@pytest.mark.parametrize("gauge", ["lattice", "atomic"])
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_sparseorbital_multiple_k(gauge, orthogonal):
+    g = geom.graphene()
+    M = SparseOrbitalBZ(g, orthogonal=orthogonal)
+    if orthogonal:
+        M.construct([(0.1, 1.44), (0, -2.7)])
+    else:
+        M.construct([(0.1, 1.44), ([0, 1.0], [-2.7, 0.1])])
+
+    k = np.random.default_rng(42).random((5, 3))
+    Pk = M.Pk(k, gauge=gauge, format="array")
+    Sk = M.Sk(k, gauge=gauge, format="array")
+    dPk = M.dPk(k, gauge=gauge, format="array")
+    assert Pk.shape == (5, M.no, M.no)
+    assert Sk.shape == (5, M.no, M.no)
+    assert len(dPk) == 3
+    for i, ik in enumerate(k):
+        assert np.allclose(Pk[i], M.Pk(ik, gauge=gauge, format="array"))
+        assert np.allclose(Sk[i], M.Sk(ik, gauge=gauge, format="array"))
+        for d, d_ik in zip(dPk, M.dPk(ik, gauge=gauge, format="array")):
+            assert np.allclose(d[i], d_ik)
+
+    eig = M.eigh(k, gauge=gauge)
+    assert eig.shape == (5, M.no)
+    for i, ik in enumerate(k):
+        assert np.allclose(eig[i], M.eigh(ik, gauge=gauge))
+
+    with pytest.raises(ValueError):
+        M.Pk(k, gauge=gauge, format="csr")
+    # scipy.linalg.eigh arguments are not used for multiple k-points
+    with pytest.raises(ValueError):
+        M.eigh(k, gauge=gauge, subset_by_index=[0, 0])
+
+
+@pytest.mark.parametrize("spin", ["non-colinear", "so"])
+def test_sparseorbital_multiple_k_spin_fail(spin):
+    M = SparseOrbitalBZSpin(geom.graphene(), spin=Spin(spin))
+    M.construct([(0.1, 1.44), (np.arange(M.dim) + 1.0, np.arange(M.dim) * 0.1)])
+    k = np.zeros([2, 3])
+    with pytest.raises(ValueError, match="multiple k-points"):
+        M.Pk(k, format="array")
+    with pytest.raises(ValueError, match="multiple k-points"):
+        M.eigh(k)
+    # a single k-point in a 2D array is fine
+    assert np.allclose(M.eigh(k[:1]), M.eigh(k[0]))
+
+
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_sparseorbital_single_k_2d(orthogonal):
+    M = SparseOrbitalBZ(geom.graphene(), orthogonal=orthogonal)
+    if orthogonal:
+        M.construct([(0.1, 1.44), (0, -2.7)])
+    else:
+        M.construct([(0.1, 1.44), ([0, 1.0], [-2.7, 0.1])])
+    # a single k-point in a 2D array is treated as a single k-point
+    k = [[0.1, 0, 0]]
+    assert np.allclose(M.Pk(k).toarray(), M.Pk(k[0]).toarray())
+    assert np.allclose(M.Sk(k).toarray(), M.Sk(k[0]).toarray())
+    for dPk, dPk0 in zip(M.dPk(k), M.dPk(k[0])):
+        assert np.allclose(dPk.toarray(), dPk0.toarray())
+    eig = M.eigh(k)
+    assert eig.shape == (M.no,)
+    assert np.allclose(eig, M.eigh(k[0]))
+
+
+def test_sparseorbital_multiple_k_gamma_dtype():
+    M = SparseOrbitalBZ(geom.graphene())
+    M.construct([(0.1, 1.44), (0, -2.7)])
+    assert M.Pk(np.zeros([2, 3]), format="array").dtype == np.float64
+    assert M.Pk([[0, 0, 0], [0.5, 0, 0]], format="array").dtype == np.complex128
+
+
+@pytest.mark.parametrize("spin", ["unpolarized", "polarized", "non-colinear", "so"])
+@pytest.mark.parametrize("format", ["csr", "array"])
+def test_sparseorbital_num_threads(spin, format):
+    from sisl._threads import get_num_threads, num_threads
+
+    g = geom.graphene().tile(4, 0).tile(4, 1)
+    M = SparseOrbitalBZSpin(g, spin=Spin(spin), orthogonal=False)
+    M.construct([(0.1, 1.44), (np.arange(M.dim) + 1.0, np.arange(M.dim) * 0.1)])
+    k = [0.1, 0.2, 0.3]
+
+    with num_threads(1):
+        assert get_num_threads() == 1
+        Pk1 = M.Pk(k, format=format)
+        Sk1 = M.Sk(k, format=format)
+        dPk1 = M.dPk(k, format=format)
+        Psc1 = M.Pk(k, format=f"sc:{format}")
+    with num_threads(3):
+        assert get_num_threads() == 3
+        Pk3 = M.Pk(k, format=format)
+        Sk3 = M.Sk(k, format=format)
+        dPk3 = M.dPk(k, format=format)
+        Psc3 = M.Pk(k, format=f"sc:{format}")
+
+    def todense(m):
+        return m.toarray() if sps.issparse(m) else m
+
+    assert np.allclose(todense(Pk1), todense(Pk3))
+    assert np.allclose(todense(Sk1), todense(Sk3))
+    assert np.allclose(todense(Psc1), todense(Psc3))
+    for d1, d3 in zip(dPk1, dPk3):
+        assert np.allclose(todense(d1), todense(d3))
+
+
+@pytest.mark.parametrize("spin", ["unpolarized", "polarized", "non-colinear"])
+def test_sparseorbital_eigen_cache(spin):
+    M = SparseOrbitalBZSpin(geom.graphene(), spin=Spin(spin))
+    M.construct([(0.1, 1.44), (np.arange(M.dim) * 0.1, np.full(M.dim, -2.7))])
+    assert M.eigen_cache is None
+    cache = M.set_eigen_cache()
+    assert M.eigen_cache is cache
+
+    k = [0.1, 0.2, 0]
+    # eigenvalues only also stores the full decomposition
+    e1 = M.eigh(k)
+    assert cache.stats["misses"] == 1
+    e, v = M.eigh(k, eigvals_only=False)
+    assert cache.stats["misses"] == 1
+    assert np.allclose(e, e1)
+    # eigenvalues are retrieved from the full decomposition
+    e1 = M.eigh(k)
+    assert np.allclose(e, e1)
+    e1[:] = 0
+    e2, v2 = M.eigh(k, eigvals_only=False)
+    assert np.allclose(e, e2)
+    assert np.allclose(v, v2)
+    assert cache.stats["hits"] == 3
+    if M.spin.is_polarized:
+        assert not np.allclose(M.eigh(k, spin=1), e)
+
+    # changing the matrix invalidates the entries
+    M[0, 0] = 1.0
+    assert not np.allclose(M.eigh(k), e)
+    assert cache.stats["hits"] == 3
+
+    M.set_eigen_cache(None)
+    assert M.eigen_cache is None
+
+
+def test_sparseorbital_eigen_cache_eviction():
+    M = SparseOrbitalBZ(geom.graphene().tile(2, 0))
+    M.construct([(0.1, 1.44), (0, -2.7)])
+    cache = M.set_eigen_cache()
+    M.eigh([0.1, 0, 0])
+    # room for two decompositions
+    cache.max_bytes = 2 * cache.nbytes
+    for k in ([0.2, 0, 0], [0.3, 0, 0]):
+        M.eigh(k)
+    assert len(cache) == 2
+    assert cache.stats["evictions"] == 1
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+    # decompositions larger than the cache are not stored
+    cache.max_bytes = M.no * 8
+    M.eigh(k)
+    assert len(cache) == 0
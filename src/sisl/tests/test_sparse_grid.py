@@ -314,3 +314,79 @@ def test_orbital_products_onthefly_reduction(geometry, psi_values, ncoeffs):
         assert np.allclose(reduced.grid, post_reduced.grid)
     else:
         assert np.allclose(reduced.reshape(post_reduced.shape), post_reduced)
+
+
+@pytest.mark.parametrize("ncoeffs", [1, 2])
+@pytest.mark.parametrize("dense", [True, False])
+@pytest.mark.parametrize("reduce_grid", [(), (2,), (0,)])
+def test_orbital_products_threads(geometry, psi_values, ncoeffs, dense, reduce_grid):
+    """The parallel kernels give the same results as the serial ones"""
+    from sisl._threads import num_threads
+
+    DM = sisl.DensityMatrix(geometry, dim=ncoeffs, dtype=np.float64)
+    DM.construct(
+        [(0.1, 1.44), ([1.0] * ncoeffs, [0.2 * (i + 1) for i in range(ncoeffs)])]
+    )
+    if ncoeffs == 1:
+        weights = DM.tocsr()
+    else:
+        weights = DM._csr
+    if dense:
+        weights = DM._csr.todense()
+        if ncoeffs == 1:
+            weights = weights[..., 0]
+
+    def reduce():
+        out = psi_values.reduce_orbital_products(
+            weights, DM.lattice, reduce_grid=reduce_grid
+        )
+        return getattr(out, "grid", out)
+
+    with num_threads(1):
+        serial = reduce()
+    with num_threads(3):
+        parallel = reduce()
+    assert np.any(serial != 0)
+    assert np.allclose(serial, parallel)
+
+
+def test_basis_grid_reuse(geometry, tmp_path):
+    """Re-using (and storing) the orbital values gives the same densities"""
+    from sisl import SparseGridOrbitalBZ
+
+    grid_shape = (8, 10, 12)
+    basis = SparseGridOrbitalBZ.from_geometry(geometry, grid_shape)
+    basis.write(tmp_path / "basis_grid.npz")
+    read = SparseGridOrbitalBZ.read(tmp_path / "basis_grid.npz", geometry)
+    assert read.grid_shape == basis.grid_shape
+    assert np.allclose(read._csr.tocsr().toarray(), basis._csr.tocsr().toarray())
+    assert np.allclose(read.geometry.xyz, basis.geometry.xyz)
+    assert np.all(read.geometry.nsc == basis.geometry.nsc)
+
+    for occ in [0.5, 1.0]:
+        DM = sisl.DensityMatrix(geometry, dim=1)
+        DM.construct([(0.1, 1.44), (occ, 0.2 * occ)])
+
+        ref = Grid(grid_shape, geometry=geometry)
+        DM.density(ref)
+        for basis_grid in [basis, tmp_path / "basis_grid.npz"]:
+            grid = Grid(grid_shape, geometry=geometry)
+            DM.density(grid, basis_grid=basis_grid)
+            assert np.allclose(grid.grid, ref.grid)
+
+    grid = Grid((8, 10, 10), geometry=geometry)
+    with pytest.raises(ValueError):
+        DM.density(grid, basis_grid=basis)
+
+    # the same number of orbitals, but another basis
+    r = np.linspace(0, 3.5, 50)
+    orb = sisl.AtomicOrbital("2pzZ", (r, np.exp(-2 * r)))
+    other = geometry.copy()
+    other.atoms.replace_atom(other.atoms[0], sisl.Atom(6, orb))
+    DM = sisl.DensityMatrix(other, dim=1)
+    DM.construct([(0.1, 1.44), (1.0, 0.2)])
+    for basis_grid in [basis, tmp_path / "basis_grid.npz"]:
+        with pytest.raises(ValueError):
+            DM.density(ref, basis_grid=basis_grid)
+    with pytest.raises(ValueError):
+        DM.density(ref, basis_grid=basis, method="direct")